@@ -2,12 +2,15 @@
 Flask application for Inventory Hub.
 """
 
-from flask import Flask, send_from_directory, abort
+import click
+from flask import Flask, current_app, send_from_directory, abort
+from flask.cli import with_appcontext
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 import logging
 import os
+import threading
 
 # Configure logging
 logging.basicConfig(
@@ -36,14 +39,42 @@ def create_app(config_name='default'):
     
     # Initialize extensions
     from backend.models import db
-    db.init_app(app)
+    from backend.services.db_engine import init_db
+    init_db(app)
     
-    migrate = Migrate(app, db)
+    # Batch mode lets migrations alter tables on SQLite
+    migrate = Migrate(app, db, render_as_batch=True)
     jwt = JWTManager(app)
+    from backend.utils.tokens import scoped_token_allowed
+    jwt.token_verification_loader(scoped_token_allowed)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     
+    # Job progress pub/sub
+    from backend.services.events import init_events
+    init_events(app)
+    
+    # Read replica routing for GET requests
+    from backend.services.replicas import init_read_replicas
+    init_read_replicas(app)
+    
+    # Per-user read endpoint cache
+    from backend.services.query_cache import init_query_cache
+    init_query_cache(app)
+    
+    # Job scheduler in front of scraping execution
+    from backend.services.job_scheduler import init_scheduler
+    init_scheduler(app)
+    
+    # Recurring scrape schedules
+    from backend.services.schedule_runner import init_schedule_runner
+    init_schedule_runner(app)
+    
+    # Periodic database maintenance
+    from backend.services.db_engine import init_db_maintenance
+    init_db_maintenance(app)
+    
     # Import models
-    from backend.models import User, DBInventoryItem, ScrapingJob
+    from backend.models import User, DBInventoryItem, ScrapingJob, ScrapeSchedule, InventoryStats, PriceHistory, Tag
     
     # Import and register blueprints
     from backend.routes import auth, inventory, scraping, stats
@@ -53,6 +84,29 @@ def create_app(config_name='default'):
     app.register_blueprint(scraping.bp)
     app.register_blueprint(stats.bp)
     
+    # Distributed scraping workers: `flask scrape-worker`
+    from backend.services.work_queue import worker_command
+    app.cli.add_command(worker_command)
+    
+    # Summary table repair: `flask rebuild-inventory-stats`
+    from backend.services.inventory_stats import rebuild_stats_command
+    app.cli.add_command(rebuild_stats_command)
+    
+    # Price history downsampling: `flask compact-price-history`
+    from backend.services.price_history import compact_history_command
+    app.cli.add_command(compact_history_command)
+    
+    # Statistics and space reclamation: `flask db-maintenance`
+    from backend.services.db_engine import db_maintenance_command
+    app.cli.add_command(db_maintenance_command)
+    
+    # Hot/cold archival and job retention: `flask archive`
+    from backend.services.archive import archive_command
+    app.cli.add_command(archive_command)
+    
+    # Background services on their own: `flask background`
+    app.cli.add_command(background_command)
+    
     # Health check endpoint
     @app.route('/health')
     def health_check():
@@ -114,6 +168,36 @@ def create_app(config_name='default'):
     return app
 
 
+def start_background_services(app):
+    """
+    Start the background work of the process serving the app.
+    
+    Resumes scraping jobs whose worker stopped and starts the threads that
+    run due scrape schedules and periodic database maintenance (archival,
+    statistics, VACUUM). create_app() only sets these services up, so importing the app (flask commands, tests, each worker of a
+    WSGI server) starts nothing. Call this from a single process: run.py does,
+    and `flask background` runs the services on their own.
+    """
+    from backend.services.db_engine import start_db_maintenance
+    from backend.services.job_scheduler import start_scheduler
+    from backend.services.schedule_runner import start_schedule_runner
+    start_scheduler(app)
+    start_schedule_runner(app)
+    start_db_maintenance(app)
+
+
+@click.command('background')
+@with_appcontext
+def background_command():
+    """Run the background services until interrupted."""
+    start_background_services(current_app._get_current_object())
+    click.echo("Background services started, press Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
 # Create app instance
 app = create_app(os.getenv('FLASK_ENV', 'default'))
 
@@ -123,6 +207,10 @@ if __name__ == '__main__':
     with app.app_context():
         db.create_all()
     
+    # The debug reloader runs this module twice; only its child serves requests
+    if not app.config['DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services(app)
+    
     # Run the app
     app.run(
         host=app.config['HOST'],
@@ -25,9 +25,38 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Read replicas (comma-separated URLs): GET requests read from one of them. Reads stay on
+    # the primary for REPLICA_STICKY_SECONDS after a user's data changes (memory:// or redis://)
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', '5'))
+    REPLICA_STICKY_URL = os.getenv('REPLICA_STICKY_URL', 'memory://')
+    
+    # Engine profile: 'production' (pool sizing, SQLite WAL and PRAGMAs) or 'default' (library defaults)
+    DB_ENGINE_PROFILE = os.getenv('DB_ENGINE_PROFILE', 'production').lower()
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '500'))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+    
+    # Periodic ANALYZE / VACUUM / WAL checkpoint
+    DB_MAINTENANCE_ENABLED = os.getenv('DB_MAINTENANCE_ENABLED', 'True').lower() == 'true'
+    DB_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv('DB_MAINTENANCE_INTERVAL_SECONDS', '86400'))
+    
+    # Archival to the *_archive tables (runs with maintenance); 0 days disables a policy
+    ARCHIVE_SOLD_ITEMS_AFTER_DAYS = int(os.getenv('ARCHIVE_SOLD_ITEMS_AFTER_DAYS', '90'))
+    ARCHIVE_JOBS_AFTER_DAYS = int(os.getenv('ARCHIVE_JOBS_AFTER_DAYS', '30'))
+    JOB_RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '365'))
+    ARCHIVE_BATCH_SIZE = int(os.getenv('ARCHIVE_BATCH_SIZE', '1000'))
+    
     # JWT settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
+    EXPORT_TOKEN_EXPIRES_SECONDS = int(os.getenv('EXPORT_TOKEN_EXPIRES_SECONDS', '60'))
+    JOB_EVENTS_TOKEN_EXPIRES_SECONDS = int(os.getenv('JOB_EVENTS_TOKEN_EXPIRES_SECONDS', '60'))
     
     # Celery settings
     CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
@@ -36,6 +65,65 @@ class Config:
     # Scraper settings
     SCRAPER_OUTPUT_DIR = os.getenv('SCRAPER_OUTPUT_DIR', 'scraped_data')
     
+    # Job scheduler settings
+    SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'True').lower() == 'true'
+    SCHEDULER_MAX_WORKERS = int(os.getenv('SCHEDULER_MAX_WORKERS', '4'))
+    SCHEDULER_MAX_JOBS_PER_USER = int(os.getenv('SCHEDULER_MAX_JOBS_PER_USER', '2'))
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+    DEFAULT_MERCHANT_CONCURRENCY = int(os.getenv('DEFAULT_MERCHANT_CONCURRENCY', '4'))
+    # Format: "mercari:2,depop:1"
+    MERCHANT_CONCURRENCY = {
+        name.strip().lower(): int(cap)
+        for name, cap in (
+            entry.split(':') for entry in os.getenv('MERCHANT_CONCURRENCY', '').split(',') if ':' in entry
+        )
+    }
+    
+    # Job queue backend: 'memory' runs jobs on this process's scheduler, 'database'
+    # leaves them in scraping_jobs for `flask scrape-worker` processes on any host
+    JOB_QUEUE_BACKEND = os.getenv('JOB_QUEUE_BACKEND', 'memory').lower()
+    WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '2'))
+    WORKER_POLL_SECONDS = float(os.getenv('WORKER_POLL_SECONDS', '5'))
+    WORKER_LEASE_SECONDS = int(os.getenv('WORKER_LEASE_SECONDS', '120'))
+    WORKER_HEARTBEAT_SECONDS = int(os.getenv('WORKER_HEARTBEAT_SECONDS', '30'))
+    WORKER_MAX_ATTEMPTS = int(os.getenv('WORKER_MAX_ATTEMPTS', '3'))
+    
+    # Per-job wall-clock budget
+    SCRAPE_JOB_TIMEOUT_SECONDS = int(os.getenv('SCRAPE_JOB_TIMEOUT_SECONDS', '1800'))
+    SCRAPE_JOB_MAX_TIMEOUT_SECONDS = int(os.getenv('SCRAPE_JOB_MAX_TIMEOUT_SECONDS', '14400'))
+    
+    # Scraped item ingestion: rows per bulk INSERT/COPY chunk, each committed with the job checkpoint
+    INGEST_CHUNK_SIZE = int(os.getenv('INGEST_CHUNK_SIZE', '1000'))
+    INGEST_USE_COPY = os.getenv('INGEST_USE_COPY', 'True').lower() == 'true'
+    
+    # Batch jobs
+    BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '10000'))
+    BATCH_SHARD_SIZE = int(os.getenv('BATCH_SHARD_SIZE', '50'))
+    BATCH_MAX_SHARD_SIZE = int(os.getenv('BATCH_MAX_SHARD_SIZE', '500'))
+    
+    # Recurring scrape schedules
+    SCHEDULE_RUNNER_ENABLED = os.getenv('SCHEDULE_RUNNER_ENABLED', 'True').lower() == 'true'
+    SCHEDULE_POLL_SECONDS = int(os.getenv('SCHEDULE_POLL_SECONDS', '30'))
+    SCHEDULE_MIN_INTERVAL_SECONDS = int(os.getenv('SCHEDULE_MIN_INTERVAL_SECONDS', '900'))
+    SCHEDULE_DEFAULT_JITTER_SECONDS = int(os.getenv('SCHEDULE_DEFAULT_JITTER_SECONDS', '600'))
+    SCHEDULE_REFRESH_AFTER_SECONDS = int(os.getenv('SCHEDULE_REFRESH_AFTER_SECONDS', str(7 * 24 * 3600)))
+    
+    # Job progress events (memory:// or redis://host:port/db)
+    EVENTS_BROKER_URL = os.getenv('EVENTS_BROKER_URL', 'memory://')
+    # Redis keeps each job's event counter until the job has been quiet this long
+    EVENTS_SEQUENCE_TTL_SECONDS = int(os.getenv('EVENTS_SEQUENCE_TTL_SECONDS', '86400'))
+    SSE_KEEPALIVE_SECONDS = int(os.getenv('SSE_KEEPALIVE_SECONDS', '15'))
+    
+    # Read endpoint response cache (memory://, redis://host:port/db or none;
+    # unset uses EVENTS_BROKER_URL's Redis if any, else memory://)
+    QUERY_CACHE_URL = os.getenv('QUERY_CACHE_URL')
+    QUERY_CACHE_TTL = int(os.getenv('QUERY_CACHE_TTL', '300'))
+    QUERY_CACHE_MAX_ENTRIES = int(os.getenv('QUERY_CACHE_MAX_ENTRIES', '1024'))
+    
+    # Price history downsampling: daily points after this many days, weekly after that many
+    PRICE_HISTORY_DAILY_AFTER_DAYS = int(os.getenv('PRICE_HISTORY_DAILY_AFTER_DAYS', '30'))
+    PRICE_HISTORY_WEEKLY_AFTER_DAYS = int(os.getenv('PRICE_HISTORY_WEEKLY_AFTER_DAYS', '365'))
+    
     # Pagination
     ITEMS_PER_PAGE = int(os.getenv('ITEMS_PER_PAGE', '20'))
     
@@ -58,6 +146,10 @@ class TestingConfig(Config):
     """Testing configuration."""
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_REPLICA_URIS = []
+    SCHEDULER_ENABLED = False
+    SCHEDULE_RUNNER_ENABLED = False
+    DB_MAINTENANCE_ENABLED = False
 
 
 # Configuration dictionary
@@ -5,8 +5,12 @@ Database models for Inventory Hub application.
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
 
-db = SQLAlchemy()
+from backend.services.replicas import RoutingSession
+
+# GET requests may read from a replica, see backend/services/replicas.py
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(db.Model):
@@ -24,6 +28,7 @@ class User(db.Model):
     # Relationships
     inventory_items = db.relationship('DBInventoryItem', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     scraping_jobs = db.relationship('ScrapingJob', backref='user', lazy='dynamic', cascade='all, delete-orphan')
+    scrape_schedules = db.relationship('ScrapeSchedule', backref='user', lazy='dynamic', cascade='all, delete-orphan')
     
     def set_password(self, password):
         """Hash and set the user's password."""
@@ -47,9 +52,24 @@ class DBInventoryItem(db.Model):
     """Database model for inventory items."""
     
     __tablename__ = 'inventory_items'
+    # Every inventory query filters by user first, then sorts by created_at
+    # (the default) or filters on merchant, price or is_sold
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'merchant', 'listing_key', name='uq_inventory_items_user_merchant_listing'),
+        db.Index('ix_inventory_items_user_created', 'user_id', 'created_at'),
+        db.Index('ix_inventory_items_user_merchant_created', 'user_id', 'merchant', 'created_at'),
+        db.Index('ix_inventory_items_user_price', 'user_id', 'price'),
+        db.Index('ix_inventory_items_user_sold_created', 'user_id', 'is_sold', 'created_at'),
+        # Never reuse the id of a deleted (e.g. archived) item
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Listing identity (SKU, else canonical product URL) and hash of the scraped fields
+    listing_key = db.Column(db.String(1000))
+    content_hash = db.Column(db.String(64))
     
     # Product information
     title = db.Column(db.String(500), nullable=False)
@@ -72,7 +92,9 @@ class DBInventoryItem(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Additional fields
-    tags = db.Column(db.String(500))  # Comma-separated tags
+    # Comma-separated display copy of the item's tags; item_tags is authoritative
+    # and indexed (see backend/services/tags.py)
+    tags = db.Column(db.String(500))
     notes = db.Column(db.Text)
     is_sold = db.Column(db.Boolean, default=False)
     custom_fields = db.Column(db.JSON)
@@ -80,52 +102,368 @@ class DBInventoryItem(db.Model):
     # Relationship
     scraping_job_id = db.Column(db.Integer, db.ForeignKey('scraping_jobs.id'))
     
+    # Keys of to_dict(); each is the column of the same name
+    DICT_FIELDS = (
+        'id', 'user_id', 'title', 'price', 'currency', 'quantity', 'sku', 'description', 'category',
+        'brand', 'image_url', 'product_url', 'merchant', 'condition', 'in_stock', 'scraped_at',
+        'created_at', 'updated_at', 'tags', 'notes', 'is_sold', 'custom_fields'
+    )
+    
+    def to_dict(self, fields=None):
+        """
+        Convert inventory item to dictionary.
+        
+        Args:
+            fields: Keys to include (default: all of DICT_FIELDS). Only these
+                attributes are read, so columns left out of load_only() are
+                never loaded.
+        """
+        return {field: self.dict_value(field, getattr(self, field)) for field in fields or self.DICT_FIELDS}
+    
+    @staticmethod
+    def dict_value(field, value):
+        """Convert a column value to its to_dict() form (also used for column-only rows)."""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if field == 'tags':
+            return value.split(',') if value else []
+        return value
+
+
+# Full-text search over title, brand and description (see backend/services/search.py).
+# SQLite: an external-content FTS5 table kept in sync by triggers.
+# PostgreSQL: a GIN index on the weighted tsvector expression the search query uses.
+SEARCH_FTS_TABLE = 'inventory_items_fts'
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+SQLITE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_FTS_TABLE} USING fts5(
+        title, brand, description,
+        content='inventory_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_items_fts_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO {SEARCH_FTS_TABLE}(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_items_fts_delete AFTER DELETE ON inventory_items BEGIN
+        INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_items_fts_update
+        AFTER UPDATE OF title, brand, description ON inventory_items BEGIN
+        INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+        INSERT INTO {SEARCH_FTS_TABLE}(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+)
+
+POSTGRESQL_SEARCH_DDL = (
+    f"CREATE INDEX IF NOT EXISTS ix_inventory_items_search ON inventory_items USING gin (({SEARCH_VECTOR_SQL}))",
+)
+
+for _statement in SQLITE_SEARCH_DDL:
+    event.listen(DBInventoryItem.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRESQL_SEARCH_DDL:
+    event.listen(DBInventoryItem.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+# Triggers and indexes go with the table; the FTS table does not
+event.listen(DBInventoryItem.__table__, 'after_drop',
+             DDL(f"DROP TABLE IF EXISTS {SEARCH_FTS_TABLE}").execute_if(dialect='sqlite'))
+
+
+class InventoryStats(db.Model):
+    """
+    Per-user inventory aggregates, kept current by triggers on inventory_items.
+    
+    One row per (user, merchant, condition, price bucket, sold flag) with the
+    item count and total price, so dashboard statistics read a handful of rows
+    per user however large the inventory grows. NULL merchant and condition
+    are stored as ''; price_bucket is '' for items without a non-negative price.
+    """
+    
+    __tablename__ = 'inventory_stats'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    merchant = db.Column(db.String(100), primary_key=True, default='')
+    condition = db.Column(db.String(50), primary_key=True, default='')
+    price_bucket = db.Column(db.String(10), primary_key=True, default='')
+    is_sold = db.Column(db.Boolean, primary_key=True, default=False)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0)
+
+
+# Dashboard price buckets: (label, lower bound inclusive, upper bound exclusive)
+PRICE_BUCKETS = (
+    ('0-25', 0, 25),
+    ('25-50', 25, 50),
+    ('50-100', 50, 100),
+    ('100-250', 100, 250),
+    ('250+', 250, None),
+)
+
+STATS_KEY_COLUMNS = ('user_id', 'merchant', 'condition', 'price_bucket', 'is_sold')
+
+
+def stats_key_sql(row):
+    """SQL expressions for the inventory_stats key of an inventory_items row (``new``, ``old`` or a table)."""
+    buckets = ' '.join(
+        f"WHEN {row}.price < {upper} THEN '{label}'" for label, _, upper in PRICE_BUCKETS if upper is not None
+    )
+    return (
+        f"{row}.user_id",
+        f"coalesce({row}.merchant, '')",
+        f"coalesce({row}.condition, '')",
+        f"CASE WHEN {row}.price IS NULL OR {row}.price < 0 THEN '' {buckets} ELSE '{PRICE_BUCKETS[-1][0]}' END",
+        f"coalesce({row}.is_sold, false)",
+    )
+
+
+def _stats_match(row):
+    return ' AND '.join(f"{column} = {expr}" for column, expr in zip(STATS_KEY_COLUMNS, stats_key_sql(row)))
+
+
+_STATS_COLUMNS = ', '.join(STATS_KEY_COLUMNS)
+
+_SQLITE_STATS_ADD = f"""INSERT INTO inventory_stats ({_STATS_COLUMNS}, item_count, total_value)
+        VALUES ({', '.join(stats_key_sql('new'))}, 1, coalesce(new.price, 0))
+        ON CONFLICT ({_STATS_COLUMNS})
+        DO UPDATE SET item_count = item_count + 1, total_value = total_value + excluded.total_value;"""
+
+_SQLITE_STATS_REMOVE = f"""UPDATE inventory_stats
+        SET item_count = item_count - 1, total_value = total_value - coalesce(old.price, 0)
+        WHERE {_stats_match('old')};
+        DELETE FROM inventory_stats WHERE {_stats_match('old')} AND item_count <= 0;"""
+
+SQLITE_STATS_DDL = (
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_stats_insert AFTER INSERT ON inventory_items BEGIN
+        {_SQLITE_STATS_ADD}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_stats_delete AFTER DELETE ON inventory_items BEGIN
+        {_SQLITE_STATS_REMOVE}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_stats_update
+        AFTER UPDATE OF user_id, merchant, condition, price, is_sold ON inventory_items BEGIN
+        {_SQLITE_STATS_REMOVE}
+        {_SQLITE_STATS_ADD}
+    END""",
+)
+
+
+def _pg_stats_apply(sources):
+    """Fold signed per-row deltas from transition tables into inventory_stats."""
+    delta = ' UNION ALL '.join(
+        f"SELECT {', '.join(f'{expr} AS {column}' for column, expr in zip(STATS_KEY_COLUMNS, stats_key_sql(table)))}, "
+        f"{sign} AS item_count, {sign} * coalesce({table}.price, 0) AS total_value FROM {table}"
+        for table, sign in sources
+    )
+    return f"""INSERT INTO inventory_stats AS s ({_STATS_COLUMNS}, item_count, total_value)
+            SELECT {_STATS_COLUMNS}, sum(item_count), sum(total_value) FROM ({delta}) AS delta
+            GROUP BY {_STATS_COLUMNS}
+            HAVING sum(item_count) <> 0 OR sum(total_value) <> 0
+            ON CONFLICT ({_STATS_COLUMNS}) DO UPDATE
+            SET item_count = s.item_count + excluded.item_count, total_value = s.total_value + excluded.total_value;"""
+
+
+# Statement-level triggers with transition tables, so bulk inserts, upserts
+# and COPY update each summary row once per statement rather than per item
+POSTGRESQL_STATS_DDL = (
+    f"""CREATE OR REPLACE FUNCTION inventory_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {_pg_stats_apply([('new_rows', 1)])}
+        ELSIF TG_OP = 'UPDATE' THEN
+            {_pg_stats_apply([('new_rows', 1), ('old_rows', -1)])}
+            DELETE FROM inventory_stats WHERE item_count <= 0 AND user_id IN (SELECT user_id FROM old_rows);
+        ELSE
+            {_pg_stats_apply([('old_rows', -1)])}
+            DELETE FROM inventory_stats WHERE item_count <= 0 AND user_id IN (SELECT user_id FROM old_rows);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE TRIGGER inventory_stats_insert AFTER INSERT ON inventory_items
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+    """CREATE TRIGGER inventory_stats_update AFTER UPDATE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+    """CREATE TRIGGER inventory_stats_delete AFTER DELETE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+)
+
+for _statement in SQLITE_STATS_DDL:
+    event.listen(DBInventoryItem.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRESQL_STATS_DDL:
+    event.listen(DBInventoryItem.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+class PriceHistory(db.Model):
+    """
+    Price and availability of an inventory item over time.
+    
+    Triggers on inventory_items add a point when an item is created and
+    whenever its price or in_stock actually changes, so re-scrapes of an
+    unchanged listing add nothing. previous_price is the price before the
+    change, which lets "biggest change since" queries read one point per
+    item. Old points are downsampled by compact_price_history().
+    """
+    
+    __tablename__ = 'price_history'
+    __table_args__ = (
+        db.Index('ix_price_history_item_recorded', 'item_id', 'recorded_at'),
+        db.Index('ix_price_history_user_recorded', 'user_id', 'recorded_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    item_id = db.Column(db.Integer, db.ForeignKey('inventory_items.id', ondelete='CASCADE'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    recorded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    price = db.Column(db.Float)
+    in_stock = db.Column(db.Boolean)
+    previous_price = db.Column(db.Float)
+    
     def to_dict(self):
-        """Convert inventory item to dictionary."""
+        """Convert a history point to dictionary."""
         return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'title': self.title,
+            'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
             'price': self.price,
-            'currency': self.currency,
-            'quantity': self.quantity,
-            'sku': self.sku,
-            'description': self.description,
-            'category': self.category,
-            'brand': self.brand,
-            'image_url': self.image_url,
-            'product_url': self.product_url,
-            'merchant': self.merchant,
-            'condition': self.condition,
             'in_stock': self.in_stock,
-            'scraped_at': self.scraped_at.isoformat() if self.scraped_at else None,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'tags': self.tags.split(',') if self.tags else [],
-            'notes': self.notes,
-            'is_sold': self.is_sold,
-            'custom_fields': self.custom_fields
+            'previous_price': self.previous_price
         }
 
 
+# Times are naive UTC like the rest of the schema ('%%' because DDL() %-formats its text)
+_HISTORY_COLUMNS = 'item_id, user_id, recorded_at, price, in_stock, previous_price'
+
+SQLITE_HISTORY_DDL = (
+    f"""CREATE TRIGGER IF NOT EXISTS price_history_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO price_history ({_HISTORY_COLUMNS})
+        VALUES (new.id, new.user_id, strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now'), new.price, new.in_stock, NULL);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS price_history_update AFTER UPDATE OF price, in_stock ON inventory_items
+        WHEN old.price IS NOT new.price OR old.in_stock IS NOT new.in_stock BEGIN
+        INSERT INTO price_history ({_HISTORY_COLUMNS})
+        VALUES (new.id, new.user_id, strftime('%%Y-%%m-%%d %%H:%%M:%%f', 'now'), new.price, new.in_stock, old.price);
+    END""",
+    # SQLite does not enforce ON DELETE CASCADE unless foreign keys are switched on
+    """CREATE TRIGGER IF NOT EXISTS price_history_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM price_history WHERE item_id = old.id;
+    END""",
+)
+
+# Statement-level like the stats triggers; history is removed by ON DELETE CASCADE
+POSTGRESQL_HISTORY_DDL = (
+    f"""CREATE OR REPLACE FUNCTION price_history_record() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO price_history ({_HISTORY_COLUMNS})
+            SELECT id, user_id, now() AT TIME ZONE 'utc', price, in_stock, NULL FROM new_rows;
+        ELSE
+            INSERT INTO price_history ({_HISTORY_COLUMNS})
+            SELECT n.id, n.user_id, now() AT TIME ZONE 'utc', n.price, n.in_stock, o.price
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.price IS DISTINCT FROM o.price OR n.in_stock IS DISTINCT FROM o.in_stock;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE TRIGGER price_history_insert AFTER INSERT ON inventory_items
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION price_history_record()""",
+    """CREATE TRIGGER price_history_update AFTER UPDATE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION price_history_record()""",
+)
+
+# The history table must exist before the inventory triggers that write to it
+# are created, so these run after price_history is created
+for _statement in SQLITE_HISTORY_DDL:
+    event.listen(PriceHistory.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRESQL_HISTORY_DDL:
+    event.listen(PriceHistory.__table__, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+
+
+class Tag(db.Model):
+    """A user's tag; names are normalized by backend/services/tags.py."""
+    
+    __tablename__ = 'tags'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='uq_tags_user_name'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    name = db.Column(db.String(50), nullable=False)
+
+
+# Item/tag association. The primary key serves lookups by item; the reverse
+# index serves ?tag= filters and per-tag counts.
+item_tags = db.Table(
+    'item_tags',
+    db.Column('item_id', db.Integer, db.ForeignKey('inventory_items.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_item_tags_tag_item', 'tag_id', 'item_id'),
+)
+
+# SQLite does not enforce ON DELETE CASCADE unless foreign keys are switched on
+SQLITE_ITEM_TAGS_DDL = (
+    """CREATE TRIGGER IF NOT EXISTS item_tags_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM item_tags WHERE item_id = old.id;
+    END""",
+)
+
+for _statement in SQLITE_ITEM_TAGS_DDL:
+    event.listen(item_tags, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+
 class ScrapingJob(db.Model):
     """Model for tracking scraping jobs."""
     
     __tablename__ = 'scraping_jobs'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_scraping_jobs_user_idempotency_key'),
+        db.Index('ix_scraping_jobs_user_created', 'user_id', 'created_at'),
+        # Never reuse the id of a deleted (e.g. archived) job
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Client-supplied Idempotency-Key of the request that created the job
+    idempotency_key = db.Column(db.String(255))
     
     # Job information
     url = db.Column(db.String(1000), nullable=False)
     merchant = db.Column(db.String(100), nullable=False)
     pages = db.Column(db.Integer, default=1)
-    status = db.Column(db.String(50), default='pending', index=True)  # pending, running, completed, failed
+    status = db.Column(db.String(50), default='pending', index=True)  # pending, queued, running, completed, failed, cancelled
+    
+    # Batch jobs: a 'batch' parent owns 'batch_shard' children, each with a slice of the URLs
+    kind = db.Column(db.String(20), default='scrape', nullable=False)  # scrape, batch, batch_shard
+    parent_id = db.Column(db.Integer, db.ForeignKey('scraping_jobs.id'), index=True)
+    urls = db.Column(db.JSON)
+    total_urls = db.Column(db.Integer)
+    
+    # Scheduling
+    priority = db.Column(db.Integer, default=0, nullable=False)
+    queued_at = db.Column(db.DateTime)
+    
+    # Cancellation and wall-clock budget
+    timeout_seconds = db.Column(db.Integer)
+    cancel_requested_at = db.Column(db.DateTime)
+    
+    # Database work queue lease, held by the worker running the job
+    lease_owner = db.Column(db.String(255))
+    lease_expires_at = db.Column(db.DateTime, index=True)
+    heartbeat_at = db.Column(db.DateTime)
     
     # Results
     items_scraped = db.Column(db.Integer, default=0)
     error_message = db.Column(db.Text)
     
+    # Resume state: completed pages, frontier, last page URL and saved listing URLs
+    checkpoint = db.Column(db.JSON)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    
     # Timing
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     started_at = db.Column(db.DateTime)
@@ -134,8 +472,12 @@ class ScrapingJob(db.Model):
     # Celery task ID
     task_id = db.Column(db.String(255))
     
+    # Recurring schedule that created this job, if any
+    schedule_id = db.Column(db.Integer, db.ForeignKey('scrape_schedules.id', use_alter=True), index=True)
+    
     # Relationships
     inventory_items = db.relationship('DBInventoryItem', backref='scraping_job', lazy='dynamic')
+    children = db.relationship('ScrapingJob', backref=db.backref('parent', remote_side=[id]), lazy='dynamic')
     
     def to_dict(self):
         """Convert scraping job to dictionary."""
@@ -146,10 +488,145 @@ class ScrapingJob(db.Model):
             'merchant': self.merchant,
             'pages': self.pages,
             'status': self.status,
+            'kind': self.kind,
+            'parent_id': self.parent_id,
+            'total_urls': self.total_urls,
             'items_scraped': self.items_scraped,
             'error_message': self.error_message,
+            'attempts': self.attempts,
+            'checkpoint': {
+                k: v for k, v in self.checkpoint.items() if k != 'saved_urls'
+            } if self.checkpoint else None,
+            'priority': self.priority,
+            'queued_at': self.queued_at.isoformat() if self.queued_at else None,
+            'timeout_seconds': self.timeout_seconds,
+            'cancel_requested_at': self.cancel_requested_at.isoformat() if self.cancel_requested_at else None,
+            'lease_owner': self.lease_owner,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'task_id': self.task_id
+            'task_id': self.task_id,
+            'schedule_id': self.schedule_id
         }
+
+
+
+class ScrapeSchedule(db.Model):
+    """Model for recurring scraping jobs."""
+    
+    __tablename__ = 'scrape_schedules'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    
+    # Job template
+    url = db.Column(db.String(1000), nullable=False)
+    merchant = db.Column(db.String(100), nullable=False)
+    pages = db.Column(db.Integer, default=1)
+    priority = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Schedule: either a fixed interval or a cron expression
+    interval_seconds = db.Column(db.Integer)
+    cron = db.Column(db.String(100))
+    jitter_seconds = db.Column(db.Integer, default=0, nullable=False)
+    incremental = db.Column(db.Boolean, default=True, nullable=False)
+    enabled = db.Column(db.Boolean, default=True, nullable=False)
+    
+    # Timing
+    next_run_at = db.Column(db.DateTime, index=True)
+    last_run_at = db.Column(db.DateTime)
+    last_success_at = db.Column(db.DateTime)
+    last_job_id = db.Column(db.Integer, db.ForeignKey('scraping_jobs.id', use_alter=True))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Relationships
+    jobs = db.relationship('ScrapingJob', backref='schedule', lazy='dynamic',
+                           foreign_keys='ScrapingJob.schedule_id')
+    
+    def to_dict(self):
+        """Convert schedule to dictionary."""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'url': self.url,
+            'merchant': self.merchant,
+            'pages': self.pages,
+            'priority': self.priority,
+            'interval_seconds': self.interval_seconds,
+            'cron': self.cron,
+            'jitter_seconds': self.jitter_seconds,
+            'incremental': self.incremental,
+            'enabled': self.enabled,
+            'next_run_at': self.next_run_at.isoformat() if self.next_run_at else None,
+            'last_run_at': self.last_run_at.isoformat() if self.last_run_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None,
+            'last_job_id': self.last_job_id,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+
+# Cold storage for rows moved out of the hot tables by backend/services/archive.py.
+# Archive tables repeat the source columns (items and jobs keep their ids) without
+# constraints or defaults, plus the time the row was archived. Nothing writes
+# to them except the archiver, so they carry no stats or history triggers.
+def _archive_table(name, source, *indexes, keep_ids=True):
+    columns = [
+        db.Column(column.name, column.type, primary_key=column.primary_key and keep_ids, autoincrement=False)
+        for column in source.columns if keep_ids or not column.primary_key
+    ]
+    if not keep_ids:
+        columns.insert(0, db.Column('id', db.Integer, primary_key=True))
+    return db.Table(name, *columns, db.Column('archived_at', db.DateTime, nullable=False), *indexes)
+
+
+inventory_items_archive = _archive_table(
+    'inventory_items_archive', DBInventoryItem.__table__,
+    db.Index('ix_inventory_items_archive_user_created', 'user_id', 'created_at'),
+)
+
+price_history_archive = _archive_table(
+    'price_history_archive', PriceHistory.__table__,
+    db.Index('ix_price_history_archive_item_recorded', 'item_id', 'recorded_at'),
+    keep_ids=False,
+)
+
+scraping_jobs_archive = _archive_table(
+    'scraping_jobs_archive', ScrapingJob.__table__,
+    db.Index('ix_scraping_jobs_archive_user_created', 'user_id', 'created_at'),
+    db.Index('ix_scraping_jobs_archive_parent', 'parent_id'),
+    db.Index('ix_scraping_jobs_archive_archived', 'archived_at'),
+)
+
+# Archived items stay searchable with ?include_archived=true. Archived rows
+# are never updated, so insert and delete triggers keep the index in sync.
+ARCHIVE_FTS_TABLE = 'inventory_items_archive_fts'
+
+SQLITE_ARCHIVE_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {ARCHIVE_FTS_TABLE} USING fts5(
+        title, brand, description,
+        content='inventory_items_archive', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_items_archive_fts_insert
+        AFTER INSERT ON inventory_items_archive BEGIN
+        INSERT INTO {ARCHIVE_FTS_TABLE}(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS inventory_items_archive_fts_delete
+        AFTER DELETE ON inventory_items_archive BEGIN
+        INSERT INTO {ARCHIVE_FTS_TABLE}({ARCHIVE_FTS_TABLE}, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+    END""",
+)
+
+POSTGRESQL_ARCHIVE_SEARCH_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_inventory_items_archive_search "
+    f"ON inventory_items_archive USING gin (({SEARCH_VECTOR_SQL}))",
+)
+
+for _statement in SQLITE_ARCHIVE_SEARCH_DDL:
+    event.listen(inventory_items_archive, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+for _statement in POSTGRESQL_ARCHIVE_SEARCH_DDL:
+    event.listen(inventory_items_archive, 'after_create', DDL(_statement).execute_if(dialect='postgresql'))
+event.listen(inventory_items_archive, 'after_drop',
+             DDL(f"DROP TABLE IF EXISTS {ARCHIVE_FTS_TABLE}").execute_if(dialect='sqlite'))
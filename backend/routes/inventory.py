@@ -2,11 +2,26 @@
 Inventory management routes.
 """
 
-from flask import Blueprint, request, jsonify
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models import db, DBInventoryItem
+from backend.services.archive import archived_item_history, include_archived_requested, inventory_items_union
+from backend.services.bulk_update import update_items_by_id, update_items_by_query
+from backend.services.export import EXPORT_FORMATS, export_filename, export_rows, serialize
+from backend.services.importer import IMPORT_FORMATS, CountingReader, detect_format, import_records, iter_records
+from backend.services.price_history import CHANGE_DIRECTIONS, biggest_price_changes, item_history
+from backend.services.query_cache import INVENTORY, cached_response, mark_changed
+from backend.services.search import apply_search
+from backend.services.tags import filter_by_tags, set_item_tags, tag_counts
+from backend.utils.fieldsets import FieldsetError, load_fields, parse_fields
+from backend.utils.pagination import TOTAL_MODES, CursorError, keyset_page, page_total
+from backend.utils.tokens import EXPORT_SCOPE, create_scoped_token, query_string_token_allowed
 from backend.utils.validation import sanitize_string
+from columnar import COLUMNAR_FORMATS, columnar_available
 from sqlalchemy import or_, and_
+from werkzeug.datastructures import MultiDict
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,8 +29,139 @@ logger = logging.getLogger(__name__)
 bp = Blueprint('inventory', __name__, url_prefix='/api/inventory')
 
 
+# Sort columns supported in cursor mode (besides relevance)
+CURSOR_SORT_COLUMNS = ('created_at', 'updated_at', 'scraped_at', 'price', 'title')
+
+
+def _cursor_page(query, sort_by, sort_order, rank, per_page, fields=None, Item=DBInventoryItem):
+    """
+    Serve one keyset page of a filtered inventory query.
+    
+    Args:
+        query: Filtered query without ORDER BY
+        sort_by: Requested sort column or 'relevance'
+        sort_order: 'asc' or 'desc'
+        rank: Search rank expression (lower is better), or None
+        per_page: Requested page size
+        fields: Item fields to return (default: all)
+        Item: Entity the query selects (DBInventoryItem or an inventory_items_union alias)
+    
+    Returns:
+        tuple: Flask response and status code
+    """
+    total_mode = request.args.get('total', 'none')
+    if total_mode not in TOTAL_MODES:
+        return jsonify({'error': f"total must be one of: {', '.join(TOTAL_MODES)}"}), 400
+    per_page = max(1, min(per_page, 100))
+    
+    if sort_by == 'relevance' and rank is not None:
+        key, descending, nullable = rank, False, False
+    elif sort_by == 'relevance':
+        key, descending, nullable = Item.created_at, True, False
+    elif sort_by in CURSOR_SORT_COLUMNS:
+        key = getattr(Item, sort_by)
+        descending = sort_order == 'desc'
+        nullable = DBInventoryItem.__table__.c[sort_by].nullable
+    else:
+        return jsonify({'error': f"sort_by must be one of: relevance, {', '.join(CURSOR_SORT_COLUMNS)}"}), 400
+    
+    sort = f"{sort_by}:{'desc' if descending else 'asc'}"
+    try:
+        items, next_cursor = keyset_page(query, key, Item.id, sort, per_page,
+                                         cursor=request.args.get('cursor'), descending=descending,
+                                         nullable=nullable)
+    except CursorError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'items': [item.to_dict(fields) for item in items],
+        'per_page': per_page,
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None,
+        **page_total(query, total_mode)
+    }), 200
+
+
+def _find_item(item_id, user_id, include_archived=False):
+    """Look up one of the user's items, in the archive too if asked."""
+    Item = inventory_items_union(user_id) if include_archived else DBInventoryItem
+    return db.session.query(Item).filter(Item.id == item_id, Item.user_id == user_id).first()
+
+
+def _filtered_query(user_id, fields=None, args=None):
+    """
+    Build the user's inventory query with the filters in the query string.
+    
+    Args:
+        user_id: User ID
+        fields: Columns to load (default: all)
+        args: Filter parameters (default: request.args)
+    
+    Returns:
+        tuple: (query, Item, rank) where Item is the entity the query selects
+            (DBInventoryItem or an inventory_items_union alias) and rank the
+            search rank expression, or None
+    """
+    args = request.args if args is None else args
+    merchant = args.get('merchant')
+    condition = args.get('condition')
+    min_price = args.get('min_price', type=float)
+    max_price = args.get('max_price', type=float)
+    search = args.get('search')
+    is_sold = args.get('is_sold', type=lambda x: x.lower() == 'true')
+    tags = args.getlist('tag')
+    include_archived = include_archived_requested(args)
+    
+    # Archived items come from a union of the hot and archive tables
+    if include_archived:
+        Item = inventory_items_union(user_id)
+        query = load_fields(db.session.query(Item), Item, fields)
+    else:
+        Item = DBInventoryItem
+        query = load_fields(DBInventoryItem.query.filter_by(user_id=user_id), DBInventoryItem, fields)
+    
+    if merchant:
+        query = query.filter(Item.merchant == merchant)
+    
+    if condition:
+        query = query.filter(Item.condition == condition)
+    
+    if min_price is not None:
+        query = query.filter(Item.price >= min_price)
+    
+    if max_price is not None:
+        query = query.filter(Item.price <= max_price)
+    
+    if is_sold is not None:
+        query = query.filter(Item.is_sold == is_sold)
+    
+    if tags:
+        query = filter_by_tags(query, user_id, tags, model=Item)
+    
+    rank = None
+    if search:
+        query, rank = apply_search(query, search, model=Item, include_archived=include_archived)
+    
+    return query, Item, rank
+
+
+def _sorted(query, Item, sort_by, sort_order, rank):
+    """Order a filtered inventory query as requested (offset pagination and exports)."""
+    if sort_by == 'relevance':
+        if rank is not None:
+            return query.order_by(rank.asc(), Item.created_at.desc())
+        return query.order_by(Item.created_at.desc())
+    if hasattr(DBInventoryItem, sort_by):
+        order_column = getattr(Item, sort_by)
+        if sort_order == 'desc':
+            return query.order_by(order_column.desc())
+        return query.order_by(order_column.asc())
+    return query
+
+
 @bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response(INVENTORY)
 def list_inventory():
     """List all inventory items with pagination and filters."""
     try:
@@ -25,58 +171,29 @@ def list_inventory():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         
-        # Filters
-        merchant = request.args.get('merchant')
-        condition = request.args.get('condition')
-        min_price = request.args.get('min_price', type=float)
-        max_price = request.args.get('max_price', type=float)
-        search = request.args.get('search')
-        is_sold = request.args.get('is_sold', type=lambda x: x.lower() == 'true')
+        # Sparse fieldset: only these columns are loaded and returned
+        try:
+            fields = parse_fields(request.args.get('fields'), DBInventoryItem.DICT_FIELDS)
+        except FieldsetError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Sorting
-        sort_by = request.args.get('sort_by', 'created_at')
+        # Sorting (searches default to best match first)
+        sort_by = request.args.get('sort_by', 'relevance' if request.args.get('search') else 'created_at')
         sort_order = request.args.get('sort_order', 'desc')
         
-        # Build query
-        query = DBInventoryItem.query.filter_by(user_id=user_id)
-        
-        # Apply filters
-        if merchant:
-            query = query.filter(DBInventoryItem.merchant == merchant)
-        
-        if condition:
-            query = query.filter(DBInventoryItem.condition == condition)
-        
-        if min_price is not None:
-            query = query.filter(DBInventoryItem.price >= min_price)
-        
-        if max_price is not None:
-            query = query.filter(DBInventoryItem.price <= max_price)
+        # Build query and apply filters
+        query, Item, rank = _filtered_query(user_id, fields)
         
-        if is_sold is not None:
-            query = query.filter(DBInventoryItem.is_sold == is_sold)
+        if 'cursor' in request.args:
+            return _cursor_page(query, sort_by, sort_order, rank, per_page, fields, Item)
         
-        if search:
-            search_filter = or_(
-                DBInventoryItem.title.ilike(f'%{search}%'),
-                DBInventoryItem.description.ilike(f'%{search}%'),
-                DBInventoryItem.brand.ilike(f'%{search}%')
-            )
-            query = query.filter(search_filter)
-        
-        # Apply sorting
-        if hasattr(DBInventoryItem, sort_by):
-            order_column = getattr(DBInventoryItem, sort_by)
-            if sort_order == 'desc':
-                query = query.order_by(order_column.desc())
-            else:
-                query = query.order_by(order_column.asc())
+        query = _sorted(query, Item, sort_by, sort_order, rank)
         
         # Paginate
         pagination = query.paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'items': [item.to_dict() for item in pagination.items],
+            'items': [item.to_dict(fields) for item in pagination.items],
             'total': pagination.total,
             'pages': pagination.pages,
             'current_page': page,
@@ -90,6 +207,129 @@ def list_inventory():
         return jsonify({'error': 'Failed to list inventory'}), 500
 
 
+@bp.route('/export-token', methods=['POST'])
+@jwt_required()
+def create_export_token():
+    """Issue a short-lived token for an export download link, valid for GET /export only."""
+    try:
+        user_id = get_jwt_identity()
+        expires_in = current_app.config.get('EXPORT_TOKEN_EXPIRES_SECONDS', 60)
+        
+        token = create_scoped_token(user_id, EXPORT_SCOPE, expires_in)
+        return jsonify({'token': token, 'expires_in': expires_in}), 200
+        
+    except Exception as e:
+        logger.error(f"Create export token error: {e}")
+        return jsonify({'error': 'Failed to create export token'}), 500
+
+
+@bp.route('/export', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def export_inventory():
+    """Stream the user's inventory as CSV, JSON, NDJSON, Parquet or Arrow, with the list filters."""
+    try:
+        user_id = get_jwt_identity()
+        
+        # Links end up in history and logs, so only short-lived export tokens go in the URL
+        if not query_string_token_allowed(EXPORT_SCOPE):
+            return jsonify({'error': 'Download links need a token from POST /api/inventory/export-token'}), 401
+        
+        fmt = request.args.get('format', 'csv').lower()
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({'error': f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+        if fmt in COLUMNAR_FORMATS and not columnar_available():
+            return jsonify({'error': f'{fmt} export is not available on this server (pyarrow is not installed)'}), 501
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), DBInventoryItem.DICT_FIELDS)
+        except FieldsetError as e:
+            return jsonify({'error': str(e)}), 400
+        fields = list(fields or DBInventoryItem.DICT_FIELDS)
+        
+        sort_by = request.args.get('sort_by', 'relevance' if request.args.get('search') else 'created_at')
+        sort_order = request.args.get('sort_order', 'desc')
+        
+        query, Item, rank = _filtered_query(user_id)
+        query = _sorted(query, Item, sort_by, sort_order, rank)
+        
+        # The generator runs after this view returns; stream_with_context keeps
+        # the request (and its session) open until the last chunk is sent
+        rows = export_rows(query, Item, fields, raw=fmt in COLUMNAR_FORMATS)
+        body = stream_with_context(serialize(rows, fmt, fields))
+        return Response(body, mimetype=EXPORT_FORMATS[fmt], headers={
+            'Content-Disposition': f'attachment; filename="{export_filename(fmt)}"',
+            'X-Accel-Buffering': 'no'
+        })
+        
+    except Exception as e:
+        logger.error(f"Export inventory error: {e}")
+        return jsonify({'error': 'Failed to export inventory'}), 500
+
+
+@bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_inventory():
+    """
+    Import items from a CSV, JSON array or NDJSON upload (e.g. main.py's output files).
+    
+    The upload is either the raw request body or a multipart ``file`` field.
+    It is parsed as a stream and upserted in batches; with ``progress=true``
+    the response is NDJSON with one progress line per batch.
+    """
+    try:
+        user_id = get_jwt_identity()
+        
+        if request.mimetype == 'multipart/form-data':
+            upload = request.files.get('file')
+            if upload is None:
+                return jsonify({'error': 'A file field is required'}), 400
+            stream, mimetype, filename = upload.stream, upload.mimetype, upload.filename
+        else:
+            stream, mimetype, filename = request.stream, request.mimetype, None
+        
+        fmt = detect_format(request.args.get('format'), mimetype, filename)
+        if fmt is None:
+            return jsonify({'error': f"format must be one of: {', '.join(IMPORT_FORMATS)}"}), 400
+        
+        try:
+            batch_size = int(request.args.get('batch_size', current_app.config['INGEST_CHUNK_SIZE']))
+            batch_size = max(1, min(batch_size, 10000))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid batch_size value'}), 400
+        merchant = sanitize_string(request.args.get('merchant'), 100) or None
+        
+        reader = CountingReader(stream)
+        progress = import_records(iter_records(reader, fmt), user_id, default_merchant=merchant,
+                                  batch_size=batch_size, reader=reader)
+        
+        if request.args.get('progress', '').lower() == 'true':
+            total_bytes = request.content_length
+            
+            def progress_lines():
+                try:
+                    for update in progress:
+                        yield json.dumps(dict(update, total_bytes=total_bytes)) + '\n'
+                except Exception as e:
+                    logger.error(f"Import inventory failed mid-stream: {e}")
+                    db.session.rollback()
+                    yield json.dumps({'done': True, 'error': 'Failed to import inventory'}) + '\n'
+            
+            return Response(stream_with_context(progress_lines()), mimetype='application/x-ndjson',
+                            headers={'X-Accel-Buffering': 'no'})
+        
+        for summary in progress:
+            pass
+        summary.pop('done')
+        if 'error' in summary:
+            return jsonify(summary), 400
+        return jsonify(summary), 200
+        
+    except Exception as e:
+        logger.error(f"Import inventory error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import inventory'}), 500
+
+
 @bp.route('/<int:item_id>', methods=['GET'])
 @jwt_required()
 def get_inventory_item(item_id):
@@ -97,7 +337,7 @@ def get_inventory_item(item_id):
     try:
         user_id = get_jwt_identity()
         
-        item = DBInventoryItem.query.filter_by(id=item_id, user_id=user_id).first()
+        item = _find_item(item_id, user_id, include_archived_requested(request.args))
         
         if not item:
             return jsonify({'error': 'Item not found'}), 404
@@ -109,60 +349,221 @@ def get_inventory_item(item_id):
         return jsonify({'error': 'Failed to get item'}), 500
 
 
-@bp.route('/<int:item_id>', methods=['PUT'])
+@bp.route('/<int:item_id>/history', methods=['GET'])
 @jwt_required()
-def update_inventory_item(item_id):
-    """Update an inventory item."""
+@cached_response(INVENTORY)
+def get_inventory_item_history(item_id):
+    """Get an item's price and availability history."""
     try:
         user_id = get_jwt_identity()
-        data = request.get_json()
+        
+        days = request.args.get('days', type=int)
+        limit = max(1, min(request.args.get('limit', 1000, type=int), 5000))
         
         item = DBInventoryItem.query.filter_by(id=item_id, user_id=user_id).first()
+        history = item_history
+        if not item and include_archived_requested(request.args):
+            item = _find_item(item_id, user_id, include_archived=True)
+            history = archived_item_history
         
         if not item:
             return jsonify({'error': 'Item not found'}), 404
         
-        # Update allowed fields with sanitization
-        if 'title' in data:
-            item.title = sanitize_string(data['title'], 500)
+        since = datetime.utcnow() - timedelta(days=days) if days else None
+        points = history(item.id, since=since, limit=limit)
         
-        if 'price' in data:
-            try:
-                item.price = float(data['price'])
-            except (ValueError, TypeError):
-                return jsonify({'error': 'Invalid price value'}), 400
+        return jsonify({
+            'item_id': item.id,
+            'price': item.price,
+            'in_stock': item.in_stock,
+            'history': [point.to_dict() for point in points]
+        }), 200
         
-        if 'quantity' in data:
-            try:
-                item.quantity = int(data['quantity'])
-            except (ValueError, TypeError):
-                return jsonify({'error': 'Invalid quantity value'}), 400
+    except Exception as e:
+        logger.error(f"Get inventory history error: {e}")
+        return jsonify({'error': 'Failed to get item history'}), 500
+
+
+@bp.route('/tags', methods=['GET'])
+@jwt_required()
+@cached_response(INVENTORY)
+def list_tags():
+    """List the user's tags with item counts, most used first."""
+    try:
+        user_id = get_jwt_identity()
         
-        if 'description' in data:
-            item.description = sanitize_string(data['description'], 5000)
+        prefix = request.args.get('prefix')
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
         
-        if 'notes' in data:
-            item.notes = sanitize_string(data['notes'], 5000)
+        return jsonify({
+            'tags': [{'tag': name, 'count': count} for name, count in tag_counts(user_id, prefix, limit)]
+        }), 200
         
-        if 'tags' in data:
-            item.tags = sanitize_string(data['tags'], 500)
+    except Exception as e:
+        logger.error(f"List tags error: {e}")
+        return jsonify({'error': 'Failed to list tags'}), 500
+
+
+@bp.route('/price-changes', methods=['GET'])
+@jwt_required()
+@cached_response(INVENTORY)
+def list_price_changes():
+    """List the items whose price changed the most over the last N days."""
+    try:
+        user_id = get_jwt_identity()
+        
+        days = max(1, request.args.get('days', 30, type=int))
+        limit = max(1, min(request.args.get('limit', 20, type=int), 100))
+        direction = request.args.get('direction', 'any')
+        if direction not in CHANGE_DIRECTIONS:
+            return jsonify({'error': f"direction must be one of: {', '.join(CHANGE_DIRECTIONS)}"}), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), DBInventoryItem.DICT_FIELDS)
+        except FieldsetError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        since = datetime.utcnow() - timedelta(days=days)
+        changes = biggest_price_changes(user_id, since, limit=limit, direction=direction)
+        
+        return jsonify({
+            'days': days,
+            'direction': direction,
+            'changes': [
+                {
+                    'item': item.to_dict(fields),
+                    'old_price': old_price,
+                    'new_price': item.price,
+                    'change': round(item.price - old_price, 2),
+                    'change_pct': round((item.price - old_price) / old_price * 100, 1) if old_price else None
+                }
+                for item, old_price in changes
+            ]
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"List price changes error: {e}")
+        return jsonify({'error': 'Failed to list price changes'}), 500
+
+
+def _item_updates(data):
+    """
+    Validate and sanitize the editable fields of an item update.
+    
+    Unknown fields are ignored, as is a condition outside the allowed values.
+    Tags are not included; they are written with the item_tags association.
+    
+    Args:
+        data: Request JSON
+    
+    Returns:
+        tuple: (column values, error message or None)
+    """
+    values = {}
+    
+    if 'title' in data:
+        values['title'] = sanitize_string(data['title'], 500)
+    
+    if 'price' in data:
+        try:
+            values['price'] = float(data['price'])
+        except (ValueError, TypeError):
+            return None, 'Invalid price value'
+    
+    if 'quantity' in data:
+        try:
+            values['quantity'] = int(data['quantity'])
+        except (ValueError, TypeError):
+            return None, 'Invalid quantity value'
+    
+    if 'description' in data:
+        values['description'] = sanitize_string(data['description'], 5000)
+    
+    if 'notes' in data:
+        values['notes'] = sanitize_string(data['notes'], 5000)
+    
+    if 'is_sold' in data:
+        values['is_sold'] = bool(data['is_sold'])
+    
+    if 'condition' in data:
+        condition = sanitize_string(data['condition'], 50)
+        if condition in ['new', 'used', 'like new', 'refurbished']:
+            values['condition'] = condition
+    
+    if 'in_stock' in data:
+        values['in_stock'] = bool(data['in_stock'])
+    
+    if 'category' in data:
+        values['category'] = sanitize_string(data['category'], 100)
+    
+    if 'brand' in data:
+        values['brand'] = sanitize_string(data['brand'], 100)
+    
+    return values, None
+
+
+# Filters a bulk update can select items with (those of GET /api/inventory)
+BULK_FILTER_KEYS = ('merchant', 'condition', 'min_price', 'max_price', 'search', 'is_sold', 'tag')
+
+
+def _bulk_filter_args(item_filter):
+    """
+    Validate a bulk update filter and turn it into list filter parameters.
+    
+    A filter has to narrow the selection: one that is empty, has only empty
+    values or has keys the list endpoint does not know is rejected rather
+    than matching every item, unless it says ``"all": true``. Archived items
+    are read-only, so ``include_archived`` is ignored.
+    
+    Args:
+        item_filter: Request filter object
+    
+    Returns:
+        tuple: (MultiDict of filter parameters, error message or None)
+    """
+    args = MultiDict()
+    for key, value in item_filter.items():
+        if key in ('all', 'include_archived'):
+            continue
+        if key not in BULK_FILTER_KEYS:
+            return None, f"Unknown filter '{key}'; use {', '.join(BULK_FILTER_KEYS)} or \"all\": true"
+        for entry in value if isinstance(value, list) else [value]:
+            if entry is None or entry == '':
+                continue
+            if key in ('min_price', 'max_price'):
+                try:
+                    float(entry)
+                except (ValueError, TypeError):
+                    return None, f'Invalid {key} value'
+            args.add(key, str(entry))
+    
+    if not args and item_filter.get('all') is not True:
+        return None, 'The filter matches every item; narrow it or pass "all": true'
+    return args, None
+
+
+@bp.route('/<int:item_id>', methods=['PUT'])
+@jwt_required()
+def update_inventory_item(item_id):
+    """Update an inventory item."""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
         
-        if 'is_sold' in data:
-            item.is_sold = bool(data['is_sold'])
+        item = DBInventoryItem.query.filter_by(id=item_id, user_id=user_id).first()
         
-        if 'condition' in data:
-            condition = sanitize_string(data['condition'], 50)
-            if condition in ['new', 'used', 'like new', 'refurbished']:
-                item.condition = condition
+        if not item:
+            return jsonify({'error': 'Item not found'}), 404
         
-        if 'in_stock' in data:
-            item.in_stock = bool(data['in_stock'])
+        values, error = _item_updates(data)
+        if error:
+            return jsonify({'error': error}), 400
         
-        if 'category' in data:
-            item.category = sanitize_string(data['category'], 100)
+        for field, value in values.items():
+            setattr(item, field, value)
         
-        if 'brand' in data:
-            item.brand = sanitize_string(data['brand'], 100)
+        if 'tags' in data:
+            set_item_tags(item, data['tags'])
         
         db.session.commit()
         
@@ -179,6 +580,64 @@ def update_inventory_item(item_id):
         return jsonify({'error': 'Failed to update item'}), 500
 
 
+@bp.route('/bulk', methods=['PATCH'])
+@jwt_required()
+def bulk_update_inventory():
+    """
+    Apply the same updates to many inventory items.
+    
+    Items are selected by ``item_ids`` or by a ``filter`` with the list
+    endpoint's filter parameters; ``updates`` are validated as for a single
+    item and applied with set-based UPDATE statements in one transaction.
+    """
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json(silent=True) or {}
+        
+        updates = data.get('updates')
+        if not isinstance(updates, dict):
+            return jsonify({'error': 'An updates object is required'}), 400
+        
+        values, error = _item_updates(updates)
+        if error:
+            return jsonify({'error': error}), 400
+        tags = (updates['tags'] or []) if 'tags' in updates else None
+        if not values and tags is None:
+            return jsonify({'error': 'No fields to update'}), 400
+        
+        if 'item_ids' in data:
+            item_ids = data['item_ids']
+            if not isinstance(item_ids, list) or not item_ids:
+                return jsonify({'error': 'No item IDs provided'}), 400
+            try:
+                item_ids = [int(item_id) for item_id in item_ids]
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid item ID'}), 400
+            updated = update_items_by_id(user_id, item_ids, values, tags)
+        elif isinstance(data.get('filter'), dict):
+            args, error = _bulk_filter_args(data['filter'])
+            if error:
+                return jsonify({'error': error}), 400
+            query, _, _ = _filtered_query(user_id, args=args)
+            updated = update_items_by_query(user_id, query, values, tags)
+        else:
+            return jsonify({'error': 'Provide item_ids or a filter'}), 400
+        
+        db.session.commit()
+        
+        logger.info(f"Bulk updated {updated} items")
+        
+        return jsonify({
+            'message': f'Successfully updated {updated} items',
+            'updated': updated
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Bulk update error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update items'}), 500
+
+
 @bp.route('/<int:item_id>', methods=['DELETE'])
 @jwt_required()
 def delete_inventory_item(item_id):
@@ -221,6 +680,7 @@ def bulk_delete_inventory():
             DBInventoryItem.id.in_(item_ids),
             DBInventoryItem.user_id == user_id
         ).delete(synchronize_session=False)
+        mark_changed(db.session, INVENTORY, [user_id])
         
         db.session.commit()
         
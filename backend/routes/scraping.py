@@ -2,20 +2,38 @@
 Scraping routes.
 """
 
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import db, ScrapingJob
-from backend.services.scraper_service import start_scraping_task
+from datetime import datetime, timezone
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
+from backend.models import db, ScrapingJob, ScrapeSchedule
+from backend.services.archive import include_archived_requested, scraping_jobs_union
+from backend.services.batch_service import (
+    BatchError, batch_progress, collect_urls, create_batch, iter_ndjson_urls, requeue_failed_shards,
+    update_batch_parent
+)
+from backend.services.events import format_sse, get_broker, job_channel, publish_job_event
+from backend.services.job_scheduler import get_scheduler
+from backend.services.query_cache import JOBS, cached_response, mark_changed
+from backend.services.scraper_service import request_cancel
+from backend.services.schedule_runner import compute_next_run
+from backend.utils.cron import CronError, parse_cron
+from backend.utils.pagination import TOTAL_MODES, CursorError, keyset_page, page_total
+from backend.utils.tokens import JOB_EVENTS_SCOPE, create_scoped_token, query_string_token_allowed
 from backend.utils.validation import validate_url, sanitize_string
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Job statuses after which no further events are published
+TERMINAL_STATUSES = {'completed', 'failed', 'cancelled'}
+
 bp = Blueprint('scraping', __name__, url_prefix='/api/scraping')
 
 
 @bp.route('/jobs', methods=['GET'])
 @jwt_required()
+@cached_response(JOBS)
 def list_scraping_jobs():
     """List all scraping jobs for the current user."""
     try:
@@ -28,8 +46,33 @@ def list_scraping_jobs():
         page = max(1, page)
         per_page = max(1, min(per_page, 100))
         
-        pagination = ScrapingJob.query.filter_by(user_id=user_id)\
-            .order_by(ScrapingJob.created_at.desc())\
+        # Batch shards are reported through their parent job
+        if include_archived_requested(request.args):
+            Job = scraping_jobs_union(user_id)
+            query = db.session.query(Job).filter(Job.parent_id.is_(None))
+        else:
+            Job = ScrapingJob
+            query = ScrapingJob.query.filter_by(user_id=user_id, parent_id=None)
+        
+        if 'cursor' in request.args:
+            total_mode = request.args.get('total', 'none')
+            if total_mode not in TOTAL_MODES:
+                return jsonify({'error': f"total must be one of: {', '.join(TOTAL_MODES)}"}), 400
+            try:
+                jobs, next_cursor = keyset_page(query, Job.created_at, Job.id, 'created_at:desc',
+                                                per_page, cursor=request.args.get('cursor'))
+            except CursorError as e:
+                return jsonify({'error': str(e)}), 400
+            
+            return jsonify({
+                'jobs': [job.to_dict() for job in jobs],
+                'per_page': per_page,
+                'next_cursor': next_cursor,
+                'has_next': next_cursor is not None,
+                **page_total(query, total_mode)
+            }), 200
+        
+        pagination = query.order_by(Job.created_at.desc())\
             .paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
@@ -52,18 +95,238 @@ def get_scraping_job(job_id):
     try:
         user_id = get_jwt_identity()
         
-        job = ScrapingJob.query.filter_by(id=job_id, user_id=user_id).first()
+        Job = scraping_jobs_union(user_id) if include_archived_requested(request.args) else ScrapingJob
+        job = db.session.query(Job).filter(Job.id == job_id, Job.user_id == user_id).first()
         
         if not job:
             return jsonify({'error': 'Job not found'}), 404
         
-        return jsonify({'job': job.to_dict()}), 200
+        job_data = job.to_dict()
+        if job.status == 'queued':
+            job_data['queue_position'] = get_scheduler().position(job.id)
+        if job.kind == 'batch':
+            job_data['progress'] = batch_progress(job.id, Job)
+        
+        return jsonify({'job': job_data}), 200
         
     except Exception as e:
         logger.error(f"Get scraping job error: {e}")
         return jsonify({'error': 'Failed to get job'}), 500
 
 
+@bp.route('/jobs/<int:job_id>/events-token', methods=['POST'])
+@jwt_required()
+def create_job_events_token(job_id):
+    """Issue a short-lived token for one job's event stream URL."""
+    try:
+        user_id = get_jwt_identity()
+        
+        if not ScrapingJob.query.filter_by(id=job_id, user_id=user_id).first():
+            return jsonify({'error': 'Job not found'}), 404
+        
+        expires_in = current_app.config.get('JOB_EVENTS_TOKEN_EXPIRES_SECONDS', 60)
+        token = create_scoped_token(user_id, JOB_EVENTS_SCOPE, expires_in, job_id=job_id)
+        return jsonify({'token': token, 'expires_in': expires_in}), 200
+        
+    except Exception as e:
+        logger.error(f"Create job events token error: {e}")
+        return jsonify({'error': 'Failed to create events token'}), 500
+
+
+@bp.route('/jobs/<int:job_id>/events', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_job_events(job_id):
+    """
+    Stream live progress for a scraping job as Server-Sent Events.
+    
+    EventSource cannot send headers, so a token from POST
+    /jobs/<id>/events-token may also be passed as ?jwt=<token>.
+    """
+    user_id = get_jwt_identity()
+    
+    # URLs end up in logs and history, so only short-lived tokens for this job go in them
+    if not query_string_token_allowed(JOB_EVENTS_SCOPE):
+        return jsonify({'error': 'Stream URLs need a token from POST /api/scraping/jobs/<id>/events-token'}), 401
+    if get_jwt().get('scope') == JOB_EVENTS_SCOPE and get_jwt().get('job_id') != job_id:
+        return jsonify({'error': 'Token is for another job'}), 401
+    
+    # Subscribe before reading the job so no event falls in between
+    subscription = get_broker().subscribe(job_channel(job_id))
+    job = ScrapingJob.query.filter_by(id=job_id, user_id=user_id).first()
+    
+    if not job:
+        subscription.close()
+        return jsonify({'error': 'Job not found'}), 404
+    
+    snapshot = job.to_dict()
+    keepalive = current_app.config.get('SSE_KEEPALIVE_SECONDS', 15)
+    
+    # Release the DB connection; the stream may stay open for minutes
+    db.session.close()
+    
+    def generate():
+        try:
+            yield format_sse('snapshot', snapshot)
+            if snapshot['status'] in TERMINAL_STATUSES:
+                yield format_sse('end', {'job_id': job_id, 'status': snapshot['status']})
+                return
+            
+            while True:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    # Check the job itself while idle, so a terminal event the
+                    # broker never delivered cannot keep the stream open
+                    job = db.session.get(ScrapingJob, job_id)
+                    current = job.to_dict() if job else None
+                    db.session.close()
+                    if current is None or current['status'] in TERMINAL_STATUSES:
+                        if current is not None:
+                            yield format_sse('snapshot', current)
+                        yield format_sse('end', {'job_id': job_id, 'status': current and current['status']})
+                        return
+                    yield ': keepalive\n\n'
+                    continue
+                
+                yield format_sse(event['type'], event['data'], event['id'])
+                
+                status = event['data'].get('status')
+                if event['type'] == 'status' and status in TERMINAL_STATUSES:
+                    yield format_sse('end', {'job_id': job_id, 'status': status})
+                    return
+        finally:
+            subscription.close()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@bp.route('/jobs/<int:job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_scraping_job(job_id):
+    """
+    Cancel a scraping job.
+    
+    Queued jobs are cancelled immediately. Running jobs are signalled through
+    their cancellation token: the scraper stops before its next fetch and any
+    in-flight browser navigation is aborted. Cancelling a batch cancels its shards.
+    """
+    try:
+        user_id = get_jwt_identity()
+        
+        job = ScrapingJob.query.filter_by(id=job_id, user_id=user_id).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job.status in TERMINAL_STATUSES:
+            return jsonify({'error': f'Job is already {job.status}'}), 409
+        
+        now = datetime.now(timezone.utc)
+        targets = [job]
+        if job.kind == 'batch':
+            targets += job.children.filter(ScrapingJob.status.in_(['pending', 'queued', 'running'])).all()
+        
+        scheduler = get_scheduler()
+        running = []
+        for target in targets:
+            target.cancel_requested_at = now
+            if target.kind == 'batch':
+                continue
+            if target.status in ('pending', 'queued'):
+                scheduler.remove(target.id)
+                target.status = 'cancelled'
+                target.error_message = 'Cancelled by user'
+                target.completed_at = now
+            else:
+                running.append(target.id)
+        db.session.commit()
+        
+        # Signal running jobs after the flag is committed, so a job that is just
+        # starting picks it up either way
+        for target_id in running:
+            request_cancel(target_id)
+        
+        if job.kind == 'batch':
+            update_batch_parent(job.id)
+        elif job.status == 'cancelled':
+            publish_job_event(job.id, 'status', status='cancelled', error_message=job.error_message)
+        
+        logger.info(f"Cancellation requested for scraping job {job.id}")
+        
+        db.session.refresh(job)
+        return jsonify({
+            'message': 'Cancellation requested',
+            'job': job.to_dict()
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Cancel scraping job error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to cancel job'}), 500
+
+
+@bp.route('/jobs/<int:job_id>/retry', methods=['POST'])
+@jwt_required()
+def retry_scraping_job(job_id):
+    """Retry a failed scraping job, resuming from its checkpoint."""
+    try:
+        user_id = get_jwt_identity()
+        
+        job = ScrapingJob.query.filter_by(id=job_id, user_id=user_id).first()
+        
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        if job.kind == 'batch':
+            requeued = requeue_failed_shards(job)
+            if not requeued:
+                return jsonify({'error': 'Batch has no failed or cancelled shards'}), 409
+            return jsonify({
+                'message': f'Requeued {requeued} failed shards',
+                'job': job.to_dict()
+            }), 202
+        
+        if job.status not in ('failed', 'cancelled'):
+            return jsonify({'error': 'Only failed or cancelled jobs can be retried'}), 409
+        
+        job.status = 'queued'
+        job.queued_at = datetime.now(timezone.utc)
+        job.completed_at = None
+        job.cancel_requested_at = None
+        db.session.commit()
+        
+        get_scheduler().submit(job.id, user_id, job.merchant, job.priority)
+        
+        logger.info(f"Retrying scraping job {job.id} for user {user_id}")
+        
+        db.session.refresh(job)
+        return jsonify({
+            'message': 'Scraping job requeued',
+            'job': job.to_dict()
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Retry scraping job error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to retry job'}), 500
+
+
+def _replay_idempotent_job(job, url, merchant, pages):
+    """Respond to a repeated Idempotency-Key with the job it created."""
+    if (job.url, job.merchant, job.pages) != (url, merchant, pages):
+        return jsonify({'error': 'Idempotency-Key was already used for a different request'}), 422
+    
+    response = jsonify({
+        'message': 'Scraping job already queued',
+        'job': job.to_dict()
+    })
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response, 200
+
+
 @bp.route('/scrape', methods=['POST'])
 @jwt_required()
 def start_scraping():
@@ -93,29 +356,69 @@ def start_scraping():
         except (ValueError, TypeError):
             return jsonify({'error': 'Invalid pages value'}), 400
         
+        # Validate priority
+        try:
+            priority = int(data.get('priority', 0))
+            if priority < 0 or priority > 10:
+                return jsonify({'error': 'Priority must be between 0 and 10'}), 400
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid priority value'}), 400
+        
+        # Validate wall-clock budget
+        try:
+            timeout_seconds = int(data.get('timeout_seconds', current_app.config['SCRAPE_JOB_TIMEOUT_SECONDS']))
+            if timeout_seconds < 1 or timeout_seconds > current_app.config['SCRAPE_JOB_MAX_TIMEOUT_SECONDS']:
+                return jsonify({'error': 'timeout_seconds is out of range'}), 400
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid timeout_seconds value'}), 400
+        
+        # A retried request with the same Idempotency-Key returns the original job
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is not None:
+            idempotency_key = idempotency_key.strip()
+            if not idempotency_key or len(idempotency_key) > 255:
+                return jsonify({'error': 'Invalid Idempotency-Key header'}), 400
+            existing = ScrapingJob.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+            if existing:
+                return _replay_idempotent_job(existing, url, merchant, pages)
+        
         # Create scraping job
         job = ScrapingJob(
             user_id=user_id,
             url=url,
             merchant=merchant,
             pages=pages,
-            status='pending'
+            priority=priority,
+            timeout_seconds=timeout_seconds,
+            idempotency_key=idempotency_key,
+            status='queued',
+            queued_at=datetime.now(timezone.utc)
         )
         
-        db.session.add(job)
-        db.session.commit()
-        
-        # Start scraping task
-        task = start_scraping_task(job.id, user_id, url, merchant, pages)
+        try:
+            db.session.add(job)
+            db.session.flush()
+            job.task_id = str(job.id)
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request with the same key won the race
+            db.session.rollback()
+            if idempotency_key is None:
+                raise
+            existing = ScrapingJob.query.filter_by(user_id=user_id, idempotency_key=idempotency_key).first()
+            if existing is None:
+                # The other request's job is gone (e.g. it rolled back); let the client retry
+                return jsonify({'error': 'A concurrent request with this Idempotency-Key did not complete; retry it'}), 409
+            return _replay_idempotent_job(existing, url, merchant, pages)
         
-        # Update job with task ID
-        job.task_id = task.id if hasattr(task, 'id') else None
-        db.session.commit()
+        # Hand the job to the scheduler; it runs once a worker and merchant slot free up
+        get_scheduler().submit(job.id, user_id, merchant, priority)
         
-        logger.info(f"Started scraping job {job.id} for user {user_id}")
+        logger.info(f"Queued scraping job {job.id} for user {user_id}")
         
+        db.session.refresh(job)
         return jsonify({
-            'message': 'Scraping job started',
+            'message': 'Scraping job queued',
             'job': job.to_dict()
         }), 202
         
@@ -123,3 +426,219 @@ def start_scraping():
         logger.error(f"Start scraping error: {e}")
         db.session.rollback()
         return jsonify({'error': 'Failed to start scraping'}), 500
+
+
+@bp.route('/batch', methods=['POST'])
+@jwt_required()
+def start_batch():
+    """
+    Start a batch job for many listing URLs.
+    
+    Accepts a JSON body ({"urls": [...], "merchant": ..., "priority": ...}) or an
+    NDJSON body (one URL string or {"url": ...} object per line, with merchant and
+    priority in the query string). URLs are sharded into child jobs.
+    """
+    try:
+        user_id = get_jwt_identity()
+        config = current_app.config
+        
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            options = request.args
+            values = iter_ndjson_urls(request.stream)
+        else:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data.get('urls'), list):
+                return jsonify({'error': 'A list of URLs is required'}), 400
+            options = data
+            values = data['urls']
+        
+        merchant = sanitize_string(options.get('merchant', 'Generic'), 100)
+        
+        try:
+            priority = int(options.get('priority', 0))
+            if priority < 0 or priority > 10:
+                return jsonify({'error': 'Priority must be between 0 and 10'}), 400
+            shard_size = int(options.get('shard_size', config['BATCH_SHARD_SIZE']))
+            shard_size = max(1, min(shard_size, config['BATCH_MAX_SHARD_SIZE']))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid priority or shard_size value'}), 400
+        
+        try:
+            urls, invalid = collect_urls(values, config['BATCH_MAX_URLS'])
+        except BatchError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if not urls:
+            return jsonify({'error': 'No valid URLs provided', 'invalid_count': len(invalid)}), 400
+        
+        parent = create_batch(user_id, urls, merchant, priority, shard_size)
+        
+        return jsonify({
+            'message': 'Batch job queued',
+            'job': parent.to_dict(),
+            'progress': batch_progress(parent.id),
+            'invalid_count': len(invalid),
+            'invalid_urls': [str(v)[:200] for v in invalid[:10]]
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Start batch error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to start batch'}), 500
+
+
+@bp.route('/queue', methods=['GET'])
+@jwt_required()
+def get_queue_metrics():
+    """Get scheduler queue depth and concurrency metrics."""
+    try:
+        user_id = get_jwt_identity()
+        metrics = get_scheduler().metrics()
+        
+        # Only expose the caller's own per-user figures
+        queued_by_user = metrics.pop('queued_by_user')
+        running_by_user = metrics.pop('running_by_user')
+        metrics['user_queued'] = queued_by_user.get(user_id, 0)
+        metrics['user_running'] = running_by_user.get(user_id, 0)
+        metrics['active_users'] = len(queued_by_user)
+        
+        return jsonify({'queue': metrics}), 200
+        
+    except Exception as e:
+        logger.error(f"Get queue metrics error: {e}")
+        return jsonify({'error': 'Failed to get queue metrics'}), 500
+
+
+@bp.route('/schedules', methods=['GET'])
+@jwt_required()
+def list_schedules():
+    """List recurring scrape schedules for the current user."""
+    try:
+        user_id = get_jwt_identity()
+        
+        schedules = ScrapeSchedule.query.filter_by(user_id=user_id)\
+            .order_by(ScrapeSchedule.created_at.desc())\
+            .all()
+        
+        return jsonify({'schedules': [s.to_dict() for s in schedules]}), 200
+        
+    except Exception as e:
+        logger.error(f"List schedules error: {e}")
+        return jsonify({'error': 'Failed to list schedules'}), 500
+
+
+@bp.route('/schedules', methods=['POST'])
+@jwt_required()
+def create_schedule():
+    """Create a recurring scrape schedule."""
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        
+        # Validate input
+        if not data or not data.get('url'):
+            return jsonify({'error': 'URL is required'}), 400
+        
+        url = sanitize_string(data['url'], 1000)
+        
+        if not validate_url(url):
+            return jsonify({'error': 'Invalid URL format'}), 400
+        
+        merchant = sanitize_string(data.get('merchant', 'Generic'), 100)
+        
+        try:
+            pages = int(data.get('pages', 1))
+            priority = int(data.get('priority', 0))
+            if pages < 1 or pages > 10:
+                return jsonify({'error': 'Pages must be between 1 and 10'}), 400
+            if priority < 0 or priority > 10:
+                return jsonify({'error': 'Priority must be between 0 and 10'}), 400
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid pages or priority value'}), 400
+        
+        # Either a cron expression or a fixed interval
+        cron = data.get('cron')
+        interval_seconds = None
+        if cron:
+            cron = sanitize_string(cron, 100)
+            try:
+                parse_cron(cron)
+            except CronError as e:
+                return jsonify({'error': f'Invalid cron expression: {e}'}), 400
+        else:
+            try:
+                interval_seconds = int(data.get('interval_minutes', 0)) * 60
+            except (ValueError, TypeError):
+                return jsonify({'error': 'Invalid interval_minutes value'}), 400
+            min_interval = current_app.config['SCHEDULE_MIN_INTERVAL_SECONDS']
+            if interval_seconds < min_interval:
+                return jsonify({'error': f'interval_minutes must be at least {min_interval // 60}'}), 400
+        
+        try:
+            jitter_seconds = int(data.get('jitter_seconds', current_app.config['SCHEDULE_DEFAULT_JITTER_SECONDS']))
+            if jitter_seconds < 0:
+                raise ValueError
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid jitter_seconds value'}), 400
+        
+        incremental = data.get('incremental', True)
+        if not isinstance(incremental, bool):
+            return jsonify({'error': 'incremental must be true or false'}), 400
+        
+        schedule = ScrapeSchedule(
+            user_id=user_id,
+            url=url,
+            merchant=merchant,
+            pages=pages,
+            priority=priority,
+            cron=cron or None,
+            interval_seconds=interval_seconds,
+            jitter_seconds=jitter_seconds,
+            incremental=incremental,
+            enabled=True
+        )
+        schedule.next_run_at = compute_next_run(schedule)
+        
+        db.session.add(schedule)
+        db.session.commit()
+        
+        logger.info(f"Created scrape schedule {schedule.id} for user {user_id}")
+        
+        return jsonify({
+            'message': 'Schedule created',
+            'schedule': schedule.to_dict()
+        }), 201
+        
+    except Exception as e:
+        logger.error(f"Create schedule error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create schedule'}), 500
+
+
+@bp.route('/schedules/<int:schedule_id>', methods=['DELETE'])
+@jwt_required()
+def delete_schedule(schedule_id):
+    """Delete a recurring scrape schedule."""
+    try:
+        user_id = get_jwt_identity()
+        
+        schedule = ScrapeSchedule.query.filter_by(id=schedule_id, user_id=user_id).first()
+        
+        if not schedule:
+            return jsonify({'error': 'Schedule not found'}), 404
+        
+        # Keep past jobs, just detach them
+        ScrapingJob.query.filter_by(schedule_id=schedule.id)\
+            .update({'schedule_id': None}, synchronize_session=False)
+        mark_changed(db.session, JOBS, [user_id])
+        db.session.delete(schedule)
+        db.session.commit()
+        
+        logger.info(f"Deleted scrape schedule {schedule_id}")
+        
+        return jsonify({'message': 'Schedule deleted successfully'}), 200
+        
+    except Exception as e:
+        logger.error(f"Delete schedule error: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to delete schedule'}), 500
@@ -2,10 +2,14 @@
 Statistics routes.
 """
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.models import db, DBInventoryItem, ScrapingJob
-from sqlalchemy import func
+from backend.services.archive import include_archived_requested, scraping_jobs_union
+from backend.services.inventory_stats import inventory_summary
+from backend.services.query_cache import INVENTORY, JOBS, cached_response
+from backend.utils.fieldsets import FieldsetError, load_fields, parse_fields
+from sqlalchemy import case, func
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,102 +19,41 @@ bp = Blueprint('stats', __name__, url_prefix='/api/stats')
 
 @bp.route('', methods=['GET'])
 @jwt_required()
+@cached_response(INVENTORY, JOBS)
 def get_statistics():
     """Get dashboard statistics."""
     try:
         user_id = get_jwt_identity()
         
-        # Total items
-        total_items = DBInventoryItem.query.filter_by(user_id=user_id).count()
+        # Sparse fieldset for recent_items
+        try:
+            fields = parse_fields(request.args.get('fields'), DBInventoryItem.DICT_FIELDS)
+        except FieldsetError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Total value
-        total_value = db.session.query(func.sum(DBInventoryItem.price))\
-            .filter(DBInventoryItem.user_id == user_id)\
-            .scalar() or 0
+        include_archived = include_archived_requested(request.args)
         
-        # Items by merchant
-        items_by_merchant = db.session.query(
-            DBInventoryItem.merchant,
-            func.count(DBInventoryItem.id).label('count')
-        ).filter(DBInventoryItem.user_id == user_id)\
-         .group_by(DBInventoryItem.merchant)\
-         .all()
-        
-        merchant_stats = [
-            {'merchant': m or 'Unknown', 'count': c}
-            for m, c in items_by_merchant
-        ]
-        
-        # Items by condition
-        items_by_condition = db.session.query(
-            DBInventoryItem.condition,
-            func.count(DBInventoryItem.id).label('count')
-        ).filter(DBInventoryItem.user_id == user_id)\
-         .group_by(DBInventoryItem.condition)\
-         .all()
-        
-        condition_stats = [
-            {'condition': c or 'unknown', 'count': cnt}
-            for c, cnt in items_by_condition
-        ]
-        
-        # Price distribution
-        price_ranges = [
-            ('0-25', 0, 25),
-            ('25-50', 25, 50),
-            ('50-100', 50, 100),
-            ('100-250', 100, 250),
-            ('250+', 250, float('inf'))
-        ]
-        
-        price_distribution = []
-        for label, min_price, max_price in price_ranges:
-            if max_price == float('inf'):
-                count = DBInventoryItem.query.filter(
-                    DBInventoryItem.user_id == user_id,
-                    DBInventoryItem.price >= min_price
-                ).count()
-            else:
-                count = DBInventoryItem.query.filter(
-                    DBInventoryItem.user_id == user_id,
-                    DBInventoryItem.price >= min_price,
-                    DBInventoryItem.price < max_price
-                ).count()
-            
-            if count > 0:
-                price_distribution.append({'range': label, 'count': count})
+        # Inventory aggregates from the trigger-maintained per-user summary
+        summary = inventory_summary(user_id, include_archived=include_archived)
         
         # Recently added items
-        recent_items = DBInventoryItem.query.filter_by(user_id=user_id)\
+        recent_items = load_fields(DBInventoryItem.query.filter_by(user_id=user_id), DBInventoryItem, fields)\
             .order_by(DBInventoryItem.created_at.desc())\
             .limit(10)\
             .all()
         
-        # Scraping job stats
-        total_jobs = ScrapingJob.query.filter_by(user_id=user_id).count()
-        successful_jobs = ScrapingJob.query.filter_by(
-            user_id=user_id,
-            status='completed'
-        ).count()
-        
-        # Sold vs unsold items
-        sold_items = DBInventoryItem.query.filter_by(
-            user_id=user_id,
-            is_sold=True
-        ).count()
-        unsold_items = total_items - sold_items
+        # Scraping job stats in one pass
+        Job = scraping_jobs_union(user_id) if include_archived else ScrapingJob
+        total_jobs, successful_jobs = db.session.query(
+            func.count(Job.id),
+            func.sum(case((Job.status == 'completed', 1), else_=0))
+        ).filter(Job.user_id == user_id).one()
         
         return jsonify({
-            'total_items': total_items,
-            'total_value': round(total_value, 2),
-            'items_by_merchant': merchant_stats,
-            'items_by_condition': condition_stats,
-            'price_distribution': price_distribution,
-            'recent_items': [item.to_dict() for item in recent_items],
+            **summary,
+            'recent_items': [item.to_dict(fields) for item in recent_items],
             'total_scraping_jobs': total_jobs,
-            'successful_scraping_jobs': successful_jobs,
-            'sold_items': sold_items,
-            'unsold_items': unsold_items
+            'successful_scraping_jobs': successful_jobs or 0
         }), 200
         
     except Exception as e:
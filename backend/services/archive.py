@@ -0,0 +1,263 @@
+"""
+Hot/cold archival of sold items and finished scraping jobs.
+
+Sold items untouched for ``ARCHIVE_SOLD_ITEMS_AFTER_DAYS`` and finished jobs
+older than ``ARCHIVE_JOBS_AFTER_DAYS`` are moved, in batches, into archive
+tables with the same columns (see backend/models.py), so list, count and
+statistics queries on the hot tables stop paying for them. An item's price
+history moves with it; its tags stay readable in the item's ``tags`` column.
+Archived jobs are deleted for good after ``JOB_RETENTION_DAYS``.
+
+Endpoints read archived rows only when asked (``?include_archived=true``),
+through ``inventory_items_union`` and ``scraping_jobs_union``: a UNION ALL of
+the hot and archive tables mapped onto the regular models, so the usual
+filters, sorting and pagination apply unchanged.
+
+Archival runs with the periodic database maintenance and with
+``flask archive``.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, exists, func, insert, literal, or_, select, union_all, update
+from sqlalchemy.orm import aliased
+
+from backend.models import (
+    db, DBInventoryItem, PriceHistory, ScrapeSchedule, ScrapingJob,
+    inventory_items_archive, price_history_archive, scraping_jobs_archive,
+)
+from backend.services.query_cache import INVENTORY, JOBS, mark_changed
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states are never picked up again
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def include_archived_requested(args) -> bool:
+    """Whether a request's query string asks for archived rows (``include_archived=true``)."""
+    return args.get('include_archived', 'false').lower() == 'true'
+
+
+def _union(model, archive, user_id, name):
+    table = model.__table__
+    columns = [column.name for column in table.columns]
+    hot = select(*[table.c[name] for name in columns]).where(table.c.user_id == user_id)
+    cold = select(*[archive.c[name] for name in columns]).where(archive.c.user_id == user_id)
+    return aliased(model, union_all(hot, cold).subquery(name), name=name)
+
+
+def inventory_items_union(user_id):
+    """
+    A user's hot and archived items, as a DBInventoryItem alias.
+
+    Query it like the model (``db.session.query(items).filter(items.price > 10)``);
+    the rows load as read-only DBInventoryItem instances.
+    """
+    return _union(DBInventoryItem, inventory_items_archive, user_id, 'inventory_items_all')
+
+
+def scraping_jobs_union(user_id):
+    """A user's hot and archived jobs, as a read-only ScrapingJob alias."""
+    return _union(ScrapingJob, scraping_jobs_archive, user_id, 'scraping_jobs_all')
+
+
+def archived_item_history(item_id, since=None, limit=1000):
+    """
+    Return an archived item's history points, oldest first.
+
+    The points are detached PriceHistory objects built from
+    ``price_history_archive``.
+    """
+    table = price_history_archive
+    query = select(table.c.recorded_at, table.c.price, table.c.in_stock, table.c.previous_price)\
+        .where(table.c.item_id == item_id)
+    if since is not None:
+        query = query.where(table.c.recorded_at >= since)
+    rows = db.session.execute(query.order_by(table.c.recorded_at.desc(), table.c.id.desc()).limit(limit)).all()
+    return [PriceHistory(**row._mapping) for row in reversed(rows)]
+
+
+def archive_sold_items(before, now=None, batch_size=1000):
+    """
+    Move sold items last updated before a cutoff into the archive.
+
+    Deleting the hot rows fires the usual triggers, so the stats summary,
+    search index and tag associations drop them; their history points are
+    copied to ``price_history_archive`` first.
+
+    Args:
+        before: Archive items whose updated_at is older than this
+        now: Archive timestamp (defaults to now)
+        batch_size: Items moved per transaction
+
+    Returns:
+        int: Number of items archived
+    """
+    now = now or _utcnow()
+    item_columns = [column.name for column in DBInventoryItem.__table__.columns]
+    history_columns = ['item_id', 'user_id', 'recorded_at', 'price', 'in_stock', 'previous_price']
+    archived = 0
+    while True:
+        rows = db.session.execute(
+            select(DBInventoryItem.id, DBInventoryItem.user_id)
+            .where(DBInventoryItem.is_sold.is_(True), DBInventoryItem.updated_at < before)
+            .order_by(DBInventoryItem.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = [row.id for row in rows]
+
+        db.session.execute(insert(inventory_items_archive).from_select(
+            item_columns + ['archived_at'],
+            select(*[DBInventoryItem.__table__.c[name] for name in item_columns], literal(now))
+            .where(DBInventoryItem.id.in_(ids))
+        ))
+        db.session.execute(insert(price_history_archive).from_select(
+            history_columns + ['archived_at'],
+            select(*[PriceHistory.__table__.c[name] for name in history_columns], literal(now))
+            .where(PriceHistory.item_id.in_(ids))
+        ))
+        db.session.execute(
+            delete(DBInventoryItem).where(DBInventoryItem.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        mark_changed(db.session, INVENTORY, {row.user_id for row in rows})
+        db.session.commit()
+
+        archived += len(ids)
+        if len(ids) < batch_size:
+            break
+
+    if archived:
+        logger.info(f"Archived {archived} sold items")
+    return archived
+
+
+def archive_finished_jobs(before, now=None, batch_size=1000):
+    """
+    Move finished jobs older than a cutoff into the archive.
+
+    A batch moves together with its shards, and only once every shard has
+    finished. A schedule's most recent job stays hot (the schedule refers to
+    it). Items keep no link to archived jobs: their scraping_job_id is cleared.
+
+    Args:
+        before: Archive jobs that finished (or were created, if they never ran) before this
+        now: Archive timestamp (defaults to now)
+        batch_size: Top-level jobs moved per transaction
+
+    Returns:
+        int: Number of job rows archived, shards included
+    """
+    now = now or _utcnow()
+    columns = [column.name for column in ScrapingJob.__table__.columns]
+    child = aliased(ScrapingJob)
+    archived = 0
+    while True:
+        roots = db.session.execute(
+            select(ScrapingJob.id, ScrapingJob.user_id).where(
+                ScrapingJob.parent_id.is_(None),
+                ScrapingJob.status.in_(FINISHED_STATUSES),
+                func.coalesce(ScrapingJob.completed_at, ScrapingJob.created_at) < before,
+                ScrapingJob.id.notin_(
+                    select(ScrapeSchedule.last_job_id).where(ScrapeSchedule.last_job_id.isnot(None))
+                ),
+                ~exists().where(child.parent_id == ScrapingJob.id, child.status.notin_(FINISHED_STATUSES))
+            ).order_by(ScrapingJob.id).limit(batch_size)
+        ).all()
+        if not roots:
+            break
+        root_ids = [row.id for row in roots]
+        family = or_(ScrapingJob.id.in_(root_ids), ScrapingJob.parent_id.in_(root_ids))
+
+        db.session.execute(insert(scraping_jobs_archive).from_select(
+            columns + ['archived_at'],
+            select(*[ScrapingJob.__table__.c[name] for name in columns], literal(now)).where(family)
+        ))
+        family_ids = select(ScrapingJob.id).where(family)
+        db.session.execute(
+            update(DBInventoryItem)
+            .where(DBInventoryItem.scraping_job_id.in_(family_ids))
+            # Keep updated_at: this is not a change to the item
+            .values(scraping_job_id=None, updated_at=DBInventoryItem.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        moved = db.session.execute(
+            delete(ScrapingJob).where(family).execution_options(synchronize_session=False)
+        ).rowcount
+        mark_changed(db.session, JOBS, {row.user_id for row in roots})
+        db.session.commit()
+
+        archived += moved
+        if len(root_ids) < batch_size:
+            break
+
+    if archived:
+        logger.info(f"Archived {archived} finished scraping jobs")
+    return archived
+
+
+def purge_archived_jobs(before):
+    """
+    Delete archived jobs that finished before a cutoff (job retention).
+
+    Returns:
+        int: Number of job rows deleted
+    """
+    table = scraping_jobs_archive
+    root_finished = func.coalesce(table.c.completed_at, table.c.created_at)
+    roots = select(table.c.id).where(table.c.parent_id.is_(None), root_finished < before)
+    # Shards first: in one DELETE a batch could go before its shards are matched
+    purged = db.session.execute(delete(table).where(table.c.parent_id.in_(roots))).rowcount
+    purged += db.session.execute(delete(table).where(table.c.id.in_(roots))).rowcount
+    if purged:
+        mark_changed(db.session, JOBS)
+    db.session.commit()
+    if purged:
+        logger.info(f"Purged {purged} archived scraping jobs")
+    return purged
+
+
+def run_archival(now=None):
+    """
+    Apply the configured archival and retention policies.
+
+    A policy set to 0 days is disabled.
+
+    Returns:
+        dict: Rows archived or purged by each policy
+    """
+    now = now or _utcnow()
+    config = current_app.config
+    batch_size = config.get('ARCHIVE_BATCH_SIZE', 1000)
+    results = {'items_archived': 0, 'jobs_archived': 0, 'jobs_purged': 0}
+
+    item_days = config.get('ARCHIVE_SOLD_ITEMS_AFTER_DAYS', 90)
+    if item_days > 0:
+        results['items_archived'] = archive_sold_items(now - timedelta(days=item_days), now, batch_size)
+
+    job_days = config.get('ARCHIVE_JOBS_AFTER_DAYS', 30)
+    if job_days > 0:
+        results['jobs_archived'] = archive_finished_jobs(now - timedelta(days=job_days), now, batch_size)
+
+    retention_days = config.get('JOB_RETENTION_DAYS', 365)
+    if retention_days > 0:
+        results['jobs_purged'] = purge_archived_jobs(now - timedelta(days=retention_days))
+    return results
+
+
+@click.command('archive')
+@with_appcontext
+def archive_command():
+    """Move old sold items and finished jobs to the archive tables."""
+    results = run_archival()
+    click.echo("Archived {items_archived} items and {jobs_archived} jobs, "
+               "purged {jobs_purged} archived jobs".format(**results))
@@ -0,0 +1,224 @@
+"""
+Batch scraping jobs.
+
+A batch is one parent ``ScrapingJob`` (kind 'batch') whose URLs are sharded
+into child work units (kind 'batch_shard'). Shards are bulk-inserted and
+scheduled like any other job; the parent's status and item count are
+aggregated from its shards.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import case, func, insert
+
+from backend.models import db, ScrapingJob
+from backend.services.events import publish_job_event
+from backend.services.job_scheduler import get_scheduler
+from backend.utils.validation import sanitize_string, validate_url
+
+logger = logging.getLogger(__name__)
+
+# Shard statuses that still have work to do
+ACTIVE_STATUSES = ('pending', 'queued', 'running')
+
+
+class BatchError(ValueError):
+    """Raised for an invalid batch submission."""
+
+
+def iter_ndjson_urls(stream):
+    """
+    Yield URLs from an NDJSON body without reading it into memory at once.
+
+    Each line is either a JSON string or an object with a ``url`` key.
+
+    Args:
+        stream: Binary file-like object (e.g. request.stream)
+    """
+    for line_number, raw_line in enumerate(stream, start=1):
+        line = raw_line.strip()
+        if not line:
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError:
+            raise BatchError(f"Invalid JSON on line {line_number}")
+        if isinstance(value, dict):
+            value = value.get('url')
+        yield value
+
+
+def collect_urls(values, max_urls):
+    """
+    Validate, sanitize and de-duplicate submitted URLs.
+
+    Args:
+        values: Iterable of submitted URL values
+        max_urls: Maximum number of URLs accepted
+
+    Returns:
+        tuple: (urls, invalid) - accepted URLs in submission order, rejected values
+    """
+    urls = []
+    seen = set()
+    invalid = []
+    for value in values:
+        url = sanitize_string(value, 1000) if isinstance(value, str) else ''
+        if not validate_url(url):
+            invalid.append(value)
+            continue
+        if url in seen:
+            continue
+        seen.add(url)
+        urls.append(url)
+        if len(urls) > max_urls:
+            raise BatchError(f"A batch may contain at most {max_urls} URLs")
+    return urls, invalid
+
+
+def create_batch(user_id, urls, merchant, priority=0, shard_size=50):
+    """
+    Create a batch parent job and its shards, and queue the shards.
+
+    Shard rows are written with a single executemany INSERT.
+
+    Returns:
+        ScrapingJob: The parent job
+    """
+    now = datetime.now(timezone.utc)
+    parent = ScrapingJob(
+        user_id=user_id,
+        url=urls[0],
+        merchant=merchant,
+        pages=1,
+        priority=priority,
+        kind='batch',
+        total_urls=len(urls),
+        status='queued',
+        queued_at=now
+    )
+    db.session.add(parent)
+    db.session.flush()
+    parent.task_id = str(parent.id)
+
+    rows = [
+        {
+            'user_id': user_id,
+            'url': chunk[0],
+            'merchant': merchant,
+            'pages': 1,
+            'priority': priority,
+            'kind': 'batch_shard',
+            'parent_id': parent.id,
+            'urls': chunk,
+            'total_urls': len(chunk),
+            'status': 'queued',
+            'queued_at': now,
+            'created_at': now,
+            'items_scraped': 0,
+            'attempts': 0
+        }
+        for chunk in (urls[i:i + shard_size] for i in range(0, len(urls), shard_size))
+    ]
+    shard_ids = db.session.scalars(insert(ScrapingJob).returning(ScrapingJob.id), rows).all()
+    db.session.commit()
+
+    scheduler = get_scheduler()
+    for shard_id in shard_ids:
+        scheduler.submit(shard_id, user_id, merchant, priority)
+
+    logger.info(f"Created batch job {parent.id} with {len(urls)} URLs in {len(shard_ids)} shards")
+    return parent
+
+
+def batch_progress(parent_id, model=ScrapingJob):
+    """
+    Aggregate shard progress for a batch in a single query.
+
+    Args:
+        parent_id: Batch job ID
+        model: ScrapingJob, or a ``scraping_jobs_union`` alias for archived batches
+
+    Returns:
+        dict: Shard counts by status, URLs done and items scraped
+    """
+    done = case((model.status.in_(['completed', 'failed', 'cancelled']), model.total_urls), else_=0)
+    rows = db.session.query(
+        model.status,
+        func.count(model.id),
+        func.coalesce(func.sum(model.items_scraped), 0),
+        func.coalesce(func.sum(done), 0)
+    ).filter(model.parent_id == parent_id).group_by(model.status).all()
+
+    shards = {status: count for status, count, _, _ in rows}
+    return {
+        'shards_total': sum(shards.values()),
+        'shards': shards,
+        'urls_done': int(sum(urls_done for _, _, _, urls_done in rows)),
+        'items_scraped': int(sum(items for _, _, items, _ in rows))
+    }
+
+
+def update_batch_parent(parent_id):
+    """
+    Refresh a batch parent's status and item count from its shards.
+
+    The parent is 'running' while any shard has work left, then 'completed'
+    ('failed' if every shard failed, 'cancelled' if the batch was cancelled).
+    """
+    parent = db.session.get(ScrapingJob, parent_id)
+    if not parent:
+        return None
+
+    progress = batch_progress(parent_id)
+    shards = progress['shards']
+    active = sum(shards.get(status, 0) for status in ACTIVE_STATUSES)
+    failed = shards.get('failed', 0)
+    cancelled = shards.get('cancelled', 0)
+
+    parent.items_scraped = progress['items_scraped']
+    now = datetime.now(timezone.utc)
+    if active:
+        if shards.get('running') and parent.status != 'running':
+            parent.status = 'running'
+            parent.started_at = parent.started_at or now
+    else:
+        if cancelled and parent.cancel_requested_at:
+            parent.status = 'cancelled'
+        elif failed == progress['shards_total']:
+            parent.status = 'failed'
+        else:
+            parent.status = 'completed'
+        parent.completed_at = now
+        parent.error_message = f"{failed} of {progress['shards_total']} shards failed" if failed else None
+    db.session.commit()
+
+    publish_job_event(parent_id, 'progress', **progress)
+    if not active:
+        publish_job_event(parent_id, 'status', status=parent.status, items_scraped=parent.items_scraped)
+    return parent
+
+
+def requeue_failed_shards(parent):
+    """Requeue a batch's failed or cancelled shards. Returns the number requeued."""
+    shards = parent.children.filter(ScrapingJob.status.in_(['failed', 'cancelled'])).all()
+    if not shards:
+        return 0
+    
+    now = datetime.now(timezone.utc)
+    for shard in shards:
+        shard.status = 'queued'
+        shard.queued_at = now
+        shard.completed_at = None
+        shard.cancel_requested_at = None
+    parent.status = 'queued'
+    parent.completed_at = None
+    parent.cancel_requested_at = None
+    db.session.commit()
+
+    scheduler = get_scheduler()
+    for shard in shards:
+        scheduler.submit(shard.id, shard.user_id, shard.merchant, shard.priority)
+    return len(shards)
@@ -0,0 +1,113 @@
+"""
+Set-based bulk updates of inventory items.
+
+The same field values are applied to many items with one ``UPDATE ... WHERE
+id IN (...)`` per chunk of IDs instead of loading, mutating and committing
+each item. Chunks are kept under SQLite's limit on bound parameters per
+statement. Database triggers (search index, stats, price history) fire as
+for single-item updates.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from sqlalchemy import select, update
+
+from backend.models import db, DBInventoryItem
+from backend.services.query_cache import INVENTORY, mark_changed
+from backend.services.tags import set_tags_for_items
+
+logger = logging.getLogger(__name__)
+
+# Bound parameters allowed per statement by SQLite builds older than 3.32
+SQLITE_MAX_VARIABLES = 999
+
+
+def update_chunk_size(values):
+    """IDs per UPDATE, leaving room for the SET values, user_id and updated_at."""
+    return max(1, SQLITE_MAX_VARIABLES - len(values) - 3)
+
+
+def _owned_id_chunks(user_id, item_ids, chunk_size):
+    """Split item IDs into chunks, keeping only the user's items."""
+    item_ids = list(dict.fromkeys(item_ids))
+    for start in range(0, len(item_ids), chunk_size):
+        chunk = item_ids[start:start + chunk_size]
+        owned = db.session.execute(
+            select(DBInventoryItem.id).where(DBInventoryItem.user_id == user_id, DBInventoryItem.id.in_(chunk))
+        ).scalars().all()
+        if owned:
+            yield owned
+
+
+def _query_id_chunks(query, chunk_size):
+    """Walk the IDs a filtered query matches in ID order, one chunk at a time."""
+    ids = query.with_entities(DBInventoryItem.id).order_by(None).order_by(DBInventoryItem.id)
+    last_id = 0
+    while True:
+        chunk = [item_id for (item_id,) in ids.filter(DBInventoryItem.id > last_id).limit(chunk_size)]
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def _update_chunks(user_id, chunks, values, tags):
+    values = dict(values, updated_at=datetime.now(timezone.utc).replace(tzinfo=None))
+    updated = 0
+    for chunk in chunks:
+        if tags is not None:
+            values['tags'] = ','.join(set_tags_for_items(user_id, chunk, tags)) or None
+        result = db.session.execute(
+            update(DBInventoryItem)
+            .where(DBInventoryItem.user_id == user_id, DBInventoryItem.id.in_(chunk))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        updated += result.rowcount
+    if updated:
+        mark_changed(db.session, INVENTORY, [user_id])
+    logger.debug(f"Bulk updated {updated} inventory items for user {user_id}")
+    return updated
+
+
+def update_items_by_id(user_id, item_ids, values, tags=None):
+    """
+    Apply the same updates to the user's items with the given IDs.
+
+    IDs of other users' items or of items that do not exist are skipped.
+    Nothing is committed.
+
+    Args:
+        user_id: Owning user ID
+        item_ids: Item IDs
+        values: Validated column values
+        tags: Tags to replace the items' tags with, or None to leave them
+
+    Returns:
+        int: Number of items updated
+    """
+    chunk_size = update_chunk_size(values)
+    return _update_chunks(user_id, _owned_id_chunks(user_id, item_ids, chunk_size), values, tags)
+
+
+def update_items_by_query(user_id, query, values, tags=None):
+    """
+    Apply the same updates to every item a filtered inventory query matches.
+
+    The matching IDs are read in chunks (keyset on ID) and each chunk is
+    updated before the next is read, so updates that change whether an item
+    matches the filter do not affect which items are updated. Nothing is
+    committed.
+
+    Args:
+        user_id: Owning user ID
+        query: Filtered DBInventoryItem query for the user's items
+        values: Validated column values
+        tags: Tags to replace the items' tags with, or None to leave them
+
+    Returns:
+        int: Number of items updated
+    """
+    chunk_size = update_chunk_size(values)
+    return _update_chunks(user_id, _query_id_chunks(query, chunk_size), values, tags)
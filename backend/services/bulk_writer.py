@@ -0,0 +1,327 @@
+"""
+Bulk persistence of scraped inventory items.
+
+Rows are upserted in chunks with a single executemany ``INSERT ... ON
+CONFLICT DO UPDATE`` per chunk, or staged with ``COPY`` on PostgreSQL,
+instead of one ORM object per item. Nothing is added to the session's
+identity map.
+
+A listing is identified by (user_id, merchant, listing_key), where the key is
+the SKU or else the canonical product URL. Re-scraping a listing updates its
+row only when the content hash of its scraped fields has changed; unchanged
+listings are not written, except that a caller can have their scraped_at
+moved forward once it is older than a refresh window.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import logging
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import bindparam, column, insert, or_, select, table, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.models import db, DBInventoryItem
+from backend.services.query_cache import INVENTORY, mark_changed
+from fetch_cache import canonical_url
+
+logger = logging.getLogger(__name__)
+
+# InventoryItem fields copied onto inventory_items columns
+ITEM_FIELDS = (
+    'title', 'price', 'currency', 'quantity', 'sku', 'description', 'category', 'brand',
+    'image_url', 'product_url', 'merchant', 'condition', 'in_stock', 'custom_fields'
+)
+
+# Columns refreshed when a re-scraped listing has changed; user edits
+# (tags, notes, is_sold) and created_at are left alone
+UPDATE_COLUMNS = ITEM_FIELDS + ('content_hash', 'scraped_at', 'updated_at', 'scraping_job_id')
+
+IDENTITY_COLUMNS = ('user_id', 'merchant', 'listing_key')
+
+# Marks NULL in COPY input, so empty strings stay empty strings
+COPY_NULL = '\\N'
+
+STAGING_TABLE = 'inventory_items_staging'
+
+
+def listing_key(item):
+    """Return the identity of a listing within its merchant, or None if it has none."""
+    if item.sku and item.sku.strip():
+        return f"sku:{item.sku.strip()}"
+    if item.product_url:
+        return f"url:{canonical_url(item.product_url)}"
+    return None
+
+
+def content_hash(item):
+    """Hash the normalized scraped fields of an item."""
+    values = {}
+    for field in ITEM_FIELDS:
+        value = getattr(item, field)
+        if field == 'product_url' and value:
+            value = canonical_url(value)
+        elif isinstance(value, str):
+            value = ' '.join(value.split())
+        elif isinstance(value, float):
+            value = round(value, 2)
+        values[field] = value
+    payload = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def item_row(item, user_id, job_id=None, scraped_at=None):
+    """
+    Build an inventory_items row from a scraped InventoryItem.
+
+    Args:
+        item: InventoryItem
+        user_id: Owning user ID
+        job_id: Scraping job that produced the item
+        scraped_at: Scrape time (defaults to now)
+
+    Returns:
+        dict: Column values
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    row = {field: getattr(item, field) for field in ITEM_FIELDS}
+    row.update(
+        user_id=user_id,
+        scraping_job_id=job_id,
+        listing_key=listing_key(item),
+        content_hash=content_hash(item),
+        scraped_at=scraped_at or now,
+        created_at=now,
+        updated_at=now,
+        is_sold=False
+    )
+    return row
+
+
+def backfill_listing_identity(connection, batch_size=1000):
+    """
+    Compute listing_key and content_hash for rows written before listings were upserted.
+
+    A NULL listing_key never conflicts on (user_id, merchant, listing_key), so
+    without a key every re-scrape of such a listing would insert a duplicate.
+    Earlier re-scrapes may already have left duplicates: of the rows sharing a
+    key, only the most recently scraped one gets it (unless a keyed row already
+    holds it) and the others keep a NULL key.
+
+    Args:
+        connection: SQLAlchemy Connection (e.g. op.get_bind() in a migration)
+        batch_size: Rows read and updated at a time
+
+    Returns:
+        int: Number of rows given a listing key
+    """
+    items = DBInventoryItem.__table__
+    taken = {
+        tuple(row) for row in connection.execute(
+            select(items.c.user_id, items.c.merchant, items.c.listing_key).where(items.c.listing_key.is_not(None))
+        )
+    }
+
+    # Newest unkeyed row per identity
+    newest = {}
+    columns = [items.c.id, items.c.user_id, items.c.scraped_at, items.c.listing_key, items.c.content_hash]
+    columns += [items.c[field] for field in ITEM_FIELDS]
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(*columns)
+            .where(items.c.id > last_id, or_(items.c.listing_key.is_(None), items.c.content_hash.is_(None)))
+            .order_by(items.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        hashes = [{'row_id': row.id, 'hash': content_hash(row)} for row in rows if row.content_hash is None]
+        if hashes:
+            connection.execute(
+                update(items).where(items.c.id == bindparam('row_id')).values(content_hash=bindparam('hash')),
+                hashes
+            )
+        for row in rows:
+            key = listing_key(row) if row.listing_key is None else None
+            identity = (row.user_id, row.merchant, key)
+            if key is None or identity in taken:
+                continue
+            order = (row.scraped_at or datetime.min, row.id)
+            if identity not in newest or newest[identity][0] < order:
+                newest[identity] = (order, row.id)
+
+    keys = [{'row_id': row_id, 'key': identity[2]} for identity, (_, row_id) in newest.items()]
+    for chunk in _chunks(keys, batch_size):
+        connection.execute(
+            update(items).where(items.c.id == bindparam('row_id')).values(listing_key=bindparam('key')),
+            chunk
+        )
+    logger.info(f"Backfilled listing keys for {len(keys)} inventory items")
+    return len(keys)
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _dedupe(rows):
+    """Keep the last row per listing; one statement may not upsert a row twice."""
+    keyed = {}
+    unkeyed = []
+    for row in rows:
+        if row['listing_key'] is None:
+            unkeyed.append(row)
+        else:
+            keyed[tuple(row[c] for c in IDENTITY_COLUMNS)] = row
+    return list(keyed.values()) + unkeyed
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _use_copy():
+    return current_app.config.get('INGEST_USE_COPY', True) and _dialect() == 'postgresql'
+
+
+def _upsert(stmt):
+    """Add ON CONFLICT DO UPDATE, skipping rows whose content hash is unchanged."""
+    target = DBInventoryItem.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=list(IDENTITY_COLUMNS),
+        set_={name: stmt.excluded[name] for name in UPDATE_COLUMNS},
+        where=target.c.content_hash.is_distinct_from(stmt.excluded.content_hash)
+    )
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(rows, table_name=DBInventoryItem.__tablename__):
+    """
+    Load rows into a table with PostgreSQL ``COPY ... FROM STDIN``.
+
+    Runs on the session's connection, so it is part of the current transaction.
+    Works with psycopg2 and psycopg 3.
+    """
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[name]) for name in columns])
+
+    sql = (f"COPY {table_name} ({', '.join(columns)}) "
+           f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')")
+    cursor = db.session.connection().connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _copy_upsert(rows):
+    """COPY rows into a session-local staging table, then upsert them in one statement."""
+    connection = db.session.connection()
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+        f"(LIKE {DBInventoryItem.__tablename__} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    copy_rows(rows, STAGING_TABLE)
+
+    columns = list(rows[0])
+    staging = table(STAGING_TABLE, *[column(name) for name in columns])
+    stmt = postgresql.insert(DBInventoryItem.__table__).from_select(
+        columns, select(*[staging.c[name] for name in columns])
+    )
+    written = len(connection.execute(_upsert(stmt).returning(DBInventoryItem.__table__.c.id)).all())
+    connection.exec_driver_sql(f"TRUNCATE {STAGING_TABLE}")
+    return written
+
+
+def _refresh_scraped_at(chunk, before):
+    """Move scraped_at forward on listings re-fetched unchanged whose scraped_at is older than ``before``."""
+    keyed = [
+        {'key_user_id': row['user_id'], 'key_merchant': row['merchant'], 'key_listing': row['listing_key'],
+         'new_scraped_at': row['scraped_at']}
+        for row in chunk if row['listing_key'] is not None
+    ]
+    if not keyed:
+        return 0
+    target = DBInventoryItem.__table__
+    stmt = update(target).where(
+        target.c.user_id == bindparam('key_user_id'),
+        target.c.merchant == bindparam('key_merchant'),
+        target.c.listing_key == bindparam('key_listing'),
+        target.c.scraped_at < before
+    ).values(scraped_at=bindparam('new_scraped_at'), updated_at=target.c.updated_at)  # not an edit: skip onupdate
+    return db.session.execute(stmt, keyed).rowcount
+
+
+def _insert_chunk(chunk):
+    """Upsert one chunk and return the number of rows inserted or changed."""
+    dialect = _dialect()
+    if dialect == 'postgresql' and _use_copy():
+        return _copy_upsert(chunk)
+    if dialect in ('postgresql', 'sqlite'):
+        module = postgresql if dialect == 'postgresql' else sqlite
+        stmt = _upsert(module.insert(DBInventoryItem.__table__)).returning(DBInventoryItem.__table__.c.id)
+        return len(db.session.execute(stmt, chunk).all())
+    db.session.execute(insert(DBInventoryItem), chunk)
+    return len(chunk)
+
+
+def write_items(rows, chunk_size=None, on_chunk=None, commit=True, refresh_before=None):
+    """
+    Upsert inventory rows in chunks.
+
+    Args:
+        rows: List of row dicts (see item_row)
+        chunk_size: Rows per chunk (defaults to INGEST_CHUNK_SIZE)
+        on_chunk: Called with each chunk after it is written and before it is
+            committed, so callers can record progress in the same transaction
+        commit: Commit after every chunk
+        refresh_before: Also set scraped_at on unchanged listings whose
+            scraped_at is older than this, recording that they were seen
+
+    Returns:
+        int: Number of rows inserted or changed (unchanged listings are not counted)
+    """
+    if not rows:
+        return 0
+
+    chunk_size = max(1, chunk_size or current_app.config.get('INGEST_CHUNK_SIZE', 1000))
+    written = 0
+    for chunk in _chunks(_dedupe(rows), chunk_size):
+        chunk_written = _insert_chunk(chunk)
+        if refresh_before is not None and _refresh_scraped_at(chunk, refresh_before):
+            mark_changed(db.session, INVENTORY, {row['user_id'] for row in chunk})
+        if chunk_written:
+            mark_changed(db.session, INVENTORY, {row['user_id'] for row in chunk})
+        written += chunk_written
+        if on_chunk is not None:
+            on_chunk(chunk)
+        if commit:
+            db.session.commit()
+
+    logger.debug(f"Upserted {len(rows)} inventory rows in chunks of {chunk_size}, {written} written")
+    return written
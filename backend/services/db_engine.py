@@ -0,0 +1,292 @@
+"""
+Database engine profile and maintenance.
+
+With ``DB_ENGINE_PROFILE=production`` (the default) the engine is tuned for a
+long-running server rather than left at SQLAlchemy's defaults:
+
+- SQLite files run in WAL mode with ``synchronous=NORMAL``, so readers no
+  longer wait for writers and commits skip the per-transaction fsync of the
+  rollback journal. ``busy_timeout`` makes writers queue for the lock instead
+  of failing, and ``mmap_size`` serves reads from the page cache.
+- Server databases get a sized connection pool with pre-ping and recycling,
+  so connections dropped by the server or a proxy are replaced transparently.
+- Compiled statements are cached by SQLAlchemy (``query_cache_size``) and
+  prepared statements by the driver (sqlite3 ``cached_statements``, psycopg 3
+  ``prepare_threshold``).
+
+``DB_ENGINE_PROFILE=default`` leaves every setting at the library defaults
+(the baseline in ``benchmarks/concurrency_benchmark.py``).
+
+Maintenance (statistics, WAL checkpoint, VACUUM when worthwhile) runs from a
+background thread every ``DB_MAINTENANCE_INTERVAL_SECONDS``, after archival
+(see backend/services/archive.py) and price history downsampling (see
+backend/services/price_history.py), and on demand with ``flask db-maintenance``.
+"""
+
+import logging
+import threading
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+from backend.models import db
+from backend.services.archive import run_archival
+from backend.services.price_history import compact_price_history
+from backend.services.replicas import replica_urls
+
+logger = logging.getLogger(__name__)
+
+PRODUCTION = 'production'
+
+# SQLite: VACUUM once this fraction of the file is free pages
+SQLITE_VACUUM_FREE_FRACTION = 0.2
+
+# PostgreSQL: VACUUM a table once dead rows exceed this fraction of live ones
+# (plus a floor so small tables are left to autovacuum)
+POSTGRES_VACUUM_DEAD_FRACTION = 0.2
+POSTGRES_VACUUM_MIN_DEAD_ROWS = 1000
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config, uri=None) -> dict:
+    """
+    Build ``SQLALCHEMY_ENGINE_OPTIONS`` for the configured database.
+
+    Options already present in ``SQLALCHEMY_ENGINE_OPTIONS`` win over the
+    profile.
+
+    Args:
+        config: Application config
+        uri: Database URL (defaults to ``SQLALCHEMY_DATABASE_URI``)
+
+    Returns:
+        dict: Keyword arguments for create_engine
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if config.get('DB_ENGINE_PROFILE', PRODUCTION) != PRODUCTION:
+        return options
+
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    statement_cache_size = config.get('DB_STATEMENT_CACHE_SIZE', 500)
+    options.setdefault('query_cache_size', statement_cache_size)
+    connect_args = dict(options.get('connect_args') or {})
+
+    if url.get_backend_name() == 'sqlite':
+        connect_args.setdefault('cached_statements', statement_cache_size)
+        if not _is_memory_sqlite(url):
+            # Every thread holds its own connection; the pool only bounds how many
+            options.setdefault('pool_size', config.get('DB_POOL_SIZE', 10))
+            options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 20))
+            options.setdefault('pool_timeout', config.get('DB_POOL_TIMEOUT', 30))
+    else:
+        options.setdefault('pool_size', config.get('DB_POOL_SIZE', 10))
+        options.setdefault('max_overflow', config.get('DB_MAX_OVERFLOW', 20))
+        options.setdefault('pool_timeout', config.get('DB_POOL_TIMEOUT', 30))
+        options.setdefault('pool_recycle', config.get('DB_POOL_RECYCLE', 1800))
+        options.setdefault('pool_pre_ping', config.get('DB_POOL_PRE_PING', True))
+        if url.get_driver_name() == 'psycopg':
+            # Server-side prepare statements executed this many times per connection
+            connect_args.setdefault('prepare_threshold', config.get('DB_PREPARE_THRESHOLD', 5))
+
+    if connect_args:
+        options['connect_args'] = connect_args
+    return options
+
+
+def sqlite_pragmas(config, url) -> list:
+    """
+    Return the (name, value) PRAGMAs set on every new SQLite connection.
+
+    Args:
+        config: Application config
+        url: Database URL
+
+    Returns:
+        list: PRAGMA name and value pairs, in execution order
+    """
+    pragmas = []
+    if not _is_memory_sqlite(url):
+        # journal_mode is stored in the file; setting it again is a no-op
+        pragmas.append(('journal_mode', 'WAL'))
+        pragmas.append(('mmap_size', config.get('SQLITE_MMAP_SIZE', 268435456)))
+    pragmas.append(('synchronous', 'NORMAL'))
+    pragmas.append(('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)))
+    return pragmas
+
+
+def init_db(app):
+    """
+    Initialize the database extension with the configured engine profile.
+
+    Engine options must be in place before ``db.init_app`` creates the
+    engine; the SQLite PRAGMAs are applied to each connection it opens. Read
+    replica engines are created with the same profile and registered as
+    ``app.extensions['replica_engines']`` (see backend/services/replicas.py).
+    They are not Flask-SQLAlchemy binds, so ``db.create_all()`` and
+    migrations only ever touch the primary.
+    """
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    db.init_app(app)
+    with app.app_context():
+        engines = [db.engine]
+
+    replicas = {}
+    for key, uri in replica_urls(app.config).items():
+        options = engine_options(app.config, uri)
+        if _is_memory_sqlite(make_url(uri)):
+            # What Flask-SQLAlchemy does for an in-memory primary
+            options['poolclass'] = StaticPool
+            options['connect_args'] = {**options.get('connect_args', {}), 'check_same_thread': False}
+        replicas[key] = create_engine(uri, **options)
+    app.extensions['replica_engines'] = replicas
+
+    if app.config.get('DB_ENGINE_PROFILE', PRODUCTION) != PRODUCTION:
+        return
+    for engine in engines + list(replicas.values()):
+        if engine.dialect.name == 'sqlite':
+            _install_sqlite_pragmas(engine, sqlite_pragmas(app.config, engine.url))
+
+
+def _install_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+                if name == 'journal_mode' and cursor.fetchone()[0].lower() != 'wal':
+                    logger.warning("SQLite WAL mode unavailable for this database, using rollback journal")
+        finally:
+            cursor.close()
+
+
+def _sqlite_maintenance(conn, vacuum):
+    actions = []
+    # What PRAGMA optimize runs, but for every table: optimize only considers
+    # tables queried on its own connection, and this one is fresh. The
+    # analysis limit samples large indexes instead of reading them in full.
+    conn.exec_driver_sql('PRAGMA analysis_limit=1000')
+    conn.exec_driver_sql('ANALYZE')
+    actions.append('analyze')
+
+    if 'inventory_items_fts' in inspect(conn).get_table_names():
+        conn.exec_driver_sql("INSERT INTO inventory_items_fts(inventory_items_fts) VALUES('optimize')")
+        actions.append('fts optimize')
+
+    page_count = conn.exec_driver_sql('PRAGMA page_count').scalar()
+    free_pages = conn.exec_driver_sql('PRAGMA freelist_count').scalar()
+    if vacuum or (page_count and free_pages / page_count >= SQLITE_VACUUM_FREE_FRACTION):
+        conn.exec_driver_sql('VACUUM')
+        actions.append('vacuum')
+
+    if conn.exec_driver_sql('PRAGMA journal_mode').scalar().lower() == 'wal':
+        # Fold the WAL back into the database file and truncate it
+        conn.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+        actions.append('checkpoint')
+    return actions
+
+
+def _postgres_maintenance(conn, vacuum):
+    actions = []
+    rows = conn.exec_driver_sql(
+        'SELECT relname, n_live_tup, n_dead_tup FROM pg_stat_user_tables WHERE schemaname = current_schema()'
+    ).all()
+    quote = conn.dialect.identifier_preparer.quote
+    for table, live, dead in rows:
+        if vacuum or dead >= max(POSTGRES_VACUUM_MIN_DEAD_ROWS, live * POSTGRES_VACUUM_DEAD_FRACTION):
+            conn.exec_driver_sql(f'VACUUM (ANALYZE) {quote(table)}')
+            actions.append(f'vacuum {table}')
+    conn.exec_driver_sql('ANALYZE')
+    actions.append('analyze')
+    return actions
+
+
+def run_db_maintenance(vacuum=False):
+    """
+    Refresh planner statistics and reclaim space.
+
+    SQLite runs a bounded ``ANALYZE``, merges the FTS index, checkpoints the WAL
+    and VACUUMs once a fifth of the file is free pages. PostgreSQL runs
+    ``ANALYZE`` and ``VACUUM (ANALYZE)`` on tables with many dead rows, on top
+    of autovacuum.
+
+    Args:
+        vacuum: VACUUM regardless of free space or dead rows
+
+    Returns:
+        list: Descriptions of the actions taken
+    """
+    # VACUUM cannot run inside a transaction
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if conn.dialect.name == 'sqlite':
+            actions = _sqlite_maintenance(conn, vacuum)
+        elif conn.dialect.name == 'postgresql':
+            actions = _postgres_maintenance(conn, vacuum)
+        else:
+            actions = []
+
+    logger.info(f"Database maintenance: {', '.join(actions)}")
+    return actions
+
+
+class MaintenanceRunner:
+    """Background thread that periodically runs database maintenance."""
+
+    def __init__(self, app, interval_seconds=86400):
+        self.app = app
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='db-maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Run one maintenance pass in the current app context."""
+        # Archive and downsample first, so the statistics and VACUUM see the smaller tables
+        run_archival()
+        compact_price_history()
+        return run_db_maintenance()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            with self.app.app_context():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error(f"Database maintenance error: {e}")
+
+
+def init_db_maintenance(app):
+    """Create the maintenance runner; start_background_services starts it."""
+    runner = MaintenanceRunner(app, interval_seconds=app.config.get('DB_MAINTENANCE_INTERVAL_SECONDS', 86400))
+    app.extensions['db_maintenance'] = runner
+    return runner
+
+
+def start_db_maintenance(app):
+    """Start the maintenance runner if enabled (never for in-memory SQLite)."""
+    if app.config.get('DB_MAINTENANCE_ENABLED', True) and not _is_memory_sqlite(
+            make_url(app.config['SQLALCHEMY_DATABASE_URI'])):
+        app.extensions['db_maintenance'].start()
+
+
+@click.command('db-maintenance')
+@click.option('--vacuum', is_flag=True, help='VACUUM even if little space would be reclaimed.')
+@with_appcontext
+def db_maintenance_command(vacuum):
+    """Refresh query planner statistics and reclaim free space."""
+    actions = run_db_maintenance(vacuum=vacuum)
+    click.echo(f"Database maintenance done ({', '.join(actions) or 'nothing to do'})")
@@ -0,0 +1,165 @@
+"""
+Lightweight publish/subscribe for job progress events.
+
+Workers publish events to a channel per job; the SSE endpoint subscribes and
+forwards them to clients. The default broker is in-process. Setting
+``EVENTS_BROKER_URL`` to a ``redis://`` URL shares events between processes
+using Redis pub/sub (requires the optional ``redis`` package).
+"""
+
+import json
+import logging
+import queue
+import threading
+from typing import Optional
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+
+def job_channel(job_id) -> str:
+    """Return the pub/sub channel name for a scraping job."""
+    return f'job:{job_id}'
+
+
+def format_sse(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    """Format a single Server-Sent Events message."""
+    message = ''
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    message += f'event: {event_type}\n'
+    message += f'data: {json.dumps(data)}\n\n'
+    return message
+
+
+class Subscription:
+    """A subscriber's view of a channel."""
+
+    def __init__(self, broker, channel: str):
+        self.broker = broker
+        self.channel = channel
+        self._queue: queue.Queue = queue.Queue(maxsize=1000)
+
+    def put(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            logger.warning(f"Dropping event for slow subscriber on {self.channel}")
+
+    def get(self, timeout: float = None) -> Optional[dict]:
+        """Wait for the next event, returning None on timeout."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """In-process event broker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._sequence = 0
+
+    def subscribe(self, channel: str) -> Subscription:
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel: str, event_type: str, data: dict):
+        """Publish an event to every subscriber of a channel."""
+        with self._lock:
+            self._sequence += 1
+            event = {'id': self._sequence, 'type': event_type, 'data': data}
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+class RedisSubscription(Subscription):
+    """Subscription backed by a Redis pub/sub connection."""
+
+    def __init__(self, broker, channel: str):
+        super().__init__(broker, channel)
+        self._pubsub = broker.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(channel)
+
+    def get(self, timeout: float = None) -> Optional[dict]:
+        message = self._pubsub.get_message(timeout=timeout or 0)
+        if not message:
+            return None
+        return json.loads(message['data'])
+
+    def close(self):
+        self._pubsub.close()
+
+
+class RedisEventBroker:
+    """Event broker using Redis pub/sub, for multi-process deployments."""
+
+    def __init__(self, url: str, sequence_ttl: int = 86400):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.sequence_ttl = sequence_ttl
+
+    def subscribe(self, channel: str) -> Subscription:
+        return RedisSubscription(self, channel)
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+
+    def publish(self, channel: str, event_type: str, data: dict):
+        # Each job has its own counter; it expires once the job goes quiet
+        pipeline = self.client.pipeline()
+        pipeline.incr(f'{channel}:seq')
+        pipeline.expire(f'{channel}:seq', self.sequence_ttl)
+        event_id, _ = pipeline.execute()
+        event = {'id': event_id, 'type': event_type, 'data': data}
+        self.client.publish(channel, json.dumps(event))
+
+
+def init_events(app):
+    """Create the application's event broker and register it on the app."""
+    url = app.config.get('EVENTS_BROKER_URL', 'memory://')
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        try:
+            broker = RedisEventBroker(url, app.config.get('EVENTS_SEQUENCE_TTL_SECONDS', 86400))
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-process events")
+            broker = EventBroker()
+    else:
+        broker = EventBroker()
+    app.extensions['event_broker'] = broker
+    return broker
+
+
+def get_broker():
+    """Return the event broker for the current application."""
+    return current_app.extensions['event_broker']
+
+
+def publish_job_event(job_id, event_type: str, **data):
+    """
+    Publish a job progress event.
+
+    Failures are logged and swallowed so progress reporting never breaks a job.
+    """
+    try:
+        get_broker().publish(job_channel(job_id), event_type, dict(data, job_id=job_id))
+    except Exception as e:
+        logger.warning(f"Failed to publish {event_type} event for job {job_id}: {e}")
@@ -0,0 +1,152 @@
+"""
+Streaming inventory export.
+
+Rows are read with a server-side cursor (``yield_per``) as plain column
+tuples, not ORM objects, and serialized chunk by chunk into a generator that
+Flask sends as a chunked response. Only one batch of rows and one chunk of
+output are in memory at a time, however large the inventory.
+
+Parquet and Arrow output (see columnar.py, requires pyarrow) is sent one
+record batch at a time.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime, timezone
+
+from backend.models import DBInventoryItem
+from columnar import COLUMNAR_FORMATS, stream_columnar
+
+logger = logging.getLogger(__name__)
+
+# Text CSV cells starting with these get a leading ' so spreadsheets don't run them
+FORMULA_PREFIXES = ('=', '+', '-', '@')
+
+# Content type per export format
+EXPORT_FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+
+# Rows fetched from the cursor at a time
+EXPORT_BATCH_SIZE = 1000
+
+# Output is flushed to the client in chunks of roughly this many characters
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def export_rows(query, Item, fields, batch_size=EXPORT_BATCH_SIZE, raw=False):
+    """
+    Stream the rows of a filtered inventory query as to_dict()-shaped dicts.
+
+    Args:
+        query: Filtered, sorted inventory query
+        Item: Entity the query selects (DBInventoryItem or an inventory_items_union alias)
+        fields: Item fields to export
+        batch_size: Rows fetched per round trip
+        raw: Keep column values as loaded (datetimes, comma-separated tags)
+
+    Yields:
+        dict: One item
+    """
+    rows = query.with_entities(*[getattr(Item, field) for field in fields]).yield_per(batch_size)
+    for row in rows:
+        if raw:
+            yield dict(zip(fields, row))
+        else:
+            yield {field: DBInventoryItem.dict_value(field, value) for field, value in zip(fields, row)}
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        value = ','.join(value)
+    elif isinstance(value, dict):
+        value = json.dumps(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        # Spreadsheets would evaluate the cell as a formula
+        return "'" + value
+    return value
+
+
+def _chunked(pieces, chunk_size):
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _csv_lines(items, fields):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(fields)
+    for item in items:
+        writer.writerow([_csv_value(item[field]) for field in fields])
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+    yield output.getvalue()
+
+
+def _json_array(items):
+    yield '['
+    separator = '\n'
+    for item in items:
+        yield separator + json.dumps(item)
+        separator = ',\n'
+    yield '\n]\n'
+
+
+def _ndjson_lines(items):
+    for item in items:
+        yield json.dumps(item) + '\n'
+
+
+def serialize(items, fmt, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Serialize items into output chunks.
+
+    CSV has one column per field; tags are written comma-separated and
+    custom_fields as JSON. JSON is a single array, NDJSON one object per line.
+    Parquet and Arrow are binary and come in one chunk per record batch.
+
+    Args:
+        items: Iterable of item dicts
+        fmt: One of EXPORT_FORMATS
+        fields: Item fields, in column order
+        chunk_size: Approximate characters per chunk (text formats)
+
+    Yields:
+        str or bytes: Output chunks
+    """
+    if fmt in COLUMNAR_FORMATS:
+        chunks = stream_columnar(items, fmt, fields)
+    elif fmt == 'csv':
+        chunks = _chunked(_csv_lines(items, fields), chunk_size)
+    elif fmt == 'json':
+        chunks = _chunked(_json_array(items), chunk_size)
+    else:
+        chunks = _chunked(_ndjson_lines(items), chunk_size)
+    try:
+        yield from chunks
+    except Exception as e:
+        # Headers are already sent; the client sees a truncated file
+        logger.error(f"Inventory export failed mid-stream: {e}")
+        raise
+
+
+def export_filename(fmt, now=None):
+    """Download name in the style of main.py's output files."""
+    now = now or datetime.now(timezone.utc)
+    return f"inventory_{now.strftime('%Y%m%d_%H%M%S')}.{fmt}"
@@ -0,0 +1,382 @@
+"""
+Streaming inventory import.
+
+Uploads (main.py's JSON and CSV outputs, or this app's own exports) are
+decoded incrementally from the request stream: CSV row by row, NDJSON line by
+line and JSON arrays element by element. Records are validated and normalized
+into scraped ``InventoryItem`` s and upserted in batches with the bulk writer,
+so only one batch of records is held in memory however large the file is.
+"""
+
+import ast
+import csv
+import io
+import json
+import logging
+import math
+from datetime import datetime, timezone
+
+from backend.services.bulk_writer import item_row, write_items
+from backend.utils.validation import sanitize_string
+from models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'json', 'ndjson')
+
+# Format implied by an upload's content type or file extension
+IMPORT_MIMETYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/json': 'json',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+IMPORT_EXTENSIONS = {'csv': 'csv', 'json': 'json', 'ndjson': 'ndjson', 'jsonl': 'ndjson'}
+
+# Records validated and upserted together
+IMPORT_BATCH_SIZE = 1000
+
+# Characters read from the upload at a time
+IMPORT_READ_SIZE = 64 * 1024
+
+# Largest single record accepted; bounds memory for malformed uploads
+IMPORT_MAX_RECORD_SIZE = 1024 * 1024
+
+# Invalid records reported individually in the summary
+IMPORT_MAX_ERRORS = 20
+
+# Column lengths of the string fields (see DBInventoryItem)
+_STRING_FIELDS = {
+    'title': 500, 'currency': 10, 'sku': 100, 'description': 10000, 'category': 100, 'brand': 100,
+    'image_url': 1000, 'product_url': 1000, 'merchant': 100, 'condition': 50,
+}
+
+# Largest value of an INTEGER column
+_MAX_INTEGER = 2 ** 31 - 1
+
+_TRUE = ('true', '1', 'yes', 'y', 't')
+_FALSE = ('false', '0', 'no', 'n', 'f')
+
+
+class ImportFormatError(ValueError):
+    """Raised when an upload cannot be decoded; records before it are kept."""
+
+
+def detect_format(fmt=None, mimetype=None, filename=None):
+    """
+    Resolve the format of an upload.
+
+    Args:
+        fmt: Explicitly requested format
+        mimetype: Content type of the upload
+        filename: Name of the uploaded file
+
+    Returns:
+        str: One of IMPORT_FORMATS, or None if it cannot be told
+    """
+    if fmt:
+        fmt = fmt.lower()
+        return fmt if fmt in IMPORT_FORMATS else None
+    if filename and '.' in filename:
+        extension = filename.rsplit('.', 1)[1].lower()
+        if extension in IMPORT_EXTENSIONS:
+            return IMPORT_EXTENSIONS[extension]
+    return IMPORT_MIMETYPES.get(mimetype)
+
+
+class CountingReader(io.RawIOBase):
+    """Binary reader over an upload stream that counts the bytes consumed."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.stream.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def _json_array(text):
+    """Yield the elements of a JSON array one at a time, reading the text in chunks."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = '', 0, False
+    # 'start' (before '['), 'first' (after '['), 'next' (after ','), 'after' (after an element)
+    state = 'start'
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = text.read(IMPORT_READ_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position].isspace():
+            position += 1
+        if position == len(buffer):
+            if eof:
+                raise ImportFormatError('Upload is empty' if state == 'start' else 'Unexpected end of JSON input')
+            fill()
+            continue
+
+        char = buffer[position]
+        if state == 'start':
+            if char != '[':
+                raise ImportFormatError('JSON upload must be an array of items')
+            state = 'first'
+            position += 1
+        elif char == ']' and state in ('first', 'after'):
+            return
+        elif state == 'after':
+            if char != ',':
+                raise ImportFormatError("Invalid JSON in upload: expected ',' or ']' between items")
+            state = 'next'
+            position += 1
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                value, end = None, None
+            # A value ending at the end of the buffer may be cut short (e.g. a number)
+            if end is None or (end == len(buffer) and not eof):
+                if eof:
+                    raise ImportFormatError('Invalid JSON in upload')
+                if len(buffer) - position > IMPORT_MAX_RECORD_SIZE:
+                    raise ImportFormatError('A record is larger than the maximum of '
+                                            f'{IMPORT_MAX_RECORD_SIZE // 1024} KiB')
+                fill()
+                continue
+            position = end
+            state = 'after'
+            yield value
+
+
+def iter_records(stream, fmt):
+    """
+    Decode records from an upload without reading it into memory at once.
+
+    Args:
+        stream: Binary file-like object (request.stream or an uploaded file),
+            or a CountingReader over one
+        fmt: One of IMPORT_FORMATS
+
+    Yields:
+        tuple: (record number, record); an NDJSON line that is not valid JSON
+        is yielded as a ValueError so it counts as one invalid record
+
+    Raises:
+        ImportFormatError: If the upload cannot be decoded any further
+    """
+    if not isinstance(stream, CountingReader):
+        stream = CountingReader(stream)
+    text = io.TextIOWrapper(io.BufferedReader(stream, IMPORT_READ_SIZE), encoding='utf-8-sig',
+                            errors='replace', newline='' if fmt == 'csv' else None)
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        try:
+            for number, row in enumerate(reader, start=1):
+                yield number, {key: value for key, value in row.items() if key is not None}
+        except csv.Error as e:
+            raise ImportFormatError(f"Invalid CSV on line {reader.line_num}: {e}")
+    elif fmt == 'ndjson':
+        number = 0
+        while True:
+            line = text.readline(IMPORT_MAX_RECORD_SIZE + 1)
+            if not line:
+                return
+            if len(line) > IMPORT_MAX_RECORD_SIZE:
+                raise ImportFormatError(f"Record {number + 1} is longer than the maximum of "
+                                        f"{IMPORT_MAX_RECORD_SIZE // 1024} KiB")
+            line = line.strip()
+            if not line:
+                continue
+            number += 1
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = ValueError('invalid JSON')
+            yield number, record
+    else:
+        yield from enumerate(_json_array(text), start=1)
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _number(value, kind, field):
+    if _blank(value):
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be a number")
+    try:
+        if isinstance(value, str):
+            value = value.strip().replace(',', '').lstrip('$')
+        number = float(value)
+        if kind is int:
+            if not number.is_integer():
+                raise ValueError
+            number = int(number)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError(f"{field} must be a number")
+    if not math.isfinite(number) or (kind is int and number > _MAX_INTEGER):
+        raise ValueError(f"{field} is out of range")
+    if number < 0:
+        raise ValueError(f"{field} must not be negative")
+    return number
+
+
+def _boolean(value, default):
+    if _blank(value):
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError('in_stock must be true or false')
+
+
+def _custom_fields(value):
+    if _blank(value):
+        return None
+    if isinstance(value, str):
+        # JSON from exports, or a dict repr from main.py's CSV output
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError, MemoryError, RecursionError):
+                raise ValueError('custom_fields must be an object')
+    if not isinstance(value, dict):
+        raise ValueError('custom_fields must be an object')
+    return value
+
+
+def _scraped_at(value):
+    if _blank(value):
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise ValueError('scraped_at must be an ISO 8601 timestamp')
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def normalize_record(record, default_merchant=None):
+    """
+    Validate one uploaded record and turn it into a scraped item.
+
+    Accepts the fields of main.py's output (InventoryItem.to_dict()) and of
+    the inventory export. Database-only fields (id, user_id, tags, notes,
+    is_sold, timestamps other than scraped_at) are ignored.
+
+    Args:
+        record: Decoded record
+        default_merchant: Merchant for records that do not name one
+
+    Returns:
+        tuple: (InventoryItem, scraped_at datetime or None)
+
+    Raises:
+        ValueError: If the record is invalid
+    """
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError('record must be an object')
+
+    values = {}
+    for field, max_length in _STRING_FIELDS.items():
+        value = record.get(field)
+        values[field] = None if _blank(value) else sanitize_string(value, max_length) or None
+
+    if not values['title']:
+        raise ValueError('title is required')
+    values['merchant'] = values['merchant'] or default_merchant
+    if not values['merchant']:
+        raise ValueError('merchant is required')
+    values['currency'] = (values['currency'] or 'USD').upper()
+    values['condition'] = values['condition'] or 'new'
+
+    scraped_at = _scraped_at(record.get('scraped_at'))
+    item = InventoryItem(
+        price=_number(record.get('price'), float, 'price'),
+        quantity=_number(record.get('quantity'), int, 'quantity'),
+        in_stock=_boolean(record.get('in_stock'), True),
+        custom_fields=_custom_fields(record.get('custom_fields')),
+        scraped_at=scraped_at.isoformat() if scraped_at else None,
+        **values
+    )
+    return item, scraped_at
+
+
+def import_records(records, user_id, default_merchant=None, batch_size=IMPORT_BATCH_SIZE,
+                   max_errors=IMPORT_MAX_ERRORS, reader=None):
+    """
+    Validate and upsert decoded records in batches, reporting progress.
+
+    Each batch is committed once written, so an import that fails part way
+    keeps the batches before the failure; importing the same file again only
+    writes listings whose content changed.
+
+    Args:
+        records: Iterable of (record number, record), see iter_records
+        user_id: Owning user ID
+        default_merchant: Merchant for records that do not name one
+        batch_size: Records validated and written per batch
+        max_errors: Invalid records reported individually
+        reader: CountingReader the records are decoded from, to report bytes_read
+
+    Yields:
+        dict: Progress after every batch (records, imported, written, invalid,
+        errors, bytes_read); the last one has done=True, plus error if the upload could
+        not be decoded to the end
+    """
+    progress = {'records': 0, 'imported': 0, 'written': 0, 'invalid': 0, 'errors': [], 'bytes_read': 0}
+    batch = []
+
+    def flush():
+        if batch:
+            progress['written'] += write_items(batch, chunk_size=len(batch))
+            progress['imported'] += len(batch)
+            batch.clear()
+        if reader is not None:
+            progress['bytes_read'] = reader.bytes_read
+        logger.info(f"Import for user {user_id}: {progress['records']} records read, "
+                    f"{progress['written']} written, {progress['invalid']} invalid")
+
+    try:
+        for number, record in records:
+            progress['records'] += 1
+            try:
+                item, scraped_at = normalize_record(record, default_merchant)
+            except ValueError as e:
+                progress['invalid'] += 1
+                if len(progress['errors']) < max_errors:
+                    progress['errors'].append({'record': number, 'error': str(e)})
+                continue
+            batch.append(item_row(item, user_id, scraped_at=scraped_at))
+            if len(batch) >= batch_size:
+                flush()
+                yield dict(progress, done=False)
+    except ImportFormatError as e:
+        flush()
+        yield dict(progress, done=True, error=str(e))
+        return
+
+    flush()
+    yield dict(progress, done=True)
@@ -0,0 +1,115 @@
+"""
+Dashboard statistics from the per-user inventory_stats summary.
+
+The summary is maintained by triggers on inventory_items (see
+backend/models.py), so reading a user's statistics touches a handful of
+summary rows instead of aggregating their whole inventory.
+"""
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from backend.models import db, InventoryStats, PRICE_BUCKETS, STATS_KEY_COLUMNS, stats_key_sql
+from backend.services.query_cache import ALL_USERS, INVENTORY, mark_changed
+
+
+def inventory_summary(user_id, include_archived=False):
+    """
+    Aggregate a user's inventory from the summary table in one query.
+
+    Archived items are not in the summary; with ``include_archived`` they are
+    aggregated from inventory_items_archive and added in.
+
+    Args:
+        user_id: User ID
+        include_archived: Count archived items too
+
+    Returns:
+        dict: total_items, total_value, items_by_merchant, items_by_condition,
+            price_distribution, sold_items and unsold_items, shaped as the
+            /api/stats response
+    """
+    rows = db.session.query(
+        InventoryStats.merchant, InventoryStats.condition, InventoryStats.price_bucket,
+        InventoryStats.is_sold, InventoryStats.item_count, InventoryStats.total_value
+    ).filter(InventoryStats.user_id == user_id).all()
+    if include_archived:
+        rows += _archived_summary_rows(user_id)
+
+    total_items = sold_items = 0
+    total_value = 0.0
+    by_merchant, by_condition, by_bucket = {}, {}, {}
+    for merchant, condition, bucket, is_sold, count, value in rows:
+        total_items += count
+        total_value += value
+        if is_sold:
+            sold_items += count
+        by_merchant[merchant] = by_merchant.get(merchant, 0) + count
+        by_condition[condition] = by_condition.get(condition, 0) + count
+        if bucket:
+            by_bucket[bucket] = by_bucket.get(bucket, 0) + count
+
+    return {
+        'total_items': total_items,
+        'total_value': round(total_value, 2),
+        'items_by_merchant': [
+            {'merchant': merchant or 'Unknown', 'count': count}
+            for merchant, count in sorted(by_merchant.items())
+        ],
+        'items_by_condition': [
+            {'condition': condition or 'unknown', 'count': count}
+            for condition, count in sorted(by_condition.items())
+        ],
+        'price_distribution': [
+            {'range': label, 'count': by_bucket[label]}
+            for label, _, _ in PRICE_BUCKETS if by_bucket.get(label)
+        ],
+        'sold_items': sold_items,
+        'unsold_items': total_items - sold_items
+    }
+
+
+def _archived_summary_rows(user_id):
+    keys = ', '.join(stats_key_sql('inventory_items_archive')[1:])
+    return db.session.execute(text(
+        f"SELECT {keys}, count(*), coalesce(sum(price), 0) "
+        f"FROM inventory_items_archive WHERE user_id = :user_id GROUP BY 1, 2, 3, 4"
+    ), {'user_id': user_id}).all()
+
+
+def rebuild_inventory_stats(user_id=None):
+    """
+    Recompute the summary from inventory_items.
+
+    The triggers keep it current; this is for repairs after writes that
+    bypassed them (e.g. restoring a dump with triggers disabled).
+
+    Args:
+        user_id: Only rebuild this user's rows (default: everyone)
+
+    Returns:
+        int: Number of summary rows written
+    """
+    columns = ', '.join(STATS_KEY_COLUMNS)
+    where = 'WHERE user_id = :user_id' if user_id is not None else ''
+    params = {'user_id': user_id} if user_id is not None else {}
+
+    db.session.execute(text(f"DELETE FROM inventory_stats {where}"), params)
+    result = db.session.execute(text(
+        f"INSERT INTO inventory_stats ({columns}, item_count, total_value) "
+        f"SELECT {', '.join(stats_key_sql('inventory_items'))}, count(*), coalesce(sum(price), 0) "
+        f"FROM inventory_items {where} GROUP BY 1, 2, 3, 4, 5"
+    ), params)
+    mark_changed(db.session, INVENTORY, [user_id if user_id is not None else ALL_USERS])
+    db.session.commit()
+    return result.rowcount
+
+
+@click.command('rebuild-inventory-stats')
+@click.option('--user-id', type=int, default=None, help='Only rebuild this user (default: all users).')
+@with_appcontext
+def rebuild_stats_command(user_id):
+    """Recompute the inventory_stats summary table from inventory_items."""
+    rows = rebuild_inventory_stats(user_id)
+    click.echo(f"Rebuilt inventory stats ({rows} summary rows)")
@@ -0,0 +1,345 @@
+"""
+Fair-share scheduler for scraping jobs.
+
+Jobs are queued per user and dispatched to a small worker pool. Selection
+honours job priority first, then weighted round robin between users, while
+per-user and per-merchant concurrency caps keep a single user or merchant
+from holding every worker and browser.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Merchants whose scrapers drive a Selenium browser and so share the browser pool
+BROWSER_MERCHANTS = {'mercari', 'depop'}
+
+
+@dataclass(order=True)
+class QueuedJob:
+    """A scraping job waiting in (or dispatched from) the scheduler."""
+
+    sort_key: tuple = field(init=False, repr=False)
+    job_id: int = field(compare=False)
+    user_id: int = field(compare=False)
+    merchant: str = field(compare=False)
+    priority: int = field(default=0, compare=False)
+    seq: int = field(default=0, compare=False)
+    queued_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc), compare=False)
+
+    def __post_init__(self):
+        """Order by highest priority first, then submission order."""
+        self.sort_key = (-self.priority, self.seq)
+
+    @property
+    def merchant_key(self) -> str:
+        return (self.merchant or 'generic').lower()
+
+
+class JobScheduler:
+    """
+    In-process scheduler in front of scraping job execution.
+
+    Args:
+        runner: Callable invoked with a job ID on a worker thread
+        max_workers: Size of the worker pool
+        max_jobs_per_user: Maximum concurrently running jobs per user
+        browser_pool_size: Number of Selenium browsers that may be open at once
+        merchant_caps: Per-merchant concurrency caps, keyed by lowercase merchant
+        default_merchant_cap: Cap for merchants without an explicit entry
+        default_user_weight: Round-robin turns granted to a user per round
+    """
+
+    def __init__(self, runner: Optional[Callable[[int], None]] = None, max_workers: int = 4,
+                 max_jobs_per_user: int = 2, browser_pool_size: int = 2,
+                 merchant_caps: Optional[Dict[str, int]] = None,
+                 default_merchant_cap: int = 4, default_user_weight: int = 1):
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_user = max(1, max_jobs_per_user)
+        self.browser_pool_size = max(1, browser_pool_size)
+        self.merchant_caps = {k.lower(): v for k, v in (merchant_caps or {}).items()}
+        self.default_merchant_cap = max(1, default_merchant_cap)
+        self.default_user_weight = max(1, default_user_weight)
+        self.enabled = runner is not None
+
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+        self._queues: Dict[int, list] = {}
+        self._ring: deque = deque()
+        self._credits: Dict[int, int] = {}
+        self._weights: Dict[int, int] = {}
+        self._running: Dict[int, QueuedJob] = {}
+        self._running_by_user: Counter = Counter()
+        self._running_by_merchant: Counter = Counter()
+        self._dispatched_total = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # Configuration
+
+    def set_user_weight(self, user_id: int, weight: int):
+        """Set the fair-share weight (turns per round) for a user."""
+        with self._lock:
+            self._weights[user_id] = max(1, int(weight))
+
+    def merchant_cap(self, merchant: str) -> int:
+        """Return the concurrency cap for a merchant."""
+        merchant = (merchant or 'generic').lower()
+        cap = self.merchant_caps.get(merchant, self.default_merchant_cap)
+        if merchant in BROWSER_MERCHANTS:
+            cap = min(cap, self.browser_pool_size)
+        return max(1, cap)
+
+    # Queue operations
+
+    def submit(self, job_id: int, user_id: int, merchant: str, priority: int = 0) -> QueuedJob:
+        """
+        Queue a job and dispatch work if capacity is available.
+
+        Returns:
+            The QueuedJob entry
+        """
+        entry = QueuedJob(job_id=job_id, user_id=user_id, merchant=merchant,
+                          priority=priority, seq=next(self._seq))
+        with self._lock:
+            queue = self._queues.setdefault(user_id, [])
+            heapq.heappush(queue, entry)
+            if user_id not in self._ring:
+                self._ring.append(user_id)
+                self._credits[user_id] = self._weight(user_id)
+        logger.info(f"Queued scraping job {job_id} for user {user_id} (priority {priority})")
+        self.dispatch()
+        return entry
+
+    def remove(self, job_id: int) -> bool:
+        """Remove a queued (not yet running) job. Returns True if it was queued."""
+        with self._lock:
+            for user_id, queue in self._queues.items():
+                for index, entry in enumerate(queue):
+                    if entry.job_id == job_id:
+                        queue.pop(index)
+                        heapq.heapify(queue)
+                        self._drop_user_if_idle(user_id)
+                        return True
+        return False
+
+    def next_job(self) -> Optional[QueuedJob]:
+        """
+        Pick the next job to run and mark it running.
+
+        The highest priority that has a dispatchable job wins; among users
+        offering that priority, the first in round-robin order gets the slot.
+
+        Returns:
+            QueuedJob, or None if nothing can run right now
+        """
+        with self._lock:
+            if len(self._running) >= self.max_workers:
+                return None
+
+            best_priority = None
+            candidates = []
+            for user_id in self._ring:
+                entry = self._best_runnable(user_id)
+                if entry is None:
+                    continue
+                candidates.append((user_id, entry))
+                if best_priority is None or entry.priority > best_priority:
+                    best_priority = entry.priority
+
+            if not candidates:
+                return None
+
+            user_id, entry = next((u, e) for u, e in candidates if e.priority == best_priority)
+            queue = self._queues[user_id]
+            queue.remove(entry)
+            heapq.heapify(queue)
+
+            self._running[entry.job_id] = entry
+            self._running_by_user[user_id] += 1
+            self._running_by_merchant[entry.merchant_key] += 1
+            self._dispatched_total += 1
+
+            # Weighted round robin: spend one credit, rotate once exhausted
+            self._credits[user_id] -= 1
+            if self._credits[user_id] <= 0:
+                self._credits[user_id] = self._weight(user_id)
+                self._ring.remove(user_id)
+                self._ring.append(user_id)
+            self._drop_user_if_idle(user_id)
+
+            return entry
+
+    def release(self, job_id: int):
+        """Mark a running job as finished and free its slots."""
+        with self._lock:
+            entry = self._running.pop(job_id, None)
+            if entry is None:
+                return
+            self._running_by_user[entry.user_id] -= 1
+            if self._running_by_user[entry.user_id] <= 0:
+                del self._running_by_user[entry.user_id]
+            self._running_by_merchant[entry.merchant_key] -= 1
+            if self._running_by_merchant[entry.merchant_key] <= 0:
+                del self._running_by_merchant[entry.merchant_key]
+
+    def dispatch(self):
+        """Start as many queued jobs as current capacity allows."""
+        if not self.enabled:
+            return
+        while True:
+            entry = self.next_job()
+            if entry is None:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='scrape-worker')
+            self._executor.submit(self._run, entry)
+
+    def _run(self, entry: QueuedJob):
+        try:
+            self.runner(entry.job_id)
+        except Exception as e:
+            logger.error(f"Scheduler runner error for job {entry.job_id}: {e}")
+        finally:
+            self.release(entry.job_id)
+            self.dispatch()
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    # Introspection
+
+    def position(self, job_id: int) -> Optional[int]:
+        """Return the 1-based position of a queued job within its user's queue."""
+        with self._lock:
+            for queue in self._queues.values():
+                ordered = sorted(queue)
+                for index, entry in enumerate(ordered):
+                    if entry.job_id == job_id:
+                        return index + 1
+        return None
+
+    def is_running(self, job_id: int) -> bool:
+        with self._lock:
+            return job_id in self._running
+
+    def metrics(self) -> dict:
+        """Return queue-depth and concurrency metrics."""
+        with self._lock:
+            queued_by_user = {u: len(q) for u, q in self._queues.items() if q}
+            queued_by_merchant = Counter(e.merchant_key for q in self._queues.values() for e in q)
+            browsers_in_use = sum(c for m, c in self._running_by_merchant.items() if m in BROWSER_MERCHANTS)
+            return {
+                'queued': sum(queued_by_user.values()),
+                'running': len(self._running),
+                'max_workers': self.max_workers,
+                'dispatched_total': self._dispatched_total,
+                'queued_by_user': queued_by_user,
+                'queued_by_merchant': dict(queued_by_merchant),
+                'running_by_user': dict(self._running_by_user),
+                'running_by_merchant': dict(self._running_by_merchant),
+                'browser_pool': {
+                    'size': self.browser_pool_size,
+                    'in_use': browsers_in_use
+                }
+            }
+
+    # Internals
+
+    def _weight(self, user_id: int) -> int:
+        return self._weights.get(user_id, self.default_user_weight)
+
+    def _has_capacity(self, entry: QueuedJob) -> bool:
+        if self._running_by_user[entry.user_id] >= self.max_jobs_per_user:
+            return False
+        merchant = entry.merchant_key
+        if self._running_by_merchant[merchant] >= self.merchant_cap(merchant):
+            return False
+        if merchant in BROWSER_MERCHANTS:
+            in_use = sum(c for m, c in self._running_by_merchant.items() if m in BROWSER_MERCHANTS)
+            if in_use >= self.browser_pool_size:
+                return False
+        return True
+
+    def _best_runnable(self, user_id: int) -> Optional[QueuedJob]:
+        for entry in sorted(self._queues.get(user_id, [])):
+            if self._has_capacity(entry):
+                return entry
+        return None
+
+    def _drop_user_if_idle(self, user_id: int):
+        if not self._queues.get(user_id):
+            self._queues.pop(user_id, None)
+            self._credits.pop(user_id, None)
+            if user_id in self._ring:
+                self._ring.remove(user_id)
+
+
+def init_scheduler(app):
+    """Create the application's job scheduler and register it on the app."""
+    # Jobs are run by `flask scrape-worker` processes claiming them from the database
+    if app.config.get('JOB_QUEUE_BACKEND') == 'database':
+        from backend.services.work_queue import DatabaseJobQueue
+        queue = DatabaseJobQueue()
+        app.extensions['job_scheduler'] = queue
+        return queue
+
+    from backend.services.work_queue import QueueWorker, lease_job
+    
+    # Jobs run here hold a heartbeated lease like those of `flask scrape-worker`,
+    # so other processes can tell a running job from an abandoned one
+    worker = QueueWorker(app)
+    
+    def runner(job_id):
+        with app.app_context():
+            if lease_job(job_id, worker.worker_id, worker.lease_seconds):
+                worker.process(job_id)
+            else:
+                logger.info(f"Skipping job {job_id}: leased by another worker or no longer queued")
+
+    scheduler = JobScheduler(
+        runner=runner if app.config.get('SCHEDULER_ENABLED', True) else None,
+        max_workers=app.config.get('SCHEDULER_MAX_WORKERS', 4),
+        max_jobs_per_user=app.config.get('SCHEDULER_MAX_JOBS_PER_USER', 2),
+        browser_pool_size=app.config.get('BROWSER_POOL_SIZE', 2),
+        merchant_caps=app.config.get('MERCHANT_CONCURRENCY', {}),
+        default_merchant_cap=app.config.get('DEFAULT_MERCHANT_CONCURRENCY', 4)
+    )
+    app.extensions['job_scheduler'] = scheduler
+    return scheduler
+
+
+def start_scheduler(app):
+    """
+    Pick up jobs whose worker stopped and jobs still waiting in the queue.
+    
+    Called by ``start_background_services`` rather than at app creation, so
+    only the serving process submits them to its scheduler.
+    """
+    if not app.extensions['job_scheduler'].enabled:
+        return
+    from backend.services.scraper_service import resume_interrupted_jobs
+    with app.app_context():
+        try:
+            resume_interrupted_jobs()
+        except Exception as e:
+            logger.warning(f"Could not resume interrupted jobs: {e}")
+
+
+def get_scheduler():
+    """Return the job scheduler (or database queue) for the current application."""
+    return current_app.extensions['job_scheduler']
@@ -0,0 +1,171 @@
+"""
+Price and availability history for inventory items.
+
+Points are written by triggers on inventory_items (see backend/models.py)
+only when price or in_stock changes. This module reads them back and keeps
+the table compact by downsampling old points: one point per item per day
+after ``PRICE_HISTORY_DAILY_AFTER_DAYS`` and one per week after
+``PRICE_HISTORY_WEEKLY_AFTER_DAYS``.
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, delete, func, select, update
+from sqlalchemy.orm import aliased
+
+from backend.models import db, DBInventoryItem, PriceHistory
+from backend.services.query_cache import INVENTORY, mark_changed
+
+logger = logging.getLogger(__name__)
+
+CHANGE_DIRECTIONS = ('any', 'drop', 'rise')
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def item_history(item_id, since=None, limit=1000):
+    """
+    Return an item's history points, oldest first.
+
+    Args:
+        item_id: Inventory item ID
+        since: Only points recorded at or after this time
+        limit: Maximum points (the most recent ones are kept)
+
+    Returns:
+        list: PriceHistory rows
+    """
+    query = PriceHistory.query.filter(PriceHistory.item_id == item_id)
+    if since is not None:
+        query = query.filter(PriceHistory.recorded_at >= since)
+    points = query.order_by(PriceHistory.recorded_at.desc(), PriceHistory.id.desc()).limit(limit).all()
+    return points[::-1]
+
+
+def biggest_price_changes(user_id, since, limit=20, direction='any'):
+    """
+    Find the items whose price moved the most since a point in time.
+
+    The change is the current price minus the price before the item's first
+    change in the window. That first change is found with the
+    (user_id, recorded_at) index, so the query reads only the window's points
+    rather than every item's history.
+
+    Args:
+        user_id: User ID
+        since: Start of the window
+        limit: Maximum items
+        direction: 'any' (largest absolute change), 'drop' or 'rise'
+
+    Returns:
+        list: (DBInventoryItem, old_price) tuples, biggest change first
+    """
+    first_change = select(func.min(PriceHistory.id).label('id')).where(
+        PriceHistory.user_id == user_id,
+        PriceHistory.recorded_at >= since,
+        PriceHistory.previous_price.isnot(None)
+    ).group_by(PriceHistory.item_id).subquery()
+
+    start = aliased(PriceHistory)
+    change = DBInventoryItem.price - start.previous_price
+    query = db.session.query(DBInventoryItem, start.previous_price)\
+        .select_from(first_change)\
+        .join(start, start.id == first_change.c.id)\
+        .join(DBInventoryItem, DBInventoryItem.id == start.item_id)\
+        .filter(DBInventoryItem.price.isnot(None), change != 0)
+
+    if direction == 'drop':
+        query = query.filter(change < 0).order_by(change.asc())
+    elif direction == 'rise':
+        query = query.filter(change > 0).order_by(change.desc())
+    else:
+        query = query.order_by(func.abs(change).desc())
+
+    return query.order_by(DBInventoryItem.id).limit(limit).all()
+
+
+def _bucket(unit):
+    """SQL expression truncating recorded_at to a day or a week starting on Monday."""
+    if db.engine.dialect.name == 'sqlite':
+        if unit == 'day':
+            return func.date(PriceHistory.recorded_at)
+        # The Monday on or before the date, as date_trunc('week') gives on PostgreSQL;
+        # unlike strftime('%W'), this does not split a week at the new year
+        return func.date(PriceHistory.recorded_at, '-6 days', 'weekday 1')
+    return func.date_trunc(unit, PriceHistory.recorded_at)
+
+
+def _downsample(unit, window):
+    """
+    Keep the last point per item and bucket within a window.
+
+    The kept point takes the previous_price of the bucket's first point, so
+    it records the bucket's net change.
+
+    Returns:
+        int: Number of points removed
+    """
+    bucket = _bucket(unit)
+    groups = select(
+        func.min(PriceHistory.id).label('first_id'),
+        func.max(PriceHistory.id).label('last_id')
+    ).where(window).group_by(PriceHistory.item_id, bucket).having(func.count() > 1).subquery()
+
+    first = aliased(PriceHistory)
+    db.session.execute(
+        update(PriceHistory)
+        .where(PriceHistory.id == groups.c.last_id)
+        .values(previous_price=select(first.previous_price)
+                .where(first.id == groups.c.first_id).scalar_subquery())
+        .execution_options(synchronize_session=False)
+    )
+
+    keep = select(func.max(PriceHistory.id)).where(window).group_by(PriceHistory.item_id, bucket)
+    return db.session.execute(
+        delete(PriceHistory)
+        .where(window, PriceHistory.id.not_in(keep))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def compact_price_history(now=None):
+    """
+    Downsample old history points.
+
+    Points older than PRICE_HISTORY_DAILY_AFTER_DAYS are reduced to one per
+    item per day, and points older than PRICE_HISTORY_WEEKLY_AFTER_DAYS to
+    one per item per week. Each kept point is the last of its period.
+
+    Args:
+        now: Reference time (defaults to now)
+
+    Returns:
+        int: Number of points removed
+    """
+    now = now or _utcnow()
+    daily_cutoff = now - timedelta(days=current_app.config.get('PRICE_HISTORY_DAILY_AFTER_DAYS', 30))
+    weekly_cutoff = now - timedelta(days=current_app.config.get('PRICE_HISTORY_WEEKLY_AFTER_DAYS', 365))
+
+    removed = _downsample('day', and_(PriceHistory.recorded_at < daily_cutoff,
+                                      PriceHistory.recorded_at >= weekly_cutoff))
+    removed += _downsample('week', PriceHistory.recorded_at < weekly_cutoff)
+    if removed:
+        mark_changed(db.session, INVENTORY)
+    db.session.commit()
+
+    logger.info(f"Compacted price history: {removed} points removed")
+    return removed
+
+
+@click.command('compact-price-history')
+@with_appcontext
+def compact_history_command():
+    """Downsample old price history points to daily and weekly."""
+    removed = compact_price_history()
+    click.echo(f"Compacted price history ({removed} points removed)")
@@ -0,0 +1,240 @@
+"""
+Per-user cache for read endpoint responses.
+
+Cached responses are keyed by user, request and the user's data version for
+each scope the endpoint reads (``inventory``, ``jobs``). Write paths bump
+those versions when they commit, so reads are served from cache until
+something they depend on actually changes; stale entries are never looked up
+again and age out of the store.
+
+ORM writes to inventory_items and scraping_jobs are picked up automatically
+from the session. Core statements that bypass the unit of work (bulk
+upserts, conditional UPDATEs) call ``mark_changed`` before committing.
+
+``QUERY_CACHE_URL`` picks the store: a ``redis://`` URL shares entries and
+versions between processes (requires the optional ``redis`` package),
+``memory://`` is an in-process LRU and ``none`` disables caching. Unset, it
+uses the Redis of ``EVENTS_BROKER_URL`` if there is one, else the in-process
+LRU. The in-process store only sees writes made in its own process, so with
+several web worker processes (gunicorn/uwsgi ``--workers``) or a separate
+job worker, the others serve stale responses for up to ``QUERY_CACHE_TTL``.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from functools import wraps
+
+from flask import current_app, has_app_context, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from fetch_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+INVENTORY = 'inventory'
+JOBS = 'jobs'
+
+# Tables whose ORM writes bump a scope, by table name
+TABLE_SCOPES = {'inventory_items': INVENTORY, 'scraping_jobs': JOBS}
+
+# Session.info key for versions to bump when the transaction commits
+PENDING_KEY = 'query_cache_pending'
+
+# Stands in for "every user" in a pending bump
+ALL_USERS = '*'
+
+
+def version_key(scope, user_id=ALL_USERS) -> str:
+    """Return the version counter name for a user's scope (or the scope as a whole)."""
+    return f'version:{scope}:{user_id}'
+
+
+class MemoryQueryCache:
+    """In-process LRU of responses, with version counters kept outside the LRU."""
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1024):
+        self._entries = TTLCache(ttl, max_entries)
+        self._lock = threading.Lock()
+        self._versions = {}
+
+    def versions(self, names) -> list:
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, names):
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def set(self, key: str, value):
+        self._entries.set(key, value)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+
+class RedisQueryCache:
+    """Response cache in Redis, shared by every web process and worker."""
+
+    def __init__(self, url: str, ttl: float = 300, prefix: str = 'query-cache:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+
+    def versions(self, names) -> list:
+        values = self.client.mget([self.prefix + name for name in names])
+        return [int(value) if value is not None else 0 for value in values]
+
+    def bump(self, names):
+        pipeline = self.client.pipeline(transaction=False)
+        for name in names:
+            pipeline.incr(self.prefix + name)
+        pipeline.execute()
+
+    def get(self, key: str):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value):
+        if self.ttl > 0:
+            self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+
+def init_query_cache(app):
+    """Create the application's query cache and register it on the app."""
+    url = app.config.get('QUERY_CACHE_URL')
+    ttl = app.config.get('QUERY_CACHE_TTL', 300)
+    max_entries = app.config.get('QUERY_CACHE_MAX_ENTRIES', 1024)
+    if url is None:
+        # Share the events Redis when there is one, so every process sees each write
+        broker_url = app.config.get('EVENTS_BROKER_URL') or ''
+        url = broker_url if broker_url.startswith(('redis://', 'rediss://')) else 'memory://'
+    if not url or url == 'none':
+        cache = None
+    elif url.startswith('redis://') or url.startswith('rediss://'):
+        try:
+            cache = RedisQueryCache(url, ttl)
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-process query cache")
+            cache = MemoryQueryCache(ttl, max_entries)
+    else:
+        cache = MemoryQueryCache(ttl, max_entries)
+        # Other processes cannot bump this process's versions
+        if app.config.get('JOB_QUEUE_BACKEND') == 'database':
+            logger.warning("In-process query cache with database job queue: worker writes show up "
+                           f"after QUERY_CACHE_TTL ({ttl}s); use a redis:// QUERY_CACHE_URL")
+        elif not app.debug and not app.testing:
+            logger.warning("In-process query cache: with several web worker processes, a write in one "
+                           f"shows up in the others after QUERY_CACHE_TTL ({ttl}s); "
+                           "use a redis:// QUERY_CACHE_URL")
+    app.extensions['query_cache'] = cache
+    return cache
+
+
+def get_query_cache():
+    """Return the current application's query cache, or None if caching is off."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('query_cache')
+
+
+def mark_changed(session, scope, user_ids=(ALL_USERS,)):
+    """
+    Record that this transaction changed a scope for some users.
+
+    The versions are bumped once the transaction commits, and forgotten if it
+    rolls back.
+
+    Args:
+        session: Session the change was made in
+        scope: INVENTORY or JOBS
+        user_ids: Affected users (default: everyone)
+    """
+    pending = session.info.setdefault(PENDING_KEY, set())
+    pending.update(version_key(scope, str(user_id)) for user_id in user_ids if user_id is not None)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_orm_changes(session, flush_context, instances):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        scope = TABLE_SCOPES.get(getattr(obj, '__tablename__', None))
+        if scope is not None:
+            mark_changed(session, scope, (obj.user_id,))
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_committed(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    cache = get_query_cache()
+    if not pending or cache is None:
+        return
+    try:
+        cache.bump(sorted(pending))
+    except Exception as e:
+        logger.warning(f"Failed to bump query cache versions: {e}")
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_rolled_back(session, previous_transaction):
+    if not session.in_transaction():
+        session.info.pop(PENDING_KEY, None)
+
+
+def cached_response(*scopes):
+    """
+    Serve a JSON view from the query cache.
+
+    The view must run under ``jwt_required`` and return ``(response, status)``.
+    Only 200 responses are stored. Versions are read before the view runs, so
+    a write that commits while the response is being built leaves it under an
+    already outdated key.
+
+    Args:
+        *scopes: Data scopes the view reads
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_query_cache()
+            if cache is None:
+                return view(*args, **kwargs)
+
+            user_id = str(get_jwt_identity())
+            names = [name for scope in scopes for name in (version_key(scope), version_key(scope, user_id))]
+            args_key = json.dumps(sorted(request.args.items(multi=True)))
+            try:
+                versions = cache.versions(names)
+                key = 'response:{}:{}:{}:{}'.format(
+                    user_id, request.path, '.'.join(map(str, versions)),
+                    hashlib.sha1(args_key.encode('utf-8')).hexdigest()
+                )
+                hit = cache.get(key)
+            except Exception as e:
+                logger.warning(f"Query cache unavailable: {e}")
+                return view(*args, **kwargs)
+            if hit is not None:
+                return jsonify(hit), 200
+
+            response, status = view(*args, **kwargs)
+            if status == 200:
+                try:
+                    cache.set(key, response.get_json())
+                except Exception as e:
+                    logger.warning(f"Failed to store query cache entry: {e}")
+            return response, status
+        return wrapper
+    return decorator
@@ -0,0 +1,212 @@
+"""
+Read replica routing.
+
+When ``SQLALCHEMY_REPLICA_URIS`` lists replicas, queries made while serving a
+GET or HEAD request go to one of them (picked once per request). Everything
+else goes to the primary: other request methods, background threads and CLI
+commands, flushes and DML statements, and any query after a GET request has
+written.
+
+Replication lags, so reads stay on the primary for ``REPLICA_STICKY_SECONDS``
+after a user's data changes: after any successful write request they make,
+and after any commit that changes their inventory or jobs (the same changes
+that bump their query cache versions, including scrape ingestion in the
+background). A response cached right after a change is therefore built from
+the primary rather than from a replica that has not caught up.
+
+Sticky marks are kept in process by default; with several app processes or
+``flask scrape-worker`` hosts, set ``REPLICA_STICKY_URL`` to a ``redis://`` URL
+(requires the optional ``redis`` package) so every process sees them.
+"""
+
+import logging
+import random
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from backend.services.query_cache import ALL_USERS, PENDING_KEY
+from fetch_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PREFIX = 'replica_'
+
+# Request methods whose queries may read from a replica
+READ_METHODS = ('GET', 'HEAD')
+
+# WSGI environ key holding the request's replica name (None: primary)
+REQUEST_REPLICA = 'inventory_hub.read_replica'
+
+
+def replica_urls(config) -> dict:
+    """Return the configured replica URLs by name."""
+    return {
+        f'{REPLICA_PREFIX}{index}': url
+        for index, url in enumerate(config.get('SQLALCHEMY_REPLICA_URIS') or ())
+    }
+
+
+class MemoryStickyStore:
+    """In-process record of recently written users."""
+
+    def __init__(self, seconds: float, max_entries: int = 10000):
+        self._marks = TTLCache(seconds, max_entries)
+
+    def mark(self, names):
+        for name in names:
+            self._marks.set(name, True)
+
+    def any(self, names) -> bool:
+        return any(self._marks.get(name) for name in names)
+
+
+class RedisStickyStore:
+    """Recently written users in Redis, shared by every web process and worker."""
+
+    def __init__(self, url: str, seconds: float, prefix: str = 'replica-sticky:'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.milliseconds = int(seconds * 1000)
+        self.prefix = prefix
+
+    def mark(self, names):
+        if self.milliseconds <= 0:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for name in names:
+            pipeline.set(self.prefix + name, 1, px=self.milliseconds)
+        pipeline.execute()
+
+    def any(self, names) -> bool:
+        return self.client.exists(*[self.prefix + name for name in names]) > 0
+
+
+class ReplicaRouter:
+    """Picks a replica for read requests, unless the user wrote recently."""
+
+    def __init__(self, engines, store):
+        self.engines = dict(engines)
+        self.store = store
+
+    def mark_written(self, user_ids):
+        """Keep these users' reads (or everyone's, for ALL_USERS) on the primary for a while."""
+        try:
+            self.store.mark(sorted({str(user_id) for user_id in user_ids if user_id is not None}))
+        except Exception as e:
+            logger.warning(f"Failed to record replica stickiness: {e}")
+
+    def replica_for(self, user_id=None):
+        """
+        Return the name of the replica to read from, or None for the primary.
+
+        Args:
+            user_id: Requesting user, if known
+        """
+        names = [ALL_USERS] if user_id is None else [ALL_USERS, str(user_id)]
+        try:
+            if self.store.any(names):
+                return None
+        except Exception as e:
+            logger.warning(f"Replica stickiness unavailable, reading from primary: {e}")
+            return None
+        return random.choice(list(self.engines))
+
+
+def init_read_replicas(app):
+    """
+    Create the replica router, if replicas are configured, and register it on the app.
+
+    Needs the replica engines created by ``init_db``.
+    """
+    engines = app.extensions.get('replica_engines')
+    if not engines:
+        app.extensions['read_replicas'] = None
+        return None
+
+    seconds = app.config.get('REPLICA_STICKY_SECONDS', 5)
+    url = app.config.get('REPLICA_STICKY_URL', 'memory://')
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        try:
+            store = RedisStickyStore(url, seconds)
+        except ImportError:
+            logger.warning("redis package not installed, falling back to in-process replica stickiness")
+            store = MemoryStickyStore(seconds)
+    else:
+        store = MemoryStickyStore(seconds)
+
+    router = ReplicaRouter(engines, store)
+    app.extensions['read_replicas'] = router
+    app.after_request(_stick_after_write_request)
+    logger.info(f"Reading GET requests from {len(engines)} replica(s)")
+    return router
+
+
+def get_replica_router():
+    """Return the current application's replica router, or None if there are no replicas."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('read_replicas')
+
+
+def _request_user():
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No JWT was verified for this request
+        return None
+
+
+def request_replica(write=False):
+    """
+    Return the replica engine for a query in the current request, or None.
+
+    Args:
+        write: The query writes; it and the rest of the request use the primary
+    """
+    if not has_request_context() or request.method not in READ_METHODS:
+        return None
+    router = get_replica_router()
+    if router is None:
+        return None
+    if write:
+        request.environ[REQUEST_REPLICA] = None
+        return None
+    if REQUEST_REPLICA not in request.environ:
+        request.environ[REQUEST_REPLICA] = router.replica_for(_request_user())
+    name = request.environ[REQUEST_REPLICA]
+    return router.engines[name] if name is not None else None
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends read requests' queries to a replica (see module docstring)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            replica = request_replica(write=self._flushing or isinstance(clause, UpdateBase))
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _stick_after_write_request(response):
+    if request.method not in READ_METHODS and response.status_code < 400:
+        user_id = _request_user()
+        if user_id is not None:
+            get_replica_router().mark_written([user_id])
+    return response
+
+
+# Runs ahead of the query cache's after_commit listener, which consumes the pending set
+@event.listens_for(Session, 'after_commit', insert=True)
+def _stick_committed_changes(session):
+    pending = session.info.get(PENDING_KEY)
+    router = get_replica_router()
+    if pending and router is not None:
+        # Pending entries are version keys, 'version:<scope>:<user>'
+        router.mark_written(name.rsplit(':', 1)[1] for name in pending)
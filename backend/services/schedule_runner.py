@@ -0,0 +1,199 @@
+"""
+Recurring scrape schedules.
+
+A background loop polls for due ``ScrapeSchedule`` rows, turns each into a
+queued ``ScrapingJob`` and hands it to the job scheduler. Run times carry a
+random jitter so schedules set for the same time do not all fire at once.
+"""
+
+import logging
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from backend.models import db, DBInventoryItem, ScrapeSchedule, ScrapingJob
+from backend.services.job_scheduler import get_scheduler
+from backend.utils.cron import parse_cron
+
+logger = logging.getLogger(__name__)
+
+# Job statuses that mean a schedule's previous run has not finished yet
+ACTIVE_STATUSES = ('pending', 'queued', 'running')
+
+
+def _utcnow():
+    """Naive UTC now, matching how DateTime columns are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def compute_next_run(schedule, after=None):
+    """
+    Compute the next run time for a schedule, including jitter.
+
+    Args:
+        schedule: ScrapeSchedule
+        after: Reference time (defaults to now)
+
+    Returns:
+        datetime of the next run
+    """
+    after = after or _utcnow()
+    if schedule.cron:
+        base = parse_cron(schedule.cron).next_after(after)
+    else:
+        base = after + timedelta(seconds=schedule.interval_seconds)
+
+    jitter = schedule.jitter_seconds or 0
+    if jitter > 0:
+        base += timedelta(seconds=random.uniform(0, jitter))
+    return base
+
+
+def run_due_schedules(now=None, limit=100):
+    """
+    Create jobs for every enabled schedule whose next run is due.
+
+    Each schedule is claimed with a conditional UPDATE on ``next_run_at`` so
+    that several app processes running this loop never fire it twice.
+
+    Args:
+        now: Reference time (defaults to now)
+        limit: Maximum schedules to process per call
+
+    Returns:
+        List of created ScrapingJob objects
+    """
+    now = now or _utcnow()
+    due = ScrapeSchedule.query.filter(
+        ScrapeSchedule.enabled.is_(True),
+        ScrapeSchedule.next_run_at <= now
+    ).order_by(ScrapeSchedule.next_run_at).limit(limit).all()
+
+    created = []
+    for schedule in due:
+        next_run = compute_next_run(schedule, now)
+        claimed = db.session.execute(
+            update(ScrapeSchedule)
+            .where(ScrapeSchedule.id == schedule.id, ScrapeSchedule.next_run_at == schedule.next_run_at)
+            .values(next_run_at=next_run)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not claimed:
+            db.session.rollback()
+            continue
+
+        # Skip this slot if the previous run is still in flight
+        if schedule.last_job_id:
+            previous = db.session.get(ScrapingJob, schedule.last_job_id)
+            if previous and previous.status in ACTIVE_STATUSES:
+                logger.info(f"Schedule {schedule.id} skipped: job {previous.id} still {previous.status}")
+                db.session.commit()
+                continue
+
+        job = ScrapingJob(
+            user_id=schedule.user_id,
+            url=schedule.url,
+            merchant=schedule.merchant,
+            pages=schedule.pages,
+            priority=schedule.priority,
+            status='queued',
+            queued_at=now,
+            schedule_id=schedule.id
+        )
+        db.session.add(job)
+        db.session.flush()
+        job.task_id = str(job.id)
+
+        schedule.last_run_at = now
+        schedule.last_job_id = job.id
+        schedule.next_run_at = next_run
+        db.session.commit()
+
+        get_scheduler().submit(job.id, job.user_id, job.merchant, job.priority)
+        logger.info(f"Schedule {schedule.id} queued job {job.id}, next run at {next_run.isoformat()}")
+        created.append(job)
+
+    return created
+
+
+def incremental_skip_urls(job, refresh_after_seconds):
+    """
+    Return listing URLs an incremental scheduled run does not need to fetch.
+
+    Listings this user fetched within the refresh window are skipped; older
+    ones are fetched again to pick up changes. A re-fetch that finds a
+    listing unchanged moves its scraped_at forward (see write_items'
+    refresh_before), so each known listing is fetched about once per window.
+    The first run of a schedule fetches everything.
+
+    Args:
+        job: ScrapingJob created by a schedule
+        refresh_after_seconds: Maximum age before a known listing is re-fetched
+
+    Returns:
+        set of product URLs
+    """
+    schedule = job.schedule
+    if not schedule or not schedule.incremental or not schedule.last_success_at:
+        return set()
+
+    cutoff = _utcnow() - timedelta(seconds=refresh_after_seconds)
+    rows = db.session.query(DBInventoryItem.product_url).filter(
+        DBInventoryItem.user_id == job.user_id,
+        DBInventoryItem.merchant == job.merchant,
+        DBInventoryItem.scraped_at >= cutoff,
+        DBInventoryItem.product_url.isnot(None)
+    ).distinct()
+    return {url for (url,) in rows}
+
+
+def mark_schedule_success(job):
+    """Record a successful scheduled run, using the job's start as the watermark."""
+    schedule = job.schedule
+    if schedule and job.started_at:
+        started_at = job.started_at.replace(tzinfo=None)
+        if not schedule.last_success_at or started_at > schedule.last_success_at:
+            schedule.last_success_at = started_at
+
+
+class ScheduleRunner:
+    """Background thread that periodically runs due schedules."""
+
+    def __init__(self, app, poll_seconds=30):
+        self.app = app
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name='schedule-runner', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.poll_seconds):
+            with self.app.app_context():
+                try:
+                    run_due_schedules()
+                except Exception as e:
+                    logger.error(f"Schedule runner error: {e}")
+                    db.session.rollback()
+
+
+def init_schedule_runner(app):
+    """Create the schedule runner; start_background_services starts it."""
+    runner = ScheduleRunner(app, poll_seconds=app.config.get('SCHEDULE_POLL_SECONDS', 30))
+    app.extensions['schedule_runner'] = runner
+    return runner
+
+
+def start_schedule_runner(app):
+    """Start the schedule runner if enabled."""
+    if app.config.get('SCHEDULE_RUNNER_ENABLED', True):
+        app.extensions['schedule_runner'].start()
@@ -2,10 +2,14 @@
 Scraper service for handling scraping tasks.
 """
 
+import copy
 import sys
 import os
-from datetime import datetime, timezone
+import threading
+from datetime import datetime, timedelta, timezone
 import logging
+from flask import current_app
+from sqlalchemy import or_
 
 # Add parent directory to path to import scrapers
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -13,93 +17,266 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from mercari_scraper import MercariScraper
 from depop_scraper import DepopScraper
 from generic_scraper import GenericEcommerceScraper
-from backend.models import db, DBInventoryItem, ScrapingJob
+from scraper import CancellationToken, ScrapeCancelled
+from backend.models import db, ScrapingJob
+from backend.services.batch_service import update_batch_parent
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.events import publish_job_event
+from backend.services.schedule_runner import incremental_skip_urls, mark_schedule_success
 
 logger = logging.getLogger(__name__)
 
+# Cancellation tokens of jobs running in this process, keyed by job ID
+_active_tokens = {}
+_tokens_lock = threading.Lock()
+
+
+def _acquire_token(job):
+    """Create and register the cancellation token for a job about to run."""
+    timeout = job.timeout_seconds or current_app.config.get('SCRAPE_JOB_TIMEOUT_SECONDS')
+    token = CancellationToken(timeout=timeout)
+    with _tokens_lock:
+        _active_tokens[job.id] = token
+    if job.cancel_requested_at:
+        token.cancel('cancelled')
+    return token
+
+
+def _release_token(job_id):
+    with _tokens_lock:
+        token = _active_tokens.pop(job_id, None)
+    if token is not None:
+        token.close()
+
+
+def request_cancel(job_id, reason='cancelled'):
+    """
+    Fire the cancellation token of a job running in this process.
+    
+    Args:
+        job_id: Job ID
+        reason: 'cancelled', or 'lease_lost' when another worker has taken the job over
+    
+    Returns:
+        bool: True if the job was running here
+    """
+    with _tokens_lock:
+        token = _active_tokens.get(job_id)
+    if token is None:
+        return False
+    token.cancel(reason)
+    return True
+
+
+def _mark_cancelled(job, reason):
+    """Record a cancelled or timed-out job. The checkpoint is kept for a later retry."""
+    db.session.rollback()
+    if reason == 'lease_lost':
+        # The job was reclaimed by another worker, which now owns its status
+        logger.warning(f"Scraping job {job.id} stopped: worker lease lost")
+        return
+    if reason == 'timeout':
+        budget = job.timeout_seconds or current_app.config.get('SCRAPE_JOB_TIMEOUT_SECONDS')
+        job.status = 'failed'
+        job.error_message = f"Job exceeded its time budget of {budget} seconds"
+    else:
+        job.status = 'cancelled'
+        job.error_message = 'Cancelled by user'
+    job.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+    logger.info(f"Scraping job {job.id} stopped: {job.error_message}")
+
+
+def run_scraping_job(job_id):
+    """
+    Execute a queued scraping job.
+    Called by the job scheduler on a worker thread inside an app context.
+    """
+    job = db.session.get(ScrapingJob, job_id)
+    if not job:
+        logger.error(f"Job {job_id} not found")
+        return None
+    
+    if job.status not in ('pending', 'queued'):
+        logger.info(f"Skipping job {job_id} with status {job.status}")
+        return None
+    
+    if job.kind == 'batch_shard':
+        try:
+            return start_batch_shard_task(job.id)
+        finally:
+            update_batch_parent(job.parent_id)
+    
+    return start_scraping_task(job.id, job.user_id, job.url, job.merchant, job.pages)
+
+
+def create_scraper(merchant):
+    """Initialize the appropriate scraper for a merchant."""
+    merchant_lower = merchant.lower()
+    
+    if merchant_lower == 'mercari':
+        return MercariScraper()
+    elif merchant_lower == 'depop':
+        return DepopScraper()
+    return GenericEcommerceScraper(merchant_name=merchant)
+
+
+def _new_checkpoint():
+    """Return an empty job checkpoint."""
+    return {
+        'next_page': 1,
+        'completed_pages': [],
+        'last_cursor': None,
+        'frontier': [],
+        'items_saved': 0,
+        'saved_urls': []
+    }
+
+
+def _save_items(job, items, checkpoint):
+    """
+    Persist scraped items for a job and advance its checkpoint.
+    
+    Items are bulk-upserted in chunks of INGEST_CHUNK_SIZE; each chunk is
+    committed together with the checkpoint that records it. Items whose product
+    URL was already saved by an earlier attempt are skipped, so a resumed job
+    does not fetch or write them again.
+    
+    Returns:
+        int: Number of items saved
+    """
+    saved_urls = set(checkpoint['saved_urls'])
+    scraped_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for item in items:
+        if item.product_url:
+            if item.product_url in saved_urls:
+                continue
+            saved_urls.add(item.product_url)
+        rows.append(item_row(item, job.user_id, job.id, scraped_at))
+    
+    def record_chunk(chunk):
+        checkpoint['saved_urls'].extend(row['product_url'] for row in chunk if row['product_url'])
+        checkpoint['items_saved'] += len(chunk)
+        job.items_scraped = checkpoint['items_saved']
+        # Reassign so the JSON column change is detected
+        job.checkpoint = copy.deepcopy(checkpoint)
+    
+    # Unchanged listings are not rewritten, but a stale scraped_at is moved
+    # forward so incremental schedules skip them for another refresh window
+    refresh_after = current_app.config.get('SCHEDULE_REFRESH_AFTER_SECONDS', 7 * 24 * 3600)
+    write_items(rows, on_chunk=record_chunk, refresh_before=scraped_at - timedelta(seconds=refresh_after))
+    if not rows:
+        # Still record page progress
+        job.checkpoint = copy.deepcopy(checkpoint)
+        db.session.commit()
+    return len(rows)
+
 
 def start_scraping_task(job_id, user_id, url, merchant, pages=1):
     """
     Start a scraping task.
-    In a production setup, this would be a Celery task.
-    For now, we'll execute synchronously.
+    Runs on a job scheduler worker thread (see backend.services.job_scheduler).
+    
+    Items are committed page by page together with a checkpoint (completed pages,
+    remaining frontier, last page URL and saved listing URLs). A retried or
+    restarted job resumes from its checkpoint instead of starting from page 1.
     """
+    job = None
     try:
         # Update job status
-        job = ScrapingJob.query.get(job_id)
+        job = db.session.get(ScrapingJob, job_id)
         if not job:
             logger.error(f"Job {job_id} not found")
             return None
         
+        checkpoint = copy.deepcopy(job.checkpoint) if job.checkpoint else _new_checkpoint()
+        resuming = bool(checkpoint['completed_pages'] or checkpoint['saved_urls'])
+        
         job.status = 'running'
-        job.started_at = datetime.now(timezone.utc)
+        job.attempts = (job.attempts or 0) + 1
+        if not resuming or not job.started_at:
+            job.started_at = datetime.now(timezone.utc)
+        job.error_message = None
         db.session.commit()
+        publish_job_event(job_id, 'status', status='running', started_at=job.started_at.isoformat(),
+                          resumed_from_page=checkpoint['next_page'] if resuming else None)
+        
+        if resuming:
+            logger.info(f"Resuming job {job_id} from page {checkpoint['next_page']} "
+                        f"({checkpoint['items_saved']} items already saved)")
         
         # Initialize appropriate scraper
-        merchant_lower = merchant.lower()
+        scraper = create_scraper(merchant)
+        token = _acquire_token(job)
+        scraper.set_cancel_token(token)
+        
+        # Incremental scheduled runs only fetch new or stale listings
+        if job.schedule_id:
+            scraper.skip_urls = incremental_skip_urls(
+                job, current_app.config.get('SCHEDULE_REFRESH_AFTER_SECONDS', 7 * 24 * 3600)
+            )
+            if scraper.skip_urls:
+                logger.info(f"Job {job_id}: skipping {len(scraper.skip_urls)} known listings")
+        
+        # Listings saved by an earlier attempt are not fetched again
+        scraper.skip_urls |= set(checkpoint['saved_urls'])
+        
+        # Forward scraper progress to job event subscribers
+        scraper.progress_callback = lambda event_type, data: publish_job_event(job_id, event_type, **data)
         
-        if merchant_lower == 'mercari':
-            scraper = MercariScraper()
-        elif merchant_lower == 'depop':
-            scraper = DepopScraper()
-        else:
-            scraper = GenericEcommerceScraper(merchant_name=merchant)
+        # Persist each finished page together with the checkpoint
+        def save_page(page_num, page_url, items):
+            checkpoint['completed_pages'].append(page_num)
+            checkpoint['next_page'] = page_num + 1
+            checkpoint['last_cursor'] = page_url
+            checkpoint['frontier'] = list(range(page_num + 1, pages + 1))
+            _save_items(job, items, checkpoint)
+        
+        scraper.page_callback = save_page
         
         # Perform scraping
         try:
             if pages > 1:
-                collection = scraper.scrape_multiple_pages(url, max_pages=pages)
-            else:
+                if checkpoint['next_page'] <= pages:
+                    collection = scraper.scrape_multiple_pages(url, max_pages=pages,
+                                                               start_page=checkpoint['next_page'])
+                    # Items from a page that failed part way were not checkpointed yet
+                    _save_items(job, list(collection), checkpoint)
+            elif not checkpoint['completed_pages']:
                 items = scraper.scrape_listing(url)
-                # Import from root models module
-                import sys
-                sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-                from models import InventoryCollection
-                collection = InventoryCollection()
-                collection.add_items(items)
+                token.raise_if_cancelled()
+                save_page(1, url, items)
+                publish_job_event(job_id, 'page', page=1, pages=1, items=len(items))
             
-            # Save items to database
-            items_saved = 0
-            for item in collection:
-                db_item = DBInventoryItem(
-                    user_id=user_id,
-                    scraping_job_id=job_id,
-                    title=item.title,
-                    price=item.price,
-                    currency=item.currency,
-                    quantity=item.quantity,
-                    sku=item.sku,
-                    description=item.description,
-                    category=item.category,
-                    brand=item.brand,
-                    image_url=item.image_url,
-                    product_url=item.product_url,
-                    merchant=item.merchant,
-                    condition=item.condition,
-                    in_stock=item.in_stock,
-                    scraped_at=datetime.now(timezone.utc),
-                    custom_fields=item.custom_fields
-                )
-                db.session.add(db_item)
-                items_saved += 1
+            items_saved = checkpoint['items_saved']
             
             # Update job as completed
             job.status = 'completed'
             job.completed_at = datetime.now(timezone.utc)
             job.items_scraped = items_saved
+            mark_schedule_success(job)
             
             db.session.commit()
+            publish_job_event(job_id, 'status', status='completed', items_scraped=items_saved)
             
             logger.info(f"Scraping job {job_id} completed successfully. Saved {items_saved} items.")
             
+        except ScrapeCancelled as cancelled:
+            _mark_cancelled(job, cancelled.reason)
+            publish_job_event(job_id, 'status', status=job.status, error_message=job.error_message)
+            
         except Exception as scrape_error:
             logger.error(f"Scraping error for job {job_id}: {scrape_error}")
+            db.session.rollback()
             job.status = 'failed'
             job.error_message = str(scrape_error)
             job.completed_at = datetime.now(timezone.utc)
             db.session.commit()
+            publish_job_event(job_id, 'status', status='failed', error_message=job.error_message)
             
         finally:
+            _release_token(job_id)
             scraper.cleanup()
         
         # Return a simple task object
@@ -112,8 +289,114 @@ def start_scraping_task(job_id, user_id, url, merchant, pages=1):
     except Exception as e:
         logger.error(f"Failed to start scraping task: {e}")
         if job:
+            db.session.rollback()
             job.status = 'failed'
             job.error_message = str(e)
             job.completed_at = datetime.now(timezone.utc)
             db.session.commit()
+            publish_job_event(job_id, 'status', status='failed', error_message=job.error_message)
         return None
+
+
+def start_batch_shard_task(job_id):
+    """
+    Scrape every listing URL in a batch shard.
+    
+    Each listing is committed as it is scraped; the checkpoint's saved and
+    completed URLs let a retried shard skip listings it already handled.
+    """
+    job = db.session.get(ScrapingJob, job_id)
+    checkpoint = copy.deepcopy(job.checkpoint) if job.checkpoint else _new_checkpoint()
+    checkpoint.setdefault('done_urls', [])
+    
+    job.status = 'running'
+    job.attempts = (job.attempts or 0) + 1
+    job.started_at = job.started_at or datetime.now(timezone.utc)
+    job.error_message = None
+    db.session.commit()
+    update_batch_parent(job.parent_id)
+    
+    scraper = create_scraper(job.merchant)
+    token = _acquire_token(job)
+    scraper.set_cancel_token(token)
+    try:
+        done_urls = set(checkpoint['done_urls'])
+        for url in job.urls or []:
+            if url in done_urls:
+                continue
+            token.raise_if_cancelled()
+            items = scraper.scrape_listing_cached(url)
+            token.raise_if_cancelled()
+            checkpoint['done_urls'].append(url)
+            checkpoint['last_cursor'] = url
+            _save_items(job, items, checkpoint)
+            publish_job_event(job.parent_id, 'item', shard_id=job.id, url=url, items=len(items))
+        
+        job.status = 'completed'
+        job.completed_at = datetime.now(timezone.utc)
+        db.session.commit()
+        logger.info(f"Batch shard {job_id} completed. Saved {job.items_scraped} items.")
+        
+    except ScrapeCancelled as cancelled:
+        _mark_cancelled(job, cancelled.reason)
+        
+    except Exception as e:
+        logger.error(f"Batch shard {job_id} failed: {e}")
+        db.session.rollback()
+        job.status = 'failed'
+        job.error_message = str(e)
+        job.completed_at = datetime.now(timezone.utc)
+        db.session.commit()
+        
+    finally:
+        _release_token(job_id)
+        scraper.cleanup()
+    
+    return job
+
+
+def resume_interrupted_jobs():
+    """
+    Requeue jobs whose worker died and submit waiting jobs to this process.
+    
+    Only jobs whose lease has expired are reclaimed (see
+    ``reclaim_stale_leases``); jobs another live process is running keep
+    their lease and are left alone. Checkpoints are kept, so reclaimed jobs
+    resume where they stopped. Every queued job without a live lease is
+    submitted here; if another process starts it first, this process fails to
+    lease it and skips it.
+    
+    Returns:
+        list: Submitted ScrapingJob objects
+    """
+    from backend.services.job_scheduler import get_scheduler
+    from backend.services.work_queue import CLAIMABLE_KINDS, reclaim_stale_leases
+    
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    reclaim_stale_leases(current_app.config.get('WORKER_MAX_ATTEMPTS', 3), now)
+    
+    # Running jobs without a lease were started before in-process jobs were leased
+    legacy = ScrapingJob.query.filter(
+        ScrapingJob.status == 'running',
+        ScrapingJob.lease_owner.is_(None),
+        ScrapingJob.kind.in_(CLAIMABLE_KINDS)
+    ).all()
+    for job in legacy:
+        job.status = 'queued'
+    
+    jobs = ScrapingJob.query.filter(
+        ScrapingJob.status == 'queued',
+        ScrapingJob.kind.in_(CLAIMABLE_KINDS),
+        or_(ScrapingJob.lease_expires_at.is_(None), ScrapingJob.lease_expires_at < now)
+    ).all()
+    for job in jobs:
+        job.queued_at = job.queued_at or now
+    db.session.commit()
+    
+    scheduler = get_scheduler()
+    for job in jobs:
+        scheduler.submit(job.id, job.user_id, job.merchant, job.priority or 0)
+    
+    if jobs:
+        logger.info(f"Submitted {len(jobs)} waiting or interrupted scraping jobs")
+    return jobs
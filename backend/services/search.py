@@ -0,0 +1,105 @@
+"""
+Full-text search over inventory items.
+
+On SQLite the search runs against the FTS5 table ``inventory_items_fts`` and
+is ranked with BM25; on PostgreSQL it matches the weighted ``tsvector``
+expression covered by the GIN index ``ix_inventory_items_search`` and is
+ranked with ``ts_rank_cd``. Both are defined in backend/models.py. Other
+databases fall back to ``ILIKE`` substring matching without ranking.
+Archived items have their own FTS table and GIN index, searched as well when
+archived items are included.
+
+Every search term is matched as a word prefix, and all terms must match:
+``"leath boot"`` finds "Leather Boots".
+"""
+
+import re
+
+from sqlalchemy import Boolean, Float, Integer, func, literal_column, or_, text
+
+from backend.models import db, DBInventoryItem, ARCHIVE_FTS_TABLE, SEARCH_FTS_TABLE, SEARCH_VECTOR_SQL
+
+# Terms beyond this are ignored
+MAX_SEARCH_TERMS = 8
+
+# BM25 column weights, in FTS table column order (title, brand, description)
+BM25_WEIGHTS = (10.0, 5.0, 1.0)
+
+_TERM_PATTERN = re.compile(r'[^\W_]+')
+
+
+def search_terms(search):
+    """Split a search string into lowercase word terms."""
+    return _TERM_PATTERN.findall(search.lower())[:MAX_SEARCH_TERMS]
+
+
+def fts_match_query(terms):
+    """Build an FTS5 MATCH expression: every term as a quoted prefix, implicitly ANDed."""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def tsquery(terms):
+    """Build a to_tsquery expression: every term as a prefix, ANDed."""
+    return ' & '.join(f'{term}:*' for term in terms)
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def _like_filter(search, model):
+    return or_(
+        model.title.ilike(f'%{search}%'),
+        model.description.ilike(f'%{search}%'),
+        model.brand.ilike(f'%{search}%')
+    )
+
+
+def _fts_matches(table, weights, match):
+    return f"SELECT rowid AS item_id, bm25({table}, {weights}) AS rank FROM {table} WHERE {table} MATCH {match}"
+
+
+def apply_search(query, search, model=DBInventoryItem, include_archived=False):
+    """
+    Restrict an inventory query to items matching a search string.
+
+    Args:
+        query: DBInventoryItem query (other filters may already be applied)
+        search: User-supplied search string
+        model: Entity the query selects (DBInventoryItem or an
+            ``inventory_items_union`` alias)
+        include_archived: The query covers archived items, so search their index too
+
+    Returns:
+        tuple: (query, rank) where rank is lower for better matches (sort it
+            ascending), or None when the backend cannot rank
+    """
+    terms = search_terms(search)
+    dialect = _dialect()
+
+    if not terms or dialect not in ('sqlite', 'postgresql'):
+        return query.filter(_like_filter(search, model)), None
+
+    if dialect == 'sqlite':
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        sql = _fts_matches(SEARCH_FTS_TABLE, weights, ':match')
+        if include_archived:
+            # Items keep their ids when archived, so the two indexes never share a rowid
+            sql += ' UNION ALL ' + _fts_matches(ARCHIVE_FTS_TABLE, weights, ':match')
+        matches = text(sql).bindparams(match=fts_match_query(terms))\
+            .columns(item_id=Integer, rank=Float).subquery('search_matches')
+        query = query.join(matches, matches.c.item_id == model.id)
+        # bm25() is already lower for better matches
+        return query, matches.c.rank
+
+    vector = literal_column(f'({SEARCH_VECTOR_SQL})')
+    ts_query = func.to_tsquery(literal_column("'simple'"), tsquery(terms))
+    query = query.filter(vector.op('@@', return_type=Boolean)(ts_query))
+    return query, -func.ts_rank_cd(vector, ts_query)
+
+
+def rebuild_search_index():
+    """Rebuild the SQLite FTS table from inventory_items (no-op on other databases)."""
+    if _dialect() == 'sqlite':
+        db.session.execute(text(f"INSERT INTO {SEARCH_FTS_TABLE}({SEARCH_FTS_TABLE}) VALUES ('rebuild')"))
+        db.session.commit()
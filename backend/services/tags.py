@@ -0,0 +1,176 @@
+"""
+Normalized item tags.
+
+Tags live in ``tags`` (one row per user and name) and ``item_tags`` (one row
+per item and tag), so filtering and counting by tag are index lookups rather
+than ``LIKE`` scans over the comma-separated ``inventory_items.tags`` column.
+That column is kept as a display copy, written together with the
+association by set_item_tags().
+"""
+
+import re
+
+from sqlalchemy import delete, func, insert, literal, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from backend.models import db, DBInventoryItem, Tag, item_tags
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_LENGTH = 500
+
+
+def normalize_tags(value):
+    """
+    Normalize tags given as a comma-separated string or a list.
+
+    Names are stripped, lowercased and have runs of whitespace collapsed;
+    empty and duplicate names are dropped and long names truncated. Tags that
+    would not fit the 500-character display column are dropped.
+
+    Args:
+        value: String, list of strings, or None
+
+    Returns:
+        list: Tag names in first-seen order
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+
+    names, length = [], 0
+    for raw in value:
+        name = re.sub(r'\s+', ' ', str(raw).replace('\x00', '')).strip().lower()[:MAX_TAG_LENGTH].strip()
+        if not name or name in names:
+            continue
+        length += len(name) + (1 if names else 0)
+        if length > MAX_TAGS_LENGTH:
+            break
+        names.append(name)
+    return names
+
+
+def _insert_ignore(table):
+    """INSERT that skips rows conflicting with an existing unique key."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        module = postgresql if dialect == 'postgresql' else sqlite
+        return module.insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+
+def tag_ids(user_id, names, create=False):
+    """
+    Look up a user's tags by name.
+
+    Args:
+        user_id: User ID
+        names: Normalized tag names
+        create: Create the tags that do not exist yet
+
+    Returns:
+        dict: Tag ID by name (missing names are absent unless ``create``)
+    """
+    if not names:
+        return {}
+    if create:
+        db.session.execute(_insert_ignore(Tag.__table__),
+                           [{'user_id': user_id, 'name': name} for name in names])
+    rows = db.session.execute(
+        select(Tag.name, Tag.id).where(Tag.user_id == user_id, Tag.name.in_(names))
+    )
+    return dict(rows.all())
+
+
+def set_item_tags(item, value):
+    """
+    Replace an item's tags.
+
+    Args:
+        item: DBInventoryItem (flushed if it has no ID yet)
+        value: Comma-separated string or list of tag names
+
+    Returns:
+        list: The normalized tag names now on the item
+    """
+    names = normalize_tags(value)
+    if item.id is None:
+        db.session.flush()
+
+    ids = tag_ids(item.user_id, names, create=True)
+    db.session.execute(delete(item_tags).where(item_tags.c.item_id == item.id))
+    if ids:
+        db.session.execute(insert(item_tags), [{'item_id': item.id, 'tag_id': ids[name]} for name in names])
+    item.tags = ','.join(names) or None
+    return names
+
+
+def set_tags_for_items(user_id, item_ids, value):
+    """
+    Replace the tags of many items with the same tags, set-based.
+
+    Only the ``item_tags`` association is written; callers update the
+    ``tags`` display column in their own UPDATE of the items.
+
+    Args:
+        user_id: Owning user ID
+        item_ids: IDs of the user's items, few enough to bind in one statement
+        value: Comma-separated string or list of tag names
+
+    Returns:
+        list: The normalized tag names now on the items
+    """
+    names = normalize_tags(value)
+    ids = tag_ids(user_id, names, create=True)
+    db.session.execute(delete(item_tags).where(item_tags.c.item_id.in_(item_ids)))
+    if ids:
+        db.session.execute(insert(item_tags), [
+            {'item_id': item_id, 'tag_id': ids[name]} for item_id in item_ids for name in names
+        ])
+    return names
+
+
+def filter_by_tags(query, user_id, names, model=DBInventoryItem):
+    """
+    Restrict an inventory query to items carrying every one of ``names``.
+
+    Each tag becomes an ``id IN (...)`` over the (tag_id, item_id) index.
+    Archived items have no ``item_tags`` rows, so when ``model`` is an
+    ``inventory_items_union`` alias they are matched on their ``tags`` column.
+    """
+    for name in normalize_tags(names):
+        tagged = select(item_tags.c.item_id).join(Tag, Tag.id == item_tags.c.tag_id)\
+            .where(Tag.user_id == user_id, Tag.name == name)
+        condition = model.id.in_(tagged)
+        if model is not DBInventoryItem:
+            listed = (literal(',') + model.tags + literal(',')).like(f'%,{_escape_like(name)},%', escape='\\')
+            condition = or_(condition, listed)
+        query = query.filter(condition)
+    return query
+
+
+def _escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def tag_counts(user_id, prefix=None, limit=100):
+    """
+    Count a user's items per tag, most used first.
+
+    Args:
+        user_id: User ID
+        prefix: Only tags starting with this (normalized) text
+        limit: Maximum tags
+
+    Returns:
+        list: (name, count) tuples
+    """
+    query = select(Tag.name, func.count().label('count'))\
+        .join(item_tags, item_tags.c.tag_id == Tag.id)\
+        .where(Tag.user_id == user_id)
+    if prefix:
+        prefix = ' '.join(prefix.lower().split())
+        # Range on the (user_id, name) unique index instead of LIKE
+        query = query.where(Tag.name >= prefix, Tag.name < prefix + '\uffff')
+    query = query.group_by(Tag.id, Tag.name).order_by(func.count().desc(), Tag.name).limit(limit)
+    return db.session.execute(query).all()
@@ -0,0 +1,413 @@
+"""
+Database-backed work queue for scraping workers on several hosts.
+
+Queued ``ScrapingJob`` rows are the queue. A worker claims a job with
+``SELECT ... FOR UPDATE SKIP LOCKED`` and takes a lease on it, renews the
+lease with heartbeats while the job runs, and releases it when done. Leases
+left behind by a worker that died expire and are reclaimed, and the job
+resumes from its checkpoint on another worker.
+
+Run workers with ``flask scrape-worker`` and set ``JOB_QUEUE_BACKEND=database``
+on the web processes so they leave jobs in the table instead of running them.
+Jobs run by a web process's own scheduler are leased the same way, so a
+restarted process only reclaims jobs whose lease has expired.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, func, or_, select, update
+
+from backend.models import db, ScrapingJob
+from backend.services.query_cache import JOBS, mark_changed
+
+logger = logging.getLogger(__name__)
+
+# Job kinds a worker executes; batch parents only aggregate their shards
+CLAIMABLE_KINDS = ('scrape', 'batch_shard')
+
+
+def _utcnow():
+    """Naive UTC now, matching how DateTime columns are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def make_worker_id():
+    """Return a worker ID that is unique across hosts and processes."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _lease_held(now):
+    return and_(ScrapingJob.lease_owner.isnot(None), ScrapingJob.lease_expires_at >= now)
+
+
+def _lease_free(now):
+    return or_(ScrapingJob.lease_expires_at.is_(None), ScrapingJob.lease_expires_at < now)
+
+
+def _queued_since():
+    # Jobs queued before queued_at existed fall back to their creation time,
+    # so NULLs sort the same on every database
+    return func.coalesce(ScrapingJob.queued_at, ScrapingJob.created_at)
+
+
+def claim_job(worker_id, lease_seconds=120, max_jobs_per_user=None, now=None):
+    """
+    Claim the next queued job for a worker.
+
+    The highest priority, oldest job is selected with ``FOR UPDATE SKIP LOCKED``
+    so concurrent workers never block on, or claim, the same row. The lease is
+    then taken with a conditional UPDATE, which also keeps SQLite (where the
+    row lock is a no-op) from handing a job to two workers.
+
+    Args:
+        worker_id: ID of the claiming worker
+        lease_seconds: Lease duration
+        max_jobs_per_user: Skip users already holding this many leases
+        now: Reference time (defaults to now)
+
+    Returns:
+        int: Claimed job ID, or None if nothing is available
+    """
+    now = now or _utcnow()
+    query = select(ScrapingJob.id).where(
+        ScrapingJob.status == 'queued',
+        ScrapingJob.kind.in_(CLAIMABLE_KINDS),
+        _lease_free(now)
+    )
+    if max_jobs_per_user:
+        busy_users = select(ScrapingJob.user_id).where(_lease_held(now))\
+            .group_by(ScrapingJob.user_id)\
+            .having(func.count(ScrapingJob.id) >= max_jobs_per_user)
+        query = query.where(ScrapingJob.user_id.not_in(busy_users))
+    query = query.order_by(
+        ScrapingJob.priority.desc(), _queued_since(), ScrapingJob.id
+    ).limit(1).with_for_update(skip_locked=True)
+
+    job_id = db.session.scalar(query)
+    if job_id is None:
+        db.session.rollback()
+        return None
+
+    if not lease_job(job_id, worker_id, lease_seconds, now):
+        return None
+    logger.info(f"Worker {worker_id} claimed scraping job {job_id}")
+    return job_id
+
+
+def lease_job(job_id, worker_id, lease_seconds=120, now=None):
+    """
+    Take the lease on a queued job, unless another worker holds it.
+
+    The in-process scheduler leases each job it is about to run this way, so
+    a job submitted to several processes (e.g. requeued by each of them after
+    a restart) still runs only once.
+
+    Args:
+        job_id: Job ID
+        worker_id: ID of the leasing worker
+        lease_seconds: Lease duration
+        now: Reference time (defaults to now)
+
+    Returns:
+        bool: True if the lease was taken
+    """
+    now = now or _utcnow()
+    leased_by_user = db.session.execute(
+        update(ScrapingJob)
+        .where(ScrapingJob.id == job_id, ScrapingJob.status == 'queued', _lease_free(now))
+        .values(lease_owner=worker_id, lease_expires_at=now + timedelta(seconds=lease_seconds),
+                heartbeat_at=now)
+        .returning(ScrapingJob.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if leased_by_user is not None:
+        mark_changed(db.session, JOBS, [leased_by_user])
+    db.session.commit()
+    return leased_by_user is not None
+
+
+def heartbeat(job_id, worker_id, lease_seconds=120, now=None):
+    """
+    Renew a job's lease.
+
+    Renewal changes neither the job's status nor its progress, so cached job
+    responses are left valid (their heartbeat_at may lag by the cache TTL).
+
+    Returns:
+        tuple: (still_owned, cancel_requested)
+    """
+    now = now or _utcnow()
+    owner_user = db.session.execute(
+        update(ScrapingJob)
+        .where(ScrapingJob.id == job_id, ScrapingJob.lease_owner == worker_id)
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .returning(ScrapingJob.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    cancel_requested_at = db.session.scalar(
+        select(ScrapingJob.cancel_requested_at).where(ScrapingJob.id == job_id)
+    )
+    db.session.commit()
+    return owner_user is not None, cancel_requested_at is not None
+
+
+def release_job(job_id, worker_id):
+    """Drop a worker's lease on a job. Returns True if the worker still held it."""
+    owner_user = db.session.execute(
+        update(ScrapingJob)
+        .where(ScrapingJob.id == job_id, ScrapingJob.lease_owner == worker_id)
+        .values(lease_owner=None, lease_expires_at=None)
+        .returning(ScrapingJob.user_id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if owner_user is not None:
+        mark_changed(db.session, JOBS, [owner_user])
+    db.session.commit()
+    return owner_user is not None
+
+
+def reclaim_stale_leases(max_attempts=3, now=None):
+    """
+    Requeue jobs whose worker stopped heartbeating.
+
+    Jobs that have already been attempted ``max_attempts`` times are failed
+    instead, so a listing that crashes workers cannot loop forever.
+
+    Returns:
+        tuple: (requeued, failed) job counts
+    """
+    from backend.services.batch_service import update_batch_parent
+
+    now = now or _utcnow()
+    stale = and_(
+        ScrapingJob.lease_owner.isnot(None),
+        ScrapingJob.lease_expires_at < now,
+        ScrapingJob.status.in_(['queued', 'running'])
+    )
+    parent_ids = set(db.session.scalars(
+        select(ScrapingJob.parent_id).where(stale, ScrapingJob.parent_id.isnot(None))
+    ))
+
+    failed = db.session.execute(
+        update(ScrapingJob)
+        .where(stale, ScrapingJob.attempts >= max_attempts)
+        .values(status='failed', lease_owner=None, lease_expires_at=None, completed_at=now,
+                error_message=f"Worker lease expired after {max_attempts} attempts")
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    requeued = db.session.execute(
+        update(ScrapingJob)
+        .where(stale)
+        .values(status='queued', lease_owner=None, lease_expires_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if requeued or failed:
+        mark_changed(db.session, JOBS)
+    db.session.commit()
+
+    for parent_id in parent_ids:
+        update_batch_parent(parent_id)
+
+    if requeued or failed:
+        logger.warning(f"Reclaimed stale leases: {requeued} requeued, {failed} failed")
+    return requeued, failed
+
+
+class DatabaseJobQueue:
+    """
+    Scheduler stand-in for web processes when workers run elsewhere.
+
+    Jobs are already queued by their row's status, so submitting is a no-op;
+    positions and metrics are read from the table.
+    """
+
+    enabled = False
+
+    def submit(self, job_id, user_id, merchant, priority=0):
+        logger.info(f"Queued scraping job {job_id} for user {user_id} (priority {priority})")
+
+    def remove(self, job_id):
+        # Cancelling sets the row's status, which workers check before claiming
+        return False
+
+    def dispatch(self):
+        pass
+
+    def shutdown(self, wait=True):
+        pass
+
+    def position(self, job_id):
+        """Return the 1-based position of a queued job in the shared queue."""
+        job = db.session.get(ScrapingJob, job_id)
+        if not job or job.status != 'queued':
+            return None
+        # Jobs claim_job would pick first: (priority desc, queued since, id)
+        queued_since = _queued_since()
+        job_since = job.queued_at or job.created_at
+        ahead = db.session.scalar(
+            select(func.count(ScrapingJob.id)).where(
+                ScrapingJob.status == 'queued',
+                ScrapingJob.kind.in_(CLAIMABLE_KINDS),
+                or_(
+                    ScrapingJob.priority > job.priority,
+                    and_(ScrapingJob.priority == job.priority, queued_since < job_since),
+                    and_(ScrapingJob.priority == job.priority, queued_since == job_since,
+                         ScrapingJob.id < job.id)
+                )
+            )
+        )
+        return ahead + 1
+
+    def is_running(self, job_id):
+        return db.session.scalar(
+            select(func.count(ScrapingJob.id)).where(ScrapingJob.id == job_id, _lease_held(_utcnow()))
+        ) > 0
+
+    def metrics(self):
+        """Return queue-depth and concurrency metrics aggregated from the table."""
+        now = _utcnow()
+        rows = db.session.execute(
+            select(ScrapingJob.status, ScrapingJob.user_id, ScrapingJob.merchant, func.count(ScrapingJob.id))
+            .where(ScrapingJob.status.in_(['queued', 'running']), ScrapingJob.kind.in_(CLAIMABLE_KINDS))
+            .group_by(ScrapingJob.status, ScrapingJob.user_id, ScrapingJob.merchant)
+        ).all()
+        workers = db.session.scalar(
+            select(func.count(func.distinct(ScrapingJob.lease_owner))).where(_lease_held(now))
+        )
+
+        metrics = {
+            'backend': 'database',
+            'queued': 0,
+            'running': 0,
+            'workers': workers,
+            'queued_by_user': {},
+            'queued_by_merchant': {},
+            'running_by_user': {},
+            'running_by_merchant': {}
+        }
+        for status, user_id, merchant, count in rows:
+            merchant = (merchant or 'generic').lower()
+            metrics[status] += count
+            for key, name in ((f'{status}_by_user', user_id), (f'{status}_by_merchant', merchant)):
+                metrics[key][name] = metrics[key].get(name, 0) + count
+        return metrics
+
+
+class QueueWorker:
+    """
+    Worker process that claims and runs jobs from the database queue.
+
+    Args:
+        app: Flask application
+        concurrency: Number of jobs run at once
+        worker_id: Worker ID (defaults to host, PID and a random suffix)
+    """
+
+    def __init__(self, app, concurrency=None, worker_id=None):
+        self.app = app
+        self.concurrency = max(1, concurrency or app.config.get('WORKER_CONCURRENCY', 2))
+        self.worker_id = worker_id or make_worker_id()
+        self.poll_seconds = app.config.get('WORKER_POLL_SECONDS', 5)
+        self.lease_seconds = app.config.get('WORKER_LEASE_SECONDS', 120)
+        self.heartbeat_seconds = app.config.get('WORKER_HEARTBEAT_SECONDS', 30)
+        self.max_attempts = app.config.get('WORKER_MAX_ATTEMPTS', 3)
+        self.max_jobs_per_user = app.config.get('SCHEDULER_MAX_JOBS_PER_USER')
+        self._stop = threading.Event()
+
+    def run(self):
+        """Run worker threads until stopped."""
+        threads = [
+            threading.Thread(target=self._loop, args=(index == 0,), name=f'queue-worker-{index}', daemon=True)
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Claim and run a single job. Returns the job ID, or None if the queue was empty."""
+        job_id = claim_job(self.worker_id, self.lease_seconds, self.max_jobs_per_user)
+        if job_id is not None:
+            self.process(job_id)
+        return job_id
+
+    def process(self, job_id):
+        """Run a claimed job while heartbeating its lease."""
+        from backend.services.scraper_service import run_scraping_job
+
+        done = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(job_id, done),
+                                name=f'heartbeat-{job_id}', daemon=True)
+        beat.start()
+        try:
+            run_scraping_job(job_id)
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id} failed running job {job_id}: {e}")
+            db.session.rollback()
+        finally:
+            done.set()
+            beat.join()
+            release_job(job_id, self.worker_id)
+
+    def _loop(self, reclaims):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    # One thread per worker sweeps for leases other workers abandoned
+                    if reclaims:
+                        reclaim_stale_leases(self.max_attempts)
+                    if self.run_once() is None:
+                        self._stop.wait(self.poll_seconds)
+                except Exception as e:
+                    logger.error(f"Queue worker error: {e}")
+                    db.session.rollback()
+                    self._stop.wait(self.poll_seconds)
+
+    def _heartbeat(self, job_id, done):
+        from backend.services.scraper_service import request_cancel
+
+        with self.app.app_context():
+            while not done.wait(self.heartbeat_seconds):
+                try:
+                    owned, cancel_requested = heartbeat(job_id, self.worker_id, self.lease_seconds)
+                except Exception as e:
+                    logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+                    db.session.rollback()
+                    continue
+                if not owned:
+                    request_cancel(job_id, 'lease_lost')
+                    return
+                # Cancellation requested through any web process
+                if cancel_requested:
+                    request_cancel(job_id)
+
+
+@click.command('scrape-worker')
+@click.option('--concurrency', type=int, default=None, help='Jobs run at once (default: WORKER_CONCURRENCY).')
+@click.option('--once', is_flag=True, help='Run at most one job and exit.')
+@with_appcontext
+def worker_command(concurrency, once):
+    """Run a scraping worker against the database job queue."""
+    worker = QueueWorker(current_app._get_current_object(), concurrency=concurrency)
+    click.echo(f"Scraping worker {worker.worker_id} started")
+    if once:
+        reclaim_stale_leases(worker.max_attempts)
+        worker.run_once()
+    else:
+        worker.run()
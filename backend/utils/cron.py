@@ -0,0 +1,114 @@
+"""
+Minimal cron expression parsing for recurring scrape schedules.
+
+Supports the standard five fields (minute hour day-of-month month day-of-week)
+with ``*``, ``*/step``, ``a-b``, ``a-b/step`` and comma-separated lists.
+Day-of-week uses 0-6 with 0 = Sunday (7 is accepted as Sunday too).
+"""
+
+from datetime import datetime, timedelta
+
+# (minimum, maximum) for each field
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Upper bound on how far ahead to search for a matching time
+MAX_SEARCH_DAYS = 366 * 5
+
+
+class CronError(ValueError):
+    """Raised for an invalid cron expression."""
+
+
+def _parse_field(text, minimum, maximum):
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) < 1:
+                raise CronError(f"Invalid step '{step_text}'")
+            step = int(step_text)
+
+        if part == '*':
+            start, end = minimum, maximum
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            if not start_text.isdigit() or not end_text.isdigit():
+                raise CronError(f"Invalid range '{part}'")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = end = int(part)
+        else:
+            raise CronError(f"Invalid value '{part}'")
+
+        if start < minimum or end > maximum or start > end:
+            raise CronError(f"Value out of range in '{text}'")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A parsed cron expression."""
+
+    def __init__(self, expression):
+        fields = (expression or '').split()
+        if len(fields) != 5:
+            raise CronError("Cron expression must have 5 fields")
+
+        parsed = [_parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, FIELD_RANGES)]
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Normalise Sunday (7 -> 0)
+        self.weekdays = {d % 7 for d in weekdays}
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def _day_matches(self, dt):
+        # Python weekday(): Monday = 0; cron: Sunday = 0
+        cron_weekday = (dt.weekday() + 1) % 7
+        day_ok = dt.day in self.days
+        weekday_ok = cron_weekday in self.weekdays
+        # Standard cron: if both fields are restricted, either may match
+        if not self._any_day and not self._any_weekday:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """
+        Return the first matching time strictly after ``after``.
+
+        Args:
+            after: Reference time (naive, UTC)
+
+        Returns:
+            datetime of the next run
+        """
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = after + timedelta(days=MAX_SEARCH_DAYS)
+
+        while dt <= limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+                continue
+            if dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+                continue
+            return dt
+
+        raise CronError(f"No matching time for '{self.expression}'")
+
+
+def parse_cron(expression):
+    """
+    Parse and validate a cron expression.
+
+    Args:
+        expression: Five-field cron string, e.g. "0 6 * * *"
+
+    Returns:
+        CronSchedule
+    """
+    return CronSchedule(expression.strip() if expression else expression)
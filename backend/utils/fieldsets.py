@@ -0,0 +1,47 @@
+"""
+Sparse fieldsets (``?fields=title,price``) for list endpoints.
+
+The requested fields become a ``load_only()`` option, so the database only
+reads those columns and unbounded ones such as description, notes and
+custom_fields stay on disk unless asked for.
+"""
+
+from sqlalchemy.orm import load_only
+
+
+class FieldsetError(ValueError):
+    """Raised for a fields parameter naming unknown fields."""
+
+
+def parse_fields(value, allowed):
+    """
+    Parse a comma-separated fields parameter.
+
+    Args:
+        value: Raw parameter value, or None
+        allowed: Valid field names, in output order
+
+    Returns:
+        tuple: Requested fields in ``allowed`` order, always including 'id',
+            or None when no fieldset was requested
+
+    Raises:
+        FieldsetError: If a field is not in ``allowed``
+    """
+    if value is None or not value.strip():
+        return None
+
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise FieldsetError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+
+    requested.add('id')
+    return tuple(name for name in allowed if name in requested)
+
+
+def load_fields(query, model, fields):
+    """Restrict the columns a query loads for ``model`` to ``fields`` (no-op for None)."""
+    if fields is None:
+        return query
+    return query.options(load_only(*[getattr(model, name) for name in fields]))
@@ -0,0 +1,160 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A cursor is an opaque, signed token holding the sort key and id of the last
+row of a page. The next page is read with ``WHERE (key, id) < (:key, :id)``
+(``>`` when ascending) followed by ``LIMIT``, which an index on the sort key
+serves directly, so a page costs the same however deep it is and no
+``COUNT(*)`` is needed. Totals are only computed when asked for.
+"""
+
+import json
+import logging
+from datetime import datetime
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, or_, tuple_
+
+from backend.models import db
+
+logger = logging.getLogger(__name__)
+
+CURSOR_SALT = 'pagination-cursor'
+
+# Accepted values of the ``total`` query parameter in cursor mode
+TOTAL_MODES = ('none', 'exact', 'estimate')
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor, or one issued for a different sort."""
+
+
+def _serializer():
+    return URLSafeSerializer(current_app.config['SECRET_KEY'], salt=CURSOR_SALT)
+
+
+def encode_cursor(sort, key, row_id):
+    """
+    Build the cursor that continues after a row.
+
+    Args:
+        sort: Sort the cursor is valid for (e.g. 'created_at:desc')
+        key: The row's sort key value
+        row_id: The row's id
+
+    Returns:
+        str: Opaque cursor
+    """
+    if isinstance(key, datetime):
+        key = {'dt': key.isoformat()}
+    return _serializer().dumps({'s': sort, 'k': key, 'i': row_id})
+
+
+def decode_cursor(cursor, sort):
+    """
+    Read a cursor back into (key, id).
+
+    Raises:
+        CursorError: If the cursor was tampered with or belongs to another sort
+    """
+    try:
+        payload = _serializer().loads(cursor)
+        key, row_id = payload['k'], int(payload['i'])
+        if isinstance(key, dict):
+            key = datetime.fromisoformat(key['dt'])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        raise CursorError('Invalid cursor')
+    if payload.get('s') != sort:
+        raise CursorError('Cursor does not match the requested sort order')
+    return key, row_id
+
+
+def _after(key, id_column, last_key, last_id, descending, nullable):
+    """Predicate for rows after (last_key, last_id); NULL keys sort last."""
+    if last_key is None:
+        id_after = id_column < last_id if descending else id_column > last_id
+        return and_(key.is_(None), id_after)
+    row = tuple_(key, id_column)
+    after = row < (last_key, last_id) if descending else row > (last_key, last_id)
+    return or_(after, key.is_(None)) if nullable else after
+
+
+def keyset_page(query, key, id_column, sort, per_page, cursor=None, descending=True, nullable=False):
+    """
+    Read one page of a query in (key, id) order.
+
+    Args:
+        query: Filtered query without ORDER BY
+        key: Sort expression
+        id_column: Unique column breaking ties in the sort key
+        sort: Name of the sort, bound into the cursor
+        per_page: Page size
+        cursor: Cursor returned with the previous page, or None for the first page
+        descending: Sort direction
+        nullable: Whether key can be NULL (NULLs are returned last)
+
+    Returns:
+        tuple: (items, next_cursor) where next_cursor is None on the last page
+
+    Raises:
+        CursorError: If the cursor is invalid
+    """
+    if cursor:
+        last_key, last_id = decode_cursor(cursor, sort)
+        query = query.filter(_after(key, id_column, last_key, last_id, descending, nullable))
+
+    key_order = key.desc() if descending else key.asc()
+    if nullable:
+        key_order = key_order.nulls_last()
+    id_order = id_column.desc() if descending else id_column.asc()
+
+    rows = query.add_columns(key.label('cursor_key'))\
+        .order_by(key_order, id_order)\
+        .limit(per_page + 1).all()
+
+    items = [row[0] for row in rows[:per_page]]
+    next_cursor = None
+    if len(rows) > per_page:
+        last = rows[per_page - 1]
+        next_cursor = encode_cursor(sort, last[1], last[0].id)
+    return items, next_cursor
+
+
+def count_rows(query, estimate=False):
+    """
+    Count the rows of a query.
+
+    With ``estimate`` on PostgreSQL this returns the planner's row estimate
+    instead of running ``COUNT(*)``; elsewhere it always counts.
+
+    Returns:
+        tuple: (total, is_estimate)
+    """
+    query = query.order_by(None)
+    if estimate and db.session.get_bind().dialect.name == 'postgresql':
+        compiled = query.statement.compile(dialect=db.session.get_bind().dialect)
+        try:
+            with db.session.begin_nested():
+                plan = db.session.connection().exec_driver_sql(
+                    f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+                ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows']), True
+        except Exception as e:
+            logger.warning(f"Row estimate failed, counting instead: {e}")
+    return query.count(), False
+
+
+def page_total(query, mode):
+    """
+    Total for a cursor page according to the ``total`` query parameter.
+
+    Returns:
+        dict: {'total', 'total_is_estimate'} or {} when no total was requested
+    """
+    if mode == 'none':
+        return {}
+    total, is_estimate = count_rows(query, estimate=(mode == 'estimate'))
+    return {'total': total, 'total_is_estimate': is_estimate}
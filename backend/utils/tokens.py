@@ -0,0 +1,73 @@
+"""
+Short-lived, scoped tokens for URLs.
+
+Plain download links and ``EventSource`` streams cannot send an
+Authorization header, so their token goes in the query string, where it ends
+up in access and proxy logs and browser history. Those URLs carry a token
+that expires within a minute and only opens one endpoint, never the session
+token.
+"""
+
+from datetime import timedelta
+
+from flask import request
+from flask_jwt_extended import create_access_token, get_jwt, get_jwt_request_location
+
+# Scope of the tokens for GET /api/inventory/export
+EXPORT_SCOPE = 'export'
+
+# Scope of the tokens for one job's GET /api/scraping/jobs/<id>/events
+JOB_EVENTS_SCOPE = 'job_events'
+
+# Endpoint each scope opens
+SCOPE_ENDPOINTS = {
+    EXPORT_SCOPE: 'inventory.export_inventory',
+    JOB_EVENTS_SCOPE: 'scraping.stream_job_events',
+}
+
+
+def create_scoped_token(user_id, scope, expires_in, **claims):
+    """
+    Issue a token that only opens the scope's endpoint.
+
+    Args:
+        user_id: Token identity
+        scope: One of SCOPE_ENDPOINTS
+        expires_in: Lifetime in seconds
+        **claims: Further claims, e.g. the job_id a job events token is for
+
+    Returns:
+        str: Encoded token
+    """
+    return create_access_token(identity=user_id, additional_claims={'scope': scope, **claims},
+                               expires_delta=timedelta(seconds=expires_in))
+
+
+def scoped_token_allowed(jwt_header, jwt_data):
+    """
+    Token verification hook keeping scoped tokens to their endpoint.
+
+    Args:
+        jwt_header: Decoded token header
+        jwt_data: Decoded token claims
+
+    Returns:
+        False if a scoped token is used on any other endpoint
+    """
+    scope = jwt_data.get('scope')
+    return scope is None or request.endpoint == SCOPE_ENDPOINTS.get(scope)
+
+
+def query_string_token_allowed(scope):
+    """
+    Check that a token passed in the query string is a scoped one.
+
+    Call from a ``jwt_required(locations=['headers', 'query_string'])`` view.
+
+    Args:
+        scope: Scope the view's URL tokens must have
+
+    Returns:
+        bool: True if the token came in a header or has the scope
+    """
+    return get_jwt_request_location() != 'query_string' or get_jwt().get('scope') == scope
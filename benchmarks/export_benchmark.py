@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark inventory output formats: file size, write time and load time.
+
+Writes the same synthetic items with InventoryCollection as JSON, CSV,
+Parquet and Arrow, then loads each file the way an analyst would (pandas for
+JSON and CSV, pyarrow for the columnar formats) and reports the results.
+
+Usage:
+    python benchmarks/export_benchmark.py
+    python benchmarks/export_benchmark.py --rows 500000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to import project modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from columnar import read_columnar
+from models import InventoryCollection
+from search_benchmark import synthetic_items
+
+FORMATS = ('json', 'csv', 'parquet', 'arrow')
+
+
+def write(collection, path, fmt):
+    getattr(collection, f'save_to_{fmt}')(path)
+
+
+def load(path, fmt):
+    if fmt == 'json':
+        return len(pd.read_json(path))
+    if fmt == 'csv':
+        return len(pd.read_csv(path))
+    return read_columnar(path, fmt).num_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inventory output formats')
+    parser.add_argument('--rows', type=int, default=100000, help='Items to write')
+    args = parser.parse_args()
+
+    collection = InventoryCollection()
+    collection.add_items(list(synthetic_items(args.rows)))
+    for i, item in enumerate(collection):
+        item.merchant = ('Mercari', 'Depop', 'Poshmark')[i % 3]
+        item.condition = ('new', 'used', 'like new')[i % 3]
+
+    print(f"rows: {args.rows}\n")
+    print(f"{'format':<8} {'size':>10} {'write':>9} {'load':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for fmt in FORMATS:
+            path = os.path.join(tmpdir, f'inventory.{fmt}')
+            start = time.perf_counter()
+            write(collection, path, fmt)
+            written = time.perf_counter() - start
+
+            start = time.perf_counter()
+            rows = load(path, fmt)
+            loaded = time.perf_counter() - start
+            assert rows == args.rows, (fmt, rows)
+
+            size = os.path.getsize(path) / (1024 * 1024)
+            print(f"{fmt:<8} {size:>7.1f} MB {written:>7.2f} s {loaded:>7.2f} s")
+
+
+if __name__ == '__main__':
+    main()
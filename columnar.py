@@ -0,0 +1,259 @@
+"""
+Columnar output (Parquet and Arrow IPC) for inventory items.
+
+Items are written in record batches: each batch becomes a Parquet row group
+or an Arrow record batch, so only one batch is held in memory. Merchant,
+condition, brand, currency and category repeat across many rows and are
+dictionary-encoded; timestamps are stored as UTC timestamps, tags as a list
+of strings and custom_fields as a JSON string.
+
+Requires the optional ``pyarrow`` package.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# Rows per Parquet row group / Arrow record batch
+COLUMNAR_BATCH_SIZE = 10000
+
+# Low-cardinality string columns stored as dictionary<int32, string>
+DICTIONARY_FIELDS = ('merchant', 'condition', 'brand', 'currency', 'category')
+
+_INTEGER_FIELDS = ('id', 'user_id', 'quantity')
+_FLOAT_FIELDS = ('price',)
+_BOOLEAN_FIELDS = ('in_stock', 'is_sold')
+_TIMESTAMP_FIELDS = ('scraped_at', 'created_at', 'updated_at')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet and Arrow output require the pyarrow package (pip install pyarrow)") from e
+    return pyarrow
+
+
+def columnar_available() -> bool:
+    """Whether pyarrow is installed."""
+    try:
+        _pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def inventory_schema(fields: Sequence[str]):
+    """Arrow schema for the given item fields (unknown fields are strings)."""
+    pa = _pyarrow()
+    types = []
+    for field in fields:
+        if field in DICTIONARY_FIELDS:
+            types.append(pa.dictionary(pa.int32(), pa.string()))
+        elif field in _INTEGER_FIELDS:
+            types.append(pa.int64())
+        elif field in _FLOAT_FIELDS:
+            types.append(pa.float64())
+        elif field in _BOOLEAN_FIELDS:
+            types.append(pa.bool_())
+        elif field in _TIMESTAMP_FIELDS:
+            types.append(pa.timestamp('us', tz='UTC'))
+        elif field == 'tags':
+            types.append(pa.list_(pa.string()))
+        else:
+            types.append(pa.string())
+    return pa.schema(list(zip(fields, types)))
+
+
+def _timestamp(value):
+    # ISO strings (InventoryItem.scraped_at, to_dict() output) or datetimes;
+    # naive values are UTC
+    if isinstance(value, str):
+        return datetime.fromisoformat(value) if value else None
+    return value
+
+
+def _tags(value):
+    if isinstance(value, str):
+        return [name for name in value.split(',') if name]
+    return list(value) if value else []
+
+
+def _text(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+class _Dictionary:
+    """A column's dictionary, grown across batches so every batch shares it."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def encode(self, pa, values):
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            value = str(value)
+            if value not in self.index:
+                self.index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(self.index[value])
+        # Later batches only append to the dictionary: the Arrow writer sends
+        # the new values as a delta instead of repeating it
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+
+class ColumnarWriter:
+    """
+    Write item dicts to a Parquet or Arrow IPC file, one batch at a time.
+
+    Args:
+        sink: File path or writable binary file object
+        fmt: 'parquet' or 'arrow'
+        fields: Item fields to write, in column order
+        compression: Codec for both formats (default: zstd)
+    """
+
+    def __init__(self, sink, fmt: str, fields: Sequence[str], compression: str = 'zstd'):
+        if fmt not in COLUMNAR_FORMATS:
+            raise ValueError(f"Unknown columnar format: {fmt}")
+        self.pa = _pyarrow()
+        self.fields = list(fields)
+        self.schema = inventory_schema(self.fields)
+        self.dictionaries = {field: _Dictionary() for field in self.fields if field in DICTIONARY_FIELDS}
+        self.rows_written = 0
+        if fmt == 'parquet':
+            self._writer = self.pa.parquet.ParquetWriter(sink, self.schema, compression=compression)
+        else:
+            options = self.pa.ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self._writer = self.pa.ipc.new_file(sink, self.schema, options=options)
+
+    def _column(self, field, values):
+        pa = self.pa
+        if field in self.dictionaries:
+            return self.dictionaries[field].encode(pa, values)
+        if field in _TIMESTAMP_FIELDS:
+            values = [_timestamp(value) for value in values]
+        elif field == 'tags':
+            values = [_tags(value) for value in values]
+        elif field not in _INTEGER_FIELDS + _FLOAT_FIELDS + _BOOLEAN_FIELDS:
+            values = [_text(value) for value in values]
+        return pa.array(values, type=self.schema.field(field).type)
+
+    def write_rows(self, rows: Sequence[Dict[str, Any]]):
+        """Write one batch of item dicts (missing keys are null)."""
+        if not rows:
+            return
+        columns = [self._column(field, [row.get(field) for row in rows]) for field in self.fields]
+        self._writer.write_batch(self.pa.record_batch(columns, schema=self.schema))
+        self.rows_written += len(rows)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _batches(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_columnar(rows: Iterable[Dict[str, Any]], sink, fmt: str, fields: Sequence[str],
+                   batch_size: int = COLUMNAR_BATCH_SIZE) -> int:
+    """
+    Write item dicts to a Parquet or Arrow file in batches.
+
+    Returns:
+        int: Number of rows written
+    """
+    with ColumnarWriter(sink, fmt, fields) as writer:
+        for batch in _batches(rows, batch_size):
+            writer.write_rows(batch)
+    return writer.rows_written
+
+
+class _ChunkSink:
+    """Write-only file object whose written bytes are drained by a generator."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> Optional[bytes]:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data or None
+
+
+def stream_columnar(rows: Iterable[Dict[str, Any]], fmt: str, fields: Sequence[str],
+                    batch_size: int = COLUMNAR_BATCH_SIZE) -> Iterator[bytes]:
+    """
+    Serialize item dicts to Parquet or Arrow, yielding the file in pieces.
+
+    Each batch is yielded as soon as it is encoded, so a streamed HTTP
+    response sends it while the next batch is read. Parquet needs no seeking:
+    its footer comes last.
+    """
+    sink = _ChunkSink()
+    writer = ColumnarWriter(sink, fmt, fields)
+    for batch in _batches(rows, batch_size):
+        writer.write_rows(batch)
+        data = sink.drain()
+        if data:
+            yield data
+    writer.close()
+    data = sink.drain()
+    if data:
+        yield data
+
+
+def read_columnar(source, fmt: str):
+    """Read a Parquet or Arrow file written by this module into a pyarrow Table."""
+    pa = _pyarrow()
+    if fmt == 'parquet':
+        return pa.parquet.read_table(source)
+    if isinstance(source, str):
+        with pa.memory_map(source) as stream:
+            return pa.ipc.open_file(stream).read_all()
+    return pa.ipc.open_file(source).read_all()
@@ -22,9 +22,14 @@ RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))
 USE_HEADLESS = os.getenv('USE_HEADLESS', 'True').lower() == 'true'
 PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
 
+# Shared fetch results: pages fetched by one scrape are reused by concurrent ones
+PAGE_CACHE_TTL = int(os.getenv('PAGE_CACHE_TTL', '30'))
+LISTING_CACHE_TTL = int(os.getenv('LISTING_CACHE_TTL', '300'))
+FETCH_CACHE_MAX_ENTRIES = int(os.getenv('FETCH_CACHE_MAX_ENTRIES', '2048'))
+
 # Output settings
 OUTPUT_DIR = os.getenv('OUTPUT_DIR', 'scraped_data')
-OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'json')  # json or csv
+OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'json')  # json, csv, parquet or arrow
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -4,12 +4,11 @@ Depop is a popular fashion resale marketplace app/website.
 """
 
 import re
-import time
 from typing import List, Optional
 from bs4 import BeautifulSoup
 import logging
 
-from scraper import BaseScraper
+from scraper import BaseScraper, ScrapeCancelled
 from models import InventoryItem, InventoryCollection
 
 logger = logging.getLogger(__name__)
@@ -165,13 +164,14 @@ class DepopScraper(BaseScraper):
             logger.error(f"Error scraping Depop listing {url}: {e}")
             return []
     
-    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5) -> InventoryCollection:
+    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5, start_page: int = 1) -> InventoryCollection:
         """
         Scrape multiple pages of Depop listings.
         
         Args:
             start_url: Starting URL (search results, category, or shop page)
             max_pages: Maximum number of pages to scrape
+            start_page: Page to start from (used when resuming from a checkpoint)
             
         Returns:
             InventoryCollection with all scraped items
@@ -179,7 +179,7 @@ class DepopScraper(BaseScraper):
         logger.info(f"Starting multi-page Depop scrape from {start_url}")
         collection = InventoryCollection()
         
-        for page_num in range(1, max_pages + 1):
+        for page_num in range(start_page, max_pages + 1):
             # Depop uses offset-based pagination
             offset = (page_num - 1) * 20  # Assuming 20 items per page
             
@@ -190,6 +190,7 @@ class DepopScraper(BaseScraper):
             
             logger.info(f"Scraping Depop page {page_num}/{max_pages}: {page_url}")
             
+            page_items = []
             try:
                 html = self._get_html(page_url, use_selenium=True)
                 soup = self._parse_html(html)
@@ -214,20 +215,33 @@ class DepopScraper(BaseScraper):
                             continue
                         urls_seen.add(product_url)
                         
-                        items = self.scrape_listing(product_url)
+                        # Already known and fresh (incremental runs)
+                        if product_url in self.skip_urls:
+                            continue
+                        
+                        self._check_cancelled()
+                        items = self.scrape_listing_cached(product_url)
                         collection.add_items(items)
+                        page_items.extend(items)
+                        self._report_progress('item', page=page_num, url=product_url, items=len(collection))
                         
                         # Add delay to avoid overwhelming the server
-                        time.sleep(2)
+                        self._sleep(2)
                 
                 # Check if we've reached the last page
                 if len(product_links) == 0:
                     logger.info("No more products found, stopping pagination")
                     break
                 
+            except ScrapeCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error scraping Depop page {page_num}: {e}")
+                self._report_progress('error', page=page_num, message=str(e))
                 break
+            
+            self._complete_page(page_num, page_url, page_items)
+            self._report_progress('page', page=page_num, pages=max_pages, items=len(collection))
         
         logger.info(f"Completed Depop scraping. Total items: {len(collection)}")
         return collection
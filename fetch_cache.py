@@ -0,0 +1,154 @@
+"""
+Request coalescing and short-lived shared results for scrapers.
+
+Scrapers running in the same process share one in-flight fetch per canonical
+URL (single flight), and keep fetched pages and parsed listings for a short
+TTL, so several jobs scraping the same popular search do not each drive a
+browser through the same pages.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import PAGE_CACHE_TTL, LISTING_CACHE_TTL, FETCH_CACHE_MAX_ENTRIES
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'ref_src'}
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL for use as a cache key.
+
+    Lowercases the scheme and host, drops the fragment, default ports and
+    tracking parameters, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith('utm_')
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], poll: Optional[Callable[[], None]] = None,
+           poll_interval: float = 0.5) -> Any:
+        """
+        Run ``fn`` for ``key``, or wait for the call already in flight.
+
+        Args:
+            key: Deduplication key
+            fn: Function to run if no call is in flight
+            poll: Called periodically while waiting; may raise to stop waiting
+            poll_interval: Seconds between ``poll`` calls
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.followers += 1
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        else:
+            while not call.done.wait(poll_interval):
+                if poll is not None:
+                    poll()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache whose entries expire after a fixed TTL.
+
+    Least recently used entries are evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+# Shared by every scraper in the process
+inflight_fetches = SingleFlight()
+page_cache = TTLCache(PAGE_CACHE_TTL, FETCH_CACHE_MAX_ENTRIES)
+listing_cache = TTLCache(LISTING_CACHE_TTL, FETCH_CACHE_MAX_ENTRIES)
@@ -1,11 +1,18 @@
 // API Base URL
 const API_BASE_URL = 'http://localhost:5000/api';
 
+// Columns shown by the inventory table and the recent items list
+const INVENTORY_LIST_FIELDS = 'title,price,merchant,condition,is_sold';
+const RECENT_ITEM_FIELDS = 'title,price,merchant,condition';
+
 // State
 let authToken = localStorage.getItem('authToken');
 let currentUser = null;
 let currentPage = 1;
+// Cursor that starts each visited inventory page ('' is the first page)
+let pageCursors = [''];
 let currentFilters = {};
+const jobStreams = {};
 
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
@@ -151,7 +158,7 @@ function hideAllSections() {
 // Statistics
 async function loadStatistics() {
     try {
-        const response = await fetch(`${API_BASE_URL}/stats`, {
+        const response = await fetch(`${API_BASE_URL}/stats?fields=${RECENT_ITEM_FIELDS}`, {
             headers: { 'Authorization': `Bearer ${authToken}` }
         });
 
@@ -237,11 +244,14 @@ function updateStatistics(data) {
 
 // Inventory
 async function loadInventory(page = 1) {
+    if (page === 1) pageCursors = [''];
     currentPage = page;
     try {
         const params = new URLSearchParams({
-            page: page,
+            cursor: pageCursors[page - 1],
             per_page: 20,
+            total: 'estimate',
+            fields: INVENTORY_LIST_FIELDS,
             ...currentFilters
         });
 
@@ -251,6 +261,7 @@ async function loadInventory(page = 1) {
 
         if (response.ok) {
             const data = await response.json();
+            pageCursors[page] = data.next_cursor;
             displayInventory(data);
         }
     } catch (error) {
@@ -293,15 +304,26 @@ function displayPagination(data) {
     const pagination = document.getElementById('inventory-pagination');
     pagination.innerHTML = '';
 
-    if (data.pages > 1) {
-        for (let i = 1; i <= data.pages; i++) {
-            const btn = document.createElement('button');
-            btn.textContent = i;
-            btn.className = i === currentPage ? 'active' : '';
-            btn.onclick = () => loadInventory(i);
-            pagination.appendChild(btn);
-        }
-    }
+    if (currentPage === 1 && !data.has_next) return;
+
+    const prev = document.createElement('button');
+    prev.textContent = '‹ Prev';
+    prev.disabled = currentPage === 1;
+    prev.onclick = () => loadInventory(currentPage - 1);
+
+    const status = document.createElement('span');
+    status.className = 'pagination-status';
+    const pages = data.total ? Math.max(currentPage, Math.ceil(data.total / data.per_page)) : null;
+    status.textContent = pages
+        ? `Page ${currentPage} of ${data.total_is_estimate ? '~' : ''}${pages}`
+        : `Page ${currentPage}`;
+
+    const next = document.createElement('button');
+    next.textContent = 'Next ›';
+    next.disabled = !data.has_next;
+    next.onclick = () => loadInventory(currentPage + 1);
+
+    pagination.append(prev, status, next);
 }
 
 function applyFilters() {
@@ -334,8 +356,28 @@ async function deleteItem(itemId) {
     }
 }
 
-async function exportInventory() {
-    alert('Export functionality would download a CSV file. Not fully implemented in this demo.');
+async function exportInventory(format = 'csv') {
+    // A plain download link: the browser streams the file to disk instead of
+    // holding it in memory. The link carries a short-lived export-only token,
+    // never the session token
+    try {
+        const response = await fetch(`${API_BASE_URL}/inventory/export-token`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${authToken}` }
+        });
+        if (!response.ok) return;
+        const data = await response.json();
+
+        const params = new URLSearchParams({ format, ...currentFilters, jwt: data.token });
+        const link = document.createElement('a');
+        link.href = `${API_BASE_URL}/inventory/export?${params}`;
+        link.download = '';
+        document.body.appendChild(link);
+        link.click();
+        link.remove();
+    } catch (error) {
+        console.error('Failed to export inventory:', error);
+    }
 }
 
 // Scraping
@@ -357,11 +399,9 @@ async function startScraping(url, merchant, pages) {
         const data = await response.json();
 
         if (response.ok) {
-            messageDiv.textContent = 'Scraping job started successfully!';
+            messageDiv.textContent = 'Scraping job queued successfully!';
             messageDiv.className = 'message success';
-            setTimeout(() => {
-                loadScrapingJobs();
-            }, 2000);
+            loadScrapingJobs();
         } else {
             messageDiv.textContent = data.error || 'Failed to start scraping';
             messageDiv.className = 'message error';
@@ -394,16 +434,74 @@ function displayScrapingJobs(jobs) {
     if (jobs && jobs.length > 0) {
         jobs.forEach(job => {
             const tr = document.createElement('tr');
+            tr.dataset.jobId = job.id;
             tr.innerHTML = `
                 <td>${job.url}</td>
                 <td>${job.merchant}</td>
-                <td class="status-${job.status}">${job.status}</td>
-                <td>${job.items_scraped || 0}</td>
+                <td class="job-status status-${job.status}">${job.status}</td>
+                <td class="job-items">${job.items_scraped || 0}</td>
                 <td>${new Date(job.created_at).toLocaleString()}</td>
             `;
             tbody.appendChild(tr);
+
+            if (!['completed', 'failed', 'cancelled'].includes(job.status)) {
+                watchJob(job.id);
+            }
         });
     } else {
         tbody.innerHTML = '<tr><td colspan="5" style="text-align: center;">No scraping jobs yet</td></tr>';
     }
 }
+
+// Live job progress via Server-Sent Events (replaces polling)
+async function watchJob(jobId) {
+    if (jobStreams[jobId] || typeof EventSource === 'undefined') return;
+    jobStreams[jobId] = true;
+
+    // EventSource cannot set headers: the URL carries a short-lived token
+    // for this job's stream, never the session token
+    let token;
+    try {
+        const response = await fetch(`${API_BASE_URL}/scraping/jobs/${jobId}/events-token`, {
+            method: 'POST',
+            headers: { 'Authorization': `Bearer ${authToken}` }
+        });
+        if (response.ok) token = (await response.json()).token;
+    } catch (error) {
+        console.error('Failed to watch job:', error);
+    }
+    if (!token) {
+        delete jobStreams[jobId];
+        return;
+    }
+
+    const url = `${API_BASE_URL}/scraping/jobs/${jobId}/events?jwt=${encodeURIComponent(token)}`;
+    const source = new EventSource(url);
+    jobStreams[jobId] = source;
+
+    const onEvent = (e) => updateJobRow(jobId, JSON.parse(e.data));
+    ['snapshot', 'status', 'page', 'item'].forEach(type => source.addEventListener(type, onEvent));
+
+    const stop = () => {
+        source.close();
+        delete jobStreams[jobId];
+    };
+    source.addEventListener('end', stop);
+    source.onerror = stop;
+}
+
+function updateJobRow(jobId, data) {
+    const row = document.querySelector(`tr[data-job-id="${jobId}"]`);
+    if (!row) return;
+
+    if (data.status) {
+        const statusCell = row.querySelector('.job-status');
+        statusCell.textContent = data.status;
+        statusCell.className = `job-status status-${data.status}`;
+    }
+
+    const items = data.items_scraped !== undefined ? data.items_scraped : data.items;
+    if (items !== undefined) {
+        row.querySelector('.job-items').textContent = items;
+    }
+}
@@ -8,7 +8,7 @@ from typing import List, Optional
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
-from scraper import BaseScraper
+from scraper import BaseScraper, ScrapeCancelled
 from models import InventoryItem, InventoryCollection
 import logging
 
@@ -149,13 +149,14 @@ class GenericEcommerceScraper(BaseScraper):
             logger.error(f"Error scraping {url}: {e}")
             return []
     
-    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5) -> InventoryCollection:
+    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5, start_page: int = 1) -> InventoryCollection:
         """
         Scrape multiple pages of listings.
         
         Args:
             start_url: Starting URL (should be a category or search page)
             max_pages: Maximum number of pages to scrape
+            start_page: Page to start from (used when resuming from a checkpoint)
             
         Returns:
             InventoryCollection with all scraped items
@@ -163,7 +164,7 @@ class GenericEcommerceScraper(BaseScraper):
         logger.info(f"Starting multi-page scrape from {start_url}")
         collection = InventoryCollection()
         
-        for page_num in range(1, max_pages + 1):
+        for page_num in range(start_page, max_pages + 1):
             # Construct page URL (this is generic, may need customization)
             if '?' in start_url:
                 page_url = f"{start_url}&page={page_num}"
@@ -172,6 +173,7 @@ class GenericEcommerceScraper(BaseScraper):
             
             logger.info(f"Scraping page {page_num}/{max_pages}: {page_url}")
             
+            page_items = []
             try:
                 html = self._get_html(page_url, use_selenium=self.use_selenium)
                 soup = self._parse_html(html)
@@ -189,13 +191,22 @@ class GenericEcommerceScraper(BaseScraper):
                         # Handle relative URLs
                         product_url = urljoin(page_url, product_url)
                     
-                    if product_url:
-                        items = self.scrape_listing(product_url)
+                    if product_url and product_url not in self.skip_urls:
+                        self._check_cancelled()
+                        items = self.scrape_listing_cached(product_url)
                         collection.add_items(items)
+                        page_items.extend(items)
+                        self._report_progress('item', page=page_num, url=product_url, items=len(collection))
                 
+            except ScrapeCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error scraping page {page_num}: {e}")
+                self._report_progress('error', page=page_num, message=str(e))
                 break
+            
+            self._complete_page(page_num, page_url, page_items)
+            self._report_progress('page', page=page_num, pages=max_pages, items=len(collection))
         
         logger.info(f"Completed scraping. Total items: {len(collection)}")
         return collection
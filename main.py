@@ -11,6 +11,7 @@ from datetime import datetime
 from generic_scraper import GenericEcommerceScraper, CustomMerchantScraper
 from mercari_scraper import MercariScraper
 from depop_scraper import DepopScraper
+from columnar import COLUMNAR_FORMATS, columnar_available
 from models import InventoryCollection
 from config import OUTPUT_DIR, OUTPUT_FORMAT
 
@@ -53,7 +54,7 @@ def main():
     )
     parser.add_argument(
         '--format',
-        choices=['json', 'csv'],
+        choices=['json', 'csv', 'parquet', 'arrow'],
         default=OUTPUT_FORMAT,
         help=f'Output format (default: {OUTPUT_FORMAT})'
     )
@@ -69,6 +70,8 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.format in COLUMNAR_FORMATS and not columnar_available():
+        parser.error(f"--format {args.format} requires the pyarrow package (pip install pyarrow)")
     
     # Create output directory if it doesn't exist
     output_dir = Path(OUTPUT_DIR)
@@ -115,6 +118,10 @@ def main():
         logger.info(f"Saving {len(collection)} items to {output_path}")
         if args.format == 'json':
             collection.save_to_json(str(output_path))
+        elif args.format == 'parquet':
+            collection.save_to_parquet(str(output_path))
+        elif args.format == 'arrow':
+            collection.save_to_arrow(str(output_path))
         else:
             collection.save_to_csv(str(output_path))
         
@@ -4,12 +4,11 @@ Mercari is a popular resale marketplace app/website.
 """
 
 import re
-import time
 from typing import List, Optional
 from bs4 import BeautifulSoup
 import logging
 
-from scraper import BaseScraper
+from scraper import BaseScraper, ScrapeCancelled
 from models import InventoryItem, InventoryCollection
 
 logger = logging.getLogger(__name__)
@@ -140,13 +139,14 @@ class MercariScraper(BaseScraper):
             logger.error(f"Error scraping Mercari listing {url}: {e}")
             return []
     
-    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5) -> InventoryCollection:
+    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5, start_page: int = 1) -> InventoryCollection:
         """
         Scrape multiple pages of Mercari listings.
         
         Args:
             start_url: Starting URL (search results or category page)
             max_pages: Maximum number of pages to scrape
+            start_page: Page to start from (used when resuming from a checkpoint)
             
         Returns:
             InventoryCollection with all scraped items
@@ -154,7 +154,7 @@ class MercariScraper(BaseScraper):
         logger.info(f"Starting multi-page Mercari scrape from {start_url}")
         collection = InventoryCollection()
         
-        for page_num in range(1, max_pages + 1):
+        for page_num in range(start_page, max_pages + 1):
             # Construct page URL
             if '?' in start_url:
                 page_url = f"{start_url}&page={page_num}"
@@ -163,6 +163,7 @@ class MercariScraper(BaseScraper):
             
             logger.info(f"Scraping Mercari page {page_num}/{max_pages}: {page_url}")
             
+            page_items = []
             try:
                 html = self._get_html(page_url, use_selenium=True)
                 soup = self._parse_html(html)
@@ -187,15 +188,28 @@ class MercariScraper(BaseScraper):
                             continue
                         urls_seen.add(product_url)
                         
-                        items = self.scrape_listing(product_url)
+                        # Already known and fresh (incremental runs)
+                        if product_url in self.skip_urls:
+                            continue
+                        
+                        self._check_cancelled()
+                        items = self.scrape_listing_cached(product_url)
                         collection.add_items(items)
+                        page_items.extend(items)
+                        self._report_progress('item', page=page_num, url=product_url, items=len(collection))
                         
                         # Add delay to avoid overwhelming the server
-                        time.sleep(2)
+                        self._sleep(2)
                 
+            except ScrapeCancelled:
+                raise
             except Exception as e:
                 logger.error(f"Error scraping Mercari page {page_num}: {e}")
+                self._report_progress('error', page=page_num, message=str(e))
                 break
+            
+            self._complete_page(page_num, page_url, page_items)
+            self._report_progress('page', page=page_num, pages=max_pages, items=len(collection))
         
         logger.info(f"Completed Mercari scraping. Total items: {len(collection)}")
         return collection
@@ -0,0 +1,111 @@
+"""price history time series
+
+price_history gets a point when an inventory item is created and whenever
+its price or in_stock changes, written by triggers on inventory_items:
+row-level on SQLite, statement-level with transition tables on PostgreSQL.
+Existing items start with one point each.
+
+SQLite batch migrations that recreate inventory_items drop its triggers;
+such migrations must create the price_history_* triggers again.
+
+Revision ID: 0df251027561
+Revises: 1f0943093abf
+Create Date: 2026-10-18 22:50:53.831345
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0df251027561'
+down_revision = '1f0943093abf'
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER price_history_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+        VALUES (new.id, new.user_id, strftime('%Y-%m-%d %H:%M:%f', 'now'), new.price, new.in_stock, NULL);
+    END""",
+    """CREATE TRIGGER price_history_update AFTER UPDATE OF price, in_stock ON inventory_items
+        WHEN old.price IS NOT new.price OR old.in_stock IS NOT new.in_stock BEGIN
+        INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+        VALUES (new.id, new.user_id, strftime('%Y-%m-%d %H:%M:%f', 'now'), new.price, new.in_stock, old.price);
+    END""",
+    """CREATE TRIGGER price_history_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM price_history WHERE item_id = old.id;
+    END""",
+)
+
+POSTGRESQL_TRIGGERS = (
+    """CREATE OR REPLACE FUNCTION price_history_record() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+            SELECT id, user_id, now() AT TIME ZONE 'utc', price, in_stock, NULL FROM new_rows;
+        ELSE
+            INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+            SELECT n.id, n.user_id, now() AT TIME ZONE 'utc', n.price, n.in_stock, o.price
+            FROM new_rows n JOIN old_rows o ON o.id = n.id
+            WHERE n.price IS DISTINCT FROM o.price OR n.in_stock IS DISTINCT FROM o.in_stock;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE TRIGGER price_history_insert AFTER INSERT ON inventory_items
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION price_history_record()""",
+    """CREATE TRIGGER price_history_update AFTER UPDATE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION price_history_record()""",
+)
+
+# One point per existing item, at its last update
+BACKFILL = (
+    "INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price) "
+    "SELECT id, user_id, coalesce(updated_at, created_at), price, in_stock, NULL FROM inventory_items"
+)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('price_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('in_stock', sa.Boolean(), nullable=True),
+    sa.Column('previous_price', sa.Float(), nullable=True),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('price_history', schema=None) as batch_op:
+        batch_op.create_index('ix_price_history_item_recorded', ['item_id', 'recorded_at'], unique=False)
+        batch_op.create_index('ix_price_history_user_recorded', ['user_id', 'recorded_at'], unique=False)
+
+    # ### end Alembic commands ###
+
+    dialect = op.get_bind().dialect.name
+    triggers = {'sqlite': SQLITE_TRIGGERS, 'postgresql': POSTGRESQL_TRIGGERS}.get(dialect, ())
+    for statement in triggers:
+        op.execute(statement)
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    for name in ('price_history_insert', 'price_history_update', 'price_history_delete'):
+        if dialect == 'postgresql':
+            op.execute(f"DROP TRIGGER IF EXISTS {name} ON inventory_items")
+        else:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    if dialect == 'postgresql':
+        op.execute("DROP FUNCTION IF EXISTS price_history_record()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('price_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_price_history_user_recorded')
+        batch_op.drop_index('ix_price_history_item_recorded')
+
+    op.drop_table('price_history')
+    # ### end Alembic commands ###
@@ -0,0 +1,33 @@
+"""backfill listing keys for existing items
+
+Items written before re-scraped listings were upserted have no listing_key or
+content_hash. A NULL key never conflicts on (user_id, merchant, listing_key),
+so the first re-scrape of each such listing would insert a duplicate instead
+of updating it. The keys are computed with the same rules as the bulk writer
+(backend/services/bulk_writer.py); where earlier re-scrapes already left
+duplicates, the most recently scraped row gets the key.
+
+Revision ID: 131ef45af2b1
+Revises: a70112e8fec5
+Create Date: 2026-10-19 10:02:37.114520
+
+"""
+from alembic import op
+
+from backend.services.bulk_writer import backfill_listing_identity
+
+
+# revision identifiers, used by Alembic.
+revision = '131ef45af2b1'
+down_revision = 'a70112e8fec5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    backfill_listing_identity(op.get_bind())
+
+
+def downgrade():
+    # Data only; the keys stay valid for the previous schema
+    pass
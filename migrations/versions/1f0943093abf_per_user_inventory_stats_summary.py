@@ -0,0 +1,127 @@
+"""per-user inventory stats summary
+
+inventory_stats holds item counts and price totals per (user, merchant,
+condition, price bucket, sold) and is maintained by triggers on
+inventory_items: row-level on SQLite, statement-level with transition tables
+on PostgreSQL. Existing inventory is summarized once here.
+
+SQLite batch migrations that recreate inventory_items drop its triggers;
+such migrations must create the inventory_stats_* triggers again.
+
+Revision ID: 1f0943093abf
+Revises: e09fafb07d99
+Create Date: 2026-10-18 22:38:39.831312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1f0943093abf'
+down_revision = 'e09fafb07d99'
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER inventory_stats_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO inventory_stats (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+        VALUES (new.user_id, coalesce(new.merchant, ''), coalesce(new.condition, ''), CASE WHEN new.price IS NULL OR new.price < 0 THEN '' WHEN new.price < 25 THEN '0-25' WHEN new.price < 50 THEN '25-50' WHEN new.price < 100 THEN '50-100' WHEN new.price < 250 THEN '100-250' ELSE '250+' END, coalesce(new.is_sold, false), 1, coalesce(new.price, 0))
+        ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold)
+        DO UPDATE SET item_count = item_count + 1, total_value = total_value + excluded.total_value;
+    END""",
+    """CREATE TRIGGER inventory_stats_delete AFTER DELETE ON inventory_items BEGIN
+        UPDATE inventory_stats
+        SET item_count = item_count - 1, total_value = total_value - coalesce(old.price, 0)
+        WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false);
+        DELETE FROM inventory_stats WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false) AND item_count <= 0;
+    END""",
+    """CREATE TRIGGER inventory_stats_update
+        AFTER UPDATE OF user_id, merchant, condition, price, is_sold ON inventory_items BEGIN
+        UPDATE inventory_stats
+        SET item_count = item_count - 1, total_value = total_value - coalesce(old.price, 0)
+        WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false);
+        DELETE FROM inventory_stats WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false) AND item_count <= 0;
+        INSERT INTO inventory_stats (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+        VALUES (new.user_id, coalesce(new.merchant, ''), coalesce(new.condition, ''), CASE WHEN new.price IS NULL OR new.price < 0 THEN '' WHEN new.price < 25 THEN '0-25' WHEN new.price < 50 THEN '25-50' WHEN new.price < 100 THEN '50-100' WHEN new.price < 250 THEN '100-250' ELSE '250+' END, coalesce(new.is_sold, false), 1, coalesce(new.price, 0))
+        ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold)
+        DO UPDATE SET item_count = item_count + 1, total_value = total_value + excluded.total_value;
+    END""",
+)
+
+POSTGRESQL_TRIGGERS = (
+    """CREATE OR REPLACE FUNCTION inventory_stats_apply() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            INSERT INTO inventory_stats AS s (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+            SELECT user_id, merchant, condition, price_bucket, is_sold, sum(item_count), sum(total_value) FROM (SELECT new_rows.user_id AS user_id, coalesce(new_rows.merchant, '') AS merchant, coalesce(new_rows.condition, '') AS condition, CASE WHEN new_rows.price IS NULL OR new_rows.price < 0 THEN '' WHEN new_rows.price < 25 THEN '0-25' WHEN new_rows.price < 50 THEN '25-50' WHEN new_rows.price < 100 THEN '50-100' WHEN new_rows.price < 250 THEN '100-250' ELSE '250+' END AS price_bucket, coalesce(new_rows.is_sold, false) AS is_sold, 1 AS item_count, 1 * coalesce(new_rows.price, 0) AS total_value FROM new_rows) AS delta
+            GROUP BY user_id, merchant, condition, price_bucket, is_sold
+            HAVING sum(item_count) <> 0 OR sum(total_value) <> 0
+            ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold) DO UPDATE
+            SET item_count = s.item_count + excluded.item_count, total_value = s.total_value + excluded.total_value;
+        ELSIF TG_OP = 'UPDATE' THEN
+            INSERT INTO inventory_stats AS s (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+            SELECT user_id, merchant, condition, price_bucket, is_sold, sum(item_count), sum(total_value) FROM (SELECT new_rows.user_id AS user_id, coalesce(new_rows.merchant, '') AS merchant, coalesce(new_rows.condition, '') AS condition, CASE WHEN new_rows.price IS NULL OR new_rows.price < 0 THEN '' WHEN new_rows.price < 25 THEN '0-25' WHEN new_rows.price < 50 THEN '25-50' WHEN new_rows.price < 100 THEN '50-100' WHEN new_rows.price < 250 THEN '100-250' ELSE '250+' END AS price_bucket, coalesce(new_rows.is_sold, false) AS is_sold, 1 AS item_count, 1 * coalesce(new_rows.price, 0) AS total_value FROM new_rows UNION ALL SELECT old_rows.user_id AS user_id, coalesce(old_rows.merchant, '') AS merchant, coalesce(old_rows.condition, '') AS condition, CASE WHEN old_rows.price IS NULL OR old_rows.price < 0 THEN '' WHEN old_rows.price < 25 THEN '0-25' WHEN old_rows.price < 50 THEN '25-50' WHEN old_rows.price < 100 THEN '50-100' WHEN old_rows.price < 250 THEN '100-250' ELSE '250+' END AS price_bucket, coalesce(old_rows.is_sold, false) AS is_sold, -1 AS item_count, -1 * coalesce(old_rows.price, 0) AS total_value FROM old_rows) AS delta
+            GROUP BY user_id, merchant, condition, price_bucket, is_sold
+            HAVING sum(item_count) <> 0 OR sum(total_value) <> 0
+            ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold) DO UPDATE
+            SET item_count = s.item_count + excluded.item_count, total_value = s.total_value + excluded.total_value;
+            DELETE FROM inventory_stats WHERE item_count <= 0 AND user_id IN (SELECT user_id FROM old_rows);
+        ELSE
+            INSERT INTO inventory_stats AS s (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+            SELECT user_id, merchant, condition, price_bucket, is_sold, sum(item_count), sum(total_value) FROM (SELECT old_rows.user_id AS user_id, coalesce(old_rows.merchant, '') AS merchant, coalesce(old_rows.condition, '') AS condition, CASE WHEN old_rows.price IS NULL OR old_rows.price < 0 THEN '' WHEN old_rows.price < 25 THEN '0-25' WHEN old_rows.price < 50 THEN '25-50' WHEN old_rows.price < 100 THEN '50-100' WHEN old_rows.price < 250 THEN '100-250' ELSE '250+' END AS price_bucket, coalesce(old_rows.is_sold, false) AS is_sold, -1 AS item_count, -1 * coalesce(old_rows.price, 0) AS total_value FROM old_rows) AS delta
+            GROUP BY user_id, merchant, condition, price_bucket, is_sold
+            HAVING sum(item_count) <> 0 OR sum(total_value) <> 0
+            ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold) DO UPDATE
+            SET item_count = s.item_count + excluded.item_count, total_value = s.total_value + excluded.total_value;
+            DELETE FROM inventory_stats WHERE item_count <= 0 AND user_id IN (SELECT user_id FROM old_rows);
+        END IF;
+        RETURN NULL;
+    END $$""",
+    """CREATE TRIGGER inventory_stats_insert AFTER INSERT ON inventory_items
+        REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+    """CREATE TRIGGER inventory_stats_update AFTER UPDATE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+    """CREATE TRIGGER inventory_stats_delete AFTER DELETE ON inventory_items
+        REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION inventory_stats_apply()""",
+)
+
+BACKFILL = (
+    "INSERT INTO inventory_stats (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value) SELECT inventory_items.user_id, coalesce(inventory_items.merchant, ''), coalesce(inventory_items.condition, ''), CASE WHEN inventory_items.price IS NULL OR inventory_items.price < 0 THEN '' WHEN inventory_items.price < 25 THEN '0-25' WHEN inventory_items.price < 50 THEN '25-50' WHEN inventory_items.price < 100 THEN '50-100' WHEN inventory_items.price < 250 THEN '100-250' ELSE '250+' END, coalesce(inventory_items.is_sold, false), count(*), coalesce(sum(price), 0) FROM inventory_items GROUP BY 1, 2, 3, 4, 5"
+)
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('inventory_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('merchant', sa.String(length=100), nullable=False),
+    sa.Column('condition', sa.String(length=50), nullable=False),
+    sa.Column('price_bucket', sa.String(length=10), nullable=False),
+    sa.Column('is_sold', sa.Boolean(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('total_value', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'merchant', 'condition', 'price_bucket', 'is_sold')
+    )
+    # ### end Alembic commands ###
+
+    dialect = op.get_bind().dialect.name
+    triggers = {'sqlite': SQLITE_TRIGGERS, 'postgresql': POSTGRESQL_TRIGGERS}.get(dialect, ())
+    for statement in triggers:
+        op.execute(statement)
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    for name in ('inventory_stats_insert', 'inventory_stats_update', 'inventory_stats_delete'):
+        if op.get_bind().dialect.name == 'postgresql':
+            op.execute(f"DROP TRIGGER IF EXISTS {name} ON inventory_items")
+        else:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("DROP FUNCTION IF EXISTS inventory_stats_apply()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('inventory_stats')
+    # ### end Alembic commands ###
@@ -0,0 +1,114 @@
+"""normalized item tags
+
+Moves tags from the comma-separated inventory_items.tags column into tags
+(one row per user and name) and item_tags, indexed both ways. The column is
+kept as a display copy and rewritten in normalized form.
+
+SQLite batch migrations that recreate inventory_items drop its triggers;
+such migrations must create the item_tags_delete trigger again.
+
+Revision ID: 4f860652fb7c
+Revises: 0df251027561
+Create Date: 2026-10-18 22:53:55.103532
+
+"""
+from alembic import op
+import re
+
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f860652fb7c'
+down_revision = '0df251027561'
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER item_tags_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM item_tags WHERE item_id = old.id;
+    END""",
+)
+
+
+def normalize_tags(value):
+    """Frozen copy of backend.services.tags.normalize_tags for string input."""
+    names, length = [], 0
+    for raw in (value or '').split(','):
+        name = re.sub(r'\s+', ' ', raw.replace('\x00', '')).strip().lower()[:50].strip()
+        if not name or name in names:
+            continue
+        length += len(name) + (1 if names else 0)
+        if length > 500:
+            break
+        names.append(name)
+    return names
+
+
+def backfill():
+    """Split every item's tags string into tags and item_tags rows."""
+    conn = op.get_bind()
+    items = sa.table('inventory_items', sa.column('id'), sa.column('user_id'), sa.column('tags'))
+    tags = sa.table('tags', sa.column('id'), sa.column('user_id'), sa.column('name'))
+    links = sa.table('item_tags', sa.column('item_id'), sa.column('tag_id'))
+
+    rows = conn.execute(
+        sa.select(items.c.id, items.c.user_id, items.c.tags).where(items.c.tags.isnot(None), items.c.tags != '')
+    ).all()
+    item_names = {item_id: (user_id, normalize_tags(value)) for item_id, user_id, value in rows}
+
+    by_user = {}
+    for user_id, names in item_names.values():
+        by_user.setdefault(user_id, set()).update(names)
+    new_tags = [{'user_id': user_id, 'name': name} for user_id, names in by_user.items() for name in sorted(names)]
+    if new_tags:
+        conn.execute(tags.insert(), new_tags)
+    tag_ids = {(user_id, name): tag_id for tag_id, user_id, name in conn.execute(sa.select(tags))}
+
+    new_links = [{'item_id': item_id, 'tag_id': tag_ids[(user_id, name)]}
+                 for item_id, (user_id, names) in item_names.items() for name in names]
+    if new_links:
+        conn.execute(links.insert(), new_links)
+    for item_id, (user_id, names) in item_names.items():
+        conn.execute(items.update().where(items.c.id == item_id).values(tags=','.join(names) or None))
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'name', name='uq_tags_user_name')
+    )
+    op.create_table('item_tags',
+    sa.Column('item_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('item_id', 'tag_id')
+    )
+    with op.batch_alter_table('item_tags', schema=None) as batch_op:
+        batch_op.create_index('ix_item_tags_tag_item', ['tag_id', 'item_id'], unique=False)
+
+    # ### end Alembic commands ###
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in SQLITE_TRIGGERS:
+            op.execute(statement)
+    backfill()
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS item_tags_delete")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('item_tags', schema=None) as batch_op:
+        batch_op.drop_index('ix_item_tags_tag_item')
+
+    op.drop_table('item_tags')
+    op.drop_table('tags')
+    # ### end Alembic commands ###
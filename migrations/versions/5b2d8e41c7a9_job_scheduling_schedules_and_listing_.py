@@ -0,0 +1,166 @@
+"""job scheduling, schedules, checkpoints and listing identity
+
+Columns and tables added to the baseline schema for the fair-share scheduler
+(priority, queued_at), recurring schedules (scrape_schedules, schedule_id),
+checkpoints (checkpoint, attempts), batch jobs (kind, parent_id, urls,
+total_urls), cancellation and timeouts, the work queue lease, Idempotency-Key
+and the listing upsert (listing_key, content_hash).
+
+Databases created with db.create_all() after some of these were added and
+stamped at the baseline already have part of the schema, so only what is
+missing is added. Existing jobs are backfilled as plain, unprioritized
+scrape jobs with no attempts.
+
+Revision ID: 5b2d8e41c7a9
+Revises: bcf9bc36c3e1
+Create Date: 2026-10-19 09:12:04.318266
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2d8e41c7a9'
+down_revision = 'bcf9bc36c3e1'
+branch_labels = None
+depends_on = None
+
+
+# Nullable job columns, added as-is
+JOB_COLUMNS = (
+    sa.Column('idempotency_key', sa.String(length=255), nullable=True),
+    sa.Column('urls', sa.JSON(), nullable=True),
+    sa.Column('total_urls', sa.Integer(), nullable=True),
+    sa.Column('queued_at', sa.DateTime(), nullable=True),
+    sa.Column('timeout_seconds', sa.Integer(), nullable=True),
+    sa.Column('cancel_requested_at', sa.DateTime(), nullable=True),
+    sa.Column('lease_owner', sa.String(length=255), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.Column('checkpoint', sa.JSON(), nullable=True),
+)
+
+# NOT NULL job columns and the value existing jobs get
+JOB_BACKFILLS = (
+    (sa.Column('kind', sa.String(length=20), nullable=True), "'scrape'"),
+    (sa.Column('priority', sa.Integer(), nullable=True), '0'),
+    (sa.Column('attempts', sa.Integer(), nullable=True), '0'),
+)
+
+
+def _schema():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    def columns(table):
+        return {column['name'] for column in inspector.get_columns(table)}
+
+    def indexes(table):
+        return {index['name'] for index in inspector.get_indexes(table)}
+
+    def unique_constraints(table):
+        return {constraint['name'] for constraint in inspector.get_unique_constraints(table)}
+
+    def foreign_keys(table):
+        return {tuple(fk['constrained_columns']) for fk in inspector.get_foreign_keys(table)}
+
+    return tables, columns, indexes, unique_constraints, foreign_keys
+
+
+def upgrade():
+    tables, columns, indexes, unique_constraints, foreign_keys = _schema()
+
+    if 'scrape_schedules' not in tables:
+        op.create_table('scrape_schedules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('url', sa.String(length=1000), nullable=False),
+        sa.Column('merchant', sa.String(length=100), nullable=False),
+        sa.Column('pages', sa.Integer(), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column('interval_seconds', sa.Integer(), nullable=True),
+        sa.Column('cron', sa.String(length=100), nullable=True),
+        sa.Column('jitter_seconds', sa.Integer(), nullable=False),
+        sa.Column('incremental', sa.Boolean(), nullable=False),
+        sa.Column('enabled', sa.Boolean(), nullable=False),
+        sa.Column('next_run_at', sa.DateTime(), nullable=True),
+        sa.Column('last_run_at', sa.DateTime(), nullable=True),
+        sa.Column('last_success_at', sa.DateTime(), nullable=True),
+        sa.Column('last_job_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['last_job_id'], ['scraping_jobs.id'], name='fk_scrape_schedules_last_job_id'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('scrape_schedules', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_scrape_schedules_next_run_at'), ['next_run_at'], unique=False)
+            batch_op.create_index(batch_op.f('ix_scrape_schedules_user_id'), ['user_id'], unique=False)
+
+    existing = columns('scraping_jobs')
+    with op.batch_alter_table('scraping_jobs', schema=None) as batch_op:
+        for column in JOB_COLUMNS:
+            if column.name not in existing:
+                batch_op.add_column(column.copy())
+        for column, _ in JOB_BACKFILLS:
+            if column.name not in existing:
+                batch_op.add_column(column.copy())
+        if 'parent_id' not in existing:
+            batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+        if 'schedule_id' not in existing:
+            batch_op.add_column(sa.Column('schedule_id', sa.Integer(), nullable=True))
+
+    for column, value in JOB_BACKFILLS:
+        op.execute(f"UPDATE scraping_jobs SET {column.name} = {value} WHERE {column.name} IS NULL")
+
+    job_foreign_keys = foreign_keys('scraping_jobs')
+    job_indexes = indexes('scraping_jobs')
+    with op.batch_alter_table('scraping_jobs', schema=None) as batch_op:
+        for column, _ in JOB_BACKFILLS:
+            batch_op.alter_column(column.name, existing_type=column.type, nullable=False)
+        if ('parent_id',) not in job_foreign_keys:
+            batch_op.create_foreign_key('fk_scraping_jobs_parent_id', 'scraping_jobs', ['parent_id'], ['id'])
+        if ('schedule_id',) not in job_foreign_keys:
+            batch_op.create_foreign_key('fk_scraping_jobs_schedule_id', 'scrape_schedules', ['schedule_id'], ['id'])
+        if 'uq_scraping_jobs_user_idempotency_key' not in unique_constraints('scraping_jobs'):
+            batch_op.create_unique_constraint('uq_scraping_jobs_user_idempotency_key', ['user_id', 'idempotency_key'])
+        for name in ('lease_expires_at', 'parent_id', 'schedule_id'):
+            if f'ix_scraping_jobs_{name}' not in job_indexes:
+                batch_op.create_index(f'ix_scraping_jobs_{name}', [name], unique=False)
+
+    existing = columns('inventory_items')
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        if 'listing_key' not in existing:
+            batch_op.add_column(sa.Column('listing_key', sa.String(length=1000), nullable=True))
+        if 'content_hash' not in existing:
+            batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        if 'uq_inventory_items_user_merchant_listing' not in unique_constraints('inventory_items'):
+            batch_op.create_unique_constraint('uq_inventory_items_user_merchant_listing',
+                                              ['user_id', 'merchant', 'listing_key'])
+
+
+def downgrade():
+    with op.batch_alter_table('inventory_items', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_inventory_items_user_merchant_listing', type_='unique')
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('listing_key')
+
+    with op.batch_alter_table('scraping_jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_scraping_jobs_schedule_id')
+        batch_op.drop_index('ix_scraping_jobs_parent_id')
+        batch_op.drop_index('ix_scraping_jobs_lease_expires_at')
+        batch_op.drop_constraint('uq_scraping_jobs_user_idempotency_key', type_='unique')
+        batch_op.drop_constraint('fk_scraping_jobs_schedule_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_scraping_jobs_parent_id', type_='foreignkey')
+        batch_op.drop_column('schedule_id')
+        batch_op.drop_column('parent_id')
+        for column, _ in JOB_BACKFILLS:
+            batch_op.drop_column(column.name)
+        for column in JOB_COLUMNS:
+            batch_op.drop_column(column.name)
+
+    with op.batch_alter_table('scrape_schedules', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_scrape_schedules_user_id'))
+        batch_op.drop_index(batch_op.f('ix_scrape_schedules_next_run_at'))
+
+    op.drop_table('scrape_schedules')
@@ -0,0 +1,116 @@
+"""never reuse inventory item and scraping job ids
+
+SQLite gives a new row max(rowid) + 1, so once the newest rows of a table
+were archived (or deleted after archival) a new item or job could get the id
+of an archived one: listings with include_archived=true would merge the two
+and archived price history would attach to the new item. inventory_items and
+scraping_jobs are recreated with AUTOINCREMENT and their sequences start
+after the largest id in either the hot or the archive table.
+
+Recreating inventory_items drops its triggers, so the search index, stats,
+price history and tag triggers are created again. PostgreSQL sequences never
+hand out an id twice; nothing changes there.
+
+Revision ID: 8c3f51d2a6e0
+Revises: 131ef45af2b1
+Create Date: 2026-10-19 11:24:51.662093
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3f51d2a6e0'
+down_revision = '131ef45af2b1'
+branch_labels = None
+depends_on = None
+
+# Archive table whose ids each recreated table must not hand out again
+TABLES = (
+    ('scraping_jobs', 'scraping_jobs_archive'),
+    ('inventory_items', 'inventory_items_archive'),
+)
+
+# Frozen copies of the inventory_items triggers from e09fafb07d99 (search
+# index), 1f0943093abf (stats), 0df251027561 (price history) and 4f860652fb7c
+# (tags)
+SQLITE_TRIGGERS = (
+    """CREATE TRIGGER inventory_items_fts_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    """CREATE TRIGGER inventory_items_fts_delete AFTER DELETE ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(inventory_items_fts, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+    END""",
+    """CREATE TRIGGER inventory_items_fts_update
+        AFTER UPDATE OF title, brand, description ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(inventory_items_fts, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+        INSERT INTO inventory_items_fts(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    """CREATE TRIGGER inventory_stats_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO inventory_stats (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+        VALUES (new.user_id, coalesce(new.merchant, ''), coalesce(new.condition, ''), CASE WHEN new.price IS NULL OR new.price < 0 THEN '' WHEN new.price < 25 THEN '0-25' WHEN new.price < 50 THEN '25-50' WHEN new.price < 100 THEN '50-100' WHEN new.price < 250 THEN '100-250' ELSE '250+' END, coalesce(new.is_sold, false), 1, coalesce(new.price, 0))
+        ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold)
+        DO UPDATE SET item_count = item_count + 1, total_value = total_value + excluded.total_value;
+    END""",
+    """CREATE TRIGGER inventory_stats_delete AFTER DELETE ON inventory_items BEGIN
+        UPDATE inventory_stats
+        SET item_count = item_count - 1, total_value = total_value - coalesce(old.price, 0)
+        WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false);
+        DELETE FROM inventory_stats WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false) AND item_count <= 0;
+    END""",
+    """CREATE TRIGGER inventory_stats_update
+        AFTER UPDATE OF user_id, merchant, condition, price, is_sold ON inventory_items BEGIN
+        UPDATE inventory_stats
+        SET item_count = item_count - 1, total_value = total_value - coalesce(old.price, 0)
+        WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false);
+        DELETE FROM inventory_stats WHERE user_id = old.user_id AND merchant = coalesce(old.merchant, '') AND condition = coalesce(old.condition, '') AND price_bucket = CASE WHEN old.price IS NULL OR old.price < 0 THEN '' WHEN old.price < 25 THEN '0-25' WHEN old.price < 50 THEN '25-50' WHEN old.price < 100 THEN '50-100' WHEN old.price < 250 THEN '100-250' ELSE '250+' END AND is_sold = coalesce(old.is_sold, false) AND item_count <= 0;
+        INSERT INTO inventory_stats (user_id, merchant, condition, price_bucket, is_sold, item_count, total_value)
+        VALUES (new.user_id, coalesce(new.merchant, ''), coalesce(new.condition, ''), CASE WHEN new.price IS NULL OR new.price < 0 THEN '' WHEN new.price < 25 THEN '0-25' WHEN new.price < 50 THEN '25-50' WHEN new.price < 100 THEN '50-100' WHEN new.price < 250 THEN '100-250' ELSE '250+' END, coalesce(new.is_sold, false), 1, coalesce(new.price, 0))
+        ON CONFLICT (user_id, merchant, condition, price_bucket, is_sold)
+        DO UPDATE SET item_count = item_count + 1, total_value = total_value + excluded.total_value;
+    END""",
+    """CREATE TRIGGER price_history_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+        VALUES (new.id, new.user_id, strftime('%Y-%m-%d %H:%M:%f', 'now'), new.price, new.in_stock, NULL);
+    END""",
+    """CREATE TRIGGER price_history_update AFTER UPDATE OF price, in_stock ON inventory_items
+        WHEN old.price IS NOT new.price OR old.in_stock IS NOT new.in_stock BEGIN
+        INSERT INTO price_history (item_id, user_id, recorded_at, price, in_stock, previous_price)
+        VALUES (new.id, new.user_id, strftime('%Y-%m-%d %H:%M:%f', 'now'), new.price, new.in_stock, old.price);
+    END""",
+    """CREATE TRIGGER price_history_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM price_history WHERE item_id = old.id;
+    END""",
+    """CREATE TRIGGER item_tags_delete AFTER DELETE ON inventory_items BEGIN
+        DELETE FROM item_tags WHERE item_id = old.id;
+    END""",
+)
+
+
+def _recreate(autoincrement):
+    for table, archive in TABLES:
+        with op.batch_alter_table(table, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+        if autoincrement:
+            op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+            op.execute(
+                f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', "
+                f"max(coalesce((SELECT max(id) FROM {table}), 0), coalesce((SELECT max(id) FROM {archive}), 0))"
+            )
+    for statement in SQLITE_TRIGGERS:
+        op.execute(statement)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate(True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        _recreate(False)
@@ -0,0 +1,77 @@
+"""full-text search index for inventory items
+
+SQLite: external-content FTS5 table over title, brand and description, kept
+in sync by triggers and built from the existing rows. PostgreSQL: GIN index on
+the weighted tsvector expression used by backend/services/search.py.
+
+SQLite batch migrations that recreate inventory_items drop its triggers;
+such migrations must create the inventory_items_fts_* triggers again.
+
+Revision ID: e09fafb07d99
+Revises: 74532df037f7
+Create Date: 2026-10-18 22:26:13.857036
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e09fafb07d99'
+down_revision = '74532df037f7'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'C')"
+)
+
+SQLITE_UPGRADE = (
+    """CREATE VIRTUAL TABLE inventory_items_fts USING fts5(
+        title, brand, description,
+        content='inventory_items', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3')""",
+    """CREATE TRIGGER inventory_items_fts_insert AFTER INSERT ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    """CREATE TRIGGER inventory_items_fts_delete AFTER DELETE ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(inventory_items_fts, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+    END""",
+    """CREATE TRIGGER inventory_items_fts_update
+        AFTER UPDATE OF title, brand, description ON inventory_items BEGIN
+        INSERT INTO inventory_items_fts(inventory_items_fts, rowid, title, brand, description)
+        VALUES ('delete', old.id, old.title, old.brand, old.description);
+        INSERT INTO inventory_items_fts(rowid, title, brand, description)
+        VALUES (new.id, new.title, new.brand, new.description);
+    END""",
+    "INSERT INTO inventory_items_fts(inventory_items_fts) VALUES ('rebuild')",
+)
+
+SQLITE_DOWNGRADE = (
+    "DROP TRIGGER IF EXISTS inventory_items_fts_update",
+    "DROP TRIGGER IF EXISTS inventory_items_fts_delete",
+    "DROP TRIGGER IF EXISTS inventory_items_fts_insert",
+    "DROP TABLE IF EXISTS inventory_items_fts",
+)
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.execute(f"CREATE INDEX ix_inventory_items_search ON inventory_items USING gin (({SEARCH_VECTOR_SQL}))")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for statement in SQLITE_DOWNGRADE:
+            op.execute(statement)
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_inventory_items_search")
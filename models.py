@@ -2,12 +2,14 @@
 Data models for inventory items.
 """
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 import json
 import csv
 
+from columnar import write_columnar
+
 
 @dataclass
 class InventoryItem:
@@ -88,6 +90,21 @@ class InventoryCollection:
             for item in self.items:
                 writer.writerow(item.to_dict())
     
+    def save_to_parquet(self, filepath: str):
+        """Save the collection to a Parquet file (requires pyarrow)."""
+        self._save_columnar(filepath, 'parquet')
+    
+    def save_to_arrow(self, filepath: str):
+        """Save the collection to an Arrow IPC file (requires pyarrow)."""
+        self._save_columnar(filepath, 'arrow')
+    
+    def _save_columnar(self, filepath: str, fmt: str):
+        # Shallow dicts, built one at a time as the writer consumes them
+        # (asdict() deep-copies every item)
+        names = [field.name for field in fields(InventoryItem)]
+        write_columnar(({name: getattr(item, name) for name in names} for item in self.items),
+                       filepath, fmt, names)
+    
     def __len__(self) -> int:
         """Return the number of items in the collection."""
         return len(self.items)
@@ -9,7 +9,7 @@ import os
 # Add current directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.app import app
+from backend.app import app, start_background_services
 from backend.models import db
 
 if __name__ == '__main__':
@@ -23,6 +23,11 @@ if __name__ == '__main__':
     port = app.config.get('PORT', 5000)
     debug = app.config.get('DEBUG', False)
     
+    # Background services run in this process only; with the debug reloader,
+    # only in the child that serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services(app)
+    
     # Run the app
     print(f"\n✅ Inventory Hub is starting!")
     print(f"🌐 Web App: http://localhost:{port}/")
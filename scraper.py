@@ -2,10 +2,12 @@
 Base scraper class for inventory data extraction.
 """
 
+import copy
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Callable, List, Optional, Set
 import requests
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -14,6 +16,7 @@ from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
 from models import InventoryItem, InventoryCollection
+from fetch_cache import canonical_url, inflight_fetches, listing_cache, page_cache
 from config import (
     USER_AGENT, REQUEST_TIMEOUT, MAX_RETRIES, RETRY_DELAY,
     USE_HEADLESS, PAGE_LOAD_TIMEOUT, LOG_LEVEL
@@ -27,6 +30,86 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class ScrapeCancelled(Exception):
+    """Raised inside a scraper when its cancellation token fires."""
+    
+    def __init__(self, reason: str = 'cancelled'):
+        super().__init__(f"Scrape {reason}")
+        self.reason = reason
+
+
+class CancellationToken:
+    """
+    Cooperative cancellation token with an optional wall-clock budget.
+    
+    Scrapers check the token between fetches. Callbacks registered with
+    on_cancel run as soon as the token fires (including when the budget runs
+    out), so in-flight browser navigation can be aborted from another thread.
+    """
+    
+    def __init__(self, timeout: Optional[float] = None):
+        """
+        Args:
+            timeout: Wall-clock budget in seconds, or None for no limit
+        """
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._timer: Optional[threading.Timer] = None
+        if timeout:
+            self._timer = threading.Timer(timeout, self.cancel, args=('timeout',))
+            self._timer.daemon = True
+            self._timer.start()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+    def cancel(self, reason: str = 'cancelled'):
+        """Fire the token and run registered callbacks (first call wins)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+    
+    def on_cancel(self, callback: Callable[[], None]):
+        """Register a callback to run when the token fires."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget, or None if unlimited."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+    
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise ScrapeCancelled(self.reason)
+    
+    def wait(self, seconds: float):
+        """Sleep for up to ``seconds``, raising ScrapeCancelled if the token fires."""
+        if self._event.wait(seconds):
+            raise ScrapeCancelled(self.reason)
+    
+    def close(self):
+        """Stop the budget timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+
+
 class BaseScraper(ABC):
     """Abstract base class for inventory scrapers."""
     
@@ -42,11 +125,84 @@ class BaseScraper(ABC):
         self.session.headers.update({'User-Agent': USER_AGENT})
         self.inventory = InventoryCollection()
         self.driver: Optional[webdriver.Chrome] = None
+        # Optional hook called as progress_callback(event_type, data) during multi-page scrapes
+        self.progress_callback: Optional[Callable[[str, dict], None]] = None
+        # Listing URLs that multi-page scrapes should not fetch (incremental and resumed runs)
+        self.skip_urls: Set[str] = set()
+        # Optional hook called as page_callback(page_num, page_url, items) after each page,
+        # so callers can persist results and checkpoint progress page by page
+        self.page_callback: Optional[Callable[[int, str, List[InventoryItem]], None]] = None
+        self.cancel_token: Optional[CancellationToken] = None
+    
+    def set_cancel_token(self, token: CancellationToken):
+        """
+        Attach a cancellation token.
+        
+        When it fires, the Selenium driver is quit immediately, which aborts any
+        in-flight page load with an error in the scraping thread.
+        """
+        self.cancel_token = token
+        token.on_cancel(self._abort_browser)
+    
+    def _abort_browser(self):
+        driver, self.driver = self.driver, None
+        if driver is not None:
+            logger.info("Aborting Selenium WebDriver")
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting WebDriver: {e}")
+    
+    def _check_cancelled(self):
+        """Raise ScrapeCancelled if the job has been cancelled or timed out."""
+        if self.cancel_token is not None:
+            self.cancel_token.raise_if_cancelled()
+    
+    def _sleep(self, seconds: float):
+        """Sleep between fetches, waking early (and raising) on cancellation."""
+        if self.cancel_token is not None:
+            self.cancel_token.wait(seconds)
+        else:
+            time.sleep(seconds)
+    
+    def _timeout(self, default: float) -> float:
+        """Cap a per-request timeout by the remaining job budget."""
+        remaining = self.cancel_token.remaining() if self.cancel_token is not None else None
+        if remaining is None:
+            return default
+        return max(1.0, min(default, remaining))
+    
+    def _report_progress(self, event_type: str, **data):
+        """
+        Report scraping progress to the registered callback, if any.
+        
+        Args:
+            event_type: Event name ('item', 'page' or 'error')
+            **data: Event payload
+        """
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event_type, data)
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+    
+    def _complete_page(self, page_num: int, page_url: str, items: List[InventoryItem]):
+        """
+        Hand a finished page's items to the registered page callback, if any.
+        
+        Errors are not swallowed: a checkpoint that cannot be saved must stop the scrape.
+        """
+        if self.page_callback is not None:
+            self.page_callback(page_num, page_url, items)
     
     def _get_html(self, url: str, use_selenium: bool = False) -> str:
         """
         Fetch HTML content from a URL.
         
+        Concurrent fetches of the same canonical URL from any scraper in the
+        process share one request, and the page is reused for a short TTL.
+        
         Args:
             url: The URL to fetch
             use_selenium: Whether to use Selenium for JavaScript-rendered content
@@ -54,23 +210,55 @@ class BaseScraper(ABC):
         Returns:
             HTML content as string
         """
-        if use_selenium:
-            return self._get_html_selenium(url)
-        else:
-            return self._get_html_requests(url)
+        self._check_cancelled()
+        key = canonical_url(url)
+        html = page_cache.get(key)
+        if html is not None:
+            return html
+        
+        def fetch():
+            html = self._get_html_selenium(url) if use_selenium else self._get_html_requests(url)
+            page_cache.set(key, html)
+            return html
+        
+        try:
+            return inflight_fetches.do(key, fetch, poll=self._check_cancelled)
+        except ScrapeCancelled:
+            # The shared fetch may belong to another job that was cancelled
+            self._check_cancelled()
+            return fetch()
+    
+    def scrape_listing_cached(self, url: str) -> List[InventoryItem]:
+        """
+        Scrape a single listing, reusing items parsed by another scrape within the TTL.
+        
+        Args:
+            url: URL of the listing page
+            
+        Returns:
+            List of InventoryItem objects (copies, safe to modify)
+        """
+        key = (self.merchant_name, canonical_url(url))
+        items = listing_cache.get(key)
+        if items is None:
+            items = self.scrape_listing(url)
+            if items:
+                listing_cache.set(key, items)
+        return copy.deepcopy(items)
     
     def _get_html_requests(self, url: str) -> str:
         """Fetch HTML using requests library with retry logic."""
         for attempt in range(MAX_RETRIES):
             try:
                 logger.info(f"Fetching {url} (attempt {attempt + 1}/{MAX_RETRIES})")
-                response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+                response = self.session.get(url, timeout=self._timeout(REQUEST_TIMEOUT))
                 response.raise_for_status()
                 return response.text
             except requests.RequestException as e:
                 logger.warning(f"Request failed: {e}")
+                self._check_cancelled()
                 if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
+                    self._sleep(RETRY_DELAY)
                 else:
                     logger.error(f"Failed to fetch {url} after {MAX_RETRIES} attempts")
                     raise
@@ -82,10 +270,15 @@ class BaseScraper(ABC):
         
         try:
             logger.info(f"Fetching {url} with Selenium")
+            self.driver.set_page_load_timeout(self._timeout(PAGE_LOAD_TIMEOUT))
             self.driver.get(url)
-            time.sleep(2)  # Wait for dynamic content to load
+            self._sleep(2)  # Wait for dynamic content to load
             return self.driver.page_source
+        except ScrapeCancelled:
+            raise
         except Exception as e:
+            # Quitting the driver on cancellation surfaces here as a WebDriver error
+            self._check_cancelled()
             logger.error(f"Selenium fetch failed: {e}")
             raise
     
@@ -131,13 +324,14 @@ class BaseScraper(ABC):
         pass
     
     @abstractmethod
-    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5) -> InventoryCollection:
+    def scrape_multiple_pages(self, start_url: str, max_pages: int = 5, start_page: int = 1) -> InventoryCollection:
         """
         Scrape multiple pages of listings.
         
         Args:
             start_url: Starting URL for pagination
             max_pages: Maximum number of pages to scrape
+            start_page: Page to start from (used when resuming from a checkpoint)
             
         Returns:
             InventoryCollection with all scraped items
@@ -146,10 +340,10 @@ class BaseScraper(ABC):
     
     def cleanup(self):
         """Clean up resources (close Selenium driver, etc.)."""
-        if self.driver:
+        driver, self.driver = self.driver, None
+        if driver:
             logger.info("Closing Selenium WebDriver")
-            self.driver.quit()
-            self.driver = None
+            driver.quit()
         
         if self.session:
             self.session.close()
@@ -6,12 +6,15 @@ import unittest
 import json
 import sys
 import os
+from unittest.mock import patch
+
+from sqlalchemy.exc import IntegrityError
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from backend.app import create_app
-from backend.models import db
+from backend.models import db, ScrapingJob
 
 
 class TestAuthAPI(unittest.TestCase):
@@ -199,6 +202,248 @@ class TestScrapingAPI(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
         self.assertEqual(data['total'], 0)
+    
+    def test_start_scraping_queues_job(self):
+        """Test that a new scraping job is queued with the scheduler."""
+        response = self.client.post('/api/scraping/scrape',
+            data=json.dumps({
+                'url': 'https://www.mercari.com/search/?keyword=shoes',
+                'merchant': 'mercari',
+                'priority': 7
+            }),
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 202)
+        job = json.loads(response.data)['job']
+        self.assertEqual(job['status'], 'queued')
+        self.assertEqual(job['priority'], 7)
+        
+        response = self.client.get(f"/api/scraping/jobs/{job['id']}", headers=self.headers)
+        self.assertEqual(json.loads(response.data)['job']['queue_position'], 1)
+        
+        response = self.client.get('/api/scraping/queue', headers=self.headers)
+        queue = json.loads(response.data)['queue']
+        self.assertEqual(queue['queued'], 1)
+        self.assertEqual(queue['user_queued'], 1)
+    
+    def events_token(self, job_id):
+        response = self.client.post(f'/api/scraping/jobs/{job_id}/events-token', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data)['token']
+    
+    def test_job_events_token(self):
+        """Test that stream URLs need a token scoped to the job, which opens nothing else."""
+        job_ids = []
+        for _ in range(2):
+            response = self.client.post('/api/scraping/scrape',
+                data=json.dumps({'url': 'https://example.com/shop', 'pages': 2}),
+                headers=self.headers
+            )
+            job_ids.append(json.loads(response.data)['job']['id'])
+        token = self.events_token(job_ids[0])
+        
+        response = self.client.get(f'/api/scraping/jobs/{job_ids[0]}/events?jwt={self.token}')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(f'/api/scraping/jobs/{job_ids[1]}/events?jwt={token}')
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get('/api/scraping/jobs', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/scraping/jobs/999999/events-token', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+    
+    def test_job_events_stream(self):
+        """Test streaming job progress as Server-Sent Events."""
+        from backend.services.events import publish_job_event
+        
+        response = self.client.post('/api/scraping/scrape',
+            data=json.dumps({'url': 'https://example.com/shop', 'pages': 2}),
+            headers=self.headers
+        )
+        job_id = json.loads(response.data)['job']['id']
+        
+        # EventSource clients pass a job events token in the query string
+        response = self.client.get(f'/api/scraping/jobs/{job_id}/events?jwt={self.events_token(job_id)}',
+                                   buffered=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        stream = iter(response.response)
+        self.assertIn(b'event: snapshot', next(stream))
+        
+        with self.app.app_context():
+            publish_job_event(job_id, 'page', page=1, pages=2, items=5)
+            publish_job_event(job_id, 'status', status='completed', items_scraped=5)
+        
+        page_event = next(stream)
+        self.assertIn(b'event: page', page_event)
+        self.assertIn(b'"items": 5', page_event)
+        self.assertIn(b'event: status', next(stream))
+        self.assertIn(b'event: end', next(stream))
+        response.close()
+    
+    def test_job_events_missed_end(self):
+        """Test that an idle stream ends once the job finishes, even if no event arrives."""
+        response = self.client.post('/api/scraping/scrape',
+            data=json.dumps({'url': 'https://example.com/shop', 'pages': 2}),
+            headers=self.headers
+        )
+        job_id = json.loads(response.data)['job']['id']
+        self.app.config['SSE_KEEPALIVE_SECONDS'] = 0.01
+        
+        response = self.client.get(f'/api/scraping/jobs/{job_id}/events?jwt={self.events_token(job_id)}',
+                                   buffered=False)
+        stream = iter(response.response)
+        self.assertIn(b'event: snapshot', next(stream))
+        self.assertEqual(next(stream), b': keepalive\n\n')
+        
+        with self.app.app_context():
+            db.session.get(ScrapingJob, job_id).status = 'completed'
+            db.session.commit()
+        
+        snapshot = next(stream)
+        self.assertIn(b'event: snapshot', snapshot)
+        self.assertIn(b'"status": "completed"', snapshot)
+        self.assertIn(b'event: end', next(stream))
+        response.close()
+    
+    def test_create_schedule(self):
+        """Test creating and listing a recurring scrape schedule."""
+        response = self.client.post('/api/scraping/schedules',
+            data=json.dumps({
+                'url': 'https://www.depop.com/search/?q=jacket',
+                'merchant': 'depop',
+                'cron': '0 6 * * *',
+                'jitter_seconds': 300
+            }),
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 201)
+        schedule = json.loads(response.data)['schedule']
+        self.assertEqual(schedule['cron'], '0 6 * * *')
+        self.assertTrue(schedule['incremental'])
+        self.assertIsNotNone(schedule['next_run_at'])
+        
+        response = self.client.get('/api/scraping/schedules', headers=self.headers)
+        self.assertEqual(len(json.loads(response.data)['schedules']), 1)
+        
+        response = self.client.post('/api/scraping/schedules',
+            data=json.dumps({'url': 'https://www.depop.com/', 'interval_minutes': 1}),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+        
+        response = self.client.post('/api/scraping/schedules',
+            data=json.dumps({'url': 'https://www.depop.com/', 'cron': '0 6 * * *', 'incremental': 'false'}),
+            headers=self.headers
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_start_batch_json(self):
+        """Test submitting a batch of URLs as JSON."""
+        urls = [f'https://www.mercari.com/item/m{i}' for i in range(120)]
+        response = self.client.post('/api/scraping/batch',
+            data=json.dumps({
+                'urls': urls + [urls[0], 'not-a-url'],
+                'merchant': 'mercari',
+                'shard_size': 50
+            }),
+            headers=self.headers
+        )
+        
+        self.assertEqual(response.status_code, 202)
+        data = json.loads(response.data)
+        self.assertEqual(data['job']['kind'], 'batch')
+        self.assertEqual(data['job']['total_urls'], 120)
+        self.assertEqual(data['progress']['shards_total'], 3)
+        self.assertEqual(data['progress']['shards'], {'queued': 3})
+        self.assertEqual(data['invalid_count'], 1)
+        
+        # Shards are hidden from the job list; progress is on the parent
+        response = self.client.get('/api/scraping/jobs', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['total'], 1)
+        
+        response = self.client.get(f"/api/scraping/jobs/{data['job']['id']}", headers=self.headers)
+        self.assertEqual(json.loads(response.data)['job']['progress']['shards_total'], 3)
+    
+    def test_start_batch_ndjson(self):
+        """Test submitting a batch of URLs as NDJSON."""
+        body = '\n'.join([
+            json.dumps('https://www.depop.com/products/a'),
+            json.dumps({'url': 'https://www.depop.com/products/b'}),
+            ''
+        ])
+        response = self.client.post('/api/scraping/batch?merchant=depop',
+            data=body,
+            headers={'Authorization': f'Bearer {self.token}', 'Content-Type': 'application/x-ndjson'}
+        )
+        
+        self.assertEqual(response.status_code, 202)
+        data = json.loads(response.data)
+        self.assertEqual(data['job']['total_urls'], 2)
+        self.assertEqual(data['job']['merchant'], 'depop')
+        
+        response = self.client.post('/api/scraping/batch',
+            data='{not json',
+            headers={'Authorization': f'Bearer {self.token}', 'Content-Type': 'application/x-ndjson'}
+        )
+        self.assertEqual(response.status_code, 400)
+    
+    def test_start_scraping_idempotency_key(self):
+        """Test that retrying with the same Idempotency-Key returns the original job."""
+        headers = dict(self.headers, **{'Idempotency-Key': 'retry-123'})
+        body = json.dumps({'url': 'https://example.com/shop', 'pages': 2})
+        
+        first = self.client.post('/api/scraping/scrape', data=body, headers=headers)
+        second = self.client.post('/api/scraping/scrape', data=body, headers=headers)
+        
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.headers['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(first.data)['job']['id'], json.loads(second.data)['job']['id'])
+        
+        response = self.client.get('/api/scraping/jobs', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['total'], 1)
+        
+        response = self.client.post('/api/scraping/scrape',
+            data=json.dumps({'url': 'https://example.com/other'}), headers=headers)
+        self.assertEqual(response.status_code, 422)
+    
+    def test_idempotency_key_race_rolled_back(self):
+        """Test a 409 when the key's insert conflicts but the other job is gone."""
+        headers = dict(self.headers, **{'Idempotency-Key': 'retry-456'})
+        body = json.dumps({'url': 'https://example.com/shop'})
+        
+        with patch.object(db.session, 'flush', side_effect=IntegrityError('INSERT', {}, Exception('unique'))):
+            response = self.client.post('/api/scraping/scrape', data=body, headers=headers)
+        self.assertEqual(response.status_code, 409, response.data)
+        
+        response = self.client.post('/api/scraping/scrape', data=body, headers=headers)
+        self.assertEqual(response.status_code, 202)
+    
+    def test_cancel_queued_job(self):
+        """Test cancelling a queued job removes it from the queue."""
+        response = self.client.post('/api/scraping/scrape',
+            data=json.dumps({'url': 'https://example.com/shop', 'timeout_seconds': 600}),
+            headers=self.headers
+        )
+        job = json.loads(response.data)['job']
+        self.assertEqual(job['timeout_seconds'], 600)
+        
+        response = self.client.post(f"/api/scraping/jobs/{job['id']}/cancel", headers=self.headers)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(json.loads(response.data)['job']['status'], 'cancelled')
+        
+        response = self.client.get('/api/scraping/queue', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['queue']['queued'], 0)
+        
+        response = self.client.post(f"/api/scraping/jobs/{job['id']}/cancel", headers=self.headers)
+        self.assertEqual(response.status_code, 409)
+    
+    def test_job_events_not_found(self):
+        """Test streaming events for another user's or missing job."""
+        response = self.client.get('/api/scraping/jobs/999/events', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
 
 
 if __name__ == '__main__':
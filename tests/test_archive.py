@@ -0,0 +1,205 @@
+"""
+Tests for hot/cold archival of sold items and finished jobs.
+"""
+
+import unittest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import (
+    db, User, DBInventoryItem, PriceHistory, ScrapeSchedule, ScrapingJob,
+    inventory_items_archive, price_history_archive, scraping_jobs_archive,
+)
+from backend.services.archive import archive_finished_jobs, purge_archived_jobs, run_archival
+from backend.services.bulk_writer import item_row, write_items
+from models import InventoryItem
+
+
+class ArchiveTestCase(unittest.TestCase):
+    """Common setup: one user with a few items and jobs."""
+
+    def setUp(self):
+        """Set up test client, database and a user."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'archivist', 'email': 'archivist@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='archivist').one().id
+        self.now = datetime.utcnow()
+        self.old = self.now - timedelta(days=200)
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def get(self, path):
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data)
+
+    def count(self, table):
+        return db.session.execute(select(func.count()).select_from(table)).scalar()
+
+
+class TestItemArchival(ArchiveTestCase):
+    """Test moving sold items out of the hot table."""
+
+    def setUp(self):
+        """Add an old sold item, a recently sold one and unsold ones."""
+        super().setUp()
+        write_items([
+            item_row(InventoryItem(title=f'{title} jacket', price=price, merchant='Shop', sku=title), self.user_id)
+            for title, price in (('Suede', 80.0), ('Denim', 40.0), ('Leather', 120.0), ('Wool', 60.0))
+        ])
+        self.items = {item.sku: item for item in DBInventoryItem.query.all()}
+        response = self.client.put(f"/api/inventory/{self.items['Suede'].id}", headers=self.headers,
+                                   data=json.dumps({'tags': 'vintage, outerwear', 'price': 75.0}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.data)
+
+        db.session.execute(update(DBInventoryItem).where(DBInventoryItem.sku.in_(['Suede', 'Denim']))
+                           .values(is_sold=True))
+        db.session.execute(update(DBInventoryItem).where(DBInventoryItem.sku == 'Suede')
+                           .values(updated_at=self.old))
+        db.session.commit()
+        self.suede_id = self.items['Suede'].id
+
+        self.assertEqual(run_archival(self.now), {'items_archived': 1, 'jobs_archived': 0, 'jobs_purged': 0})
+
+    def test_moved(self):
+        """Test that only the old sold item moves, with its price history."""
+        self.assertIsNone(db.session.get(DBInventoryItem, self.suede_id))
+        self.assertEqual(DBInventoryItem.query.count(), 3)
+        self.assertEqual(db.session.execute(select(inventory_items_archive.c.title)).scalars().all(),
+                         ['Suede jacket'])
+        self.assertEqual(PriceHistory.query.filter_by(item_id=self.suede_id).count(), 0)
+        self.assertEqual(self.count(price_history_archive), 2)
+
+    def test_hidden_unless_asked(self):
+        """Test that list, detail and stats include archived items only with include_archived=true."""
+        self.assertEqual(self.get('/api/inventory')['total'], 3)
+        self.assertEqual(self.client.get(f'/api/inventory/{self.suede_id}', headers=self.headers).status_code, 404)
+        self.assertEqual(self.get('/api/stats')['total_items'], 3)
+
+        listed = self.get('/api/inventory?include_archived=true&sort_by=price&sort_order=desc')
+        self.assertEqual([item['sku'] for item in listed['items']], ['Leather', 'Suede', 'Wool', 'Denim'])
+        self.assertEqual(self.get(f'/api/inventory/{self.suede_id}?include_archived=true')['item']['price'], 75.0)
+
+        stats = self.get('/api/stats?include_archived=true')
+        self.assertEqual((stats['total_items'], stats['sold_items']), (4, 2))
+
+    def test_cursor_search_and_tags(self):
+        """Test that cursor pages, search and tag filters cover archived items."""
+        page = self.get('/api/inventory?include_archived=true&cursor=&per_page=3&sort_by=price&total=exact')
+        rest = self.get(f"/api/inventory?include_archived=true&cursor={page['next_cursor']}&per_page=3&sort_by=price")
+        self.assertEqual(page['total'], 4)
+        self.assertEqual(len(page['items']) + len(rest['items']), 4)
+
+        self.assertEqual(self.get('/api/inventory?search=sued')['total'], 0)
+        found = self.get('/api/inventory?search=sued&include_archived=true')
+        self.assertEqual([item['sku'] for item in found['items']], ['Suede'])
+
+        self.assertEqual(self.get('/api/inventory?tag=vintage')['total'], 0)
+        tagged = self.get('/api/inventory?tag=vintage&tag=outerwear&include_archived=true')
+        self.assertEqual([item['sku'] for item in tagged['items']], ['Suede'])
+
+    def test_history(self):
+        """Test that an archived item's history is served from the archive."""
+        path = f'/api/inventory/{self.suede_id}/history'
+        self.assertEqual(self.client.get(path, headers=self.headers).status_code, 404)
+        history = self.get(f'{path}?include_archived=true')['history']
+        self.assertEqual([point['price'] for point in history], [80.0, 75.0])
+
+    def test_ids_not_reused(self):
+        """Test that a new item never gets an archived item's id, even once the hot table is emptied."""
+        hot_ids = [item.id for item in DBInventoryItem.query]
+        response = self.client.post('/api/inventory/bulk-delete', headers=self.headers,
+                                    data=json.dumps({'item_ids': hot_ids}), content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(DBInventoryItem.query.count(), 0)
+
+        write_items([item_row(InventoryItem(title='Cotton shirt', price=20.0, merchant='Shop', sku='Cotton'),
+                              self.user_id)])
+        self.assertGreater(DBInventoryItem.query.one().id, max(hot_ids + [self.suede_id]))
+
+        listed = self.get('/api/inventory?include_archived=true&sort_by=price&sort_order=asc')
+        self.assertEqual([item['sku'] for item in listed['items']], ['Cotton', 'Suede'])
+        history = self.get(f'/api/inventory/{self.suede_id}/history?include_archived=true')['history']
+        self.assertEqual([point['price'] for point in history], [80.0, 75.0])
+
+
+class TestJobArchival(ArchiveTestCase):
+    """Test moving finished jobs to the archive and job retention."""
+
+    def add_job(self, status='completed', finished=None, **fields):
+        job = ScrapingJob(user_id=self.user_id, url='https://example.com/shop', merchant='Shop',
+                          status=status, completed_at=finished or self.old, created_at=finished or self.old,
+                          **fields)
+        db.session.add(job)
+        db.session.flush()
+        return job
+
+    def test_archive_jobs(self):
+        """Test which jobs move, and that items lose the link to archived jobs."""
+        done = self.add_job()
+        batch = self.add_job(kind='batch')
+        self.add_job(kind='batch_shard', parent_id=batch.id)
+        running = self.add_job(kind='batch')
+        self.add_job(kind='batch_shard', parent_id=running.id, status='running')
+        latest = self.add_job()
+        db.session.add(ScrapeSchedule(user_id=self.user_id, url='https://example.com/shop', merchant='Shop',
+                                      interval_seconds=3600, last_job_id=latest.id))
+        self.add_job(finished=self.now)
+        done_id, batch_id = done.id, batch.id
+        db.session.commit()
+        write_items([item_row(InventoryItem(title='Scraped', price=5.0, merchant='Shop', sku='1'),
+                              self.user_id, done_id)])
+
+        self.assertEqual(archive_finished_jobs(self.now - timedelta(days=30), self.now), 3)
+        self.assertEqual(sorted(db.session.execute(select(scraping_jobs_archive.c.id)).scalars()),
+                         [done_id, batch_id, batch_id + 1])
+        self.assertIsNone(DBInventoryItem.query.one().scraping_job_id)
+        self.assertEqual(ScrapingJob.query.count(), 4)
+
+        self.assertEqual(self.get('/api/scraping/jobs')['total'], 3)
+        self.assertEqual(self.get('/api/scraping/jobs?include_archived=true')['total'], 5)
+        job = self.get(f'/api/scraping/jobs/{batch_id}?include_archived=true')['job']
+        self.assertEqual(job['progress']['shards_total'], 1)
+        self.assertEqual(self.get('/api/stats?include_archived=true')['total_scraping_jobs'], 7)
+
+        self.assertEqual(purge_archived_jobs(self.now - timedelta(days=100)), 3)
+        self.assertEqual(self.count(scraping_jobs_archive), 0)
+
+    def test_disabled_policies(self):
+        """Test that a policy set to 0 days does nothing, and the CLI reports the counts."""
+        self.add_job()
+        self.add_job(finished=self.now)
+        db.session.commit()
+        self.app.config.update(ARCHIVE_JOBS_AFTER_DAYS=0)
+        self.assertEqual(run_archival(self.now)['jobs_archived'], 0)
+
+        self.app.config.update(ARCHIVE_JOBS_AFTER_DAYS=30)
+        result = self.app.test_cli_runner().invoke(args=['archive'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('1 jobs', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+"""
+Tests for set-based bulk updates of inventory items.
+"""
+
+import unittest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.price_history import item_history
+from models import InventoryItem
+
+
+class TestBulkUpdateAPI(unittest.TestCase):
+    """Test PATCH /api/inventory/bulk."""
+
+    def setUp(self):
+        """Set up test client, database and two users with items."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user_ids = []
+        for name in ('seller', 'other'):
+            response = self.client.post('/api/auth/register',
+                data=json.dumps({'username': name, 'email': f'{name}@example.com', 'password': 'password123'}),
+                content_type='application/json'
+            )
+            if name == 'seller':
+                self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+            user_ids.append(User.query.filter_by(username=name).one().id)
+        self.user_id, other_id = user_ids
+
+        write_items([
+            item_row(InventoryItem(title=f'Item {i}', price=float(i), sku=str(i),
+                                   merchant='Mercari' if i % 2 else 'Depop'), self.user_id)
+            for i in range(2500)
+        ])
+        write_items([item_row(InventoryItem(title='Theirs', price=1.0, sku='x', merchant='Depop'), other_id)])
+        self.other_item_id = DBInventoryItem.query.filter_by(user_id=other_id).one().id
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def patch(self, body):
+        return self.client.patch('/api/inventory/bulk', data=json.dumps(body),
+                                 content_type='application/json', headers=self.headers)
+
+    def test_filter(self):
+        """Test updating every item a filter matches, in chunks of UPDATE statements."""
+        statements = []
+
+        def count_updates(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith('UPDATE inventory_items'):
+                statements.append(len(parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', count_updates)
+        try:
+            response = self.patch({'filter': {'merchant': 'Depop', 'is_sold': False},
+                                   'updates': {'is_sold': True, 'tags': 'sold, Spring'}})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_updates)
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(json.loads(response.data)['updated'], 1250)
+        self.assertEqual(len(statements), 2)
+        self.assertTrue(all(count <= 999 for count in statements))
+
+        self.assertEqual(DBInventoryItem.query.filter_by(user_id=self.user_id, is_sold=True).count(), 1250)
+        self.assertEqual(DBInventoryItem.query.filter_by(merchant='Depop', sku='4').one().tags, 'sold,spring')
+        self.assertEqual(db.session.get(DBInventoryItem, self.other_item_id).is_sold, False)
+
+        response = self.client.get('/api/inventory?tag=spring&per_page=1', headers=self.headers)
+        self.assertEqual(json.loads(response.data)['total'], 1250)
+
+    def test_item_ids(self):
+        """Test that only the user's listed items are repriced, with price history."""
+        ids = [item.id for item in DBInventoryItem.query.filter(DBInventoryItem.sku.in_(['1', '2']))]
+        response = self.patch({'item_ids': ids + [self.other_item_id, 999999],
+                               'updates': {'price': '9.5', 'condition': 'used', 'tags': 'a'}})
+        self.assertEqual(json.loads(response.data)['updated'], 2)
+
+        item = db.session.get(DBInventoryItem, ids[0])
+        self.assertEqual((item.price, item.condition, item.tags), (9.5, 'used', 'a'))
+        self.assertEqual([point.price for point in item_history(ids[0])][-1], 9.5)
+        self.assertEqual(db.session.get(DBInventoryItem, self.other_item_id).price, 1.0)
+
+        # Clearing tags
+        self.patch({'item_ids': ids, 'updates': {'tags': None}})
+        self.assertIsNone(db.session.get(DBInventoryItem, ids[0]).tags)
+
+    def test_validation(self):
+        """Test that invalid requests are rejected as PUT rejects them, updating nothing."""
+        for body in ({'item_ids': [1], 'updates': {'price': 'cheap'}},
+                     {'item_ids': [1], 'updates': {'quantity': 'many'}},
+                     {'item_ids': [1], 'updates': {'unknown': 1}},
+                     {'item_ids': [], 'updates': {'is_sold': True}},
+                     {'item_ids': ['one'], 'updates': {'is_sold': True}},
+                     {'updates': {'is_sold': True}},
+                     {'item_ids': [1]},
+                     {'filter': {}, 'updates': {'is_sold': True}},
+                     {'filter': {'merchnt': 'Depop'}, 'updates': {'is_sold': True}},
+                     {'filter': {'merchant': '', 'tag': []}, 'updates': {'is_sold': True}},
+                     {'filter': {'include_archived': True}, 'updates': {'is_sold': True}},
+                     {'filter': {'all': False}, 'updates': {'is_sold': True}},
+                     {'filter': {'max_price': 'cheap'}, 'updates': {'is_sold': True}}):
+            self.assertEqual(self.patch(body).status_code, 400, body)
+        self.assertEqual(DBInventoryItem.query.filter_by(is_sold=True).count(), 0)
+
+    def test_all(self):
+        """Test that every item of the user is updated only with an explicit "all": true."""
+        response = self.patch({'filter': {'all': True}, 'updates': {'condition': 'used'}})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(json.loads(response.data)['updated'],
+                         DBInventoryItem.query.filter_by(user_id=self.user_id).count())
+        self.assertNotEqual(db.session.get(DBInventoryItem, self.other_item_id).condition, 'used')
+
+
+if __name__ == '__main__':
+    unittest.main()
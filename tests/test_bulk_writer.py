@@ -0,0 +1,166 @@
+"""
+Tests for bulk persistence of scraped items.
+"""
+
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem
+from backend.services.bulk_writer import (
+    COPY_NULL, _copy_value, backfill_listing_identity, content_hash, item_row, listing_key, write_items
+)
+from models import InventoryItem
+
+
+class TestBulkWriter(unittest.TestCase):
+    """Test cases for the chunked item writer."""
+
+    def setUp(self):
+        """Set up app, database and user."""
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='bulk', email='bulk@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_rows(self, count):
+        return [
+            item_row(InventoryItem(title=f'Item {i}', price=float(i), merchant='Shop',
+                                   product_url=f'https://example.com/item/{i}',
+                                   custom_fields={'size': 'M'}), self.user_id)
+            for i in range(count)
+        ]
+
+    def test_writes_in_chunks(self):
+        """Test that rows are written and committed chunk by chunk."""
+        chunks = []
+        written = write_items(self.make_rows(25), chunk_size=10, on_chunk=lambda chunk: chunks.append(len(chunk)))
+
+        self.assertEqual(written, 25)
+        self.assertEqual(chunks, [10, 10, 5])
+        self.assertEqual(DBInventoryItem.query.count(), 25)
+        self.assertFalse(any(isinstance(obj, DBInventoryItem) for obj in db.session.identity_map.values()))
+
+        item = DBInventoryItem.query.filter_by(title='Item 3').one()
+        self.assertEqual(item.price, 3.0)
+        self.assertEqual(item.custom_fields, {'size': 'M'})
+        self.assertFalse(item.is_sold)
+        self.assertTrue(item.in_stock)
+
+    def test_rescrape_upserts_changed_listings_only(self):
+        """Test that re-scraping updates changed listings and skips unchanged ones."""
+        item = InventoryItem(title='Boots', price=40.0, merchant='Shop',
+                             product_url='https://example.com/item/1?utm_source=feed')
+        self.assertEqual(write_items([item_row(item, self.user_id)]), 1)
+
+        row = DBInventoryItem.query.one()
+        row.notes = 'keep me'
+        row.updated_at = datetime(2026, 1, 1)
+        db.session.commit()
+
+        # Same content, equivalent URL: no write
+        same = InventoryItem(title='Boots', price=40.0, merchant='Shop',
+                             product_url='https://example.com/item/1')
+        self.assertEqual(write_items([item_row(same, self.user_id)]), 0)
+        db.session.refresh(row)
+        self.assertEqual(row.updated_at, datetime(2026, 1, 1))
+
+        # Price drop: updated in place, user notes kept
+        cheaper = InventoryItem(title='Boots', price=35.0, merchant='Shop',
+                                product_url='https://example.com/item/1')
+        self.assertEqual(write_items([item_row(cheaper, self.user_id)]), 1)
+        db.session.refresh(row)
+        self.assertEqual(DBInventoryItem.query.count(), 1)
+        self.assertEqual(row.price, 35.0)
+        self.assertEqual(row.notes, 'keep me')
+        self.assertGreater(row.updated_at, datetime(2026, 1, 1))
+
+    def test_refresh_before(self):
+        """Test that an unchanged re-scrape moves a stale scraped_at forward without rewriting the row."""
+        item = InventoryItem(title='Boots', price=40.0, merchant='Shop', sku='B1')
+        write_items([item_row(item, self.user_id, scraped_at=datetime(2026, 1, 1))])
+        row = DBInventoryItem.query.one()
+        updated_at = row.updated_at
+
+        self.assertEqual(write_items([item_row(item, self.user_id, scraped_at=datetime(2026, 1, 5))],
+                                     refresh_before=datetime(2025, 12, 30)), 0)
+        db.session.refresh(row)
+        self.assertEqual(row.scraped_at, datetime(2026, 1, 1))
+
+        write_items([item_row(item, self.user_id, scraped_at=datetime(2026, 1, 9))],
+                    refresh_before=datetime(2026, 1, 2))
+        db.session.refresh(row)
+        self.assertEqual((row.scraped_at, row.updated_at), (datetime(2026, 1, 9), updated_at))
+
+    def test_listing_identity(self):
+        """Test that the SKU wins over the URL and duplicates in one batch collapse."""
+        first = InventoryItem(title='A', sku='MERC-1', merchant='Mercari', product_url='https://x.com/1')
+        moved = InventoryItem(title='A', sku='MERC-1', merchant='Mercari', product_url='https://x.com/2')
+        self.assertEqual(listing_key(first), 'sku:MERC-1')
+        self.assertEqual(listing_key(InventoryItem(title='B')), None)
+        self.assertEqual(content_hash(InventoryItem(title=' Boots  ', price=1.001)),
+                         content_hash(InventoryItem(title='Boots', price=1.0)))
+
+        write_items([item_row(first, self.user_id), item_row(moved, self.user_id)])
+        self.assertEqual(DBInventoryItem.query.one().product_url, 'https://x.com/2')
+
+        # Items without any identity are always inserted
+        write_items([item_row(InventoryItem(title='B'), self.user_id) for _ in range(2)])
+        self.assertEqual(DBInventoryItem.query.count(), 3)
+
+    def test_backfill_listing_identity(self):
+        """Test that rows saved before listing keys existed are keyed, so re-scrapes update them."""
+        for day, sku in ((1, 'A'), (2, 'A'), (3, 'B')):
+            db.session.add(DBInventoryItem(user_id=self.user_id, title=f'Old {sku}', sku=sku, merchant='Shop',
+                                           price=10.0, scraped_at=datetime(2025, 1, day)))
+        db.session.add(DBInventoryItem(user_id=self.user_id, title='No identity', merchant='Shop'))
+        db.session.commit()
+        # B was re-scraped since: the keyed row keeps its key
+        write_items([item_row(InventoryItem(title='New B', sku='B', merchant='Shop'), self.user_id)])
+
+        self.assertEqual(backfill_listing_identity(db.session.connection(), batch_size=2), 1)
+        db.session.commit()
+        rows = DBInventoryItem.query.order_by(DBInventoryItem.id).all()
+        self.assertEqual([row.listing_key for row in rows], [None, 'sku:A', None, None, 'sku:B'])
+        self.assertTrue(all(row.content_hash for row in rows))
+
+        # Re-scraping the unchanged listing writes nothing; a changed one updates the newest row
+        self.assertEqual(write_items([item_row(InventoryItem(title='Old A', sku='A', merchant='Shop', price=10.0),
+                                               self.user_id)]), 0)
+        write_items([item_row(InventoryItem(title='Old A', sku='A', merchant='Shop', price=8.0), self.user_id)])
+        db.session.expire_all()
+        self.assertEqual(DBInventoryItem.query.count(), 5)
+        self.assertEqual(db.session.get(DBInventoryItem, rows[1].id).price, 8.0)
+
+    def test_empty(self):
+        """Test that nothing is written for no rows."""
+        self.assertEqual(write_items([]), 0)
+
+    def test_copy_values(self):
+        """Test COPY input formatting for NULLs, booleans and JSON."""
+        self.assertEqual(_copy_value(None), COPY_NULL)
+        self.assertEqual(_copy_value(''), '')
+        self.assertEqual(_copy_value(True), 't')
+        self.assertEqual(_copy_value({'a': 1}), '{"a": 1}')
+        self.assertEqual(_copy_value(datetime(2026, 1, 19, 12, 0)), '2026-01-19T12:00:00')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests for Parquet and Arrow output.
+"""
+
+import unittest
+import io
+import json
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from columnar import columnar_available, read_columnar, stream_columnar, write_columnar
+from models import InventoryItem, InventoryCollection
+
+
+@unittest.skipUnless(columnar_available(), 'pyarrow is not installed')
+class TestColumnar(unittest.TestCase):
+    """Test the columnar writers."""
+
+    def items(self, count):
+        return [
+            InventoryItem(title=f'Item {i}', price=float(i), merchant=('Mercari', 'Depop')[i % 2],
+                          brand=None if i % 3 else f'Brand {i // 3}', custom_fields={'size': i} if i else None,
+                          scraped_at='2024-01-15T10:30:00+00:00')
+            for i in range(count)
+        ]
+
+    def test_collection(self):
+        """Test InventoryCollection.save_to_parquet / save_to_arrow round trips."""
+        collection = InventoryCollection()
+        collection.add_items(self.items(5))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fmt in ('parquet', 'arrow'):
+                path = os.path.join(tmpdir, f'inventory.{fmt}')
+                getattr(collection, f'save_to_{fmt}')(path)
+                table = read_columnar(path, fmt)
+
+                self.assertEqual(table.num_rows, 5)
+                self.assertEqual(str(table.schema.field('merchant').type),
+                                 'dictionary<values=string, indices=int32, ordered=0>')
+                self.assertEqual(str(table.schema.field('scraped_at').type), 'timestamp[us, tz=UTC]')
+                rows = table.to_pylist()
+                self.assertEqual(rows[1]['merchant'], 'Depop')
+                self.assertEqual(json.loads(rows[1]['custom_fields']), {'size': 1})
+                self.assertIsNone(rows[0]['custom_fields'])
+                self.assertEqual(rows[0]['scraped_at'].isoformat(), '2024-01-15T10:30:00+00:00')
+
+    def test_batches_share_dictionaries(self):
+        """Test that values first seen in later batches decode correctly in both formats."""
+        items = [item.to_dict() for item in self.items(25)]
+        fields = ['title', 'merchant', 'brand']
+        for fmt in ('parquet', 'arrow'):
+            sink = io.BytesIO()
+            self.assertEqual(write_columnar(items, sink, fmt, fields, batch_size=4), 25)
+            sink.seek(0)
+            self.assertEqual(read_columnar(sink, fmt).to_pylist(),
+                             [{field: item[field] for field in fields} for item in items])
+
+            chunks = list(stream_columnar(iter(items), fmt, fields, batch_size=10))
+            self.assertGreater(len(chunks), 2)
+            self.assertEqual(read_columnar(io.BytesIO(b''.join(chunks)), fmt).num_rows, 25)
+
+    def test_export_endpoint(self):
+        """Test GET /api/inventory/export?format=parquet with the list filters."""
+        from backend.app import create_app
+        from backend.models import db, User
+        from backend.services.bulk_writer import item_row, write_items
+
+        app = create_app('testing')
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            response = client.post('/api/auth/register',
+                data=json.dumps({'username': 'analyst', 'email': 'analyst@example.com', 'password': 'password123'}),
+                content_type='application/json'
+            )
+            headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+            user_id = User.query.filter_by(username='analyst').one().id
+            write_items([item_row(item, user_id) for item in self.items(30)])
+
+            response = client.get('/api/inventory/export?format=parquet&merchant=Depop&fields=title,price,tags',
+                                  headers=headers)
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertEqual(response.mimetype, 'application/vnd.apache.parquet')
+            table = read_columnar(io.BytesIO(response.data), 'parquet')
+            self.assertEqual(table.column_names, ['id', 'title', 'price', 'tags'])
+            self.assertEqual(table.num_rows, 15)
+
+            response = client.get('/api/inventory/export?format=arrow', headers=headers)
+            self.assertEqual(read_columnar(io.BytesIO(response.data), 'arrow').num_rows, 30)
+
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
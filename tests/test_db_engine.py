@@ -0,0 +1,147 @@
+"""
+Tests for the database engine profile and maintenance.
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+from flask import Flask
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.models import db, User
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.db_engine import (
+    engine_options, init_db, init_db_maintenance, run_db_maintenance, start_db_maintenance, db_maintenance_command
+)
+from models import InventoryItem
+
+
+class TestEngineOptions(unittest.TestCase):
+    """Test engine options per database."""
+
+    def test_postgres_pool(self):
+        """Test that server databases get a sized, pre-pinged, recycled pool."""
+        options = engine_options({
+            'SQLALCHEMY_DATABASE_URI': 'postgresql+psycopg://user:pass@db/inventory',
+            'DB_POOL_SIZE': 5, 'DB_POOL_RECYCLE': 600
+        })
+        self.assertEqual(options['pool_size'], 5)
+        self.assertEqual(options['pool_recycle'], 600)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(options['query_cache_size'], 500)
+        self.assertEqual(options['connect_args'], {'prepare_threshold': 5})
+
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'postgresql://user:pass@db/inventory'})
+        self.assertNotIn('connect_args', options)
+
+    def test_sqlite(self):
+        """Test that SQLite caches statements and in-memory databases keep their pool."""
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'})
+        self.assertEqual(options, {'query_cache_size': 500, 'connect_args': {'cached_statements': 500}})
+
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:////tmp/inventory.db'})
+        self.assertEqual(options['pool_size'], 10)
+        self.assertNotIn('pool_pre_ping', options)
+
+    def test_explicit_options_win(self):
+        """Test that SQLALCHEMY_ENGINE_OPTIONS overrides the profile, and 'default' turns it off."""
+        options = engine_options({
+            'SQLALCHEMY_DATABASE_URI': 'postgresql://db/inventory',
+            'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 50}
+        })
+        self.assertEqual(options['pool_size'], 50)
+
+        options = engine_options({
+            'SQLALCHEMY_DATABASE_URI': 'postgresql://db/inventory',
+            'DB_ENGINE_PROFILE': 'default'
+        })
+        self.assertEqual(options, {})
+
+
+class TestSQLiteProfile(unittest.TestCase):
+    """Test PRAGMAs and maintenance on a SQLite file."""
+
+    def setUp(self):
+        """Create an app on a temporary SQLite file."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config.update(
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(self.tmpdir.name, 'test.db')}",
+            SQLALCHEMY_TRACK_MODIFICATIONS=False,
+            SQLITE_BUSY_TIMEOUT_MS=2500
+        )
+        init_db(self.app)
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Drop the database and remove the file."""
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.ctx.pop()
+        self.tmpdir.cleanup()
+
+    def pragma(self, name):
+        return db.session.execute(db.text(f'PRAGMA {name}')).scalar()
+
+    def test_pragmas(self):
+        """Test that every connection runs in WAL mode with the profile's settings."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 2500)
+        self.assertEqual(self.pragma('mmap_size'), 256 * 1024 * 1024)
+
+    def test_maintenance(self):
+        """Test that maintenance gathers statistics, and vacuums once enough space is free."""
+        user = User(username='maint', email='maint@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        write_items([item_row(InventoryItem(title=f'Item {i}', price=1.0, merchant='Shop', sku=str(i),
+                                            description='x' * 500), user.id) for i in range(500)])
+
+        self.assertEqual(run_db_maintenance(), ['analyze', 'fts optimize', 'checkpoint'])
+        self.assertGreater(db.session.execute(db.text('SELECT count(*) FROM sqlite_stat1')).scalar(), 0)
+
+        db.session.execute(db.text('DELETE FROM inventory_items'))
+        db.session.commit()
+        db.session.remove()
+        self.assertIn('vacuum', run_db_maintenance())
+        self.assertEqual(self.pragma('freelist_count'), 0)
+
+    def test_runner_started_explicitly(self):
+        """Test that setting up the maintenance runner does not start its thread."""
+        runner = init_db_maintenance(self.app)
+        self.assertIsNone(runner._thread)
+
+        start_db_maintenance(self.app)
+        self.assertTrue(runner._thread.is_alive())
+        runner.stop()
+        runner._thread.join(timeout=5)
+
+    def test_maintenance_pass(self):
+        """Test that a background pass archives and compacts price history before maintenance."""
+        runner = init_db_maintenance(self.app)
+        with patch('backend.services.db_engine.run_archival') as archive, \
+                patch('backend.services.db_engine.compact_price_history') as compact:
+            self.assertIn('analyze', runner.run_once())
+        archive.assert_called_once_with()
+        compact.assert_called_once_with()
+
+    def test_cli(self):
+        """Test the flask db-maintenance command."""
+        self.app.cli.add_command(db_maintenance_command)
+        result = self.app.test_cli_runner().invoke(args=['db-maintenance', '--vacuum'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('vacuum', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+"""
+Tests for the streaming inventory export.
+"""
+
+import unittest
+import csv
+import io
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.export import serialize
+from models import InventoryItem
+
+
+class TestSerialize(unittest.TestCase):
+    """Test the export serializers."""
+
+    items = [
+        {'id': 1, 'title': 'Boots, leather', 'tags': ['vintage', 'boots'], 'custom_fields': {'size': 9}},
+        {'id': 2, 'title': 'Scarf', 'tags': [], 'custom_fields': None},
+    ]
+    fields = ['id', 'title', 'tags', 'custom_fields']
+
+    def test_formats(self):
+        """Test CSV quoting and cell encoding, the JSON array and NDJSON lines."""
+        rows = list(csv.reader(io.StringIO(''.join(serialize(iter(self.items), 'csv', self.fields)))))
+        self.assertEqual(rows, [self.fields, ['1', 'Boots, leather', 'vintage,boots', '{"size": 9}'],
+                                ['2', 'Scarf', '', '']])
+
+        self.assertEqual(json.loads(''.join(serialize(iter(self.items), 'json', self.fields))), self.items)
+        self.assertEqual(json.loads(''.join(serialize(iter([]), 'json', self.fields))), [])
+
+        lines = ''.join(serialize(iter(self.items), 'ndjson', self.fields)).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], self.items)
+
+    def test_csv_formulas(self):
+        """Test that text cells a spreadsheet would run as a formula are escaped, and numbers are not."""
+        items = [{'id': 1, 'title': '=HYPERLINK("http://evil")', 'price': -5.0, 'tags': ['@x', 'y']},
+                 {'id': 2, 'title': '+1 boots', 'price': 5.0, 'tags': ['-y']},
+                 {'id': 3, 'title': 'Boots = good', 'price': None, 'tags': []}]
+        rows = list(csv.reader(io.StringIO(''.join(serialize(iter(items), 'csv', ['title', 'price', 'tags'])))))
+        self.assertEqual(rows[1:], [["'=HYPERLINK(\"http://evil\")", '-5.0', "'@x,y"],
+                                    ["'+1 boots", '5.0', "'-y"],
+                                    ['Boots = good', '', '']])
+
+    def test_chunks(self):
+        """Test that output is produced lazily, in chunks of about chunk_size."""
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield {'id': i, 'title': 'x' * 20}
+
+        chunks = serialize(items(), 'ndjson', ['id', 'title'], chunk_size=200)
+        first = next(chunks)
+        self.assertGreaterEqual(len(first), 200)
+        self.assertLess(len(consumed), 100)
+        self.assertGreater(len(list(chunks)), 5)
+
+
+class TestExportAPI(unittest.TestCase):
+    """Test GET /api/inventory/export."""
+
+    def setUp(self):
+        """Set up test client, database and a user with items."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'exporter', 'email': 'exporter@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.token = json.loads(response.data)['access_token']
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+        user_id = User.query.filter_by(username='exporter').one().id
+        write_items([
+            item_row(InventoryItem(title=f'Item {i}', price=float(i), sku=str(i),
+                                   merchant='Mercari' if i % 2 else 'Depop'), user_id)
+            for i in range(2500)
+        ])
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def export(self, query, **kwargs):
+        response = self.client.get(f'/api/inventory/export?{query}', headers=self.headers, **kwargs)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_csv(self):
+        """Test a filtered, sorted CSV export of selected fields."""
+        response = self.export('merchant=Depop&max_price=10&sort_by=price&sort_order=asc&fields=title,price')
+        self.assertEqual(response.mimetype, 'text/csv')
+        self.assertIn('attachment; filename="inventory_', response.headers['Content-Disposition'])
+
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        self.assertEqual([row['title'] for row in rows], [f'Item {i}' for i in range(0, 11, 2)])
+        self.assertEqual(set(rows[0]), {'id', 'title', 'price'})
+
+    def test_json_and_ndjson(self):
+        """Test that every item is exported, in the list endpoint's shape."""
+        items = json.loads(self.export('format=json').get_data(as_text=True))
+        self.assertEqual(len(items), 2500)
+        listed = json.loads(self.client.get('/api/inventory?per_page=1', headers=self.headers).data)['items'][0]
+        self.assertEqual(items[0], listed)
+
+        lines = self.export('format=ndjson&search=item').get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 2500)
+
+    def test_token_in_query_string(self):
+        """Test that download links need a short-lived export token, which opens nothing else."""
+        response = self.client.get(f'/api/inventory/export?format=ndjson&jwt={self.token}')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/inventory/export-token', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.data)
+        data = json.loads(response.data)
+        self.assertEqual(data['expires_in'], 60)
+
+        response = self.client.get(f"/api/inventory/export?format=ndjson&merchant=Mercari&jwt={data['token']}")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(len(response.get_data(as_text=True).splitlines()), 1250)
+
+        export_headers = {'Authorization': f"Bearer {data['token']}"}
+        self.assertEqual(self.client.get('/api/inventory', headers=export_headers).status_code, 400)
+        self.assertEqual(self.client.post('/api/inventory/export-token', headers=export_headers).status_code, 400)
+
+        response = self.client.get('/api/inventory/export?format=xml', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Tests for request coalescing and the shared fetch caches.
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fetch_cache import SingleFlight, TTLCache, canonical_url, listing_cache, page_cache
+from generic_scraper import GenericEcommerceScraper
+from models import InventoryItem
+
+
+class TestCanonicalUrl(unittest.TestCase):
+    """Test cases for URL canonicalization."""
+
+    def test_equivalent_urls_match(self):
+        """Test that case, port, fragment, param order and tracking params are ignored."""
+        self.assertEqual(
+            canonical_url('HTTPS://WWW.Mercari.com:443/search/?keyword=shoes&page=2&utm_source=x#top'),
+            canonical_url('https://www.mercari.com/search/?page=2&keyword=shoes')
+        )
+
+    def test_different_pages_differ(self):
+        """Test that meaningful query parameters are kept."""
+        self.assertNotEqual(
+            canonical_url('https://www.mercari.com/search/?keyword=shoes&page=1'),
+            canonical_url('https://www.mercari.com/search/?keyword=shoes&page=2')
+        )
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for single-flight request coalescing."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that callers arriving during a fetch wait for its result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return 'html'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', fetch, poll_interval=0.01)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while flight.coalesced < 4:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['html'] * 5)
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_errors_are_shared_and_not_remembered(self):
+        """Test that a failed call raises for its waiters but the next call runs again."""
+        flight = SingleFlight()
+        with self.assertRaises(RuntimeError):
+            flight.do('key', lambda: (_ for _ in ()).throw(RuntimeError('boom')))
+        self.assertEqual(flight.do('key', lambda: 'ok'), 'ok')
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for the TTL cache."""
+
+    def test_expiry_and_eviction(self):
+        """Test that entries expire and the least recently used entry is evicted."""
+        cache = TTLCache(ttl=60, max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+        with patch('fetch_cache.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertIsNone(cache.get('a'))
+
+
+class TestScraperCaching(unittest.TestCase):
+    """Test cases for shared results in BaseScraper."""
+
+    def setUp(self):
+        page_cache.clear()
+        listing_cache.clear()
+        self.scraper = GenericEcommerceScraper(merchant_name='Shop')
+
+    def tearDown(self):
+        page_cache.clear()
+        listing_cache.clear()
+        self.scraper.cleanup()
+
+    def test_page_fetched_once_within_ttl(self):
+        """Test that equivalent URLs reuse the cached page."""
+        with patch.object(self.scraper, '_get_html_requests', return_value='<html></html>') as fetch:
+            self.scraper._get_html('https://example.com/shop?b=2&a=1')
+            self.scraper._get_html('https://example.com/shop?a=1&b=2#reviews')
+        fetch.assert_called_once()
+
+    def test_listing_cache_returns_copies(self):
+        """Test that cached listings are shared but callers get their own copies."""
+        item = InventoryItem(title='Boots', price=40.0, product_url='https://example.com/item/1')
+        with patch.object(self.scraper, 'scrape_listing', return_value=[item]) as scrape:
+            first = self.scraper.scrape_listing_cached('https://example.com/item/1')
+            first[0].price = 1.0
+            second = self.scraper.scrape_listing_cached('https://example.com/item/1')
+
+        scrape.assert_called_once()
+        self.assertEqual(second[0].price, 40.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
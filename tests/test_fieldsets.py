@@ -0,0 +1,112 @@
+"""
+Tests for sparse fieldsets on list endpoints.
+"""
+
+import unittest
+import json
+import sys
+import os
+
+from sqlalchemy import event
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem
+from backend.services.bulk_writer import item_row, write_items
+from backend.utils.fieldsets import FieldsetError, parse_fields
+from models import InventoryItem
+
+
+class TestParseFields(unittest.TestCase):
+    """Test cases for fields parameter parsing."""
+
+    def test_parse(self):
+        """Test that fields keep model order and always include id."""
+        self.assertEqual(parse_fields('price, title,price', DBInventoryItem.DICT_FIELDS), ('id', 'title', 'price'))
+        self.assertIsNone(parse_fields(None, DBInventoryItem.DICT_FIELDS))
+        self.assertIsNone(parse_fields(' ', DBInventoryItem.DICT_FIELDS))
+
+    def test_unknown_field(self):
+        """Test that unknown and non-column names are rejected."""
+        with self.assertRaises(FieldsetError):
+            parse_fields('title,password_hash', DBInventoryItem.DICT_FIELDS)
+
+
+class TestFieldsetsAPI(unittest.TestCase):
+    """Test the fields parameter on inventory and stats."""
+
+    def setUp(self):
+        """Set up test client, database and an item with heavy columns."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'sparse', 'email': 'sparse@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        user_id = User.query.filter_by(username='sparse').one().id
+        write_items([item_row(InventoryItem(title='Boots', price=40.0, merchant='Shop', sku='1',
+                                            description='x' * 5000, custom_fields={'size': 9}), user_id)])
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.capture)
+
+    def tearDown(self):
+        """Clean up database."""
+        event.remove(db.engine, 'before_cursor_execute', self.capture)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and 'inventory_items' in statement:
+            self.statements.append(statement)
+
+    def get(self, path, status=200):
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, status, response.data)
+        return json.loads(response.data)
+
+    def test_inventory_fields(self):
+        """Test that only the requested columns are selected and returned."""
+        data = self.get('/api/inventory?fields=title,price,is_sold')
+        self.assertEqual(data['items'], [{'id': 1, 'title': 'Boots', 'price': 40.0, 'is_sold': False}])
+        self.assertEqual(data['total'], 1)
+        rows = [statement for statement in self.statements if 'count(*)' not in statement]
+        self.assertEqual(len(rows), 1)
+        for statement in rows:
+            self.assertNotIn('description', statement)
+            self.assertNotIn('custom_fields', statement)
+
+    def test_inventory_fields_with_cursor_and_search(self):
+        """Test that fieldsets compose with cursor mode and search."""
+        data = self.get('/api/inventory?fields=title&cursor=&search=boots&sort_by=price')
+        self.assertEqual(data['items'], [{'id': 1, 'title': 'Boots'}])
+
+    def test_default_returns_everything(self):
+        """Test that requests without fields are unchanged."""
+        item = self.get('/api/inventory')['items'][0]
+        self.assertEqual(set(item), set(DBInventoryItem.DICT_FIELDS))
+        self.assertEqual(item['custom_fields'], {'size': 9})
+        self.assertEqual(item['tags'], [])
+
+    def test_stats_recent_items_fields(self):
+        """Test that fields applies to the recent items in stats."""
+        data = self.get('/api/stats?fields=title,merchant')
+        self.assertEqual(data['recent_items'], [{'id': 1, 'title': 'Boots', 'merchant': 'Shop'}])
+        self.assertEqual(data['total_items'], 1)
+
+    def test_unknown_field(self):
+        """Test that unknown fields are a 400."""
+        self.assertIn('nope', self.get('/api/inventory?fields=title,nope', status=400)['error'])
+        self.get('/api/stats?fields=nope', status=400)
+
+
+if __name__ == '__main__':
+    unittest.main()
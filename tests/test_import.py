@@ -0,0 +1,176 @@
+"""
+Tests for the streaming inventory import.
+"""
+
+import unittest
+import io
+import json
+import sys
+import os
+import tempfile
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem
+from backend.services.importer import ImportFormatError, detect_format, iter_records, normalize_record
+from models import InventoryItem, InventoryCollection
+
+
+class TestParsing(unittest.TestCase):
+    """Test the incremental decoders and record normalization."""
+
+    def records(self, data, fmt):
+        return [record for _, record in iter_records(io.BytesIO(data.encode('utf-8')), fmt)]
+
+    def test_json_array_across_reads(self):
+        """Test that elements split across read boundaries are decoded, one at a time."""
+        items = [{'title': 'x' * 50000, 'price': 12345}, {'title': 'b', 'price': 7}, 3]
+        self.assertEqual(self.records(json.dumps(items, indent=2), 'json'), items)
+        self.assertEqual(self.records(' [ ] ', 'json'), [])
+
+        for bad in ('', '{"title": "a"}', '[{"title": "a"} {"title": "b"}]', '[{"title": "a"},]',
+                    '[{"title": "a"}'):
+            with self.assertRaises(ImportFormatError, msg=bad):
+                self.records(bad, 'json')
+
+        # Elements before the error are still yielded
+        records = iter_records(io.BytesIO(b'[{"title": "a"}, {"title": '), 'json')
+        self.assertEqual(next(records), (1, {'title': 'a'}))
+        with self.assertRaises(ImportFormatError):
+            next(records)
+
+    def test_csv_and_ndjson(self):
+        """Test CSV with a BOM and NDJSON with blank and invalid lines."""
+        records = self.records('﻿title,price\r\n"Boots, leather",10\r\nScarf,\r\n', 'csv')
+        self.assertEqual(records, [{'title': 'Boots, leather', 'price': '10'}, {'title': 'Scarf', 'price': ''}])
+
+        records = self.records('{"title": "a"}\n\nnot json\n{"title": "b"}\n', 'ndjson')
+        self.assertEqual(records[0], {'title': 'a'})
+        self.assertIsInstance(records[1], ValueError)
+        self.assertEqual(records[2], {'title': 'b'})
+
+    def test_normalize(self):
+        """Test coercion of CSV strings and main.py's dict-repr custom_fields."""
+        item, scraped_at = normalize_record({
+            'title': ' Boots ', 'price': '$1,250.50', 'quantity': '2', 'in_stock': 'False',
+            'currency': 'eur', 'merchant': '', 'custom_fields': "{'size': 9}",
+            'scraped_at': '2024-01-15T10:30:00+02:00', 'id': 99, 'is_sold': True
+        }, default_merchant='Mercari')
+        self.assertEqual((item.title, item.price, item.quantity, item.in_stock), ('Boots', 1250.5, 2, False))
+        self.assertEqual((item.currency, item.merchant, item.condition), ('EUR', 'Mercari', 'new'))
+        self.assertEqual(item.custom_fields, {'size': 9})
+        self.assertEqual(scraped_at.isoformat(), '2024-01-15T08:30:00')
+
+        for record, message in (({'merchant': 'M'}, 'title'), ({'title': 'a'}, 'merchant'),
+                                ({'title': 'a', 'merchant': 'M', 'price': '-1'}, 'price'),
+                                ({'title': 'a', 'merchant': 'M', 'quantity': '1.5'}, 'quantity'),
+                                ({'title': 'a', 'merchant': 'M', 'in_stock': 'maybe'}, 'in_stock'),
+                                ([], 'object')):
+            with self.assertRaisesRegex(ValueError, message):
+                normalize_record(record)
+
+    def test_detect_format(self):
+        """Test format resolution from the query, file name and content type."""
+        self.assertEqual(detect_format('CSV', 'application/json'), 'csv')
+        self.assertIsNone(detect_format('xml'))
+        self.assertEqual(detect_format(None, 'application/octet-stream', 'inventory_1.jsonl'), 'ndjson')
+        self.assertEqual(detect_format(None, 'application/json'), 'json')
+        self.assertIsNone(detect_format(None, 'text/plain'))
+
+
+class TestImportAPI(unittest.TestCase):
+    """Test POST /api/inventory/import."""
+
+    def setUp(self):
+        """Set up test client, database and a user."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'importer', 'email': 'importer@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='importer').one().id
+
+        self.collection = InventoryCollection()
+        self.collection.add_items([
+            InventoryItem(title=f'Item {i}', price=float(i), sku=str(i), merchant='Mercari',
+                          custom_fields={'size': i} if i % 2 else None)
+            for i in range(250)
+        ])
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def saved(self, fmt):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, f'inventory.{fmt}')
+            getattr(self.collection, f'save_to_{fmt}')(path)
+            with open(path, 'rb') as f:
+                return f.read()
+
+    def test_main_outputs(self):
+        """Test importing main.py's JSON output as a body and its CSV output as a file upload."""
+        response = self.client.post('/api/inventory/import?batch_size=100', data=self.saved('json'),
+                                    content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.data)
+        summary = json.loads(response.data)
+        self.assertEqual((summary['records'], summary['imported'], summary['written']), (250, 250, 250))
+        self.assertEqual(DBInventoryItem.query.filter_by(user_id=self.user_id).count(), 250)
+        item = DBInventoryItem.query.filter_by(sku='3').one()
+        self.assertEqual((item.price, item.custom_fields), (3.0, {'size': 3}))
+
+        # Re-importing the same listings (as CSV) writes nothing
+        self.collection.items[5].price = 99.0
+        response = self.client.post('/api/inventory/import', headers=self.headers, data={
+            'file': (io.BytesIO(self.saved('csv')), 'inventory_20240115.csv')
+        })
+        summary = json.loads(response.data)
+        self.assertEqual((summary['imported'], summary['written']), (250, 1))
+        self.assertEqual(DBInventoryItem.query.filter_by(user_id=self.user_id).count(), 250)
+        self.assertEqual(DBInventoryItem.query.filter_by(sku='5').one().price, 99.0)
+
+    def test_progress_and_errors(self):
+        """Test NDJSON progress lines and per-record errors."""
+        lines = [json.dumps({'title': f'Row {i}', 'price': i}) for i in range(25)]
+        lines[3] = json.dumps({'price': 1})
+        lines[7] = '{broken'
+        response = self.client.post('/api/inventory/import?format=ndjson&progress=true&batch_size=10&merchant=Depop',
+                                    data='\n'.join(lines), headers=self.headers)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        updates = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([update['imported'] for update in updates], [10, 20, 23])
+        self.assertTrue(updates[-1]['done'])
+        self.assertEqual(updates[-1]['invalid'], 2)
+        self.assertEqual(updates[-1]['errors'], [{'record': 4, 'error': 'title is required'},
+                                                 {'record': 8, 'error': 'invalid JSON'}])
+        self.assertGreater(updates[-1]['bytes_read'], 0)
+        self.assertEqual(DBInventoryItem.query.filter_by(merchant='Depop').count(), 23)
+
+    def test_bad_uploads(self):
+        """Test unknown formats and undecodable uploads."""
+        response = self.client.post('/api/inventory/import', data='<items/>', content_type='text/xml',
+                                    headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post('/api/inventory/import', data='{"title": "a"}',
+                                    content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('array', json.loads(response.data)['error'])
+
+        response = self.client.post('/api/inventory/import', data={}, headers=self.headers,
+                                    content_type='multipart/form-data')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
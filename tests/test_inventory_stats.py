@@ -0,0 +1,161 @@
+"""
+Tests for the trigger-maintained inventory statistics summary.
+"""
+
+import unittest
+import json
+import sys
+import os
+
+from sqlalchemy import event, func
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, InventoryStats, ScrapingJob, PRICE_BUCKETS
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.inventory_stats import inventory_summary, rebuild_inventory_stats
+from models import InventoryItem
+
+
+def direct_summary(user_id):
+    """Aggregate a user's inventory straight from inventory_items."""
+    items = DBInventoryItem.query.filter_by(user_id=user_id).all()
+    by_merchant, by_condition, by_bucket = {}, {}, {}
+    for item in items:
+        by_merchant[item.merchant or ''] = by_merchant.get(item.merchant or '', 0) + 1
+        by_condition[item.condition or ''] = by_condition.get(item.condition or '', 0) + 1
+        for label, lower, upper in PRICE_BUCKETS:
+            if item.price is not None and item.price >= lower and (upper is None or item.price < upper):
+                by_bucket[label] = by_bucket.get(label, 0) + 1
+    sold = sum(1 for item in items if item.is_sold)
+    return {
+        'total_items': len(items),
+        'total_value': round(sum(item.price or 0 for item in items), 2),
+        'items_by_merchant': [{'merchant': m or 'Unknown', 'count': c} for m, c in sorted(by_merchant.items())],
+        'items_by_condition': [{'condition': c or 'unknown', 'count': n} for c, n in sorted(by_condition.items())],
+        'price_distribution': [{'range': label, 'count': by_bucket[label]}
+                               for label, _, _ in PRICE_BUCKETS if label in by_bucket],
+        'sold_items': sold,
+        'unsold_items': len(items) - sold
+    }
+
+
+class TestInventoryStats(unittest.TestCase):
+    """Test that every write path keeps the summary equal to a full recount."""
+
+    def setUp(self):
+        """Set up test client, database and a user."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'stats', 'email': 'stats@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='stats').one().id
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def assert_consistent(self):
+        db.session.expire_all()
+        self.assertEqual(inventory_summary(self.user_id), direct_summary(self.user_id))
+        self.assertEqual(db.session.query(func.count()).select_from(InventoryStats)
+                         .filter(InventoryStats.item_count <= 0).scalar(), 0)
+
+    def seed(self):
+        items = [
+            InventoryItem(title='Boots', price=40.0, merchant='Mercari', condition='used', sku='1'),
+            InventoryItem(title='Jacket', price=120.0, merchant='Depop', condition='new', sku='2'),
+            InventoryItem(title='Scarf', price=None, merchant=None, condition=None, sku='3'),
+            InventoryItem(title='Coat', price=300.0, merchant='Depop', condition='used', sku='4'),
+            InventoryItem(title='Refund', price=-5.0, merchant='Depop', condition='used', sku='5'),
+        ]
+        write_items([item_row(item, self.user_id) for item in items])
+
+    def test_bulk_upsert(self):
+        """Test inserts and changed/unchanged re-scrapes through the bulk writer."""
+        self.seed()
+        self.assert_consistent()
+        self.assertEqual(inventory_summary(self.user_id)['total_items'], 5)
+
+        write_items([
+            item_row(InventoryItem(title='Boots', price=40.0, merchant='Mercari', condition='used', sku='1'),
+                     self.user_id),
+            item_row(InventoryItem(title='Jacket', price=60.0, merchant='Depop', condition='used', sku='2'),
+                     self.user_id),
+        ])
+        self.assert_consistent()
+
+    def test_orm_updates_and_deletes(self):
+        """Test edits through the API and ORM, including moving between buckets."""
+        self.seed()
+        boots = DBInventoryItem.query.filter_by(sku='1').one()
+        for change in ({'price': 30.0}, {'price': 99.0, 'is_sold': True}, {'condition': 'like new'},
+                       {'notes': 'no stats change'}):
+            response = self.client.put(f'/api/inventory/{boots.id}', headers=self.headers,
+                                       data=json.dumps(change), content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assert_consistent()
+
+        db.session.add(DBInventoryItem(user_id=self.user_id, title='Hat', price=10.0, merchant='Etsy'))
+        db.session.commit()
+        self.assert_consistent()
+
+        for item in DBInventoryItem.query.filter_by(merchant='Depop').all():
+            self.client.delete(f'/api/inventory/{item.id}', headers=self.headers)
+        self.assert_consistent()
+        self.assertNotIn('Depop', [row['merchant'] for row in inventory_summary(self.user_id)['items_by_merchant']])
+
+    def test_rebuild(self):
+        """Test that a rebuild reproduces the incrementally maintained rows."""
+        self.seed()
+        before = sorted((row.merchant, row.condition, row.price_bucket, row.is_sold, row.item_count, row.total_value)
+                        for row in InventoryStats.query.all())
+        rebuild_inventory_stats()
+        after = sorted((row.merchant, row.condition, row.price_bucket, row.is_sold, row.item_count, row.total_value)
+                       for row in InventoryStats.query.all())
+        self.assertEqual(before, after)
+
+    def test_stats_endpoint_query_count(self):
+        """Test that the dashboard reads the summary, recent items and jobs in three queries."""
+        self.seed()
+        db.session.add(ScrapingJob(user_id=self.user_id, url='https://example.com', merchant='Shop',
+                                   status='completed'))
+        db.session.add(ScrapingJob(user_id=self.user_id, url='https://example.com', merchant='Shop'))
+        db.session.commit()
+
+        statements = []
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self.client.get('/api/stats', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(len(statements), 3)
+        self.assertEqual(data['total_items'], 5)
+        self.assertEqual(data['total_value'], 455.0)
+        self.assertEqual(data['price_distribution'], [
+            {'range': '25-50', 'count': 1}, {'range': '100-250', 'count': 1}, {'range': '250+', 'count': 1}
+        ])
+        self.assertEqual(data['total_scraping_jobs'], 2)
+        self.assertEqual(data['successful_scraping_jobs'], 1)
+        self.assertEqual(len(data['recent_items']), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
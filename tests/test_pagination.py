@@ -0,0 +1,168 @@
+"""
+Tests for keyset (cursor) pagination.
+"""
+
+import unittest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, ScrapingJob
+from backend.services.bulk_writer import item_row, write_items
+from backend.utils.pagination import CursorError, decode_cursor, encode_cursor
+from models import InventoryItem
+
+
+class TestCursorEncoding(unittest.TestCase):
+    """Test cases for cursor tokens."""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        self.ctx.pop()
+
+    def test_round_trip(self):
+        """Test that keys of each type survive encoding."""
+        for key in (datetime(2026, 3, 1, 12, 30, 5, 123), 19.99, 'Boots', None, -3.25):
+            self.assertEqual(decode_cursor(encode_cursor('k:desc', key, 7), 'k:desc'), (key, 7))
+
+    def test_tampered_or_mismatched(self):
+        """Test that edited cursors and cursors for another sort are rejected."""
+        cursor = encode_cursor('price:asc', 10.0, 3)
+        with self.assertRaises(CursorError):
+            decode_cursor(cursor[:-2] + 'xx', 'price:asc')
+        with self.assertRaises(CursorError):
+            decode_cursor(cursor, 'price:desc')
+        with self.assertRaises(CursorError):
+            decode_cursor('not-a-cursor', 'price:asc')
+
+
+class TestCursorPagination(unittest.TestCase):
+    """Test cursor mode on the list endpoints."""
+
+    def setUp(self):
+        """Set up test client, database and a user with inventory and jobs."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'pager', 'email': 'pager@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='pager').one().id
+
+        # Prices repeat and some are missing; every other pair shares a created_at
+        rows = []
+        base = datetime(2026, 1, 1)
+        for i in range(23):
+            price = None if i % 7 == 0 else float(i % 5)
+            row = item_row(InventoryItem(title=f'Boots {i:02d}' if i % 2 else f'Jacket {i:02d}', price=price,
+                                         sku=str(i), merchant='Shop'), self.user_id)
+            row['created_at'] = base + timedelta(minutes=i // 2)
+            rows.append(row)
+        write_items(rows)
+
+        for i in range(5):
+            db.session.add(ScrapingJob(user_id=self.user_id, url=f'https://example.com/{i}', merchant='Shop',
+                                       created_at=base + timedelta(minutes=i // 2)))
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def get(self, path, status=200):
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, status, response.data)
+        return json.loads(response.data)
+
+    def walk(self, path, key='items', per_page=4):
+        """Follow next_cursor to the end and return the ids in order."""
+        ids, cursor = [], ''
+        for _ in range(50):
+            data = self.get(f'{path}&per_page={per_page}&cursor={cursor}')
+            self.assertLessEqual(len(data[key]), per_page)
+            ids.extend(entry['id'] for entry in data[key])
+            if not data['has_next']:
+                self.assertIsNone(data['next_cursor'])
+                return ids
+            cursor = data['next_cursor']
+        self.fail('Pagination did not terminate')
+
+    def test_default_sort_matches_offset_mode(self):
+        """Test that cursor pages cover every item once, newest first, ties by id."""
+        ids = self.walk('/api/inventory?sort_by=created_at')
+        expected = [item.id for item in DBInventoryItem.query.order_by(
+            DBInventoryItem.created_at.desc(), DBInventoryItem.id.desc())]
+        self.assertEqual(ids, expected)
+
+    def test_nullable_sort_key(self):
+        """Test that items without a price come last in both directions."""
+        for order in ('asc', 'desc'):
+            ids = self.walk(f'/api/inventory?sort_by=price&sort_order={order}', per_page=3)
+            self.assertEqual(len(ids), 23)
+            self.assertEqual(len(set(ids)), 23)
+            prices = [db.session.get(DBInventoryItem, item_id).price for item_id in ids]
+            priced = [price for price in prices if price is not None]
+            self.assertEqual(priced, sorted(priced, reverse=(order == 'desc')))
+            self.assertEqual(prices[len(priced):], [None] * 4)
+
+    def test_search_by_relevance(self):
+        """Test that ranked search results page by relevance."""
+        ids = self.walk('/api/inventory?search=boots', per_page=5)
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(len(set(ids)), 11)
+
+    def test_totals(self):
+        """Test that totals are only computed when asked for."""
+        data = self.get('/api/inventory?cursor=&per_page=5')
+        self.assertNotIn('total', data)
+        self.assertNotIn('pages', data)
+
+        data = self.get('/api/inventory?cursor=&per_page=5&merchant=Shop&total=exact')
+        self.assertEqual(data['total'], 23)
+        self.assertFalse(data['total_is_estimate'])
+
+        # Planner estimates are PostgreSQL-only; SQLite counts
+        data = self.get('/api/inventory?cursor=&total=estimate')
+        self.assertEqual(data['total'], 23)
+
+    def test_invalid_requests(self):
+        """Test that bad cursors, sorts and total modes are rejected."""
+        data = self.get('/api/inventory?cursor=&per_page=5&sort_by=price')
+        self.get(f"/api/inventory?cursor={data['next_cursor']}&sort_by=title", status=400)
+        self.get('/api/inventory?cursor=garbage', status=400)
+        self.get('/api/inventory?cursor=&sort_by=notes', status=400)
+        self.get('/api/inventory?cursor=&total=all', status=400)
+
+    def test_jobs(self):
+        """Test cursor mode on the scraping job list."""
+        ids = self.walk('/api/scraping/jobs?x=1', key='jobs', per_page=2)
+        expected = [job.id for job in ScrapingJob.query.order_by(
+            ScrapingJob.created_at.desc(), ScrapingJob.id.desc())]
+        self.assertEqual(ids, expected)
+
+    def test_offset_mode_unchanged(self):
+        """Test that requests without a cursor still get page numbers and totals."""
+        data = self.get('/api/inventory?page=2&per_page=10')
+        self.assertEqual(data['total'], 23)
+        self.assertEqual(data['pages'], 3)
+        self.assertEqual(len(data['items']), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
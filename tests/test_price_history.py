@@ -0,0 +1,171 @@
+"""
+Tests for the price history time series.
+"""
+
+import unittest
+import json
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, PriceHistory
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.price_history import biggest_price_changes, compact_price_history
+from models import InventoryItem
+
+
+class TestPriceHistory(unittest.TestCase):
+    """Test history recording, compaction and the history endpoints."""
+
+    def setUp(self):
+        """Set up test client, database and a user."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'history', 'email': 'history@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='history').one().id
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def scrape(self, sku, price, in_stock=True):
+        write_items([item_row(InventoryItem(title=f'Item {sku}', price=price, merchant='Shop', sku=sku,
+                                            in_stock=in_stock), self.user_id)])
+        return DBInventoryItem.query.filter_by(sku=sku).one()
+
+    def points(self, item_id):
+        return [(point.price, point.in_stock, point.previous_price)
+                for point in PriceHistory.query.filter_by(item_id=item_id).order_by(PriceHistory.id)]
+
+    def test_points_only_on_change(self):
+        """Test that re-scrapes and unrelated edits add no points."""
+        item = self.scrape('1', 40.0)
+        self.scrape('1', 40.0)
+        self.scrape('1', 35.0)
+        self.scrape('1', 35.0, in_stock=False)
+
+        for change in ({'notes': 'unrelated'}, {'price': 30.0}):
+            self.client.put(f'/api/inventory/{item.id}', headers=self.headers,
+                            data=json.dumps(change), content_type='application/json')
+
+        self.assertEqual(self.points(item.id), [
+            (40.0, True, None), (35.0, True, 40.0), (35.0, False, 35.0), (30.0, False, 35.0)
+        ])
+
+    def test_delete_removes_history(self):
+        """Test that deleting an item deletes its points."""
+        item = self.scrape('1', 40.0)
+        self.client.delete(f'/api/inventory/{item.id}', headers=self.headers)
+        self.assertEqual(PriceHistory.query.count(), 0)
+
+    def test_history_endpoint(self):
+        """Test the per-item history, oldest first, scoped to the owner."""
+        item = self.scrape('1', 40.0)
+        self.scrape('1', 20.0)
+
+        response = self.client.get(f'/api/inventory/{item.id}/history', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['price'], 20.0)
+        self.assertEqual([point['price'] for point in data['history']], [40.0, 20.0])
+        self.assertEqual(data['history'][1]['previous_price'], 40.0)
+
+        response = self.client.get('/api/inventory/999/history', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_compaction(self):
+        """Test that old points are downsampled to the last per day, then per week."""
+        item = self.scrape('1', 100.0)
+        PriceHistory.query.delete()
+        now = datetime(2026, 6, 1, 12, 0)
+        day = now - timedelta(days=40)
+        week_start = now - timedelta(days=400)
+        week_start -= timedelta(days=week_start.weekday())
+
+        series = [
+            (week_start, 100.0), (week_start + timedelta(days=1), 90.0), (week_start + timedelta(days=2), 95.0),
+            (day.replace(hour=1), 80.0), (day.replace(hour=2), 70.0), (day.replace(hour=3), 75.0),
+            (day + timedelta(days=1), 60.0),
+            (now - timedelta(days=1, hours=1), 50.0), (now - timedelta(days=1), 55.0),
+        ]
+        previous = None
+        for recorded_at, price in series:
+            db.session.add(PriceHistory(item_id=item.id, user_id=self.user_id, recorded_at=recorded_at,
+                                        price=price, in_stock=True, previous_price=previous))
+            previous = price
+        db.session.commit()
+
+        self.assertEqual(compact_price_history(now=now), 4)
+        self.assertEqual(self.points(item.id), [
+            (95.0, True, None), (75.0, True, 95.0), (60.0, True, 75.0), (50.0, True, 60.0), (55.0, True, 50.0)
+        ])
+        self.assertEqual(compact_price_history(now=now), 0)
+
+    def test_weekly_compaction_across_new_year(self):
+        """Test that a week spanning the new year is one bucket, starting on Monday."""
+        item = self.scrape('1', 100.0)
+        PriceHistory.query.delete()
+        # Monday 2024-12-30 to Sunday 2025-01-05, then Monday 2025-01-06
+        for recorded_at, price in ((datetime(2024, 12, 29, 12), 110.0), (datetime(2024, 12, 30, 12), 100.0),
+                                   (datetime(2025, 1, 1, 12), 90.0), (datetime(2025, 1, 5, 12), 80.0),
+                                   (datetime(2025, 1, 6, 12), 70.0)):
+            db.session.add(PriceHistory(item_id=item.id, user_id=self.user_id, recorded_at=recorded_at,
+                                        price=price, in_stock=True))
+        db.session.commit()
+
+        self.assertEqual(compact_price_history(now=datetime(2026, 6, 1)), 2)
+        self.assertEqual([point[0] for point in self.points(item.id)], [110.0, 80.0, 70.0])
+
+    def test_biggest_price_changes(self):
+        """Test ranking by net change since the window start, in each direction."""
+        boots = self.scrape('1', 100.0)
+        jacket = self.scrape('2', 50.0)
+        scarf = self.scrape('3', 10.0)
+        self.scrape('4', 5.0)
+        self.scrape('1', 80.0)
+        self.scrape('1', 60.0)
+        self.scrape('2', 75.0)
+        self.scrape('3', 12.0)
+        self.scrape('3', 10.0)
+
+        since = datetime.utcnow() - timedelta(days=1)
+        changes = [(item.id, old) for item, old in biggest_price_changes(self.user_id, since)]
+        self.assertEqual(changes, [(boots.id, 100.0), (jacket.id, 50.0)])
+
+        response = self.client.get('/api/inventory/price-changes?direction=rise&fields=title',
+                                   headers=self.headers)
+        data = json.loads(response.data)
+        self.assertEqual(data['changes'], [{
+            'item': {'id': jacket.id, 'title': 'Item 2'},
+            'old_price': 50.0, 'new_price': 75.0, 'change': 25.0, 'change_pct': 50.0
+        }])
+
+        data = json.loads(self.client.get('/api/inventory/price-changes?direction=drop',
+                                          headers=self.headers).data)
+        self.assertEqual([change['item']['id'] for change in data['changes']], [boots.id])
+        self.assertEqual(data['changes'][0]['change'], -40.0)
+
+        response = self.client.get('/api/inventory/price-changes?direction=up', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+        # Changes before the window do not count
+        self.assertEqual(biggest_price_changes(self.user_id, datetime.utcnow() + timedelta(minutes=1)), [])
+        self.assertNotIn(scarf.id, [item.id for item, _ in biggest_price_changes(self.user_id, since)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,195 @@
+"""
+Tests for the per-user versioned query cache.
+"""
+
+import unittest
+import json
+import sys
+import os
+from unittest.mock import patch
+
+from sqlalchemy import event
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, ScrapingJob
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.query_cache import (
+    INVENTORY, JOBS, MemoryQueryCache, init_query_cache, mark_changed, version_key
+)
+from backend.services.work_queue import claim_job, heartbeat
+from models import InventoryItem
+
+
+class TestMemoryQueryCache(unittest.TestCase):
+    """Test cases for the in-process store."""
+
+    def test_versions(self):
+        """Test that versions start at zero and only bumped names move."""
+        cache = MemoryQueryCache(ttl=60, max_entries=2)
+        names = [version_key(INVENTORY), version_key(INVENTORY, '1')]
+        self.assertEqual(cache.versions(names), [0, 0])
+        cache.bump([names[1]])
+        cache.bump([names[1]])
+        self.assertEqual(cache.versions(names), [0, 2])
+
+    def test_versions_survive_eviction(self):
+        """Test that evicting entries never resets a version."""
+        cache = MemoryQueryCache(ttl=60, max_entries=1)
+        cache.bump(['version:jobs:1'])
+        for i in range(5):
+            cache.set(f'response:{i}', {'i': i})
+        self.assertIsNone(cache.get('response:0'))
+        self.assertEqual(cache.get('response:4'), {'i': 4})
+        self.assertEqual(cache.versions(['version:jobs:1']), [1])
+
+    def test_backend_selection(self):
+        """Test that none disables the cache and redis falls back without the package."""
+        app = create_app('testing')
+        app.config['QUERY_CACHE_URL'] = 'none'
+        self.assertIsNone(init_query_cache(app))
+        app.config['QUERY_CACHE_URL'] = 'redis://localhost:6379/2'
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            self.assertIsInstance(init_query_cache(app), MemoryQueryCache)
+
+    def test_defaults_to_events_redis(self):
+        """Test that an unset QUERY_CACHE_URL shares the events Redis, or stays in process without one."""
+        app = create_app('testing')
+        app.config['QUERY_CACHE_URL'] = None
+        self.assertIsInstance(init_query_cache(app), MemoryQueryCache)
+
+        app.config['EVENTS_BROKER_URL'] = 'redis://events:6379/1'
+        with patch('backend.services.query_cache.RedisQueryCache') as redis_cache:
+            self.assertIs(init_query_cache(app), redis_cache.return_value)
+        redis_cache.assert_called_once_with('redis://events:6379/1', app.config['QUERY_CACHE_TTL'])
+
+
+class TestQueryCacheAPI(unittest.TestCase):
+    """Test that read endpoints are cached until a write they depend on commits."""
+
+    def setUp(self):
+        """Set up test client, database and two users."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.headers = {}
+        for name in ('alice', 'bob'):
+            response = self.client.post('/api/auth/register',
+                data=json.dumps({'username': name, 'email': f'{name}@example.com', 'password': 'password123'}),
+                content_type='application/json'
+            )
+            self.headers[name] = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.alice = User.query.filter_by(username='alice').one().id
+        self.bob = User.query.filter_by(username='bob').one().id
+        write_items([item_row(InventoryItem(title='Boots', price=40.0, merchant='Shop', sku='1'), self.alice)])
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.capture)
+
+    def tearDown(self):
+        """Clean up database."""
+        event.remove(db.engine, 'before_cursor_execute', self.capture)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.statements.append(statement)
+
+    def get(self, path, user='alice'):
+        """GET a path and return (data, number of SELECTs issued)."""
+        self.statements.clear()
+        response = self.client.get(path, headers=self.headers[user])
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data), len(self.statements)
+
+    def assert_cached(self, path, user='alice'):
+        data, queries = self.get(path, user)
+        self.assertEqual(queries, 0, f'{path} was not served from cache')
+        return data
+
+    def test_repeat_reads_are_cached(self):
+        """Test that identical requests are served without touching the database."""
+        for path in ('/api/inventory', '/api/stats', '/api/scraping/jobs'):
+            data, queries = self.get(path)
+            self.assertGreater(queries, 0)
+            self.assertEqual(self.assert_cached(path), data)
+
+        # Other parameters are other entries
+        self.assertGreater(self.get('/api/inventory?per_page=5')[1], 0)
+
+    def test_inventory_writes_invalidate(self):
+        """Test that API edits, bulk writes and bulk deletes show up on the next read."""
+        self.get('/api/inventory')
+        item = DBInventoryItem.query.filter_by(user_id=self.alice).one()
+
+        self.client.put(f'/api/inventory/{item.id}', headers=self.headers['alice'],
+                        data=json.dumps({'price': 10.0}), content_type='application/json')
+        data, queries = self.get('/api/inventory')
+        self.assertGreater(queries, 0)
+        self.assertEqual(data['items'][0]['price'], 10.0)
+
+        write_items([item_row(InventoryItem(title='Jacket', price=80.0, merchant='Shop', sku='2'), self.alice)])
+        self.assertEqual(self.get('/api/stats')[0]['total_items'], 2)
+        self.assertEqual(self.assert_cached('/api/stats')['total_items'], 2)
+
+        self.client.post('/api/inventory/bulk-delete', headers=self.headers['alice'],
+                         data=json.dumps({'item_ids': [item.id]}), content_type='application/json')
+        self.assertEqual(self.get('/api/inventory')[0]['total'], 1)
+        self.assertEqual(self.get('/api/stats')[0]['total_items'], 1)
+
+    def test_unchanged_rescrape_keeps_cache(self):
+        """Test that a bulk write that changes nothing does not invalidate."""
+        self.get('/api/inventory')
+        write_items([item_row(InventoryItem(title='Boots', price=40.0, merchant='Shop', sku='1'), self.alice)])
+        self.assert_cached('/api/inventory')
+
+    def test_versions_are_per_user_and_scope(self):
+        """Test that one user's writes leave other users and other scopes cached."""
+        self.get('/api/inventory')
+        self.get('/api/inventory', user='bob')
+        self.get('/api/scraping/jobs')
+
+        write_items([item_row(InventoryItem(title='Hat', price=5.0, merchant='Shop', sku='9'), self.bob)])
+        self.assert_cached('/api/inventory')
+        self.assert_cached('/api/scraping/jobs')
+        self.assertEqual(self.get('/api/inventory', user='bob')[0]['total'], 1)
+
+    def test_job_changes_invalidate(self):
+        """Test that ORM job changes and lease claims bump the jobs scope, but heartbeats do not."""
+        self.get('/api/scraping/jobs')
+        self.get('/api/stats')
+        self.get('/api/inventory')
+
+        job = ScrapingJob(user_id=self.alice, url='https://example.com', merchant='Shop', status='queued')
+        db.session.add(job)
+        db.session.commit()
+        self.assertEqual(self.get('/api/scraping/jobs')[0]['total'], 1)
+        self.assertEqual(self.get('/api/stats')[0]['total_scraping_jobs'], 1)
+        self.assert_cached('/api/inventory')
+
+        self.assertEqual(claim_job('w1'), job.id)
+        self.assertEqual(self.get('/api/scraping/jobs')[0]['jobs'][0]['lease_owner'], 'w1')
+        heartbeat(job.id, 'w1')
+        self.assert_cached('/api/scraping/jobs')
+
+    def test_rollback_does_not_bump(self):
+        """Test that changes rolled back leave the cache in place."""
+        self.get('/api/inventory')
+        db.session.add(DBInventoryItem(user_id=self.alice, title='Draft', merchant='Shop'))
+        db.session.flush()
+        mark_changed(db.session, JOBS, [self.alice])
+        db.session.rollback()
+        self.assert_cached('/api/inventory')
+
+
+if __name__ == '__main__':
+    unittest.main()
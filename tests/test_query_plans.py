@@ -0,0 +1,130 @@
+"""
+Query plan tests: list endpoints must be served by an index, not a table scan.
+"""
+
+import unittest
+import json
+import re
+import sys
+import os
+from datetime import datetime
+
+from sqlalchemy import event
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db
+from backend.utils.pagination import encode_cursor
+
+INDEXED_TABLES = ('inventory_items', 'scraping_jobs', 'price_history', 'item_tags', 'tags')
+
+
+class TestQueryPlans(unittest.TestCase):
+    """Capture the SQL issued by each endpoint and EXPLAIN it."""
+
+    def setUp(self):
+        """Set up test client, database and an authenticated user."""
+        self.app = create_app('testing')
+        # Every request must reach the database to be explained
+        self.app.extensions['query_cache'] = None
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'planner', 'email': 'planner@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        token = json.loads(response.data)['access_token']
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.capture)
+
+    def tearDown(self):
+        """Clean up database."""
+        event.remove(db.engine, 'before_cursor_execute', self.capture)
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def capture(self, conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and any(t in statement for t in INDEXED_TABLES):
+            self.statements.append((statement, parameters))
+
+    def query_plans(self, path):
+        self.statements = []
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.statements, f'No queries captured for {path}')
+
+        plans = []
+        with db.engine.connect() as conn:
+            for statement, parameters in self.statements:
+                rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+                plans.append((statement, ' | '.join(row[-1] for row in rows)))
+        return plans
+
+    def assert_indexed(self, path, index=None):
+        """Assert no query scans a table, and the page query uses ``index``."""
+        for statement, plan in self.query_plans(path):
+            for table in INDEXED_TABLES:
+                self.assertIsNone(re.search(rf'SCAN {table}\b(?! USING)', plan), f'{path} scans {table}: {plan}')
+            self.assertIn('INDEX', plan, f'{path} uses no index: {plan}')
+            if index and 'LIMIT' in statement:
+                self.assertIn(index, plan, f'{path} does not use {index}: {plan}')
+                self.assertNotIn('TEMP B-TREE', plan, f'{path} sorts in a temp b-tree: {plan}')
+
+    def test_list_inventory_default_sort(self):
+        """Test the default listing (newest first) walks the (user_id, created_at) index."""
+        self.assert_indexed('/api/inventory', 'ix_inventory_items_user_created')
+
+    def test_list_inventory_filters(self):
+        """Test the filtered listings are index-backed."""
+        self.assert_indexed('/api/inventory?merchant=Mercari', 'ix_inventory_items_user_merchant_created')
+        self.assert_indexed('/api/inventory?is_sold=false', 'ix_inventory_items_user_sold_created')
+        self.assert_indexed('/api/inventory?min_price=10&max_price=50&sort_by=price&sort_order=asc',
+                            'ix_inventory_items_user_price')
+        self.assert_indexed('/api/inventory?condition=used')
+
+    def test_cursor_pages_seek_the_index(self):
+        """Test that a cursor page seeks into the sort index instead of sorting or offsetting."""
+        cursor = encode_cursor('created_at:desc', datetime(2026, 1, 1), 100)
+        self.assert_indexed(f'/api/inventory?cursor={cursor}', 'ix_inventory_items_user_created')
+        self.assert_indexed(f'/api/scraping/jobs?cursor={cursor}', 'ix_scraping_jobs_user_created')
+        for statement, plan in self.query_plans(f'/api/inventory?cursor={cursor}'):
+            self.assertIn('(user_id=? AND created_at<?)', plan, plan)
+
+    def test_search_uses_fts(self):
+        """Test that searches go through the FTS index instead of LIKE scans."""
+        for statement, plan in self.query_plans('/api/inventory?search=leather+boo'):
+            self.assertNotIn('LIKE', statement.upper())
+            self.assertIn('inventory_items_fts VIRTUAL TABLE INDEX', plan, plan)
+            self.assertIsNone(re.search(r'SCAN inventory_items\b(?! USING)', plan), plan)
+
+    def test_list_scraping_jobs(self):
+        """Test the job list walks the (user_id, created_at) index."""
+        self.assert_indexed('/api/scraping/jobs', 'ix_scraping_jobs_user_created')
+
+    def test_tags(self):
+        """Test that tag filters and counts are index lookups, not string scans."""
+        self.assert_indexed('/api/inventory?tag=vintage&tag=denim', 'ix_inventory_items_user_created')
+        self.assert_indexed('/api/inventory/tags')
+        for statement, plan in self.query_plans('/api/inventory?tag=vintage'):
+            self.assertNotIn('LIKE', statement.upper())
+        for statement, plan in self.query_plans('/api/inventory/tags?prefix=vin'):
+            self.assertIn('SEARCH tags USING COVERING INDEX', plan, plan)
+            self.assertIn('(user_id=? AND name>? AND name<?)', plan, plan)
+
+    def test_price_changes(self):
+        """Test that biggest price changes read the user's window through the history index."""
+        self.assert_indexed('/api/inventory/price-changes?days=30')
+        for statement, plan in self.query_plans('/api/inventory/price-changes?direction=drop'):
+            self.assertIn('ix_price_history_user_recorded (user_id=? AND recorded_at>?)', plan, plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for read replica routing.
+"""
+
+import unittest
+import json
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.config import config, TestingConfig
+from backend.models import db, User, DBInventoryItem
+from backend.services.bulk_writer import item_row, write_items
+from models import InventoryItem
+
+
+class ReplicaTestingConfig(TestingConfig):
+    """Primary and replica are two separate in-memory databases."""
+    SQLALCHEMY_REPLICA_URIS = ['sqlite:///:memory:']
+    REPLICA_STICKY_SECONDS = 0.3
+
+
+class TestReadReplicas(unittest.TestCase):
+    """Test that reads go to the replica and writes, and reads right after them, to the primary."""
+
+    def setUp(self):
+        """Set up an app with one replica, and a user whose items differ between the two."""
+        with patch.dict(config, {'replica-testing': ReplicaTestingConfig}):
+            self.app = create_app('replica-testing')
+        # Responses must come from the database, not the cache
+        self.app.extensions['query_cache'] = None
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+        self.replica = self.app.extensions['replica_engines']['replica_0']
+        db.metadata.create_all(self.replica)
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'reader', 'email': 'reader@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='reader').one().id
+
+        # Replica contents as of an earlier point in time
+        with self.replica.begin() as conn:
+            conn.execute(User.__table__.insert(), {'id': self.user_id, 'username': 'reader',
+                                                   'email': 'reader@example.com', 'password_hash': 'x'})
+            conn.execute(DBInventoryItem.__table__.insert(), [item_row(
+                InventoryItem(title='Replica item', price=10.0, merchant='Shop', sku='1'), self.user_id
+            )])
+        self.item_id = self.scrape('Primary item')
+        time.sleep(0.3)
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.metadata.drop_all(self.replica)
+        db.drop_all()
+        self.ctx.pop()
+
+    def scrape(self, title):
+        write_items([item_row(InventoryItem(title=title, price=10.0, merchant='Shop', sku='1'), self.user_id)])
+        return DBInventoryItem.query.filter_by(user_id=self.user_id).one().id
+
+    def titles(self):
+        response = self.client.get('/api/inventory', headers=self.headers)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [item['title'] for item in json.loads(response.data)['items']]
+
+    def test_reads_use_replica(self):
+        """Test that GET requests read from the replica and other code from the primary."""
+        self.assertEqual(self.titles(), ['Replica item'])
+        self.assertEqual(DBInventoryItem.query.one().title, 'Primary item')
+
+    def test_read_your_writes(self):
+        """Test that a user's write request keeps their reads on the primary for a while."""
+        response = self.client.put(f'/api/inventory/{self.item_id}', headers=self.headers,
+                                   data=json.dumps({'title': 'Edited'}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.titles(), ['Edited'])
+
+        time.sleep(0.35)
+        self.assertEqual(self.titles(), ['Replica item'])
+
+    def test_background_writes_are_sticky(self):
+        """Test that ingestion outside a request also sends the user's reads to the primary."""
+        self.scrape('Rescraped item')
+        self.assertEqual(self.titles(), ['Rescraped item'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for the fair-share job scheduler.
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.services.job_scheduler import JobScheduler
+
+
+class TestJobScheduler(unittest.TestCase):
+    """Test cases for JobScheduler selection and caps."""
+
+    def setUp(self):
+        """Create a scheduler that never starts worker threads."""
+        self.scheduler = JobScheduler(max_workers=10, max_jobs_per_user=10,
+                                      browser_pool_size=10, default_merchant_cap=10)
+
+    def drain(self):
+        """Dispatch everything that can run, returning job IDs in order."""
+        order = []
+        while True:
+            entry = self.scheduler.next_job()
+            if entry is None:
+                return order
+            order.append(entry.job_id)
+
+    def test_priority_first(self):
+        """Test that higher priority jobs are dispatched first."""
+        self.scheduler.submit(1, user_id=1, merchant='generic', priority=0)
+        self.scheduler.submit(2, user_id=2, merchant='generic', priority=5)
+        self.scheduler.submit(3, user_id=1, merchant='generic', priority=9)
+
+        self.assertEqual(self.drain(), [3, 2, 1])
+
+    def test_round_robin_between_users(self):
+        """Test that one user's backlog does not starve another user."""
+        for job_id in range(1, 6):
+            self.scheduler.submit(job_id, user_id=1, merchant='generic')
+        self.scheduler.submit(100, user_id=2, merchant='generic')
+
+        order = self.drain()
+        self.assertEqual(order[:2], [1, 100])
+        self.assertEqual(len(order), 6)
+
+    def test_weighted_round_robin(self):
+        """Test that a user's weight grants consecutive turns."""
+        self.scheduler.set_user_weight(1, 2)
+        for job_id in range(1, 4):
+            self.scheduler.submit(job_id, user_id=1, merchant='generic')
+        for job_id in range(10, 13):
+            self.scheduler.submit(job_id, user_id=2, merchant='generic')
+
+        self.assertEqual(self.drain(), [1, 2, 10, 3, 11, 12])
+
+    def test_per_user_cap(self):
+        """Test the per-user concurrency cap."""
+        self.scheduler.max_jobs_per_user = 2
+        for job_id in range(1, 5):
+            self.scheduler.submit(job_id, user_id=1, merchant='generic')
+
+        self.assertEqual(self.drain(), [1, 2])
+        self.scheduler.release(1)
+        self.assertEqual(self.drain(), [3])
+
+    def test_browser_pool_caps_selenium_merchants(self):
+        """Test that Mercari and Depop jobs share the browser pool."""
+        self.scheduler.browser_pool_size = 2
+        self.scheduler.submit(1, user_id=1, merchant='Mercari')
+        self.scheduler.submit(2, user_id=2, merchant='Depop')
+        self.scheduler.submit(3, user_id=3, merchant='mercari')
+        self.scheduler.submit(4, user_id=4, merchant='Generic')
+
+        self.assertEqual(self.drain(), [1, 2, 4])
+        self.assertEqual(self.scheduler.metrics()['browser_pool']['in_use'], 2)
+
+    def test_merchant_cap(self):
+        """Test explicit per-merchant caps."""
+        self.scheduler.merchant_caps = {'shopify': 1}
+        self.scheduler.submit(1, user_id=1, merchant='Shopify')
+        self.scheduler.submit(2, user_id=2, merchant='Shopify')
+
+        self.assertEqual(self.drain(), [1])
+
+    def test_remove_and_metrics(self):
+        """Test removing a queued job and queue-depth metrics."""
+        self.scheduler.submit(1, user_id=1, merchant='mercari')
+        self.scheduler.submit(2, user_id=1, merchant='depop')
+        self.assertEqual(self.scheduler.position(2), 2)
+
+        self.assertTrue(self.scheduler.remove(1))
+        metrics = self.scheduler.metrics()
+        self.assertEqual(metrics['queued'], 1)
+        self.assertEqual(metrics['queued_by_merchant'], {'depop': 1})
+        self.assertFalse(self.scheduler.remove(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
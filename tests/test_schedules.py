@@ -0,0 +1,138 @@
+"""
+Tests for recurring scrape schedules.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app, start_background_services
+from backend.config import TestingConfig
+from backend.models import db, User, DBInventoryItem, ScrapeSchedule, ScrapingJob
+from backend.services.job_scheduler import get_scheduler
+from backend.services.schedule_runner import (
+    compute_next_run, incremental_skip_urls, mark_schedule_success, run_due_schedules
+)
+from backend.utils.cron import CronError, parse_cron
+
+
+class TestCron(unittest.TestCase):
+    """Test cases for cron expression parsing."""
+
+    def test_daily(self):
+        """Test a daily schedule rolls over to the next day."""
+        cron = parse_cron('30 6 * * *')
+        self.assertEqual(cron.next_after(datetime(2026, 1, 19, 5, 0)), datetime(2026, 1, 19, 6, 30))
+        self.assertEqual(cron.next_after(datetime(2026, 1, 19, 6, 30)), datetime(2026, 1, 20, 6, 30))
+
+    def test_step_and_weekday(self):
+        """Test steps and day-of-week (2026-01-19 is a Monday)."""
+        self.assertEqual(parse_cron('*/15 * * * *').next_after(datetime(2026, 1, 19, 10, 7)),
+                         datetime(2026, 1, 19, 10, 15))
+        self.assertEqual(parse_cron('0 9 * * 0').next_after(datetime(2026, 1, 19, 10, 0)),
+                         datetime(2026, 1, 25, 9, 0))
+
+    def test_invalid(self):
+        """Test invalid expressions are rejected."""
+        for expression in ['', '* * * *', '61 * * * *', 'a * * * *', '*/0 * * * *']:
+            with self.assertRaises(CronError):
+                parse_cron(expression)
+
+
+class TestScheduleRunner(unittest.TestCase):
+    """Test cases for running due schedules."""
+
+    def setUp(self):
+        """Set up app, database and a user."""
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.user = User(username='scheduler', email='scheduler@example.com')
+        self.user.set_password('password123')
+        db.session.add(self.user)
+        db.session.commit()
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_schedule(self, **kwargs):
+        schedule = ScrapeSchedule(user_id=self.user.id, url='https://www.mercari.com/search/?keyword=shoes',
+                                  merchant='Mercari', interval_seconds=3600, jitter_seconds=0, **kwargs)
+        db.session.add(schedule)
+        db.session.commit()
+        return schedule
+
+    def test_started_only_by_background_services(self):
+        """Test that creating the app does not start the runner thread; starting its background services does."""
+        with patch.object(TestingConfig, 'SCHEDULE_RUNNER_ENABLED', True):
+            app = create_app('testing')
+        runner = app.extensions['schedule_runner']
+        self.assertIsNone(runner._thread)
+
+        start_background_services(app)
+        self.assertTrue(runner._thread.is_alive())
+        runner.stop()
+        runner._thread.join(timeout=5)
+
+    def test_jitter_bounds(self):
+        """Test that jitter only ever delays the run, within the configured bound."""
+        schedule = ScrapeSchedule(interval_seconds=3600, jitter_seconds=600)
+        now = datetime(2026, 1, 19, 0, 0)
+        for _ in range(20):
+            next_run = compute_next_run(schedule, now)
+            self.assertGreaterEqual(next_run, now + timedelta(hours=1))
+            self.assertLessEqual(next_run, now + timedelta(hours=1, minutes=10))
+
+    def test_due_schedule_queues_job(self):
+        """Test that a due schedule creates a queued job and advances."""
+        now = datetime(2026, 1, 19, 12, 0)
+        schedule = self.make_schedule(next_run_at=now - timedelta(minutes=1))
+        self.make_schedule(next_run_at=now + timedelta(days=1))
+
+        jobs = run_due_schedules(now=now)
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0].schedule_id, schedule.id)
+        self.assertEqual(jobs[0].status, 'queued')
+        self.assertEqual(schedule.next_run_at, now + timedelta(hours=1))
+        self.assertEqual(get_scheduler().metrics()['queued'], 1)
+
+        # The previous run is still queued, so the next slot is skipped
+        self.assertEqual(run_due_schedules(now=now + timedelta(hours=2)), [])
+
+    def test_incremental_skip_urls(self):
+        """Test that listings fetched within the refresh window are skipped, not just since the last run."""
+        now = datetime.utcnow()
+        schedule = self.make_schedule(last_success_at=now - timedelta(days=1))
+        db.session.add_all([
+            DBInventoryItem(user_id=self.user.id, title='Fresh', merchant='Mercari',
+                            product_url='https://www.mercari.com/item/m1', scraped_at=now - timedelta(hours=1)),
+            DBInventoryItem(user_id=self.user.id, title='Skipped last run', merchant='Mercari',
+                            product_url='https://www.mercari.com/item/m2', scraped_at=now - timedelta(days=3)),
+            DBInventoryItem(user_id=self.user.id, title='Stale', merchant='Mercari',
+                            product_url='https://www.mercari.com/item/m3', scraped_at=now - timedelta(days=8))
+        ])
+        job = ScrapingJob(user_id=self.user.id, url=schedule.url, merchant='Mercari',
+                          schedule_id=schedule.id, started_at=now)
+        db.session.add(job)
+        db.session.commit()
+
+        skip = incremental_skip_urls(job, refresh_after_seconds=7 * 24 * 3600)
+        self.assertEqual(skip, {'https://www.mercari.com/item/m1', 'https://www.mercari.com/item/m2'})
+
+        mark_schedule_success(job)
+        self.assertEqual(schedule.last_success_at, now)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,235 @@
+"""
+Tests for the scraper service job execution.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, ScrapingJob
+from backend.services.batch_service import create_batch
+from backend.services.scraper_service import run_scraping_job, start_scraping_task
+from models import InventoryItem, InventoryCollection
+from scraper import CancellationToken, ScrapeCancelled
+
+
+class FakeScraper:
+    """Scraper stand-in that yields two items per page and can fail or be cancelled on a given page."""
+
+    fail_on_page = None
+    cancel_on_page = None
+    start_pages = []
+
+    def __init__(self, merchant_name=None):
+        self.skip_urls = set()
+        self.progress_callback = None
+        self.page_callback = None
+        self.cancel_token = None
+
+    def set_cancel_token(self, token):
+        self.cancel_token = token
+
+    def _check_cancelled(self):
+        self.cancel_token.raise_if_cancelled()
+
+    def scrape_multiple_pages(self, start_url, max_pages=5, start_page=1):
+        FakeScraper.start_pages.append(start_page)
+        collection = InventoryCollection()
+        for page_num in range(start_page, max_pages + 1):
+            if page_num == FakeScraper.fail_on_page:
+                raise RuntimeError('worker died')
+            if page_num == FakeScraper.cancel_on_page:
+                self.cancel_token.cancel('cancelled')
+            self._check_cancelled()
+            items = [
+                InventoryItem(title=f'Item {page_num}-{i}', price=10.0, merchant='Generic',
+                              product_url=f'https://example.com/item/{page_num}-{i}')
+                for i in range(2)
+            ]
+            collection.add_items(items)
+            self.page_callback(page_num, f'{start_url}?page={page_num}', items)
+        return collection
+
+    def scrape_listing(self, url):
+        if url.endswith('/broken'):
+            raise RuntimeError('listing failed')
+        return [InventoryItem(title='Single', price=5.0, merchant='Generic', product_url=url)]
+
+    def scrape_listing_cached(self, url):
+        return self.scrape_listing(url)
+
+    def cleanup(self):
+        pass
+
+
+@patch('backend.services.scraper_service.GenericEcommerceScraper', FakeScraper)
+class TestCheckpointedJobs(unittest.TestCase):
+    """Test cases for checkpointing and resuming scraping jobs."""
+
+    def setUp(self):
+        """Set up app, database, user and job."""
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='worker', email='worker@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+
+        job = ScrapingJob(user_id=user.id, url='https://example.com/shop', merchant='Generic', pages=4)
+        db.session.add(job)
+        db.session.commit()
+        self.job_id = job.id
+
+        FakeScraper.fail_on_page = None
+        FakeScraper.cancel_on_page = None
+        FakeScraper.start_pages = []
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def run_job(self):
+        start_scraping_task(self.job_id, self.user_id, 'https://example.com/shop', 'Generic', pages=4)
+        return db.session.get(ScrapingJob, self.job_id)
+
+    def test_pages_committed_before_failure(self):
+        """Test that pages finished before a crash are saved and checkpointed."""
+        FakeScraper.fail_on_page = 3
+        job = self.run_job()
+
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.items_scraped, 4)
+        self.assertEqual(job.checkpoint['completed_pages'], [1, 2])
+        self.assertEqual(job.checkpoint['next_page'], 3)
+        self.assertEqual(job.checkpoint['frontier'], [3, 4])
+        self.assertEqual(job.checkpoint['last_cursor'], 'https://example.com/shop?page=2')
+        self.assertEqual(DBInventoryItem.query.count(), 4)
+
+    def test_retry_resumes_from_checkpoint(self):
+        """Test that a retried job resumes after the last completed page."""
+        FakeScraper.fail_on_page = 3
+        self.run_job()
+
+        FakeScraper.fail_on_page = None
+        job = self.run_job()
+
+        self.assertEqual(FakeScraper.start_pages, [1, 3])
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual(job.items_scraped, 8)
+        self.assertEqual(DBInventoryItem.query.count(), 8)
+        self.assertIsNone(job.error_message)
+
+    def test_cancel_keeps_checkpoint(self):
+        """Test that a cancelled job stops before the next page and can be retried."""
+        FakeScraper.cancel_on_page = 3
+        job = self.run_job()
+
+        self.assertEqual(job.status, 'cancelled')
+        self.assertEqual(job.error_message, 'Cancelled by user')
+        self.assertEqual(job.checkpoint['next_page'], 3)
+        self.assertEqual(DBInventoryItem.query.count(), 4)
+
+        FakeScraper.cancel_on_page = None
+        job = self.run_job()
+        self.assertEqual(FakeScraper.start_pages, [1, 3])
+        self.assertEqual(job.status, 'completed')
+
+    def test_timeout_fails_job(self):
+        """Test that a job over its time budget is failed with a clear message."""
+        job = db.session.get(ScrapingJob, self.job_id)
+        job.timeout_seconds = 5
+        db.session.commit()
+
+        with patch.object(FakeScraper, 'scrape_multiple_pages', side_effect=ScrapeCancelled('timeout')):
+            job = self.run_job()
+
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error_message, 'Job exceeded its time budget of 5 seconds')
+
+
+class TestCancellationToken(unittest.TestCase):
+    """Test cases for the scraper cancellation token."""
+
+    def test_timeout_fires_callbacks(self):
+        """Test that the wall-clock budget fires the token and its callbacks."""
+        token = CancellationToken(timeout=0.05)
+        aborted = []
+        token.on_cancel(lambda: aborted.append(True))
+
+        with self.assertRaises(ScrapeCancelled) as raised:
+            token.wait(5)
+
+        self.assertEqual(raised.exception.reason, 'timeout')
+        self.assertEqual(aborted, [True])
+
+    def test_first_cancel_wins(self):
+        """Test that later cancels do not overwrite the reason or rerun callbacks."""
+        token = CancellationToken()
+        calls = []
+        token.on_cancel(lambda: calls.append(token.reason))
+        token.cancel('cancelled')
+        token.cancel('timeout')
+
+        self.assertEqual(calls, ['cancelled'])
+        self.assertIsNone(token.remaining())
+        with self.assertRaises(ScrapeCancelled):
+            token.raise_if_cancelled()
+
+
+@patch('backend.services.scraper_service.GenericEcommerceScraper', FakeScraper)
+class TestBatchJobs(unittest.TestCase):
+    """Test cases for batch shard execution and parent aggregation."""
+
+    def setUp(self):
+        """Set up app, database and user."""
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        user = User(username='batcher', email='batcher@example.com')
+        user.set_password('password123')
+        db.session.add(user)
+        db.session.commit()
+        self.user_id = user.id
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def test_shards_roll_up_to_parent(self):
+        """Test that shard results aggregate onto the batch parent."""
+        urls = [f'https://example.com/item/{i}' for i in range(5)] + ['https://example.com/broken']
+        parent = create_batch(self.user_id, urls, 'Generic', shard_size=3)
+        shard_ids = [shard.id for shard in parent.children.order_by(ScrapingJob.id)]
+        self.assertEqual(len(shard_ids), 2)
+
+        run_scraping_job(shard_ids[0])
+        parent = db.session.get(ScrapingJob, parent.id)
+        self.assertEqual(parent.status, 'running')
+        self.assertEqual(parent.items_scraped, 3)
+
+        run_scraping_job(shard_ids[1])
+        parent = db.session.get(ScrapingJob, parent.id)
+        self.assertEqual(parent.status, 'completed')
+        self.assertEqual(parent.items_scraped, 5)
+        self.assertEqual(parent.error_message, '1 of 2 shards failed')
+        self.assertEqual(DBInventoryItem.query.count(), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
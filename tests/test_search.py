@@ -0,0 +1,127 @@
+"""
+Tests for full-text inventory search.
+"""
+
+import unittest
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.search import fts_match_query, search_terms, tsquery
+from models import InventoryItem
+
+
+class TestSearchTerms(unittest.TestCase):
+    """Test cases for search query building."""
+
+    def test_terms_are_words_only(self):
+        """Test that punctuation and query syntax are dropped."""
+        self.assertEqual(search_terms('Leather "boots" OR -nike*'), ['leather', 'boots', 'or', 'nike'])
+        self.assertEqual(search_terms('t_shirt'), ['t', 'shirt'])
+        self.assertEqual(search_terms('!!!'), [])
+
+    def test_prefix_queries(self):
+        """Test that every term is matched as a prefix."""
+        self.assertEqual(fts_match_query(['leath', 'boot']), '"leath"* "boot"*')
+        self.assertEqual(tsquery(['leath', 'boot']), 'leath:* & boot:*')
+
+
+class TestSearchAPI(unittest.TestCase):
+    """Test the search parameter of the inventory list endpoint."""
+
+    def setUp(self):
+        """Set up test client, database and a user with some inventory."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        response = self.client.post('/api/auth/register',
+            data=json.dumps({'username': 'searcher', 'email': 'searcher@example.com', 'password': 'password123'}),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+        self.user_id = User.query.filter_by(username='searcher').one().id
+
+        items = [
+            InventoryItem(title='Leather boots', brand='Frye', price=120.0, merchant='Mercari', sku='1',
+                          description='Brown, size 9'),
+            InventoryItem(title='Rain jacket', brand='Patagonia', price=80.0, merchant='Depop', sku='2',
+                          description='Pairs well with leather boots'),
+            InventoryItem(title='Canvas sneakers', brand='Vans', price=40.0, merchant='Mercari', sku='3',
+                          description='Barely worn'),
+            InventoryItem(title='Suede boots', brand='Clarks', price=60.0, merchant='Depop', sku='4',
+                          description='Desert boot, café colour'),
+        ]
+        write_items([item_row(item, self.user_id) for item in items])
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def search(self, query):
+        response = self.client.get(f'/api/inventory?{query}', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return [item['title'] for item in json.loads(response.data)['items']]
+
+    def test_ranked_by_relevance(self):
+        """Test that title matches outrank description matches."""
+        self.assertEqual(self.search('search=leather+boots'), ['Leather boots', 'Rain jacket'])
+
+    def test_prefix_and_diacritics(self):
+        """Test that partial words and unaccented terms match."""
+        self.assertEqual(sorted(self.search('search=boo')), ['Leather boots', 'Rain jacket', 'Suede boots'])
+        self.assertEqual(self.search('search=cafe'), ['Suede boots'])
+        self.assertEqual(self.search('search=patag'), ['Rain jacket'])
+
+    def test_combined_with_filters_and_sort(self):
+        """Test that search composes with the existing filters and explicit sorting."""
+        self.assertEqual(self.search('search=boots&merchant=Depop&sort_by=price&sort_order=asc'),
+                         ['Suede boots', 'Rain jacket'])
+        self.assertEqual(self.search('search=boots&max_price=100&sort_by=price&sort_order=desc'),
+                         ['Rain jacket', 'Suede boots'])
+
+    def test_index_follows_updates_and_deletes(self):
+        """Test that edits, re-scrapes and deletes are reflected in search results."""
+        item = DBInventoryItem.query.filter_by(title='Canvas sneakers').one()
+        response = self.client.put(f'/api/inventory/{item.id}', headers=self.headers,
+                                   data=json.dumps({'title': 'Canvas high tops'}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.search('search=sneakers'), [])
+        self.assertEqual(self.search('search=high+tops'), ['Canvas high tops'])
+
+        rescraped = InventoryItem(title='Suede chukkas', brand='Clarks', price=55.0, merchant='Depop', sku='4')
+        write_items([item_row(rescraped, self.user_id)])
+        self.assertEqual(self.search('search=chukka'), ['Suede chukkas'])
+
+        item = DBInventoryItem.query.filter_by(title='Leather boots').one()
+        self.client.delete(f'/api/inventory/{item.id}', headers=self.headers)
+        self.assertEqual(self.search('search=frye'), [])
+
+    def test_other_users_items_excluded(self):
+        """Test that matches are limited to the requesting user's items."""
+        other = User(username='other', email='other@example.com')
+        other.set_password('password123')
+        db.session.add(other)
+        db.session.commit()
+        write_items([item_row(InventoryItem(title='Leather boots', sku='9', merchant='Mercari'), other.id)])
+
+        self.assertEqual(self.search('search=leather'), ['Leather boots', 'Rain jacket'])
+
+    def test_punctuation_only_search_falls_back(self):
+        """Test that a search without words still works as a substring match."""
+        self.assertEqual(self.search('search=%2C&sort_by=price&sort_order=asc'), ['Suede boots', 'Leather boots'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""
+Tests for normalized item tags.
+"""
+
+import unittest
+import json
+import sys
+import os
+
+from sqlalchemy import func, select
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app
+from backend.models import db, User, DBInventoryItem, Tag, item_tags
+from backend.services.bulk_writer import item_row, write_items
+from backend.services.tags import normalize_tags
+from models import InventoryItem
+
+
+class TestNormalizeTags(unittest.TestCase):
+    """Test cases for tag normalization."""
+
+    def test_normalize(self):
+        """Test case folding, whitespace, duplicates and list input."""
+        self.assertEqual(normalize_tags(' Vintage,denim , VINTAGE,,Summer   Sale'),
+                         ['vintage', 'denim', 'summer sale'])
+        self.assertEqual(normalize_tags(['A', 'b ', 'a']), ['a', 'b'])
+        self.assertEqual(normalize_tags(None), [])
+        self.assertEqual(normalize_tags(''), [])
+
+    def test_limits(self):
+        """Test that long names are truncated and the list fits the display column."""
+        self.assertEqual(normalize_tags('x' * 80), ['x' * 50])
+        names = normalize_tags(','.join(f'{i:02d}' + 'y' * 45 for i in range(20)))
+        self.assertLessEqual(len(','.join(names)), 500)
+        self.assertEqual(len(names), 10)
+
+
+class TestTagsAPI(unittest.TestCase):
+    """Test tag editing, filtering and counts."""
+
+    def setUp(self):
+        """Set up test client, database and two users with items."""
+        self.app = create_app('testing')
+        self.client = self.app.test_client()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.headers = {}
+        for name in ('alice', 'bob'):
+            response = self.client.post('/api/auth/register',
+                data=json.dumps({'username': name, 'email': f'{name}@example.com', 'password': 'password123'}),
+                content_type='application/json'
+            )
+            self.headers[name] = {'Authorization': f"Bearer {json.loads(response.data)['access_token']}"}
+            user_id = User.query.filter_by(username=name).one().id
+            write_items([item_row(InventoryItem(title=f'{name} {i}', price=10.0 + i, merchant='Shop', sku=str(i)),
+                                  user_id) for i in range(3)])
+        self.items = {item.title: item.id for item in DBInventoryItem.query.all()}
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def tag(self, title, tags, user='alice'):
+        response = self.client.put(f'/api/inventory/{self.items[title]}', headers=self.headers[user],
+                                   data=json.dumps({'tags': tags}), content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data)['item']
+
+    def get(self, path, user='alice'):
+        response = self.client.get(path, headers=self.headers[user])
+        self.assertEqual(response.status_code, 200, response.data)
+        return json.loads(response.data)
+
+    def test_update_tags(self):
+        """Test that edits normalize tags and replace the association rows."""
+        self.assertEqual(self.tag('alice 0', 'Vintage, Denim')['tags'], ['vintage', 'denim'])
+        self.assertEqual(self.tag('alice 0', ['denim', 'wool'])['tags'], ['denim', 'wool'])
+
+        links = db.session.execute(
+            select(Tag.name).join(item_tags, item_tags.c.tag_id == Tag.id)
+            .where(item_tags.c.item_id == self.items['alice 0']).order_by(Tag.name)
+        ).scalars().all()
+        self.assertEqual(links, ['denim', 'wool'])
+        self.assertEqual(self.tag('alice 0', '')['tags'], [])
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(item_tags)), 0)
+
+    def test_filter_by_tag(self):
+        """Test ?tag= filtering, with repeated tags meaning all of them."""
+        self.tag('alice 0', 'vintage,denim')
+        self.tag('alice 1', 'vintage')
+        self.tag('bob 0', 'vintage', user='bob')
+
+        data = self.get('/api/inventory?tag=Vintage&sort_by=title&sort_order=asc')
+        self.assertEqual([item['title'] for item in data['items']], ['alice 0', 'alice 1'])
+        self.assertEqual(data['total'], 2)
+
+        data = self.get('/api/inventory?tag=vintage&tag=denim')
+        self.assertEqual([item['title'] for item in data['items']], ['alice 0'])
+
+        data = self.get('/api/inventory?tag=vintage&cursor=&per_page=1')
+        self.assertEqual(len(data['items']), 1)
+        self.assertTrue(data['has_next'])
+
+        self.assertEqual(self.get('/api/inventory?tag=nope')['items'], [])
+
+    def test_tag_counts(self):
+        """Test the per-user tag facet, most used first, with prefix matching."""
+        self.tag('alice 0', 'vintage,denim')
+        self.tag('alice 1', 'vintage,velvet')
+        self.tag('alice 2', 'vintage')
+        self.tag('bob 0', 'vintage,denim', user='bob')
+
+        self.assertEqual(self.get('/api/inventory/tags')['tags'], [
+            {'tag': 'vintage', 'count': 3}, {'tag': 'denim', 'count': 1}, {'tag': 'velvet', 'count': 1}
+        ])
+        self.assertEqual(self.get('/api/inventory/tags?prefix=V')['tags'], [
+            {'tag': 'vintage', 'count': 3}, {'tag': 'velvet', 'count': 1}
+        ])
+        self.assertEqual(self.get('/api/inventory/tags?limit=1')['tags'], [{'tag': 'vintage', 'count': 3}])
+
+    def test_deleting_items_removes_links(self):
+        """Test that single and bulk deletes drop the item's association rows."""
+        self.tag('alice 0', 'vintage')
+        self.tag('alice 1', 'vintage')
+        self.tag('alice 2', 'vintage')
+
+        self.client.delete(f"/api/inventory/{self.items['alice 0']}", headers=self.headers['alice'])
+        self.client.post('/api/inventory/bulk-delete', headers=self.headers['alice'],
+                         data=json.dumps({'item_ids': [self.items['alice 1']]}), content_type='application/json')
+
+        self.assertEqual(db.session.scalar(select(func.count()).select_from(item_tags)), 1)
+        self.assertEqual(self.get('/api/inventory/tags')['tags'], [{'tag': 'vintage', 'count': 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+"""
+Tests for the database-backed work queue.
+"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from backend.app import create_app, start_background_services
+from backend.config import TestingConfig
+from backend.models import db, User, ScrapingJob
+from backend.services.query_cache import JOBS, get_query_cache, version_key
+from backend.services.scraper_service import resume_interrupted_jobs
+from backend.services.work_queue import (
+    DatabaseJobQueue, QueueWorker, claim_job, heartbeat, lease_job, reclaim_stale_leases, release_job
+)
+
+
+class TestWorkQueue(unittest.TestCase):
+    """Test cases for claiming, heartbeating and reclaiming jobs."""
+
+    def setUp(self):
+        """Set up app, database and users."""
+        self.app = create_app('testing')
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.create_all()
+
+        self.users = []
+        for name in ('alice', 'bob'):
+            user = User(username=name, email=f'{name}@example.com')
+            user.set_password('password123')
+            db.session.add(user)
+            self.users.append(user)
+        db.session.commit()
+        self.now = datetime(2026, 1, 19, 12, 0)
+
+    def tearDown(self):
+        """Clean up database."""
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def make_job(self, user=None, priority=0, status='queued', queued_at=None, **kwargs):
+        job = ScrapingJob(user_id=(user or self.users[0]).id, url='https://example.com/shop',
+                          merchant='Generic', status=status, priority=priority,
+                          queued_at=queued_at or self.now, **kwargs)
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    def test_claim_order_and_exclusivity(self):
+        """Test that workers claim by priority and never share a job."""
+        low = self.make_job(priority=1)
+        high = self.make_job(priority=5)
+        self.make_job(kind='batch')
+
+        self.assertEqual(claim_job('w1', now=self.now), high.id)
+        self.assertEqual(claim_job('w2', now=self.now), low.id)
+        self.assertIsNone(claim_job('w3', now=self.now))
+
+        db.session.refresh(high)
+        self.assertEqual(high.lease_owner, 'w1')
+        self.assertEqual(high.lease_expires_at, self.now + timedelta(seconds=120))
+
+    def test_per_user_cap(self):
+        """Test that a user holding the maximum leases is skipped."""
+        self.make_job()
+        self.make_job()
+        other = self.make_job(user=self.users[1])
+
+        claim_job('w1', max_jobs_per_user=1, now=self.now)
+        self.assertEqual(claim_job('w2', max_jobs_per_user=1, now=self.now), other.id)
+        self.assertIsNone(claim_job('w3', max_jobs_per_user=1, now=self.now))
+
+    def test_heartbeat_and_release(self):
+        """Test lease renewal, cancellation signalling and release."""
+        job = self.make_job()
+        claim_job('w1', now=self.now)
+
+        later = self.now + timedelta(seconds=60)
+        versions = [version_key(JOBS, str(job.user_id))]
+        cached = get_query_cache().versions(versions)
+        self.assertEqual(heartbeat(job.id, 'w1', now=later), (True, False))
+        self.assertEqual(heartbeat(job.id, 'w2', now=later), (False, False))
+        # Renewing a lease does not invalidate the user's cached job responses
+        self.assertEqual(get_query_cache().versions(versions), cached)
+
+        job.cancel_requested_at = later
+        db.session.commit()
+        self.assertEqual(heartbeat(job.id, 'w1', now=later), (True, True))
+
+        self.assertTrue(release_job(job.id, 'w1'))
+        db.session.refresh(job)
+        self.assertIsNone(job.lease_owner)
+
+    def test_reclaim_stale_leases(self):
+        """Test that expired leases are requeued, or failed after too many attempts."""
+        retry = self.make_job()
+        exhausted = self.make_job(attempts=3)
+        for job in (retry, exhausted):
+            claim_job('dead-worker', now=self.now)
+            job.status = 'running'
+        db.session.commit()
+
+        self.assertEqual(reclaim_stale_leases(max_attempts=3, now=self.now + timedelta(seconds=60)), (0, 0))
+        self.assertEqual(reclaim_stale_leases(max_attempts=3, now=self.now + timedelta(seconds=121)), (1, 1))
+
+        db.session.refresh(retry)
+        db.session.refresh(exhausted)
+        self.assertEqual(retry.status, 'queued')
+        self.assertIsNone(retry.lease_owner)
+        self.assertEqual(exhausted.status, 'failed')
+        self.assertEqual(claim_job('w2', now=self.now + timedelta(seconds=121)), retry.id)
+
+    def test_worker_runs_and_releases(self):
+        """Test that a worker runs a claimed job and releases its lease."""
+        job = self.make_job()
+        worker = QueueWorker(self.app, worker_id='w1')
+
+        def complete(job_id):
+            db.session.get(ScrapingJob, job_id).status = 'completed'
+            db.session.commit()
+
+        with patch('backend.services.scraper_service.run_scraping_job', side_effect=complete) as run:
+            self.assertEqual(worker.run_once(), job.id)
+            run.assert_called_once_with(job.id)
+            self.assertIsNone(worker.run_once())
+
+        db.session.refresh(job)
+        self.assertIsNone(job.lease_owner)
+
+    def test_lease_job(self):
+        """Test that a job is leased once, and only while queued."""
+        job = self.make_job()
+        self.assertTrue(lease_job(job.id, 'w1', now=self.now))
+        self.assertFalse(lease_job(job.id, 'w2', now=self.now))
+
+        release_job(job.id, 'w1')
+        job.status = 'cancelled'
+        db.session.commit()
+        self.assertFalse(lease_job(job.id, 'w2', now=self.now))
+
+    def test_resume_only_abandoned_jobs(self):
+        """Test that startup resubmits waiting and abandoned jobs but not jobs another process runs."""
+        now = datetime.utcnow()
+        live = self.make_job(status='running', lease_owner='other', lease_expires_at=now + timedelta(seconds=60))
+        dead = self.make_job(status='running', lease_owner='gone', lease_expires_at=now - timedelta(seconds=1))
+        waiting = self.make_job()
+        legacy = self.make_job(status='running')
+        self.make_job(kind='batch')
+        scheduler = self.app.extensions['job_scheduler'] = MagicMock()
+
+        resumed = resume_interrupted_jobs()
+        self.assertEqual(sorted(job.id for job in resumed), [dead.id, waiting.id, legacy.id])
+        self.assertEqual(scheduler.submit.call_count, 3)
+
+        db.session.refresh(live)
+        self.assertEqual((live.status, live.lease_owner), ('running', 'other'))
+        db.session.refresh(dead)
+        self.assertEqual((dead.status, dead.lease_owner), ('queued', None))
+
+    def test_resumed_only_when_started(self):
+        """Test that creating the app does not touch jobs; starting its background services does."""
+        with patch.object(TestingConfig, 'SCHEDULER_ENABLED', True), \
+                patch('backend.services.scraper_service.resume_interrupted_jobs') as resume:
+            app = create_app('testing')
+            resume.assert_not_called()
+            start_background_services(app)
+            resume.assert_called_once_with()
+
+    def test_database_queue_metrics(self):
+        """Test queue position and metrics read from the table."""
+        first = self.make_job()
+        second = self.make_job(user=self.users[1])
+        queue = DatabaseJobQueue()
+
+        self.assertEqual(queue.position(first.id), 1)
+        self.assertEqual(queue.position(second.id), 2)
+
+        claim_job('w1')
+        metrics = queue.metrics()
+        self.assertEqual(metrics['queued'], 2)
+        self.assertEqual(metrics['workers'], 1)
+        self.assertEqual(metrics['queued_by_user'], {self.users[0].id: 1, self.users[1].id: 1})
+
+    def test_position_matches_claim_order(self):
+        """Test that positions follow claim order for requeued and legacy jobs."""
+        requeued = self.make_job(queued_at=self.now + timedelta(minutes=5))
+        waiting = self.make_job()
+        legacy = self.make_job(created_at=self.now - timedelta(days=1))
+        legacy.queued_at = None
+        urgent = self.make_job(priority=5, queued_at=self.now + timedelta(minutes=10))
+        db.session.commit()
+        queue = DatabaseJobQueue()
+        expected = [urgent.id, legacy.id, waiting.id, requeued.id]
+
+        self.assertEqual([queue.position(job_id) for job_id in expected], [1, 2, 3, 4])
+        self.assertEqual([claim_job(f'w{i}') for i in range(4)], expected)
+
+
+if __name__ == '__main__':
+    unittest.main()